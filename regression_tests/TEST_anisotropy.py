@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import pytest
+import numpy as np
+
+# local imports
+from mesh import CartesianMesh
+from properties import MaterialProperties, SimulationProperties
+from anisotropy import find_zero_vertex, get_toughness_from_zeroVertex
+from time_step_solution import anderson_acceleration, update_projection_angles
+
+
+def K1c_func(x, y):
+    return 1e6 * (1 + 0.5 * np.sin(7 * x) * np.cos(5 * y))
+
+
+def test_vectorized_toughness_function():
+    Mesh = CartesianMesh(1., 1., 31, 31)
+
+    looped = MaterialProperties(Mesh, 3e10, 1e6, K1c_func=K1c_func)
+    vectorized = MaterialProperties(Mesh, 3e10, 1e6, K1c_func=K1c_func, vectorized_funcs=True)
+
+    expected = np.asarray([K1c_func(x, y) for (x, y) in Mesh.CenterCoor])
+    assert np.array_equal(looped.K1c, expected)
+    assert np.array_equal(vectorized.K1c, expected)
+
+
+def test_toughness_from_zero_vertex():
+    Mesh = CartesianMesh(1., 1., 31, 31)
+    mat_prop = MaterialProperties(Mesh, 3e10, 1e6, K1c_func=K1c_func, vectorized_funcs=True)
+
+    # level set of a radial fracture
+    sgnd_dist = np.linalg.norm(Mesh.CenterCoor, axis=1) - 0.5
+    off_axes = np.logical_and(abs(Mesh.CenterCoor[:, 0]) > Mesh.hx, abs(Mesh.CenterCoor[:, 1]) > Mesh.hy)
+    elts = np.where(np.logical_and(abs(sgnd_dist) < Mesh.hx, off_axes))[0]
+    zero_vrtx = find_zero_vertex(elts, sgnd_dist, Mesh)
+    alpha = np.full((len(elts),), np.pi / 4)
+    l = np.full((len(elts),), Mesh.hx / 3)
+
+    K1c = get_toughness_from_zeroVertex(elts, Mesh, mat_prop, alpha, l, zero_vrtx)
+
+    # the zero vertex is the vertex of the cell nearest to the center of the fracture and the perpendicular is drawn
+    # from it towards the front
+    for i, e in enumerate(elts):
+        vertices = Mesh.VertexCoor[Mesh.Connectivity[e]]
+        nearest = vertices[np.argmin(np.linalg.norm(vertices, axis=1))]
+        point = nearest + np.sign(nearest) * l[i] * np.asarray([np.cos(alpha[i]), np.sin(alpha[i])])
+        assert K1c[i] == pytest.approx(K1c_func(*point), rel=1e-12)
+
+
+def test_anderson_acceleration_linear_map():
+    rng = np.random.default_rng(0)
+    n = 4
+    A = 0.8 * np.diag(rng.uniform(-1, 1, n))
+    b = rng.uniform(size=n)
+    x_exact = np.linalg.solve(np.eye(n) - A, b)
+
+    # with the whole history, the fixed point of an affine map is found after n + 1 evaluations
+    x_hist, g_hist = [np.zeros(n)], []
+    for i in range(n + 1):
+        g_hist.append(np.dot(A, x_hist[-1]) + b)
+        x_hist.append(anderson_acceleration(x_hist, g_hist, 0.7))
+    assert x_hist[-1] == pytest.approx(x_exact, rel=1e-10)
+
+    # with a single iterate in the history, it is the relaxed fixed point iteration
+    x = rng.uniform(size=n)
+    assert anderson_acceleration([x], [b], 0.7) == pytest.approx(0.3 * x + 0.7 * b, rel=1e-14)
+
+
+def test_update_projection_angles():
+    sim_prop = SimulationProperties()
+    sim_prop.projRelaxation = 0.5
+    alpha = np.asarray([0.2, 0.4, 1.5])
+    projection = np.asarray([0.4, 0.2, 1.7])
+
+    # the first iterate is relaxed with the given factor and clipped to [0, pi/2]
+    alpha_next, alpha_hist, projection_hist = update_projection_angles(alpha, projection, [], [], sim_prop)
+    assert alpha_next == pytest.approx([0.3, 0.3, np.pi / 2], rel=1e-14)
+    assert len(alpha_hist) == len(projection_hist) == 1
+
+    # the history is kept while the residual decreases, up to the depth of the acceleration
+    sim_prop.projAndersonDepth = 1
+    alpha_hist, projection_hist = [], []
+    alpha_next = np.full((3,), 0.6)
+    for i in range(3):
+        alpha_next, alpha_hist, projection_hist = update_projection_angles(alpha_next, 0.5 * alpha_next + 0.1,
+                                                                           alpha_hist, projection_hist, sim_prop)
+        assert len(alpha_hist) == min(i + 1, 2)
+    assert alpha_next == pytest.approx(0.2, abs=1e-3)
+
+    # and discarded if the residual does not decrease
+    alpha_next, alpha_hist, projection_hist = update_projection_angles(alpha_next, alpha_next + 1., alpha_hist,
+                                                                       projection_hist, sim_prop)
+    assert len(alpha_hist) == 1
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import copy
+import os
+import numpy as np
+import pytest
+
+# local imports
+from mesh import CartesianMesh
+from properties import MaterialProperties, FluidProperties, InjectionProperties, SimulationProperties
+from fracture import Fracture
+from controller import Controller
+from fracture_initialization import Geometry, InitializationParameters
+from fracture_store import FractureStore
+from elasticity import load_isotropic_elasticity_matrix
+
+
+def radial_controller(output_folder):
+    Mesh = CartesianMesh(0.3, 0.3, 21, 21)
+    Solid = MaterialProperties(Mesh, 3.3e10 / (1 - 0.4 ** 2), 1e6, Carters_coef=1e-6)
+    Injection = InjectionProperties(0.001, Mesh)
+    Fluid = FluidProperties(viscosity=1.1e-3)
+
+    simulProp = SimulationProperties()
+    simulProp.finalTime = 1.
+    simulProp.plotFigure = False
+    simulProp.log2file = False
+    simulProp.checkpointTSJump = 2
+    simulProp.set_outputFolder(output_folder)
+
+    init_param = InitializationParameters(Geometry('radial', radius=0.1), regime='M')
+    Fr = Fracture(Mesh, init_param, Solid, Fluid, Injection, simulProp)
+
+    return Controller(Fr, Solid, Fluid, Injection, simulProp)
+
+
+def test_resume_from_checkpoint(tmp_path):
+    controller = radial_controller(str(tmp_path))
+    controller.C = np.random.default_rng(0).uniform(size=(controller.fracture.mesh.NumberOfElts,) * 2)
+    controller.TmStpCount = 2
+    controller.lastSavedFile = 1
+    controller.sim_prop.tmStpPrefactor = 0.64
+    controller.save_checkpoint()
+
+    folder = controller.sim_prop.get_outputFolder()
+    store = FractureStore(folder)
+    for i in range(3):
+        controller.fracture.time = 1. + i
+        store.save(controller.fracture, folder + 'simulation_file_' + repr(i))
+
+    resumed = Controller.resume(folder)
+    assert resumed.resumed
+    assert resumed.TmStpCount == 2
+    assert resumed.sim_prop.tmStpPrefactor == 0.64
+    np.testing.assert_array_equal(resumed.C, controller.C)
+    np.testing.assert_array_equal(resumed.fracture.w, controller.fracture.w)
+
+    # the fractures saved after the checkpoint are removed from the index
+    store.truncate(resumed.lastSavedFile)
+    assert list(FractureStore(folder).get_times()) == [1.]
+
+
+def test_resume_and_complete_run(tmp_path, monkeypatch):
+    def short_run(output_folder):
+        controller = radial_controller(output_folder)
+        controller.sim_prop.finalTime = 5e-3
+        controller.sim_prop.elastohydrSolver = 'implicit_Picard'
+        controller.sim_prop.checkpointTSJump = 5
+        controller.sim_prop.collectPerfData = True
+        return controller
+
+    uninterrupted = short_run(str(tmp_path / 'uninterrupted'))
+    uninterrupted.run()
+
+    # the simulation is interrupted after the checkpoint of the tenth time step
+    interrupted = short_run(str(tmp_path / 'interrupted'))
+    advance_time_step = Controller.advance_time_step
+
+    def interrupt(self, *args, **kwargs):
+        if self.TmStpCount == 13:
+            raise KeyboardInterrupt
+        return advance_time_step(self, *args, **kwargs)
+
+    monkeypatch.setattr(Controller, 'advance_time_step', interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        interrupted.run()
+    monkeypatch.setattr(Controller, 'advance_time_step', advance_time_step)
+
+    folder = interrupted.sim_prop.get_outputFolder()
+    resumed = Controller.resume(folder)
+    assert resumed.TmStpCount == 10
+    assert resumed.perfData is not None and len(resumed.perfData) == 10
+    assert resumed.run()
+
+    # the resumed simulation gives the same fractures as the uninterrupted one
+    store = FractureStore(folder)
+    store_uninterrupted = FractureStore(uninterrupted.sim_prop.get_outputFolder())
+    times = store.get_times()
+    assert list(times) == list(store_uninterrupted.get_times())
+    assert times[-1] == 5e-3
+    assert resumed.TmStpCount == uninterrupted.TmStpCount
+    assert len(resumed.perfData) == len(uninterrupted.perfData)
+    for i in range(len(times)):
+        Fr, Fr_uninterrupted = store.load(i), store_uninterrupted.load(i)
+        np.testing.assert_array_equal(Fr.w, Fr_uninterrupted.w)
+        np.testing.assert_array_equal(Fr.EltCrack, Fr_uninterrupted.EltCrack)
+        np.testing.assert_array_equal(Fr.sgndDist, Fr_uninterrupted.sgndDist)
+
+
+def test_branch_from_checkpoint(tmp_path):
+    controller = radial_controller(str(tmp_path))
+    controller.C = np.random.default_rng(0).uniform(size=(controller.fracture.mesh.NumberOfElts,) * 2)
+    controller.TmStpCount = 2
+    controller.lastSavedFile = 2
+    controller.save_checkpoint()
+
+    folder = controller.sim_prop.get_outputFolder()
+    store = FractureStore(folder)
+    for i in range(3):
+        controller.fracture.time = 1. + i
+        store.save(controller.fracture, folder + 'simulation_file_' + repr(i))
+
+    branch = Controller.branch(folder, name='branch', Fluid_prop=FluidProperties(viscosity=1e-2),
+                               share_elasticity=True)
+    assert branch.fluid_prop.viscosity == 1e-2
+    assert branch.TmStpCount == 2
+    assert branch.sim_prop.get_outputFolder().startswith(str(tmp_path) + '/branch__')
+    assert branch.branchedFrom == (folder[:-1], 2)
+
+    # the elasticity matrix is shared with the checkpoint and copied on write
+    assert isinstance(branch.C, np.memmap)
+    branch.C[0, 0] = -1.
+    assert Controller.resume(folder).C[0, 0] == controller.C[0, 0]
+
+    # the branch references the fractures of the parent preceding the branch
+    os.makedirs(branch.sim_prop.get_outputFolder())
+    branch_store = FractureStore(branch.sim_prop.get_outputFolder())
+    branch_store.add_parent(*branch.branchedFrom)
+    branch.fracture.time = 10.
+    branch_store.save(branch.fracture, branch.sim_prop.get_outputFolder() + 'branch_file_2')
+    branch_store = FractureStore(branch.sim_prop.get_outputFolder())
+    assert list(branch_store.get_times()) == [1., 2., 10.]
+    assert branch_store.load(1).time == 2.
+    assert len(branch_store.meshFiles) == 1
+
+    branch_store.truncate(1)
+    assert list(FractureStore(branch.sim_prop.get_outputFolder()).get_times()) == [1.]
+
+
+def test_branch_elasticity_matrix(tmp_path):
+    controller = radial_controller(str(tmp_path))
+    controller.C = load_isotropic_elasticity_matrix(controller.fracture.mesh, controller.solid_prop.Eprime)
+    controller.lastSavedFile = 1
+    controller.save_checkpoint()
+    folder = controller.sim_prop.get_outputFolder()
+    FractureStore(folder).save(controller.fracture, folder + 'simulation_file_0')
+
+    # only the elasticity matrix is computed when the branches are run
+    simulProp = copy.deepcopy(controller.sim_prop)
+    simulProp.finalTime = controller.fracture.time
+
+    same = Controller.branch(folder, name='same', Sim_prop=copy.deepcopy(simulProp))
+    np.testing.assert_array_equal(same.C, controller.C)
+
+    # the elasticity matrix of the parent is not used with another plain strain modulus
+    Solid = MaterialProperties(controller.fracture.mesh, 2 * controller.solid_prop.Eprime, 1e6, Carters_coef=1e-6)
+    stiffer = Controller.branch(folder, name='stiffer', Solid_prop=Solid, Sim_prop=copy.deepcopy(simulProp))
+    assert stiffer.C is None
+    stiffer.run()
+    np.testing.assert_allclose(stiffer.C, 2 * controller.C)
@@ -10,12 +10,17 @@ All rights reserved. See the LICENSE.TXT file for more details.
 import pytest
 import numpy as np
 
-from continuous_front_reconstruction import ray_tracing_numpy
+from continuous_front_reconstruction import ray_tracing_numpy, points_inside_fronts
 from continuous_front_reconstruction import find_indexes_repeatd_elements
 from continuous_front_reconstruction import Point
 from continuous_front_reconstruction import distance
 from continuous_front_reconstruction import copute_area_of_a_polygon
 from continuous_front_reconstruction import pointtolinedistance
+from continuous_front_reconstruction import ISinsideFracture
+from continuous_front_reconstruction import get_LS_on_vertexes
+from continuous_front_reconstruction import reconstruct_front_continuous
+from mesh import CartesianMesh
+import continuous_front_reconstruction
 
 
 def test_ray_tracing_numpy():
@@ -29,6 +34,20 @@ def test_ray_tracing_numpy():
     answer = ray_tracing_numpy(x, y, poly)
     assert answer[1] == False
 
+def test_ray_tracing_numpy_several_fronts():
+    square = np.asarray([[0., 0.], [1., 0.], [1., 1.], [0., 1.]])
+    x = np.asarray([[0.5, 2.5, 1.5, 0.5, 2.5]])
+    y = np.asarray([[0.5, 0.5, 0.5, 1.5, 0.25]])
+    answer = ray_tracing_numpy(x, y, [square, square + [2., 0.]])
+    assert np.array_equal(answer, [True, True, False, False, True])
+
+def test_points_inside_fronts():
+    square = np.asarray([[0., 0.], [1., 0.], [1., 1.], [0., 1.]])
+    x = np.asarray([0.5, 2.5, 1.5, 0.5, 1.])
+    y = np.asarray([0.5, 0.5, 0.5, 1.5, 0.5])
+    answer = points_inside_fronts(x, y, [square, square + [2., 0.]])
+    assert np.array_equal(answer, [[True, False], [False, True], [False, False], [False, False], [True, False]])
+
 def test_find_indexes_repeatd_elements():
     list = [10, 15, 33, 33, 18, 22, 16, 22]
     indexes = find_indexes_repeatd_elements(list)
@@ -49,3 +68,97 @@ def test_copute_area_of_a_closed_front():
 
 def test_pointtolinedistance():
     assert pointtolinedistance(3.,1.,2.,-2.,-13./3.,-3.) == pytest.approx(1./5.,0.00001)
+
+def test_get_LS_on_vertexes():
+    mesh = CartesianMesh(1., 1., 11, 11)
+    sgndDist_k = (mesh.CenterCoor[:, 0] ** 2 + mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.5
+    cells = np.arange(12, 30)
+    LS_vertexes = get_LS_on_vertexes(cells, mesh, sgndDist_k)[0]
+    for i in range(cells.size):
+        assert np.array_equal(LS_vertexes[i] < 0, ISinsideFracture(cells[i], mesh, sgndDist_k))
+
+def test_reconstruct_front_continuous_radial():
+    mesh = CartesianMesh(1., 1., 41, 41)
+    sgndDist_k = (mesh.CenterCoor[:, 0] ** 2 + mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.53
+    anularegion = np.where(abs(sgndDist_k) < 4 * mesh.hx)[0]
+    channel = np.where(sgndDist_k < -2 * mesh.hx)[0]
+    ribbon = channel[np.any(sgndDist_k[mesh.NeiElements[channel]] >= -2 * mesh.hx, axis=1)]
+    channel = np.setdiff1d(channel, ribbon)
+
+    (EltTip, EltTipONLY, l, alpha, CellStatus, newRibbon, zrVertx, zrVertxONLY, correct_size_of_pstv_region,
+     sgndDist_k, Ffront, number_of_fronts, fronts_dictionary) = reconstruct_front_continuous(np.copy(sgndDist_k),
+                                                                                             anularegion, ribbon,
+                                                                                             channel, mesh, False)
+    assert correct_size_of_pstv_region[0]
+    assert number_of_fronts == 1
+    # the front is a closed polygon inscribed in the circle
+    radius = (Ffront[:, 0] ** 2 + Ffront[:, 1] ** 2) ** 0.5
+    assert radius == pytest.approx(0.53, abs=0.01)
+    assert np.array_equal(np.sort(EltTipONLY), np.unique(EltTipONLY))
+    assert (alpha >= 0).all() and (alpha <= np.pi / 2).all()
+    # the tip cells come first, followed by the cells fully traversed by the front
+    assert np.array_equal(EltTip[:EltTipONLY.size], EltTipONLY)
+    assert (l[:EltTipONLY.size] >= 0).all() and (l[:EltTipONLY.size] < 2 ** 0.5 * mesh.hx).all()
+
+
+def test_reconstruct_front_continuous_reuse_previous_fronts(monkeypatch):
+    mesh = CartesianMesh(1., 1., 41, 41)
+    x, y = mesh.CenterCoor[:, 0], mesh.CenterCoor[:, 1]
+
+    def reconstruct(sgndDist_k, previous_fronts_dictionary=None):
+        anularegion = np.where(abs(sgndDist_k) < 4 * mesh.hx)[0]
+        channel = np.where(sgndDist_k < -2 * mesh.hx)[0]
+        ribbon = channel[np.any(sgndDist_k[mesh.NeiElements[channel]] >= -2 * mesh.hx, axis=1)]
+        channel = np.setdiff1d(channel, ribbon)
+        return reconstruct_front_continuous(np.copy(sgndDist_k), anularegion, ribbon, channel, mesh, False,
+                                            previous_fronts_dictionary=previous_fronts_dictionary)
+
+    get_front_crossings = continuous_front_reconstruction.get_front_crossings
+    crossings_computed = []
+    monkeypatch.setattr(continuous_front_reconstruction, 'get_front_crossings',
+                        lambda cells, *args: crossings_computed.append(cells.size) or get_front_crossings(cells, *args))
+    get_closed_paths = continuous_front_reconstruction.get_closed_paths
+    traced_from_scratch = []
+    monkeypatch.setattr(continuous_front_reconstruction, 'get_closed_paths',
+                        lambda successors: traced_from_scratch.append(True) or get_closed_paths(successors))
+
+    circle = lambda radius, x0=0.: ((x - x0) ** 2 + y ** 2) ** 0.5 - radius
+    previous = reconstruct(circle(0.53))[-1]
+    # the radius increases and the front moves to the right, then a second fracture appears
+    for sgndDist_k, retraced in [(circle(0.531), True), (circle(0.55), True), (circle(0.55, 0.02), True),
+                                 (np.minimum(circle(0.55, 0.02), circle(0.15, -0.7)), False)]:
+        from_scratch = reconstruct(sgndDist_k)
+        crossings_computed.clear()
+        traced_from_scratch.clear()
+        reusing = reconstruct(sgndDist_k, previous_fronts_dictionary=previous)
+        # the crossings are computed only at the changed fictitius cells
+        assert sum(crossings_computed) < reusing[-1]['traced_paths']['FC_names'].size
+        # the fronts are traced from scratch only if the topology changed
+        assert (len(traced_from_scratch) == 0) == retraced
+        for i in [0, 1, 2, 3, 10]:
+            assert np.array_equal(reusing[i], from_scratch[i])
+        previous = reusing[-1]
+    assert reconstruct(circle(0.531), reconstruct(circle(0.531))[-1])[-1]['traced_paths'] is not None
+
+def test_reconstruct_front_continuous_closed_paths_as_walk(monkeypatch):
+    mesh = CartesianMesh(1., 1., 61, 61)
+    x, y = mesh.CenterCoor[:, 0], mesh.CenterCoor[:, 1]
+    # two fractures with fronts of different sizes
+    sgndDist_k = np.minimum(((x - 0.4) ** 2 + y ** 2) ** 0.5 - 0.25, ((x + 0.45) ** 2 + (y - 0.1) ** 2) ** 0.5 - 0.2)
+    anularegion = np.where(abs(sgndDist_k) < 4 * mesh.hx)[0]
+    channel = np.where(sgndDist_k < -2 * mesh.hx)[0]
+    ribbon = channel[np.any(sgndDist_k[mesh.NeiElements[channel]] >= -2 * mesh.hx, axis=1)]
+    channel = np.setdiff1d(channel, ribbon)
+
+    get_closed_paths = continuous_front_reconstruction.get_closed_paths
+    closed_paths = []
+    monkeypatch.setattr(continuous_front_reconstruction, 'get_closed_paths',
+                        lambda successors: closed_paths.append(get_closed_paths(successors)) or closed_paths[-1])
+    with_arrays = reconstruct_front_continuous(np.copy(sgndDist_k), anularegion, ribbon, channel, mesh, True)
+    assert len(closed_paths) > 0 and len(closed_paths[0]) == 2
+
+    # tracing the fronts cell by cell gives the same fronts
+    monkeypatch.setattr(continuous_front_reconstruction, 'get_closed_paths', lambda successors: None)
+    walking = reconstruct_front_continuous(np.copy(sgndDist_k), anularegion, ribbon, channel, mesh, True)
+    for i in [0, 1, 2, 3, 10]:
+        assert np.array_equal(with_arrays[i], walking[i])
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import copy
+import dill
+from functools import partial
+import numpy as np
+
+# local imports
+from mesh import CartesianMesh
+from properties import MaterialProperties, FluidProperties, InjectionProperties, SimulationProperties
+from fracture import Fracture
+from fracture_initialization import Geometry, InitializationParameters
+from fracture_store import FractureStore
+from postprocess_fracture import select_fractures, apply_to_saved_fractures, get_variable_and_time, \
+    get_fracture_variable_array
+
+
+def radial_fracture():
+    Mesh = CartesianMesh(0.3, 0.3, 41, 41)
+    Solid = MaterialProperties(Mesh, 3.3e10 / (1 - 0.4 ** 2), 0.5)
+    Injection = InjectionProperties(0.001, Mesh)
+    Fluid = FluidProperties(viscosity=1.1e-3)
+    simulProp = SimulationProperties()
+    init_param = InitializationParameters(Geometry('radial', radius=0.1), regime='M')
+
+    return Fracture(Mesh, init_param, Solid, Fluid, Injection, simulProp)
+
+
+def assert_same_fracture(loaded, Fr):
+    assert set(loaded.__dict__) == set(Fr.__dict__)
+    for key, value in Fr.__dict__.items():
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            assert loaded.__dict__[key].dtype == value.dtype
+            np.testing.assert_array_equal(loaded.__dict__[key], value)
+
+
+def test_store_round_trip(tmp_path):
+    Fr = radial_fracture()
+    store = FractureStore(str(tmp_path))
+    store.save(Fr, str(tmp_path / 'simulation_file_0'))
+    Fr_2 = copy.deepcopy(Fr)
+    Fr_2.time = 2.
+    Fr_2.w = Fr_2.w * 2
+    store.save(Fr_2, str(tmp_path / 'simulation_file_1'))
+
+    # the store is read again from the index
+    store = FractureStore(str(tmp_path))
+    assert [step['time'] for step in store.steps] == [Fr.time, 2.]
+    assert len(store.meshFiles) == 1
+
+    loaded = [store.load(0), store.load(1)]
+    assert_same_fracture(loaded[0], Fr)
+    assert_same_fracture(loaded[1], Fr_2)
+    assert loaded[0].mesh is loaded[1].mesh
+    assert loaded[0].mesh.NumberOfElts == Fr.mesh.NumberOfElts
+
+
+def test_store_downcast(tmp_path):
+    Fr = radial_fracture()
+    store = FractureStore(str(tmp_path), downcast=True)
+    store.save(Fr, str(tmp_path / 'simulation_file_0'))
+
+    loaded = store.load(0)
+    assert loaded.w.dtype == np.float64
+    np.testing.assert_allclose(loaded.w, Fr.w, rtol=1e-7)
+    np.testing.assert_array_equal(loaded.EltCrack, Fr.EltCrack)
+
+
+def test_index_pickled_fractures(tmp_path):
+    Fr = radial_fracture()
+    for i in range(3):
+        Fr.time = 1. + i
+        Fr.SaveFracture(str(tmp_path / ('simulation_file_' + repr(i))))
+
+    # the fractures saved without an index are indexed once
+    store = FractureStore.index_pickled_fractures(str(tmp_path), 'simulation')
+    assert FractureStore.exists(str(tmp_path))
+    assert [step['time'] for step in FractureStore(str(tmp_path)).steps] == [1., 2., 3.]
+
+    loaded = [store.load(1), store.load(2)]
+    assert loaded[0].time == 2.
+    assert_same_fracture(loaded[1], Fr)
+    assert loaded[0].mesh is loaded[1].mesh
+
+
+def test_select_fractures():
+    times = np.linspace(0.1, 10., 100)
+
+    assert select_fractures(times) == list(range(100))
+    assert select_fractures(times, step_size=10) == list(range(0, 100, 10))
+    assert select_fractures(times, time_srs=np.array([1., 5.05])) == [9, 50]
+    assert select_fractures(times, time_period=2.) == [0, 20, 40, 60, 80]
+
+
+def test_parallel_extraction(tmp_path):
+    Fr = radial_fracture()
+    store = FractureStore(str(tmp_path))
+    for i in range(4):
+        Fr.time = 1. + i
+        Fr.w = Fr.w * 2
+        store.save(Fr, str(tmp_path / ('simulation_file_' + repr(i))))
+
+    get_width = partial(get_variable_and_time, variable='w')
+    sequential = apply_to_saved_fractures(get_width, store, [0, 2, 3])
+    parallel = apply_to_saved_fractures(get_width, store, [0, 2, 3], n_workers=2)
+
+    # the results are returned in the order of the given steps
+    assert [result[1] for result in parallel] == [1., 3., 4.]
+    for result, expected in zip(parallel, sequential):
+        np.testing.assert_array_equal(result[0], expected[0])
+
+
+def test_variable_array_cache(tmp_path):
+    folder = tmp_path / 'simulation__2020-01-01__00_00_00'
+    folder.mkdir()
+    with open(str(folder / 'properties'), 'wb') as output:
+        dill.dump(None, output)
+
+    Fr = radial_fracture()
+    store = FractureStore(str(folder), save_format='pickle')
+    widths = []
+    for i in range(3):
+        Fr.time = 1. + i
+        Fr.w = Fr.w * 2
+        widths.append(Fr.w)
+        store.save(Fr, str(folder / ('simulation_file_' + repr(i))))
+
+    values, times, mesh_ids = get_fracture_variable_array('w', str(tmp_path), 'simulation')
+    np.testing.assert_array_equal(values, np.asarray(widths))
+    assert list(times) == [1., 2., 3.]
+    assert list(mesh_ids) == [0, 0, 0]
+
+    # the variable is read from the cache once it is written
+    cached = get_fracture_variable_array('w', str(tmp_path), 'simulation', time_srs=[1.5])[0]
+    assert isinstance(np.load(str(folder / 'variable_cache_w_4.npy'), mmap_mode='r'), np.memmap)
+    np.testing.assert_array_equal(cached, [widths[1]])
+
+
+def test_variable_array_cache_refresh(tmp_path):
+    folder = tmp_path / 'simulation__2020-01-01__00_00_00'
+    folder.mkdir()
+    with open(str(folder / 'properties'), 'wb') as output:
+        dill.dump(None, output)
+
+    Fr = radial_fracture()
+    store = FractureStore(str(folder))
+    for i in range(3):
+        Fr.time = 1. + i
+        store.save(Fr, str(folder / ('simulation_file_' + repr(i))))
+    get_fracture_variable_array('w', str(tmp_path), 'simulation')
+
+    # the fractures after the first one are saved again (e.g. by a resumed simulation) at the same times
+    store.truncate(1)
+    for i in range(1, 3):
+        Fr.time = 1. + i
+        Fr.w = Fr.w * 2
+        store.save(Fr, str(folder / ('simulation_file_' + repr(i))))
+
+    values = get_fracture_variable_array('w', str(tmp_path), 'simulation')[0]
+    np.testing.assert_array_equal(values[2], Fr.w)
+    np.testing.assert_array_equal(values[1], Fr.w / 2)
+
+
+def test_traced_paths_not_saved(tmp_path):
+    Fr = radial_fracture()
+    assert Fr.fronts_dictionary['traced_paths'] is not None
+
+    store = FractureStore(str(tmp_path))
+    store.save(Fr, str(tmp_path / 'simulation_file_0'))
+    Fr.SaveFracture(str(tmp_path / 'pickled'))
+
+    assert store.load(0).fronts_dictionary['traced_paths'] is None
+    assert dill.load(open(str(tmp_path / 'pickled'), 'rb')).fronts_dictionary['traced_paths'] is None
+    # the fracture in memory keeps them for the next front reconstruction
+    assert Fr.fronts_dictionary['traced_paths'] is not None
+
+
+def test_fracture_copy_shares_mesh():
+    Fr = radial_fracture()
+    Fr_copy = copy.deepcopy(Fr)
+
+    # the mesh is shared with the copy
+    assert Fr_copy.mesh is Fr.mesh
+    assert_same_fracture(Fr_copy, Fr)
+
+    # the other attributes are independent of the original
+    for key in ['w', 'sgndDist', 'EltChannel']:
+        assert not np.shares_memory(getattr(Fr_copy, key), getattr(Fr, key))
+    w, sgndDist, EltChannel = np.copy(Fr.w), np.copy(Fr.sgndDist), np.copy(Fr.EltChannel)
+    Fr_copy.w += 1.
+    Fr_copy.sgndDist[:] = 0.
+    Fr_copy.EltChannel[0] = -1
+    np.testing.assert_array_equal(Fr.w, w)
+    np.testing.assert_array_equal(Fr.sgndDist, sgndDist)
+    np.testing.assert_array_equal(Fr.EltChannel, EltChannel)
+    assert Fr_copy.fronts_dictionary is not Fr.fronts_dictionary
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import numpy as np
+from scipy.interpolate import griddata
+
+# local imports
+from mesh import CartesianMesh
+from postprocess_fracture import interpolate_on_mesh, get_interpolation_stencil
+
+
+def test_interpolation_as_griddata():
+    mesh = CartesianMesh(1., 0.6, 31, 21)
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1.1, 1.1, (200, 2))
+    points[:10] = mesh.CenterCoor[rng.integers(0, mesh.NumberOfElts, 10)]
+
+    for i in range(3):
+        values = rng.uniform(size=mesh.NumberOfElts)
+        expected = griddata(mesh.CenterCoor, values, points, method='linear', fill_value=np.nan)
+        np.testing.assert_allclose(interpolate_on_mesh(mesh, values, points), expected, rtol=1e-12, atol=1e-14)
+
+    # the stencil is evaluated once for the mesh and the points
+    assert get_interpolation_stencil(mesh, points) is get_interpolation_stencil(mesh, points.copy())
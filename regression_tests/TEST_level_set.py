@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import pytest
+import numpy as np
+
+# local imports
+from mesh import CartesianMesh
+from level_set import SolveFMM, clip_to_band, sweep_Eikonal, UpdateLists, reconstruct_front, reconstruct_front_LS_gradient
+
+
+def straight_front_level_set(Mesh, x_front):
+    """ exact signed distance from a straight vertical front at x = x_front (negative inside the fracture)"""
+    sgndDist_exact = Mesh.CenterCoor[:, 0] - x_front
+    inside = np.where(sgndDist_exact < 0)[0]
+    ribbon = inside[np.any(sgndDist_exact[Mesh.NeiElements[inside]] >= 0, axis=1)]
+    return sgndDist_exact, inside, ribbon
+
+
+def test_FMM_straight_front_hx_eq_hy():
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    sgndDist_exact, inside, ribbon = straight_front_level_set(Mesh, 0.03)
+    outside = np.setdiff1d(np.arange(Mesh.NumberOfElts), inside)
+
+    sgndDist = np.full((Mesh.NumberOfElts,), 1e50)
+    sgndDist[ribbon] = sgndDist_exact[ribbon]
+    SolveFMM(sgndDist, ribbon, inside, Mesh, outside, inside)
+
+    # the distance from a front aligned with the mesh is evaluated exactly away from the mesh boundary
+    interior = np.where((abs(Mesh.CenterCoor[:, 1]) < 0.8))[0]
+    assert sgndDist[interior] == pytest.approx(sgndDist_exact[interior], abs=1e-12)
+
+
+def test_FMM_straight_front_hx_noteq_hy():
+    Mesh = CartesianMesh(1., 2., 21, 31)
+    sgndDist_exact, inside, ribbon = straight_front_level_set(Mesh, -0.11)
+    outside = np.setdiff1d(np.arange(Mesh.NumberOfElts), inside)
+
+    sgndDist = np.full((Mesh.NumberOfElts,), 1e50)
+    sgndDist[ribbon] = sgndDist_exact[ribbon]
+    SolveFMM(sgndDist, ribbon, inside, Mesh, outside, inside)
+
+    assert (sgndDist < 1e50).all()
+    assert sgndDist[inside] == pytest.approx(sgndDist_exact[inside], abs=1e-12)
+    assert sgndDist[outside] == pytest.approx(sgndDist_exact[outside], abs=1e-12)
+
+
+def test_FMM_repeated_ribbon_cells():
+    Mesh = CartesianMesh(1., 1., 25, 25)
+    sgndDist_exact = (Mesh.CenterCoor[:, 0] ** 2 + Mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.5
+    inside = np.where(sgndDist_exact < 0)[0]
+    ribbon = inside[np.any(sgndDist_exact[Mesh.NeiElements[inside]] >= 0, axis=1)]
+    outside = np.setdiff1d(np.arange(Mesh.NumberOfElts), inside)
+
+    sgndDist = np.full((Mesh.NumberOfElts,), 1e50)
+    sgndDist[ribbon] = sgndDist_exact[ribbon]
+    sgndDist_rep = np.copy(sgndDist)
+    SolveFMM(sgndDist, ribbon, inside, Mesh, outside, inside)
+    SolveFMM(sgndDist_rep, np.concatenate((ribbon, ribbon[::3])), inside, Mesh, outside, inside)
+
+    assert (abs(sgndDist) < 1e50).all()
+    assert sgndDist_rep == pytest.approx(sgndDist, abs=1e-12)
+
+
+def test_FMM_narrow_band():
+    Mesh = CartesianMesh(1., 1., 41, 41)
+    sgndDist_exact = (Mesh.CenterCoor[:, 0] ** 2 + Mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.6
+    inside = np.where(sgndDist_exact < 0)[0]
+    ribbon = inside[np.any(sgndDist_exact[Mesh.NeiElements[inside]] >= 0, axis=1)]
+    outside = np.setdiff1d(np.arange(Mesh.NumberOfElts), inside)
+
+    sgndDist_full = np.full((Mesh.NumberOfElts,), 1e50)
+    sgndDist_full[ribbon] = sgndDist_exact[ribbon]
+    sgndDist_band = np.copy(sgndDist_full)
+    SolveFMM(sgndDist_full, ribbon, inside, Mesh, outside, inside)
+    SolveFMM(sgndDist_band, ribbon, inside, Mesh, outside, inside, band_width=3)
+
+    # the level set in the band is the same as evaluated in the whole domain
+    in_band = np.where(abs(sgndDist_full) <= 3 * Mesh.hx)[0]
+    assert sgndDist_band[in_band] == pytest.approx(sgndDist_full[in_band], abs=1e-12)
+
+    # the cells beyond the band are marked as far outside or far inside
+    beyond = np.setdiff1d(np.arange(Mesh.NumberOfElts), np.union1d(in_band, ribbon))
+    assert (abs(sgndDist_band[beyond]) == 1e50).all()
+    assert (sgndDist_band[np.intersect1d(beyond, outside)] > 0).all()
+    assert (sgndDist_band[np.intersect1d(beyond, inside)] < 0).all()
+    assert len(beyond) > 0
+
+    # clipped to the band width before being stored, keeping the sign and the values in the band
+    sgndDist_clipped = clip_to_band(sgndDist_band, Mesh, 3)
+    assert (abs(sgndDist_clipped) <= 3 * Mesh.hx).all()
+    assert sgndDist_clipped[beyond] == pytest.approx(np.sign(sgndDist_band[beyond]) * 3 * Mesh.hx)
+    assert sgndDist_clipped[in_band] == pytest.approx(sgndDist_full[in_band], abs=1e-12)
+    assert clip_to_band(sgndDist_full, Mesh, None) is sgndDist_full
+
+
+def test_sweep_Eikonal_straight_front():
+    Mesh = CartesianMesh(1., 1.5, 21, 25)
+    sgndDist_exact = Mesh.CenterCoor[:, 0] + 0.5 * Mesh.CenterCoor[:, 1] + 2.
+    sgndDist_exact /= (1 + 0.5 ** 2) ** 0.5
+
+    # a block of cells left unevaluated
+    block = np.where(np.logical_and(abs(Mesh.CenterCoor[:, 0]) < 0.25, abs(Mesh.CenterCoor[:, 1]) < 0.3))[0]
+    sgndDist = np.copy(sgndDist_exact)
+    sgndDist[block] = 1e50
+    evaluated = sweep_Eikonal(sgndDist, block, Mesh)
+
+    assert np.array_equal(np.sort(evaluated), np.sort(block))
+    assert (sgndDist[block] < 1e50).all()
+    # the closed form update gives the exact distance for a straight front up to the discretization error
+    assert sgndDist[block] == pytest.approx(sgndDist_exact[block], abs=0.2 * Mesh.hx)
+    assert (sgndDist[block] >= sgndDist_exact[block] - 1e-12).all()
+
+
+def test_FMM_unreachable_cells():
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    sgndDist_exact, inside, ribbon = straight_front_level_set(Mesh, 0.03)
+    outside = np.setdiff1d(np.arange(Mesh.NumberOfElts), inside)
+
+    # a cell in the region to be evaluated surrounded by cells with known distance not to be evaluated
+    enclosed = Mesh.locate_element(0.4, 0.)[0]
+    enclosing = Mesh.NeiElements[enclosed]
+    sgndDist = np.full((Mesh.NumberOfElts,), 1e50)
+    sgndDist[ribbon] = sgndDist_exact[ribbon]
+    sgndDist[enclosing] = sgndDist_exact[enclosing]
+    farAwayPstv = np.setdiff1d(outside, enclosing)
+    SolveFMM(sgndDist, ribbon, inside, Mesh, farAwayPstv, inside)
+
+    assert (abs(sgndDist[farAwayPstv]) < 1e50).all()
+    assert sgndDist[enclosed] == pytest.approx(sgndDist_exact[enclosed], abs=1e-12)
+
+
+def test_UpdateLists_zero_vertex_and_ribbon():
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    sgndDist = (Mesh.CenterCoor[:, 0] ** 2 + Mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.5
+    inside = np.where(sgndDist < 0)[0]
+    # four tip cells, one in each quadrant, lying on the diagonals
+    tip = np.asarray([Mesh.locate_element(x, y)[0] for (x, y) in [(0.4, 0.4), (-0.4, 0.4), (-0.4, -0.4),
+                                                                   (0.4, -0.4)]])
+    channel = np.setdiff1d(inside, tip)
+
+    (EltChannel, EltTip, EltCrack, EltRibbon, zeroVrtx, CellStatus,
+     newChannel) = UpdateLists(channel, tip, np.full((4,), 0.5), sgndDist, Mesh)
+
+    assert np.array_equal(EltTip, tip)
+    assert np.array_equal(zeroVrtx, [0, 1, 2, 3])
+    # the ribbon cells are the inner neighbours of the tip cells in the x and y directions
+    expected_ribbon = [Mesh.NeiElements[tip[0], 0], Mesh.NeiElements[tip[0], 2],
+                       Mesh.NeiElements[tip[1], 1], Mesh.NeiElements[tip[1], 2],
+                       Mesh.NeiElements[tip[2], 1], Mesh.NeiElements[tip[2], 3],
+                       Mesh.NeiElements[tip[3], 0], Mesh.NeiElements[tip[3], 3]]
+    assert np.array_equal(EltRibbon, np.unique(expected_ribbon))
+    assert (CellStatus[EltRibbon] == 3).all()
+    assert len(newChannel) == 0
+
+
+def test_UpdateLists_conjoined_tip_cells():
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    sgndDist = (Mesh.CenterCoor[:, 0] ** 2 + Mesh.CenterCoor[:, 1] ** 2) ** 0.5 - 0.5
+    # a block of four tip cells
+    elt = Mesh.locate_element(0.4, 0.3)[0]
+    block = np.asarray([elt, Mesh.NeiElements[elt, 0], Mesh.NeiElements[elt, 3], Mesh.NeiElements[elt, 3] - 1])
+    channel = np.setdiff1d(np.where(sgndDist < -0.2)[0], block)
+
+    EltTip = UpdateLists(channel, block, np.full((4,), 0.5), sgndDist, Mesh)[1]
+
+    # the cell of the block closest to the center is removed from the tip
+    closest = block[np.argmin(Mesh.distCenter[block])]
+    assert np.array_equal(EltTip, block[block != closest])
+
+
+@pytest.mark.parametrize("reconstruct", [reconstruct_front, reconstruct_front_LS_gradient])
+def test_reconstruct_front_straight_front(reconstruct):
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    sgndDist, inside, ribbon = straight_front_level_set(Mesh, 0.03)
+    band = np.where(abs(sgndDist) < 3 * Mesh.hx)[0]
+    channel = np.intersect1d(inside, band)
+
+    EltTip, l, alpha, CellStatus = reconstruct(sgndDist, band, channel, Mesh)
+
+    # the tip cells are the cells just outside the front, with the front perpendicular to the x axis
+    interior = abs(Mesh.CenterCoor[EltTip, 1]) < 0.9
+    assert (Mesh.CenterCoor[EltTip, 0] - Mesh.hx / 2 < 0.03).all()
+    assert (Mesh.CenterCoor[EltTip, 0] + Mesh.hx / 2 > 0.03).all()
+    assert l[interior] == pytest.approx(0.03 - (Mesh.CenterCoor[EltTip[interior], 0] - Mesh.hx / 2), abs=1e-12)
+    assert alpha[interior] == pytest.approx(0., abs=1e-12)
+    assert (CellStatus[EltTip] == 2).all()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import pytest
+import dill
+import numpy as np
+
+# local imports
+from output_writer import FractureWriter
+from properties import IterationProperties, MaterialProperties, FluidProperties, InjectionProperties, \
+    SimulationProperties
+from mesh import CartesianMesh
+from fracture import Fracture
+from controller import Controller
+from fracture_initialization import Geometry, InitializationParameters
+from fracture_store import FractureStore
+
+
+class Snapshot:
+    def __init__(self, time):
+        self.time = time
+        self.w = np.full((10,), time)
+
+    def SaveFracture(self, filename):
+        with open(filename, 'wb') as output:
+            dill.dump(self, output, -1)
+
+
+def test_background_writer(tmp_path):
+    writer = FractureWriter(queue_size=2)
+    nodes = []
+    fracture = Snapshot(0.)
+    for i in range(6):
+        nodes.append(IterationProperties('save to disk'))
+        writer.save(fracture, str(tmp_path / ('file_' + repr(i))), nodes[-1])
+        # the fracture is modified in place after it is queued
+        fracture.time += 1.
+        fracture.w += 1.
+    writer.close()
+
+    for i in range(6):
+        with open(str(tmp_path / ('file_' + repr(i))), 'rb') as inp:
+            saved = dill.load(inp)
+        assert saved.time == i
+        assert np.all(saved.w == i)
+        assert nodes[i].status
+        assert nodes[i].CpuTime_end >= nodes[i].CpuTime_start + nodes[i].blockingTime
+
+
+def test_background_writer_failure(tmp_path):
+    writer = FractureWriter(queue_size=2)
+    writer.save(Snapshot(0.), str(tmp_path / 'missing_folder' / 'file_0'))
+
+    # the failure of the writer is raised in the simulation
+    with pytest.raises(FileNotFoundError):
+        writer.flush()
+    writer.close()
+
+
+def test_writer_failure_after_simulation_failure(tmp_path, monkeypatch):
+    Mesh = CartesianMesh(0.3, 0.3, 21, 21)
+    Solid = MaterialProperties(Mesh, 3.3e10 / (1 - 0.4 ** 2), 1e6)
+    Injection = InjectionProperties(0.001, Mesh)
+    Fluid = FluidProperties(viscosity=1.1e-3)
+    simulProp = SimulationProperties()
+    simulProp.finalTime = 1.
+    simulProp.plotFigure = False
+    simulProp.log2file = False
+    simulProp.set_outputFolder(str(tmp_path))
+    Fr = Fracture(Mesh, InitializationParameters(Geometry('radial', radius=0.1), regime='M'), Solid, Fluid,
+                  Injection, simulProp)
+    controller = Controller(Fr, Solid, Fluid, Injection, simulProp)
+
+    def fail_to_save(self, fracture, filename):
+        raise OSError("disk full")
+
+    def fail_time_step(self, *args, **kwargs):
+        raise RuntimeError("time step failed")
+
+    monkeypatch.setattr(FractureStore, 'save', fail_to_save)
+    monkeypatch.setattr(Controller, 'advance_time_step', fail_time_step)
+
+    # the failure of the simulation is not replaced by the failure of the writer
+    with pytest.raises(RuntimeError):
+        controller.run()
+    assert controller.fileWriter is None
+
+    # the failure of the writer is raised if the simulation has not failed
+    controller.sim_prop.finalTime = controller.fracture.time
+    with pytest.raises(OSError):
+        controller.run()
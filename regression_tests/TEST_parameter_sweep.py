@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import csv
+import os
+import signal
+import numpy as np
+
+# local imports
+from mesh import CartesianMesh
+from properties import MaterialProperties, FluidProperties, InjectionProperties, SimulationProperties
+from fracture import Fracture
+from fracture_initialization import Geometry, InitializationParameters
+from elasticity import load_isotropic_elasticity_matrix, load_cached_elasticity_matrix
+from fracture_store import FractureStore
+from parameter_sweep import parameter_grid, run_sweep
+
+
+def radial_simulation(toughness, leak_off):
+    if toughness < 0:
+        raise ValueError("The toughness is negative!")
+    if toughness == 0:
+        # the process is killed, as when it runs out of memory
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    Mesh = CartesianMesh(0.3, 0.3, 21, 21)
+    Solid = MaterialProperties(Mesh, 3.3e10 / (1 - 0.4 ** 2), toughness, Carters_coef=leak_off)
+    Injection = InjectionProperties(0.001, Mesh)
+    Fluid = FluidProperties(viscosity=1.1e-3)
+    simulProp = SimulationProperties()
+    init_param = InitializationParameters(Geometry('radial', radius=0.1), regime='M')
+    Fr = Fracture(Mesh, init_param, Solid, Fluid, Injection, simulProp)
+
+    # only the initial fracture is saved
+    simulProp.finalTime = Fr.time
+
+    return Fr, Solid, Fluid, Injection, simulProp
+
+
+def test_parameter_grid():
+    grid = parameter_grid(toughness=[1e6, 2e6], leak_off=[0., 1e-6, 1e-5])
+
+    assert len(grid) == 6
+    assert grid[1] == {'toughness': 1e6, 'leak_off': 1e-6}
+
+
+def test_cached_elasticity_matrix(tmp_path):
+    Mesh = CartesianMesh(0.3, 0.3, 11, 11)
+    C = load_cached_elasticity_matrix(Mesh, 3.9e10, str(tmp_path))
+    np.testing.assert_array_equal(C, load_isotropic_elasticity_matrix(Mesh, 3.9e10))
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    # the cached matrix is not modified by the processes using it
+    C *= 2
+    np.testing.assert_array_equal(load_cached_elasticity_matrix(Mesh, 3.9e10, str(tmp_path)),
+                                  load_isotropic_elasticity_matrix(Mesh, 3.9e10))
+
+    load_cached_elasticity_matrix(Mesh, 4e10, str(tmp_path))
+    assert len(os.listdir(str(tmp_path))) == 2
+
+
+def test_sweep_survives_failures(tmp_path):
+    runs = parameter_grid(toughness=[1e6, -1.], leak_off=[0., 1e-6])
+    summaries = run_sweep(runs, str(tmp_path), build=radial_simulation, n_workers=2)
+
+    assert [summary['status'] for summary in summaries] == ['completed', 'completed', 'failed', 'failed']
+    assert 'negative' in summaries[2]['error']
+
+    # each run is saved and logged in its own folder
+    for summary in summaries[:2]:
+        assert len(FractureStore(summary['output_folder']).steps) == 1
+        assert os.path.isfile(summary['output_folder'] + 'PyFrac_log.txt')
+    assert len(os.listdir(str(tmp_path / 'elasticity_cache'))) == 1
+
+    with open(str(tmp_path / 'sweep_summary.csv'), 'r') as inp:
+        table = list(csv.DictReader(inp))
+    assert [row['run'] for row in table] == ['run_0', 'run_1', 'run_2', 'run_3']
+    assert table[1]['leak_off'] == '1e-06'
+    assert float(table[0]['wall_time']) > 0
+
+
+def test_sweep_survives_killed_process(tmp_path):
+    runs = parameter_grid(toughness=[1e6, 0., 2e6], leak_off=[0.])
+    summaries = run_sweep(runs, str(tmp_path), build=radial_simulation, n_workers=3)
+
+    # only the run killing its process is given up
+    assert [summary['status'] for summary in summaries] == ['completed', 'killed', 'completed']
+
+    with open(str(tmp_path / 'sweep_summary.csv'), 'r') as inp:
+        table = list(csv.DictReader(inp))
+    assert [row['status'] for row in table] == ['completed', 'killed', 'completed']
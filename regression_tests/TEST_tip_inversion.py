@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import pytest
+import numpy as np
+from types import SimpleNamespace
+
+# local imports
+import tip_inversion
+import tip_asymptote_tables
+from tip_inversion import Chandrupatla, TipAsym_MK_zrthOrder_Res, TipAsym_Universal_zrthOrder_Res, get_args_subset, \
+    TipAsymInversion, TipAsym_MDR_Res, TipAsym_M_MDR_Res
+from tip_asymptote_tables import TipInversionTable, MDRInversionTable
+from mesh import CartesianMesh
+from properties import SimulationProperties
+
+
+def cubic_res(x, *args):
+    (c, offset) = args
+    return x ** 3 - c + offset
+
+
+def test_Chandrupatla_roots():
+    c = np.asarray([1e-9, 0.5, 8., 27., 1.])
+    a = np.zeros((5,))
+    b = np.asarray([1., 1., 5., 2., 3.])
+
+    roots, bracketed, iterations = Chandrupatla(cubic_res, a, b, (c, 0.))
+
+    # there is no root in the bracket of the fourth element
+    assert np.array_equal(bracketed, [True, True, True, False, True])
+    assert np.isnan(roots[3])
+    assert roots[bracketed] == pytest.approx(c[bracketed] ** (1 / 3), abs=2e-12)
+    assert (iterations[bracketed] > 0).all() and (iterations < 100).all()
+
+
+def test_Chandrupatla_toughness_asymptote():
+    class Fluid:
+        muPrime = 0.
+
+    n = 20
+    w = np.linspace(1e-5, 1e-4, n)
+    Kprime = np.full((n,), 2e6)
+    Eprime = np.full((n,), 3e10)
+    args = (w, Kprime, Eprime, Fluid(), np.zeros((n,)), np.full((n,), 1e-3), 1.)
+
+    roots = Chandrupatla(TipAsym_MK_zrthOrder_Res, np.full((n,), 1e-3), np.full((n,), 10.), args)[0]
+
+    assert roots == pytest.approx(w ** 2 * (Eprime / Kprime) ** 2, rel=1e-10)
+
+
+def test_tabulated_tip_inversion():
+    class Fluid:
+        muPrime = 12 * 1.1e-3
+
+    rng = np.random.default_rng(0)
+    n = 200
+    w = rng.uniform(1e-5, 5e-4, n)
+    Kprime = rng.uniform(1e5, 3e6, n)
+    Eprime = np.full((n,), 3.5e10)
+    Cprime = rng.choice([1e-6, 5e-5], n)
+    d0 = rng.uniform(1e-3, 0.2, n)
+    args = (w, Kprime, Eprime, Fluid(), Cprime, d0, 0.5)
+
+    table = TipInversionTable(TipAsym_Universal_zrthOrder_Res, leak_off=True)
+    dist, inverted, iterations = table.invert(args)
+
+    # the cells not inverted with the table are either stagnant or left to the root finder
+    dk = (Eprime * w / Kprime) ** 2
+    moving = np.where(inverted)[0]
+    roots, bracketed = Chandrupatla(TipAsym_Universal_zrthOrder_Res,
+                                    d0[moving] * (1 + 5e3 * np.finfo(float).eps),
+                                    dk[moving],
+                                    get_args_subset(args, moving))[:2]
+    assert np.sum(inverted) > 0.9 * np.sum(d0 < dk)
+    assert np.all(bracketed)
+    assert dist[moving] == pytest.approx(roots, rel=1e-9)
+    assert (iterations <= 6).all()
+
+
+@pytest.mark.parametrize("ResFunc", [TipAsym_MDR_Res, TipAsym_M_MDR_Res])
+def test_tabulated_MDR_tip_inversion(ResFunc):
+    class Fluid:
+        muPrime = 12 * 1.1e-3
+
+    rng = np.random.default_rng(1)
+    n = 200
+    w = rng.uniform(1e-5, 5e-4, n)
+    Eprime = np.full((n,), 3.5e10)
+    d0 = rng.uniform(1e-3, 0.2, n)
+    args = (w, np.full((n,), 1e6), Eprime, Fluid(), np.zeros((n,)), d0, 0.5)
+
+    table = MDRInversionTable(ResFunc)
+    dist, inverted, iterations = table.invert(args)
+
+    roots, bracketed = Chandrupatla(ResFunc, d0 * (1 + 5e3 * np.finfo(float).eps), np.full((n,), 10.), args)[:2]
+    assert np.all(inverted)
+    assert np.all(bracketed)
+    assert dist == pytest.approx(roots, rel=1e-9)
+    assert (iterations <= 6).all()
+
+
+def test_inversion_with_cells_not_bracketed(monkeypatch):
+    Mesh = CartesianMesh(1., 1., 11, 11)
+    rng = np.random.default_rng(2)
+    n = 12
+    frac = SimpleNamespace(EltRibbon=np.arange(20, 20 + n), sgndDist=np.zeros((Mesh.NumberOfElts,)), mesh=Mesh)
+    frac.sgndDist[frac.EltRibbon] = -rng.uniform(5e-3, 2e-2, n)
+    w = np.zeros((Mesh.NumberOfElts,))
+    w[frac.EltRibbon] = rng.uniform(1e-4, 3e-4, n)
+    matProp = SimpleNamespace(Kprime=np.full((Mesh.NumberOfElts,), 1e6), Eprime=3e10,
+                              Cprime=np.full((Mesh.NumberOfElts,), 1e-6))
+    fluidProp = SimpleNamespace(muPrime=12 * 1.1e-3, rheology='Newtonian')
+    simProp = SimulationProperties()
+    simProp.set_tipAsymptote('U')
+
+    dist = TipAsymInversion(w, frac, matProp, fluidProp, simProp, dt=0.1)
+    assert (dist > -frac.sgndDist[frac.EltRibbon]).all()
+
+    # the root can not be bracketed in some of the cells, which are left at the distance of the last time step
+    not_bracketed = frac.EltRibbon[[1, 4, 9]]
+    FindBracket_dist = tip_inversion.FindBracket_dist
+
+    def FindBracket_dist_failing(w_moving, *args):
+        a, b = FindBracket_dist(w_moving, *args)
+        failing = np.isin(w_moving, w[not_bracketed])
+        a[failing], b[failing] = np.nan, np.nan
+        return a, b
+
+    monkeypatch.setattr(tip_inversion, 'FindBracket_dist', FindBracket_dist_failing)
+    expected = np.where(np.isin(frac.EltRibbon, not_bracketed), -frac.sgndDist[frac.EltRibbon], dist)
+    assert TipAsymInversion(w, frac, matProp, fluidProp, simProp, dt=0.1) == pytest.approx(expected, rel=1e-12)
+
+    # the cells inverted with the tables are not passed to the root finder. The positions of the cells that can not be
+    # bracketed are relative to the cells left to the root finder.
+    class Table:
+        def invert(self, args):
+            inverted = np.arange(len(args[0])) % 2 == 0
+            return np.where(inverted, 2 * args[5], np.nan), inverted, np.zeros((len(args[0]),), dtype=int)
+
+    monkeypatch.setattr(tip_asymptote_tables, 'get_tip_inversion_table', lambda *args, **kwargs: Table())
+    simProp.tabulatedTipInversion = True
+    expected[::2] = -2 * frac.sgndDist[frac.EltRibbon[::2]]
+    assert TipAsymInversion(w, frac, matProp, fluidProp, simProp, dt=0.1) == pytest.approx(expected, rel=1e-12)
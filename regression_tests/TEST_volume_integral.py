@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+import pytest
+import numpy as np
+
+# local imports
+from mesh import CartesianMesh
+from volume_integral import Integral_over_cell, Area, VolumeTriangle, Pdistance, leak_off_channel, \
+    arrival_time_new_channel
+
+
+def test_filling_fraction():
+    Mesh = CartesianMesh(1., 1., 21, 21)
+    alpha = np.asarray([0., np.pi / 2, np.pi / 4, np.pi / 4, 0.])
+    l = np.asarray([0.3 * Mesh.hx, 0.6 * Mesh.hy, 0.2 * Mesh.hx, 2 * Mesh.hx, 1.5 * Mesh.hx])
+
+    FillFrac = Integral_over_cell(np.arange(5), alpha, l, Mesh, 'A') / Mesh.EltArea
+
+    # triangle with the right angle at the zero vertex for the perpendicular at 45 degrees
+    assert FillFrac == pytest.approx([0.3, 0.6, 0.2 ** 2, 1., 1.], abs=1e-12)
+
+
+def test_tip_volume_universal_asymptote():
+    class Fluid:
+        muPrime = 12 * 1.1e-3
+
+    class Material:
+        Eprime = 3.5e10
+
+    Mesh = CartesianMesh(1., 1.2, 21, 21)
+    rng = np.random.default_rng(0)
+    n = 60
+    alpha = rng.uniform(0, np.pi / 2, n)
+    alpha[:10] = 0.
+    alpha[10:20] = np.pi / 2
+    l = rng.uniform(0., 2 * Mesh.hx, n)
+    Kprime = rng.uniform(1e5, 3e6, n)
+    Eprime = np.full((n,), 3.5e10)
+    Cprime = rng.choice([0., 1e-6, 5e-5], n)
+    Vel = rng.uniform(1e-3, 0.05, n)
+    stagnant = rng.uniform(size=n) < 0.2
+    KIPrime = np.where(stagnant, 1e6, np.nan)
+
+    wTip = Integral_over_cell(np.arange(n), np.copy(alpha), l, Mesh, 'U', mat_prop=Material(), fluid_prop=Fluid(),
+                              Vel=Vel, Kprime=Kprime, Eprime=Eprime, Cprime=Cprime, stagnant=stagnant,
+                              KIPrime=KIPrime)
+
+    # the tip volume evaluated separately for each of the cells
+    for i in range(n):
+        param = ('U', Fluid(), Kprime[i], Eprime[i], Cprime[i], Vel[i], stagnant[i], KIPrime[i], None, None, None,
+                 None)
+        if alpha[i] == 0.:
+            vol = (Area(l[i], *param) - (Area(l[i] - Mesh.hx, *param) if l[i] > Mesh.hx else 0.)) * Mesh.hy
+        elif alpha[i] == np.pi / 2:
+            vol = (Area(l[i], *param) - (Area(l[i] - Mesh.hy, *param) if l[i] > Mesh.hy else 0.)) * Mesh.hx
+        else:
+            param = param[:9] + (1 / (np.sin(alpha[i]) * np.cos(alpha[i])),) + param[10:]
+            yIntrcpt = l[i] / np.cos(np.pi / 2 - alpha[i])
+            grad = -1 / np.tan(alpha[i])
+            vol = VolumeTriangle(l[i], *param)
+            for (x, y, sign) in [(0, Mesh.hy, -1), (Mesh.hx, 0, -1), (Mesh.hx, Mesh.hy, 1)]:
+                dist = Pdistance(x, y, grad, yIntrcpt)
+                if dist > 0:
+                    vol += sign * VolumeTriangle(dist, *param)
+
+        # the widths are found with different root finders with a tolerance of 2e-12
+        assert wTip[i] == pytest.approx(vol, rel=1e-5, abs=1e-12 * Mesh.hx)
+
+
+@pytest.mark.parametrize("regime", ['U', 'U1'])
+def test_tabulated_tip_volume_universal_asymptote(regime, monkeypatch):
+    import tip_asymptote_tables
+
+    class Fluid:
+        muPrime = 12 * 1.1e-3
+
+    class Material:
+        Eprime = 3.5e10
+
+    Mesh = CartesianMesh(1., 1.2, 21, 21)
+    rng = np.random.default_rng(3)
+    n = 60
+    alpha = rng.uniform(0, np.pi / 2, n)
+    alpha[:10] = 0.
+    l = rng.uniform(0., 2 * Mesh.hx, n)
+    Kprime = rng.uniform(1e6, 3e6, n)
+    Eprime = np.full((n,), 3.5e10)
+    Cprime = rng.choice([0., 1e-6, 5e-6], n)
+    Vel = rng.uniform(1e-3, 0.05, n)
+    stagnant = rng.uniform(size=n) < 0.2
+    KIPrime = np.where(stagnant, 1e6, np.nan)
+    args = (np.arange(n), alpha, l, Mesh, regime)
+    kwargs = dict(mat_prop=Material(), fluid_prop=Fluid(), Vel=Vel, Kprime=Kprime, Eprime=Eprime, Cprime=Cprime,
+                  stagnant=stagnant, KIPrime=KIPrime)
+
+    monkeypatch.setattr(tip_asymptote_tables, 'tables_in_memory', {})
+    wTip = Integral_over_cell(*args, **kwargs)
+    wTip_tabulated = Integral_over_cell(*args, tabulated=True, **kwargs)
+
+    # the tables of the width with and without leak off have been used
+    assert len(tip_asymptote_tables.tables_in_memory) == 2
+    # the widths are found with a tolerance of 2e-12
+    assert wTip_tabulated == pytest.approx(wTip, rel=1e-6, abs=1e-12 * Mesh.hx)
+
+
+def test_tabulated_tip_volume_power_law():
+    class Fluid:
+        muPrime = 1.
+        n = 0.6
+        k = 0.75
+        T0 = 0.
+
+    rng = np.random.default_rng(1)
+    n = 20
+    dist = 10 ** rng.uniform(-4, -0.5, n)
+    Kprime = rng.uniform(1e5, 3e6, n)
+    Eprime = np.full((n,), 3e10)
+    Cprime = rng.choice([0., 1e-6, 5e-5], n)
+    Vel = 10 ** rng.uniform(-4, -1, n)
+    em = np.full((n,), 2.)
+    param = ('PLF_tab_quad', Fluid(), Kprime, Eprime, Cprime, Vel, np.full((n,), False), np.full((n,), np.nan), None,
+             em, None, None)
+
+    area = Area(dist, *param)
+    volume = VolumeTriangle(dist, *param)
+
+    # the integrals evaluated with numerical quadrature for each of the distances
+    for i in range(n):
+        param_quad = ('PLF_num_quad', Fluid(), Kprime[i], Eprime[i], Cprime[i], Vel[i], False, np.nan, None, em[i],
+                      None, None)
+        assert area[i] == pytest.approx(Area(dist[i], *param_quad), rel=1e-4)
+        assert volume[i] == pytest.approx(VolumeTriangle(dist[i], *param_quad), rel=1e-4)
+
+
+def test_tabulated_tip_volume_cached(tmp_path, monkeypatch):
+    import tip_asymptote_tables
+
+    class Fluid:
+        muPrime = 1.
+        n = 0.6
+        k = 0.75
+        T0 = 0.
+
+    dist = np.asarray([1e-3, 1e-2])
+    param = ('PLF_tab_quad', Fluid(), np.full((2,), 1e6), np.full((2,), 3e10), np.asarray([0., 1e-6]),
+             np.full((2,), 1e-2), np.full((2,), False), np.full((2,), np.nan), None, np.full((2,), 2.), None, None)
+
+    # the tables are saved in the given folder, also if the tip volume is not evaluated through Integral_over_cell
+    monkeypatch.setattr(tip_asymptote_tables, 'tables_in_memory', {})
+    area = Area(dist, *param, tables_folder=str(tmp_path))
+    assert len(list(tmp_path.glob('tip_volume_table_*'))) == 2
+
+    # and loaded from it in another run
+    monkeypatch.setattr(tip_asymptote_tables, 'tables_in_memory', {})
+    monkeypatch.setattr(tip_asymptote_tables.TipVolumeTable, 'solve_width', None)
+    np.testing.assert_array_equal(Area(dist, *param, tables_folder=str(tmp_path)), area)
+
+
+def test_leak_off_channel():
+    Mesh = CartesianMesh(1., 1., 11, 11)
+    Elts = np.arange(0, Mesh.NumberOfElts, 2)
+    Tarrival = np.linspace(0., 12., Mesh.NumberOfElts)
+    Cprime = np.full((Mesh.NumberOfElts,), 2e-5)
+
+    LkOff = leak_off_channel(Elts, Tarrival, 10., Cprime, 0.5, Mesh)
+
+    # the front arrives in some of the cells after the last time step
+    t_since_arrival = np.maximum(10. - Tarrival[Elts], 0.)
+    expected = 2 * Cprime[Elts] * ((t_since_arrival + 0.5) ** 0.5 - t_since_arrival ** 0.5) * Mesh.EltArea
+    assert LkOff == pytest.approx(expected, rel=1e-12)
+
+
+def test_arrival_time_new_channel():
+    Mesh = CartesianMesh(1., 1., 11, 11)
+    Tarrival = np.full((Mesh.NumberOfElts,), np.nan)
+    EltCrack = np.asarray([59, 60, 61])
+    Tarrival[EltCrack] = [1., 2., 3.]
+    l = np.asarray([0.5 * Mesh.hx, 2 * Mesh.hy])
+    alpha = np.asarray([0., np.pi / 2])
+    Vel = np.asarray([1., 0.05])
+
+    Tarrival_new = arrival_time_new_channel(Tarrival, EltCrack, 5., l, alpha, Vel, Mesh)
+
+    # the average of the times at which the front has entered and left the cells, not earlier than the latest arrival
+    t_average = 5. - (l - 0.5 * np.asarray([Mesh.hx, Mesh.hy])) / Vel
+    assert t_average[1] < 3.
+    assert Tarrival_new == pytest.approx([t_average[0], 3.], rel=1e-14)
+    assert arrival_time_new_channel(Tarrival, EltCrack, 5., l[:0], alpha[:0], Vel[:0], Mesh).size == 0
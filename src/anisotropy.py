@@ -87,86 +87,49 @@ def find_angle(elt_ribbon, elt_tip, zr_vrtx_tip, a_tip, b_tip, c_tip, x_lft, y_l
     front line in the given tip elements.
     """
 
-    closest_tip_cell = np.zeros((len(elt_ribbon),), dtype=np.int)
-    dist_ribbon = np.zeros((len(elt_ribbon),), dtype=np.float64)
-    alpha = np.zeros((len(elt_ribbon),), dtype=np.float64)
-    for i in range(len(elt_ribbon)):
-        # min dist from the front lines of a ribbon cells
-        dist_front_line = np.zeros((len(elt_tip),), dtype=np.float64)
-
-        point_at_grid_line = np.zeros((len(elt_tip),), dtype=np.uint8)
-
-        # loop over tip cells for the current ribbon cell
-        for j in range(len(elt_tip)):
-
-            if x_rgt[j] - x_lft[j] == 0:
-                # if parallel to y-axis
-                xx = mesh.CenterCoor[elt_ribbon[i], 0]
-                yy = - c_tip[j]
-            else:
-                slope_tip_line = (y_rgt[j] - y_lft[j]) / (x_rgt[j] - x_lft[j])
-                m = -1. / slope_tip_line # slope perp to the tip line
-
-                intrcpt = mesh.CenterCoor[elt_ribbon[i], 1] - m * mesh.CenterCoor[elt_ribbon[i], 0] #intercept
-                # x-coordinate of the point where the perpendicular intersects the drawn perpendicular
-                xx = -(intrcpt + c_tip[j]) / (a_tip[j] + m)
-                # y-coordinate of the point where the perpendicular intersects the drawn perpendicular
-                yy = m * xx + intrcpt
-
-            if x_lft[j] > xx or x_rgt[j] < xx or min(y_lft[j], y_rgt[j]) > yy or max(
-                    y_lft[j], y_rgt[j]) < yy:
-                # if the intersection point is out of the tip cell
-                dist_lft_pnt = ((mesh.CenterCoor[elt_ribbon[i], 0] - x_lft[j]) ** 2
-                                + (mesh.CenterCoor[elt_ribbon[i], 1] - y_lft[j]) ** 2) ** 0.5
-                dist_rgt_pnt = ((mesh.CenterCoor[elt_ribbon[i], 0] - x_rgt[j]) ** 2
-                                + (mesh.CenterCoor[elt_ribbon[i], 1] - y_rgt[j]) ** 2) ** 0.5
-                # take the distance of either the left or the right point depending upon which is closer to the ribbon
-                dist_front_line[j] = min(dist_lft_pnt, dist_rgt_pnt)
-                # save which (right of left) point on the front line is closer to the ribbon cell center
-                if dist_lft_pnt < dist_rgt_pnt:
-                    point_at_grid_line[j] = 1
-                else:
-                    point_at_grid_line[j] = 2
-            else:
-                # if the intersection point of the front line and the perpendicular drawn from the zero vertex is the
-                # closest point to the riboon cell center
-                dist_front_line[j] = abs(mesh.CenterCoor[elt_ribbon[i], 0] * a_tip[j] + mesh.CenterCoor[elt_ribbon[i],
-                                                1] + c_tip[j]) / (a_tip[j] ** 2 + 1) ** 0.5 # distance calculated by
-                                                                                            # min distance to a line
-                                                                                            # from a point formula
-
-        closest_tip_cell[i] = np.argmin(dist_front_line)
-
-        if point_at_grid_line[closest_tip_cell[i]] == 0:
-            # if the closest point is the intersection point of the perpendicular
-            y = mesh.CenterCoor[elt_ribbon[i], 1]
-            x = (-y - c_tip[closest_tip_cell[i]]) / a_tip[closest_tip_cell[i]]
-            # finding angle using arc cosine
-            alpha[i] = np.arccos(
-                round(dist_front_line[closest_tip_cell[i]] / abs(x - mesh.CenterCoor[elt_ribbon[i], 0]), 5))
-            dist_ribbon[i] = dist_front_line[closest_tip_cell[i]]
-        elif point_at_grid_line[closest_tip_cell[i]] == 1:
-            # if the closest point is the left most point on the front line
-            y = mesh.CenterCoor[elt_ribbon[i], 1]
-            x = (-y - c_tip[closest_tip_cell[i]]) / a_tip[closest_tip_cell[i]]
-            alpha_closest = np.arccos(
-                round(dist_front_line[closest_tip_cell[i]] / abs(x - mesh.CenterCoor[elt_ribbon[i], 0]), 5))
-            x = (-y - c_tip[neig_lft[closest_tip_cell[i]]]) / a_tip[neig_lft[closest_tip_cell[i]]]
-            alpha_nei = np.arccos(
-                round(dist_front_line[closest_tip_cell[i]] / abs(x - mesh.CenterCoor[elt_ribbon[i], 0]), 5))
-            alpha[i] = (alpha_closest + alpha_nei) / 2
-        elif point_at_grid_line[closest_tip_cell[i]] == 2:
-            # if the closest point is the right most point on the front line
-            y = mesh.CenterCoor[elt_ribbon[i], 1]
-            x = (-y - c_tip[closest_tip_cell[i]]) / a_tip[closest_tip_cell[i]]
-            alpha_closest = np.arccos(
-                round(dist_front_line[closest_tip_cell[i]] / abs(x - mesh.CenterCoor[elt_ribbon[i], 0]), 5))
-            x = (-y - c_tip[neig_rgt[closest_tip_cell[i]]]) / a_tip[neig_rgt[closest_tip_cell[i]]]
-            alpha_nei = np.arccos(
-                round(dist_front_line[closest_tip_cell[i]] / abs(x - mesh.CenterCoor[elt_ribbon[i], 0]), 5))
-            alpha[i] = (alpha_closest + alpha_nei) / 2
-
-        dist_ribbon[i] = dist_front_line[closest_tip_cell[i]]
+    # the distances of the ribbon cell centers (rows) from the front lines in the tip cells (columns)
+    x_rbn = mesh.CenterCoor[elt_ribbon, 0][:, np.newaxis]
+    y_rbn = mesh.CenterCoor[elt_ribbon, 1][:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # the point where the perpendicular drawn from the ribbon cell center intersects the front line
+        parallel_y = x_rgt - x_lft == 0
+        m = -1. / ((y_rgt - y_lft) / (x_rgt - x_lft))  # slope perp to the tip line
+        intrcpt = y_rbn - m * x_rbn
+        xx = np.where(parallel_y, x_rbn, -(intrcpt + c_tip) / (a_tip + m))
+        yy = np.where(parallel_y, -c_tip, m * xx + intrcpt)
+
+    # if the intersection point is out of the tip cell, take the distance of either the left or the right point
+    # depending upon which is closer to the ribbon
+    out_of_cell = np.logical_or(np.logical_or(x_lft > xx, x_rgt < xx),
+                                np.logical_or(np.minimum(y_lft, y_rgt) > yy, np.maximum(y_lft, y_rgt) < yy))
+    dist_lft_pnt = ((x_rbn - x_lft) ** 2 + (y_rbn - y_lft) ** 2) ** 0.5
+    dist_rgt_pnt = ((x_rbn - x_rgt) ** 2 + (y_rbn - y_rgt) ** 2) ** 0.5
+    # distance calculated by min distance to a line from a point formula
+    dist_front_line = np.where(out_of_cell,
+                               np.minimum(dist_lft_pnt, dist_rgt_pnt),
+                               abs(x_rbn * a_tip + y_rbn + c_tip) / (a_tip ** 2 + 1) ** 0.5)
+    # save which (right of left) point on the front line is closer to the ribbon cell center
+    point_at_grid_line = np.where(out_of_cell, np.where(dist_lft_pnt < dist_rgt_pnt, 1, 2), 0)
+
+    ribbon = np.arange(len(elt_ribbon))
+    closest_tip_cell = np.argmin(dist_front_line, axis=1)
+    dist_closest = dist_front_line[ribbon, closest_tip_cell]
+    closest_point = point_at_grid_line[ribbon, closest_tip_cell]
+
+    # finding angle using arc cosine
+    y = mesh.CenterCoor[elt_ribbon, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = (-y - c_tip[closest_tip_cell]) / a_tip[closest_tip_cell]
+        alpha = np.arccos(np.round(dist_closest / abs(x - mesh.CenterCoor[elt_ribbon, 0]), 5))
+
+        # if the closest point is the left or the right most point on the front line, the angle is averaged with the
+        # angle from the corresponding neighbor
+        for (point, neig) in [(1, neig_lft), (2, neig_rgt)]:
+            at_point = np.where(closest_point == point)[0]
+            x = (-y[at_point] - c_tip[neig[closest_tip_cell[at_point]]]) / a_tip[neig[closest_tip_cell[at_point]]]
+            alpha_nei = np.arccos(np.round(dist_closest[at_point] / abs(x - mesh.CenterCoor[elt_ribbon[at_point], 0]),
+                                           5))
+            alpha[at_point] = (alpha[at_point] + alpha_nei) / 2
 
     # the code below finds the ribbon cells directly below or above the tip cells with ninety degrees angle and sets
     # them to have ninety degrees angle as well. Similarly, the ribbon cells directly on the left or right of the tip
@@ -179,16 +142,12 @@ def find_angle(elt_ribbon, elt_tip, zr_vrtx_tip, a_tip, b_tip, c_tip, x_lft, y_l
                 if left_in_ribbon.size > 0:
                     break
             alpha[left_in_ribbon] = 0.0
-            dist_ribbon[left_in_ribbon] = abs(
-                abs(x_rgt[zero_angle[i]]) - abs(mesh.CenterCoor[elt_ribbon[left_in_ribbon], 0]))
         if zr_vrtx_tip[zero_angle[i]] == 1 or zr_vrtx_tip[zero_angle[i]] == 2:
             for j in range(3):
                 rgt_in_ribbon = np.where(elt_ribbon == elt_tip[zero_angle[i]] + (j + 1))[0]
                 if rgt_in_ribbon.size > 0:
                     break
             alpha[rgt_in_ribbon] = 0.0
-            dist_ribbon[rgt_in_ribbon] = abs(
-                abs(x_rgt[zero_angle[i]]) - abs(mesh.CenterCoor[elt_ribbon[rgt_in_ribbon], 0]))
 
     ninety_angle = np.where(y_lft == y_rgt)[0]
     for i in range(len(ninety_angle)):
@@ -198,16 +157,12 @@ def find_angle(elt_ribbon, elt_tip, zr_vrtx_tip, a_tip, b_tip, c_tip, x_lft, y_l
                 if btm_in_ribbon.size > 0:
                     break
             alpha[btm_in_ribbon] = np.pi / 2
-            dist_ribbon[btm_in_ribbon] = abs(
-                abs(y_rgt[ninety_angle[i]]) - abs(mesh.CenterCoor[elt_ribbon[btm_in_ribbon], 1]))
         if zr_vrtx_tip[ninety_angle[i]] == 2 or zr_vrtx_tip[ninety_angle[i]] == 3:
             for j in range(3):
                 top_in_ribbon = np.where(elt_ribbon == elt_tip[ninety_angle[i]] + (j + 1) * mesh.nx)[0]
                 if top_in_ribbon.size > 0:
                     break
             alpha[top_in_ribbon] = np.pi / 2
-            dist_ribbon[top_in_ribbon] = abs(
-                abs(y_rgt[ninety_angle[i]]) - abs(mesh.CenterCoor[elt_ribbon[top_in_ribbon], 1]))
 
 
     return alpha
@@ -215,6 +170,34 @@ def find_angle(elt_ribbon, elt_tip, zr_vrtx_tip, a_tip, b_tip, c_tip, x_lft, y_l
 #-----------------------------------------------------------------------------------------------------------------------
 
 
+def cells_with_polygon_vertices(polygon, mesh):
+    """
+    This function gives the cells of the mesh with at least two of the given vertices of the polygon lying in them or on
+    their edges, in ascending order.
+    """
+
+    # the cells around the ones the vertices are located in, to take into account the vertices lying on grid lines
+    x_min = mesh.VertexCoor[mesh.Connectivity[0, 0], 0]
+    y_min = mesh.VertexCoor[mesh.Connectivity[0, 0], 1]
+    col = np.floor((polygon[:, 0] - x_min) / mesh.hx).astype(int)
+    row = np.floor((polygon[:, 1] - y_min) / mesh.hy).astype(int)
+    shifts = np.asarray([-1, 0, 1])
+    col = np.clip(col[:, np.newaxis, np.newaxis] + shifts[np.newaxis, :, np.newaxis], 0, mesh.nx - 1)
+    row = np.clip(row[:, np.newaxis, np.newaxis] + shifts[np.newaxis, np.newaxis, :], 0, mesh.ny - 1)
+    cells = (row * mesh.nx + col).reshape((len(polygon), 9))
+    vertex = np.repeat(np.arange(len(polygon)), 9)
+    (vertex, cells) = np.unique(np.column_stack((vertex, cells.ravel())), axis=0).T
+
+    in_cell = polygon[vertex, 0] >= mesh.VertexCoor[mesh.Connectivity[cells, 0], 0]
+    in_cell = np.logical_and(in_cell, polygon[vertex, 0] <= mesh.VertexCoor[mesh.Connectivity[cells, 1], 0])
+    in_cell = np.logical_and(in_cell, polygon[vertex, 1] >= mesh.VertexCoor[mesh.Connectivity[cells, 0], 1])
+    in_cell = np.logical_and(in_cell, polygon[vertex, 1] <= mesh.VertexCoor[mesh.Connectivity[cells, 3], 1])
+
+    return np.where(np.bincount(cells[in_cell], minlength=mesh.NumberOfElts) > 1)[0]
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+
 def construct_polygon(elt_tip, l_tip, alpha_tip, mesh, zero_vertex_tip):
     """
     This function construct a polygon from the given non-continous front. The polygon is constructed by joining the
@@ -367,8 +350,9 @@ def construct_polygon(elt_tip, l_tip, alpha_tip, mesh, zero_vertex_tip):
     smthed_tip_points_left = np.empty((0, 2), dtype=np.float64) #left points of the tip line in the new tip cells
     smthed_tip_points_rgt = np.empty((0, 2), dtype=np.float64) #right points of the tip line in the new tip cells
 
-    # loop over the cells of the grid to find the cells containing one of the edges of the polygon
-    for i in range(mesh.NumberOfElts):
+    # loop over the cells of the grid to find the cells containing one of the edges of the polygon. Only the cells
+    # with at least two of the vertices of the polygon on their edges can contain one of the edges.
+    for i in cells_with_polygon_vertices(polygon, mesh):
         # find the vertices of the polygon with x-coordinates greater than or equal to x-coordinate of the bottom left
         # vertex of the cell
         in_cell = polygon[:, 0] >= mesh.VertexCoor[mesh.Connectivity[i, 0], 0]
@@ -476,68 +460,56 @@ def projection_from_ribbon_LS_gradient(ribbon_elts, tip_elts, mesh, sgnd_dist):
                                                    the ribbon cell centers.
     """
 
-    n_vertex = np.zeros((len(tip_elts), 2), float)
-    n_centre = np.zeros((len(ribbon_elts), 2), float)
-    Coor_vertex = np.zeros((len(tip_elts), 2), float)
-    alpha = np.zeros((len(ribbon_elts),), dtype=np.float64)
-
     zero_vertex = find_zero_vertex(tip_elts,
                                       sgnd_dist,
                                       mesh)
-    for i in range(len(tip_elts)):
-        # neighbors
-        #     6     3    7
-        #     0    elt   1
-        #     4    2     5
-         neighbors_tip = np.zeros(8, dtype=int)
-         neighbors_tip[:4] = mesh.NeiElements[tip_elts[i]]
-         neighbors_tip[4] = mesh.NeiElements[neighbors_tip[2]][0]
-         neighbors_tip[5] = mesh.NeiElements[neighbors_tip[2]][1]
-         neighbors_tip[6] = mesh.NeiElements[neighbors_tip[3]][0]
-         neighbors_tip[7] = mesh.NeiElements[neighbors_tip[3]][1]
-
-        # Vertex
-        #     3         2
-        #     0         1
-         if zero_vertex[i]==0:
-              gradx = -((sgnd_dist[neighbors_tip[0]]+sgnd_dist[neighbors_tip[4]])/2 - (
-                      sgnd_dist[tip_elts[i]]+sgnd_dist[neighbors_tip[2]])/2) / mesh.hx
-              grady = ((sgnd_dist[neighbors_tip[0]]+sgnd_dist[tip_elts[i]])/2 - (
-                      sgnd_dist[neighbors_tip[4]]+sgnd_dist[neighbors_tip[2]])/2) / mesh.hy
-              Coor_vertex[i,0] = mesh.CenterCoor[tip_elts[i], 0]-mesh.hx/2
-              Coor_vertex[i, 1] = mesh.CenterCoor[tip_elts[i], 1] - mesh.hy / 2
-         elif zero_vertex[i] == 1:
-              gradx = ((sgnd_dist[neighbors_tip[1]] + sgnd_dist[neighbors_tip[5]]) / 2 - (
-                        sgnd_dist[tip_elts[i]] + sgnd_dist[neighbors_tip[2]]) / 2) / mesh.hx
-              grady = ((sgnd_dist[neighbors_tip[1]] + sgnd_dist[tip_elts[i]]) / 2 - (
-                          sgnd_dist[neighbors_tip[5]] + sgnd_dist[neighbors_tip[2]]) / 2) / mesh.hy
-              Coor_vertex[i, 0] = mesh.CenterCoor[tip_elts[i], 0] + mesh.hx / 2
-              Coor_vertex[i, 1] = mesh.CenterCoor[tip_elts[i], 1] - mesh.hy / 2
-         elif zero_vertex[i] == 2:
-              gradx = ((sgnd_dist[neighbors_tip[1]] + sgnd_dist[neighbors_tip[7]]) / 2 - (
-                    sgnd_dist[tip_elts[i]] + sgnd_dist[neighbors_tip[3]]) / 2) / mesh.hx
-              grady = -((sgnd_dist[neighbors_tip[1]] + sgnd_dist[tip_elts[i]]) / 2 - (
-                  sgnd_dist[neighbors_tip[3]] + sgnd_dist[neighbors_tip[7]]) / 2) / mesh.hy
-              Coor_vertex[i, 0] = mesh.CenterCoor[tip_elts[i], 0] + mesh.hx / 2
-              Coor_vertex[i, 1] = mesh.CenterCoor[tip_elts[i], 1] + mesh.hy / 2
-         elif zero_vertex[i] == 3:
-               gradx =-((sgnd_dist[neighbors_tip[6]] + sgnd_dist[neighbors_tip[0]]) / 2 - (
-                    sgnd_dist[tip_elts[i]] + sgnd_dist[neighbors_tip[3]]) / 2) /mesh.hx
-               grady = ((sgnd_dist[neighbors_tip[0]] + sgnd_dist[tip_elts[i]]) / 2 - (
-                    sgnd_dist[neighbors_tip[6]] + sgnd_dist[neighbors_tip[3]]) / 2) / mesh.hy
-               Coor_vertex[i, 0] = mesh.CenterCoor[tip_elts[i], 0] - mesh.hx / 2
-               Coor_vertex[i, 1] = mesh.CenterCoor[tip_elts[i], 1] + mesh.hy / 2
-         n_vertex[i, 0] = gradx / (gradx ** 2 + grady ** 2) ** 0.5
-         n_vertex[i, 1] = grady / (gradx ** 2 + grady ** 2) ** 0.5
-
-    for i in range(len(ribbon_elts)):
-
-         actvElts = np.where((2 * abs(mesh.CenterCoor[ribbon_elts[i], 0] - Coor_vertex[:, 0]) - mesh.hx < mesh.hx/10) &
-                            (2 * abs(mesh.CenterCoor[ribbon_elts[i], 1] - Coor_vertex[:, 1]) - mesh.hy < mesh.hy/10))[0]
-
-         n_centre[i, 0] = np.mean(n_vertex[actvElts, 0])
-         n_centre[i, 1] = np.mean(n_vertex[actvElts, 1])
-         alpha[i] = np.abs(np.arcsin(n_centre[i, 1]))
+    # neighbors
+    #     6     3    7
+    #     0    elt   1
+    #     4    2     5
+    neighbors_tip = np.zeros((len(tip_elts), 8), dtype=int)
+    neighbors_tip[:, :4] = mesh.NeiElements[tip_elts]
+    neighbors_tip[:, 4:6] = mesh.NeiElements[neighbors_tip[:, 2], :2]
+    neighbors_tip[:, 6:8] = mesh.NeiElements[neighbors_tip[:, 3], :2]
+    sd = sgnd_dist[neighbors_tip]
+    sd_elt = sgnd_dist[tip_elts]
+
+    # Vertex
+    #     3         2
+    #     0         1
+    # the gradient of the level set at the zero vertex, evaluated from the four cells sharing it
+    gradx = np.empty((len(tip_elts),), dtype=np.float64)
+    grady = np.empty((len(tip_elts),), dtype=np.float64)
+    zv = zero_vertex == 0
+    gradx[zv] = -((sd[zv, 0] + sd[zv, 4]) / 2 - (sd_elt[zv] + sd[zv, 2]) / 2) / mesh.hx
+    grady[zv] = ((sd[zv, 0] + sd_elt[zv]) / 2 - (sd[zv, 4] + sd[zv, 2]) / 2) / mesh.hy
+    zv = zero_vertex == 1
+    gradx[zv] = ((sd[zv, 1] + sd[zv, 5]) / 2 - (sd_elt[zv] + sd[zv, 2]) / 2) / mesh.hx
+    grady[zv] = ((sd[zv, 1] + sd_elt[zv]) / 2 - (sd[zv, 5] + sd[zv, 2]) / 2) / mesh.hy
+    zv = zero_vertex == 2
+    gradx[zv] = ((sd[zv, 1] + sd[zv, 7]) / 2 - (sd_elt[zv] + sd[zv, 3]) / 2) / mesh.hx
+    grady[zv] = -((sd[zv, 1] + sd_elt[zv]) / 2 - (sd[zv, 3] + sd[zv, 7]) / 2) / mesh.hy
+    zv = zero_vertex == 3
+    gradx[zv] = -((sd[zv, 6] + sd[zv, 0]) / 2 - (sd_elt[zv] + sd[zv, 3]) / 2) / mesh.hx
+    grady[zv] = ((sd[zv, 0] + sd_elt[zv]) / 2 - (sd[zv, 6] + sd[zv, 3]) / 2) / mesh.hy
+
+    sign_x = np.where(np.logical_or(zero_vertex == 0, zero_vertex == 3), -1., 1.)
+    sign_y = np.where(zero_vertex <= 1, -1., 1.)
+    Coor_vertex = np.column_stack((mesh.CenterCoor[tip_elts, 0] + sign_x * mesh.hx / 2,
+                                   mesh.CenterCoor[tip_elts, 1] + sign_y * mesh.hy / 2))
+    n_vertex = np.column_stack((gradx, grady)) / ((gradx ** 2 + grady ** 2) ** 0.5)[:, np.newaxis]
+
+    # the normal at the ribbon cell center is the mean of the normals at the zero vertices of the tip cells around it
+    actvElts = np.logical_and(
+        2 * abs(mesh.CenterCoor[ribbon_elts, 0][:, np.newaxis] - Coor_vertex[:, 0]) - mesh.hx < mesh.hx / 10,
+        2 * abs(mesh.CenterCoor[ribbon_elts, 1][:, np.newaxis] - Coor_vertex[:, 1]) - mesh.hy < mesh.hy / 10)
+    (rbn_actv, tip_actv) = np.nonzero(actvElts)
+    n_actv = np.bincount(rbn_actv, minlength=len(ribbon_elts))
+    has_actv = n_actv > 0
+    n_centre_y = np.full((len(ribbon_elts),), np.nan)
+    n_centre_y[has_actv] = np.add.reduceat(n_vertex[tip_actv, 1], (np.cumsum(n_actv) - n_actv)[has_actv]) / \
+                           n_actv[has_actv]
+    alpha = np.abs(np.arcsin(n_centre_y))
 
     return alpha
 
@@ -558,22 +530,17 @@ def find_zero_vertex(Elts, level_set, mesh):
         zero_vertex (ndarray)       -- the zero vertex list
     """
 
+    neighbors = mesh.NeiElements[Elts]
+    lft_closer = level_set[neighbors[:, 0]] <= level_set[neighbors[:, 1]]
+    rgt_closer = level_set[neighbors[:, 0]] > level_set[neighbors[:, 1]]
+    btm_closer = level_set[neighbors[:, 2]] <= level_set[neighbors[:, 3]]
+    top_closer = level_set[neighbors[:, 2]] > level_set[neighbors[:, 3]]
+
+    # the zero vertex is taken to be 0 if none of the conditions is met (nan in the level set)
     zero_vertex = np.zeros((len(Elts),), dtype=int)
-    for i in range(0, len(Elts)):
-        neighbors = mesh.NeiElements[Elts]
-
-        if level_set[neighbors[i, 0]] <= level_set[neighbors[i, 1]] and level_set[neighbors[i, 2]] <= level_set[
-                                                                                            neighbors[i, 3]]:
-            zero_vertex[i] = 0
-        elif level_set[neighbors[i, 0]] > level_set[neighbors[i, 1]] and level_set[neighbors[i, 2]] <= level_set[
-                                                                                            neighbors[i, 3]]:
-            zero_vertex[i] = 1
-        elif level_set[neighbors[i, 0]] > level_set[neighbors[i, 1]] and level_set[neighbors[i, 2]] > level_set[
-                                                                                            neighbors[i, 3]]:
-            zero_vertex[i] = 2
-        elif level_set[neighbors[i, 0]] <= level_set[neighbors[i, 1]] and level_set[neighbors[i, 2]] > level_set[
-                                                                                            neighbors[i, 3]]:
-            zero_vertex[i] = 3
+    zero_vertex[np.logical_and(rgt_closer, btm_closer)] = 1
+    zero_vertex[np.logical_and(rgt_closer, top_closer)] = 2
+    zero_vertex[np.logical_and(lft_closer, top_closer)] = 3
 
     return zero_vertex
 
@@ -595,61 +562,43 @@ def get_toughness_from_cellCenter(alpha, sgnd_dist=None, elts=None, mat_prop=Non
                        "be provided")
     else:
         dist = -sgnd_dist
-        x = np.zeros((len(elts),), )
-        y = np.zeros((len(elts),), )
-
         neighbors = mesh.NeiElements[elts]
         zero_vertex = find_zero_vertex(elts,
                                        sgnd_dist,
                                        mesh)
-        # evaluating the closest tip points
-        for i in range(0, len(elts)):
-            if zero_vertex[i] == 0:
-
-                x[i] = mesh.CenterCoor[elts[i], 0] + dist[elts[i]] * np.cos(alpha[i])
-                y[i] = mesh.CenterCoor[elts[i], 1] + dist[elts[i]] * np.sin(alpha[i])
-
-            elif zero_vertex[i] == 1:
-
-                x[i] = mesh.CenterCoor[elts[i], 0] - dist[elts[i]] * np.cos(alpha[i])
-                y[i] = mesh.CenterCoor[elts[i], 1] + dist[elts[i]] * np.sin(alpha[i])
-
-            elif zero_vertex[i] == 2:
 
-                x[i] = mesh.CenterCoor[elts[i], 0] - dist[elts[i]] * np.cos(alpha[i])
-                y[i] = mesh.CenterCoor[elts[i], 1] - dist[elts[i]] * np.sin(alpha[i])
-
-            elif zero_vertex[i] == 3:
-
-                x[i] = mesh.CenterCoor[elts[i], 0] + dist[elts[i]] * np.cos(alpha[i])
-                y[i] = mesh.CenterCoor[elts[i], 1] - dist[elts[i]] * np.sin(alpha[i])
+        # evaluating the closest tip points (the direction of the front from the cell center depends on the zero vertex)
+        sign_x = np.where(np.logical_or(zero_vertex == 0, zero_vertex == 3), 1., -1.)
+        sign_y = np.where(zero_vertex <= 1, 1., -1.)
+        x = mesh.CenterCoor[elts, 0] + sign_x * dist[elts] * np.cos(alpha)
+        y = mesh.CenterCoor[elts, 1] + sign_y * dist[elts] * np.sin(alpha)
 
+        with np.errstate(divide='ignore', invalid='ignore'):
             # assume the angle is zero if the distance of the left and right neighbor is extremely close
-            if abs(dist[mesh.NeiElements[elts[i], 0]] / dist[mesh.NeiElements[elts[i], 1]] - 1) < 1e-7:
-                if sgnd_dist[neighbors[i, 2]] < sgnd_dist[neighbors[i, 3]]:
-                    x[i] = mesh.CenterCoor[elts[i], 0]
-                    y[i] = mesh.CenterCoor[elts[i], 1] + dist[elts[i]]
-                elif sgnd_dist[neighbors[i, 2]] > sgnd_dist[neighbors[i, 3]]:
-                    x[i] = mesh.CenterCoor[elts[i], 0]
-                    y[i] = mesh.CenterCoor[elts[i], 1] - dist[elts[i]]
+            zero_angle = abs(dist[neighbors[:, 0]] / dist[neighbors[:, 1]] - 1) < 1e-7
             # assume the angle is 90 degrees if the distance of the bottom and top neighbor is extremely close
-            if abs(dist[mesh.NeiElements[elts[i], 2]] / dist[mesh.NeiElements[elts[i], 3]] - 1) < 1e-7:
-                if sgnd_dist[neighbors[i, 0]] < sgnd_dist[neighbors[i, 1]]:
-                    x[i] = mesh.CenterCoor[elts[i], 0] + dist[elts[i]]
-                    y[i] = mesh.CenterCoor[elts[i], 1]
-                elif sgnd_dist[neighbors[i, 0]] > sgnd_dist[neighbors[i, 1]]:
-                    x[i] = mesh.CenterCoor[elts[i], 0] - dist[elts[i]]
-                    y[i] = mesh.CenterCoor[elts[i], 1]
+            ninety_angle = abs(dist[neighbors[:, 2]] / dist[neighbors[:, 3]] - 1) < 1e-7
+
+        up = np.logical_and(zero_angle, sgnd_dist[neighbors[:, 2]] < sgnd_dist[neighbors[:, 3]])
+        down = np.logical_and(zero_angle, sgnd_dist[neighbors[:, 2]] > sgnd_dist[neighbors[:, 3]])
+        x[up] = mesh.CenterCoor[elts[up], 0]
+        y[up] = mesh.CenterCoor[elts[up], 1] + dist[elts[up]]
+        x[down] = mesh.CenterCoor[elts[down], 0]
+        y[down] = mesh.CenterCoor[elts[down], 1] - dist[elts[down]]
+
+        right = np.logical_and(ninety_angle, sgnd_dist[neighbors[:, 0]] < sgnd_dist[neighbors[:, 1]])
+        left = np.logical_and(ninety_angle, sgnd_dist[neighbors[:, 0]] > sgnd_dist[neighbors[:, 1]])
+        x[right] = mesh.CenterCoor[elts[right], 0] + dist[elts[right]]
+        y[right] = mesh.CenterCoor[elts[right], 1]
+        x[left] = mesh.CenterCoor[elts[left], 0] - dist[elts[left]]
+        y[left] = mesh.CenterCoor[elts[left], 1]
 
         # returning the Kprime according to the given function
-        K1c = np.empty((len(elts), ), dtype=np.float64)
-        for i in range(len(elts)):
-            try:
-                K1c[i] = mat_prop.K1cFunc(x[i], y[i])
-            except TypeError:
-                SystemExit("For precise space dependant toughness, the function taking the coordinates and returning"
-                           "the toughness is to be provided.")
-        return K1c
+        try:
+            return mat_prop.evaluate_on_points(mat_prop.K1cFunc, x, y)
+        except TypeError:
+            SystemExit("For precise space dependant toughness, the function taking the coordinates and returning"
+                       "the toughness is to be provided.")
 
 #-----------------------------------------------------------------------------------------------------------------------
 
@@ -666,28 +615,16 @@ def get_toughness_from_zeroVertex(elts, mesh, mat_prop, alpha, l, zero_vrtx):
     if mat_prop.anisotropic_K1c:
         return mat_prop.K1cFunc(alpha)
     else:
-        x = np.zeros((len(elts),), )
-        y = np.zeros((len(elts),), )
-        for i in range(0, len(elts)):
-            if zero_vrtx[i] == 0:
-                x[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 0], 0] + l[i] * np.cos(alpha[i])
-                y[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 0], 1] + l[i] * np.sin(alpha[i])
-            elif zero_vrtx[i] == 1:
-                x[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 1], 0] - l[i] * np.cos(alpha[i])
-                y[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 1], 1] + l[i] * np.sin(alpha[i])
-            elif zero_vrtx[i] == 2:
-                x[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 2], 0] - l[i] * np.cos(alpha[i])
-                y[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 2], 1] - l[i] * np.sin(alpha[i])
-            elif zero_vrtx[i] == 3:
-                x[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 3], 0] + l[i] * np.cos(alpha[i])
-                y[i] = mesh.VertexCoor[mesh.Connectivity[elts[i], 3], 1] - l[i] * np.sin(alpha[i])
+        # the points on the front where the perpendiculars drawn from the zero vertices intersect it
+        zero_vrtx = np.asarray(zero_vrtx, dtype=int)
+        vertex = mesh.VertexCoor[mesh.Connectivity[elts, zero_vrtx]]
+        sign_x = np.where(np.logical_or(zero_vrtx == 0, zero_vrtx == 3), 1., -1.)
+        sign_y = np.where(zero_vrtx <= 1, 1., -1.)
+        x = vertex[:, 0] + sign_x * l * np.cos(alpha)
+        y = vertex[:, 1] + sign_y * l * np.sin(alpha)
 
         # returning the Kprime according to the given function
-        K1c = np.empty((len(elts),), dtype=np.float64)
-        for i in range(len(elts)):
-            K1c[i] = mat_prop.K1cFunc(x[i], y[i])
-
-        return K1c
+        return mat_prop.evaluate_on_points(mat_prop.K1cFunc, x, y)
 
 #-----------------------------------------------------------------------------------------------------------------------
 
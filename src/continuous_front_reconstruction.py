@@ -110,60 +110,92 @@ def plot_ray_tracing_numpy_results(mesh,x,y,poly,inside):
 def ray_tracing_numpy(x,y,poly):
     """given a polygon this function tests if each of the points in a given set is inside or outside
 
-    The answer is obtained by drawing an horizontal line on the right side of the point
+    The answer is obtained by drawing an horizontal line on the right side of the point and counting the crossings with
+    the segments of the polygon (see points_inside_fronts).
 
     :param x: an array containing the x coordinates of the points to be tested e.g.: np.asarray([[0.,5.]])
     :param y: an array containing the y coordinates of the points to be tested e.g.: np.asarray([[0.,5.]])
     :param poly: a matrix containing the x and y coordinated of the poligons e.g.: np.asarray([[-1,-1],[1,-1],[0,1]])
+                 or a list of such matrices in case of several closed fronts. A point is inside if it is inside an odd
+                 number of them.
     :return: an array of booleans ordered as x
     """
 
     # make the array with the answer at the points (np.bool_ : Boolean(True or False) stored as a byte)
-    # assume that the points are all outside (0 is false)
     if isinstance(x, (int, float, complex)) and not isinstance(x, bool):
         x = np.asarray([[x]])
         y = np.asarray([[y]])
-    inside = np.zeros(x.shape[1],np.bool_)
-
-    # initializing the parameters
-    p2x = 0.0
-    p2y = 0.0
-    xints = 0.0
-    p1x,p1y = poly[0]
-    n = poly.shape[0]
-    for i in range(n+1): # i in [0,1,...,n]
-        p2x,p2y = poly[i % n] # modulo returns the first index when the element n is called (starting from 0)
-        # compute the indexes of the points from which an horizontal line might intersect with the segment
-        idx = np.nonzero((y > min(p1y,p2y)) & (y <= max(p1y,p2y)) & (x <= max(p1x,p2x)))[1] # 0 is False, 1 is True
-
-        # if the front segment is not horizontal compute the x coord of the intersection of an horizontal line and the
-        # front only in the case the front is on the right side of the point (this latter requirement is expressed by
-        # the fact that we are taking y[idx]
-        if p1y != p2y:
-            xints = (y[0,idx]-p1y)*(p2x-p1x)/(p2y-p1y)+p1x #-->this might give problems of tolerance
-
-        # if the segment is vertical switch directly from true to false and vice versa
-        if p1x == p2x:
-            inside[idx] = ~inside[idx]
-
-        # if the segment is NOT vertical you have to decide:
-        #      p1
-        #       \          outside
-        #         \
-        #           \
-        #          *--\----------->
-        #               \  *------>
-        #     inside      \
-        #                   p2
-        #
-        # if x < xints the point is inside, otherwise it is outside
-        elif not idx.size == 0 :
-            idxx = idx[x[0,idx] <= xints]
-            inside[idxx] = ~inside[idxx]
-
-        p1x,p1y = p2x,p2y
-
-    return inside
+    if not isinstance(poly, list):
+        poly = [poly]
+
+    inside = points_inside_fronts(np.asarray(x)[0], np.asarray(y)[0], poly)
+
+    return np.logical_xor.reduce(inside, axis=1)
+
+def points_inside_fronts(x, y, polys):
+    """given several closed fronts this function tests if each of the points in a given set is inside each of them
+
+    The test is done with a scanline fill: the rows are the distinct y coordinates of the points (for the cell centers
+    of the mesh, the rows of cells). For each front, the crossings of its segments with each row they span are
+    computed at once, and a point is inside the front if the number of crossings of its row on its right is odd. The
+    crossings and the points are sorted together by front, row and x coordinate, so that the crossings on the right of
+    each point are counted without testing the point against the segments.
+
+    :param x: an array with the x coordinates of the points to be tested
+    :param y: an array with the y coordinates of the points to be tested
+    :param polys: a list of matrices with the x and y coordinates of the vertices of the fronts
+    :return: an array of booleans with the shape (number of points, number of fronts)
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    rows_y, point_row = np.unique(y, return_inverse=True)
+    n_rows = rows_y.size
+
+    # the segments of the fronts, from the vertex p1 to the vertex p2
+    p1 = np.concatenate([np.asarray(poly_i, dtype=float) for poly_i in polys])
+    p2 = np.concatenate([np.roll(np.asarray(poly_i, dtype=float), -1, axis=0) for poly_i in polys])
+    front = np.repeat(np.arange(len(polys)), [len(poly_i) for poly_i in polys])
+    p1x, p1y, p2x, p2y = p1[:, 0], p1[:, 1], p2[:, 0], p2[:, 1]
+
+    # the rows crossed by each segment, i.e. with min(p1y, p2y) < y <= max(p1y, p2y)
+    first = np.searchsorted(rows_y, np.minimum(p1y, p2y), side='right')
+    last = np.searchsorted(rows_y, np.maximum(p1y, p2y), side='right')
+    n_crossed = np.maximum(last - first, 0)
+    segment = np.repeat(np.arange(p1x.size), n_crossed)
+    row = np.repeat(first - np.cumsum(n_crossed) + n_crossed, n_crossed) + np.arange(segment.size)
+
+    # compute the x coord of the intersection of an horizontal line and the front (the segments crossing a row are
+    # never horizontal). The points with x <= xints are on the left of the crossing:
+    #      p1
+    #       \          outside
+    #         \
+    #           \
+    #          *--\----------->
+    #               \  *------>
+    #     inside      \
+    #                   p2
+    p1x, p1y, p2x, p2y = p1x[segment], p1y[segment], p2x[segment], p2y[segment]
+    xints = (rows_y[row] - p1y) * (p2x - p1x) / (p2y - p1y) + p1x  # -->this might give problems of tolerance
+    xints = np.where(p1x == p2x, p1x, np.minimum(xints, np.maximum(p1x, p2x)))
+
+    # sort the crossings and the points of each front by row and x (the points before the crossings at the same x)
+    n_fronts = len(polys)
+    key = np.concatenate((front[segment] * n_rows + row,
+                          (np.arange(n_fronts)[:, np.newaxis] * n_rows + point_row).ravel()))
+    x_all = np.concatenate((xints, np.tile(x, n_fronts)))
+    is_crossing = np.concatenate((np.ones(xints.size, dtype=int), np.zeros(n_fronts * x.size, dtype=int)))
+    order = np.lexsort((is_crossing, x_all, key))
+
+    # the number of crossings after each point in its front and row
+    crossings_before = np.cumsum(is_crossing[order])
+    key_sorted = key[order]
+    group_end = np.searchsorted(key_sorted, key_sorted, side='right') - 1
+    crossings_after = crossings_before[group_end] - crossings_before
+
+    inside = np.empty(key.size, dtype=bool)
+    inside[order] = crossings_after % 2 == 1
+
+    return inside[xints.size:].reshape((n_fronts, x.size)).T
 
 def find_indexes_repeatd_elements(list):
     """This function returns all the indexes of the repeated elements
@@ -235,15 +267,15 @@ def pointtolinedistance(x0, x1, x2, y0, y1, y2):
     """compute the minimum euclidean distance from a point of coordinates (x0,y0) to a the line passing through 2 points.
     The function works only for planar problems.
 
-    :param x0: float representing the x coordinate of the point
-    :param x1: float representing the x coordinate of the first point contained by the line
-    :param x2: float representing the x coordinate of the second point contained by the line
-    :param y0: float representing the y coordinate of the point
-    :param y1: float representing the y coordinate of the first point contained by the line
-    :param y2: float representing the y coordinate of the second point contained by the line
-    :return: float representing the shortest euclidean distance
+    :param x0: float (or array) representing the x coordinate of the point
+    :param x1: float (or array) representing the x coordinate of the first point contained by the line
+    :param x2: float (or array) representing the x coordinate of the second point contained by the line
+    :param y0: float (or array) representing the y coordinate of the point
+    :param y1: float (or array) representing the y coordinate of the first point contained by the line
+    :param y2: float (or array) representing the y coordinate of the second point contained by the line
+    :return: float (or array) representing the shortest euclidean distance
     """
-    if x1 == x2 and y1 == y2:
+    if np.any(np.logical_and(x1 == x2, y1 == y2)):
         raise SystemExit('FRONT RECONSTRUCTION ERROR: line definded by two coincident points')
     else:
         return np.abs((y2 - y1) * x0 - (x2 - x1) * y0 + x2 * y1 - y2 * x1) / np.sqrt((-x1 + x2) ** 2 + (-y1 + y2) ** 2)
@@ -315,6 +347,37 @@ def filltable(nodeVScommonelementtable, nodeindex, common, sgndDist_k, column):
         exitstatus = False
     return nodeVScommonelementtable, exitstatus
 
+def find_common_tip_cells(typeindex, edgeORvertexID, mesh, sgndDist_k):
+    """For each node at the front, return the cell in common with the previous node along the (closed) front.
+    This is the same as calling findcommon and filltable for all the nodes at once.
+
+    :param typeindex: array that specify if a node at the front is an existing vertex or an intersection with the edge
+    :param edgeORvertexID: list that contains for each node at the front the number of the vertex or of the edge where it lies
+    :param mesh: obj
+    :param sgndDist_k: level set
+    :return: array with the common cell for each node and a boolean telling if all the nodes have a common cell with
+             the previous one
+    """
+    typeindex = np.asarray(typeindex, dtype=int)
+    edgeORvertexID = np.asarray(edgeORvertexID, dtype=int)
+
+    # the cells of the nodes: 2 cells sharing the edge (repeated to get 4 columns) or 4 cells sharing the vertex
+    cells_of_nodes = np.empty((typeindex.size, 4), dtype=int)
+    on_edge = typeindex == 0
+    cells_of_nodes[on_edge] = mesh.Connectivityedgeselem[edgeORvertexID[on_edge]][:, [0, 1, 0, 1]]
+    cells_of_nodes[~on_edge] = mesh.Connectivitynodeselem[edgeORvertexID[~on_edge]]
+    cells_of_previous = np.roll(cells_of_nodes, 1, axis=0)
+
+    common = np.any(cells_of_nodes[:, :, np.newaxis] == cells_of_previous[:, np.newaxis, :], axis=2)
+    exitstatus = np.all(np.any(common, axis=1))
+
+    # in case of two common cells take the one with the largest level set (the smallest name if equal)
+    LS_common = np.where(common, sgndDist_k[cells_of_nodes], -np.inf)
+    candidates = np.logical_and(common, LS_common == np.max(LS_common, axis=1)[:, np.newaxis])
+    common_cell = np.min(np.where(candidates, cells_of_nodes, mesh.NumberOfElts), axis=1)
+
+    return common_cell, exitstatus
+
 def ISinsideFracture(i,mesh,sgndDist_k):
     """
     you are in cell i
@@ -351,6 +414,48 @@ def ISinsideFracture(i,mesh,sgndDist_k):
     answer_on_vertexes = [hcid_mean<0, cgbi_mean<0, ibfa_mean<0, diae_mean<0]
     return answer_on_vertexes
 
+def get_LS_on_vertexes(cells, mesh, sgndDist_k):
+    """
+    Same as ISinsideFracture, for a set of cells at once. The level set at the vertexes 0,1,2,3 of the cells is
+    extrapolated by taking the mean of the level set at the centers of the four cells sharing the vertex.
+      _   _   _   _   _   _
+    | _ | _ | _ | _ | _ | _ |
+    | _ | _ | _ | _ | _ | _ |
+    | _ | e | a | f | _ | _ |
+    | _ | _ 3 _ 2 _ | _ | _ |
+    | _ | d | i | b | _ | _ |
+    | _ | _ 0 _ 1 _ | _ | _ |
+    | _ | h | c | g | _ | _ |
+    | _ | _ | _ | _ | _ | _ |
+
+    :param cells: names of the cells
+    :param mesh: obj
+    :param sgndDist_k: level set
+    :return: the level set at the vertexes (number of cells x 4) and the level set at the centers of the cells
+             [[h, c, i, d], [c, g, b, i], [i, b, f, a], [d, i, a, e]] used to compute them (number of cells x 4 x 4)
+    """
+    #                         0     1      2      3
+    #       NeiElements[i]->[left, right, bottom, up]
+    [left_elem, right_elem, bottom_elem, top_elem] = [0, 1, 2, 3]
+
+    i = np.asarray(cells, dtype=int)
+    a = mesh.NeiElements[i, top_elem]
+    b = mesh.NeiElements[i, right_elem]
+    c = mesh.NeiElements[i, bottom_elem]
+    d = mesh.NeiElements[i, left_elem]
+    e = mesh.NeiElements[d, top_elem]
+    f = mesh.NeiElements[b, top_elem]
+    g = mesh.NeiElements[b, bottom_elem]
+    h = mesh.NeiElements[d, bottom_elem]
+
+    LS = sgndDist_k[np.stack((np.column_stack((h, c, i, d)),
+                              np.column_stack((c, g, b, i)),
+                              np.column_stack((i, b, f, a)),
+                              np.column_stack((d, i, a, e))), axis=1)]
+    # summed in the same order as np.mean
+    LS_vertexes = (((LS[:, :, 0] + LS[:, :, 1]) + LS[:, :, 2]) + LS[:, :, 3]) / 4.
+    return LS_vertexes, LS
+
 def findangle(x1, y1, x2, y2, x0, y0, mac_precision):
     """Compute the angle with respect to the horizontal direction between the segment from a point of coordinates (x0,y0)
     and orthogonal to a the line passing through 2 points. The function works only for planar problems.
@@ -974,8 +1079,7 @@ def define_orientation_type3OR4(type,Tx_other_intersections, mesh, sgndDist_k):
         LS_TYPE_3or4 = (LS_TYPE_3or4 < 0.).astype(int) # True (1) when is Negative otherwise False (0)
     elif type == "4":
         LS_TYPE_3or4 = (LS_TYPE_3or4 > 0.).astype(int) # True (1) when is Positive otherwise False (0)
-    for i in range(LS_TYPE_3or4.shape[0]):
-        LS_TYPE_3or4[i,:]=np.multiply(LS_TYPE_3or4[i,:], testvector)
+    LS_TYPE_3or4 = np.multiply(LS_TYPE_3or4, testvector)
 
     # if (np.sum(LS_TYPE_3or4, axis=1)-1)[0] == 4 :
     #  log.debug("stop")
@@ -2022,6 +2126,274 @@ def get_next_cell_name_from_first(first_cell_name,FC_type,mesh,sgndDist_k):
     else: raise SystemExit('FRONT RECONSTRUCTION ERROR: Unknown cell type')
     return next_cell_name
 
+def get_front_crossings(fictitius_cells, FC_type, mesh, sgndDist_k):
+    """
+    Find, for a set of fictitius cells of type 1, 3 or 4, the two neighbouring fictitius cells through which the front
+    enters and exits. The front is then traced by moving from a fictitius cell to the neighbour that is not the one
+    where we are coming from (see get_next_cell_name). The first of the two neighbours is the one given by
+    get_next_cell_name_from_first.
+
+    :param fictitius_cells: names of the fictitius cells
+    :param FC_type: the types of the fictitius cells
+    :param mesh: obj
+    :param sgndDist_k: level set
+    :return: two arrays with the names of the first and second neighbouring fictitius cells
+    """
+    """
+    remembrer the usage of NeiElements[i]->[left, right, bottom, up]
+                                             0     1      2      3
+    """
+    fictitius_cells = np.asarray(fictitius_cells, dtype=int)
+    NeiElements = mesh.NeiElements[fictitius_cells]
+    first_column = np.zeros(fictitius_cells.size, dtype=int)
+    second_column = np.zeros(fictitius_cells.size, dtype=int)
+
+    type_1 = np.where(FC_type == 1)[0]
+    if type_1.size > 0:
+        orientation = np.ndarray.flatten(define_orientation_type1(fictitius_cells[type_1], mesh, sgndDist_k))
+        quasi_horizontal = np.logical_or(orientation == 0, orientation == 2)
+        first_column[type_1] = np.where(quasi_horizontal, 0, 2)
+        second_column[type_1] = np.where(quasi_horizontal, 1, 3)
+
+    for cell_type in [3, 4]:
+        type_3or4 = np.where(FC_type == cell_type)[0]
+        if type_3or4.size > 0:
+            orientation = define_orientation_type3OR4(str(cell_type), fictitius_cells[type_3or4], mesh, sgndDist_k)
+            if np.any(np.logical_or(orientation < 0, orientation > 3)):
+                raise SystemExit('FRONT RECONSTRUCTION ERROR: Wrong orientation')
+            first_column[type_3or4] = np.asarray([2, 2, 3, 3])[orientation]
+            second_column[type_3or4] = np.asarray([0, 1, 1, 0])[orientation]
+
+    rows = np.arange(fictitius_cells.size)
+    return NeiElements[rows, first_column], NeiElements[rows, second_column]
+
+def get_successors(FC_names, FC_position, FC_crossing_0, FC_crossing_1):
+    """
+    Link the fictitius cells along the fronts. Moving along a front, a fictitius cell is entered through one of its two
+    crossings and left through the other (see get_front_crossings). The state 2 * p + k is the fictitius cell at the
+    position p entered through the crossing k (k = 0 or 1), the successor of a state is the state of the next fictitius
+    cell along the front.
+
+    :param FC_names: names of the fictitius cells
+    :param FC_position: the position of each cell of the mesh in FC_names (-1 if it is not a fictitius cell)
+    :param FC_crossing_0: the first crossing of each fictitius cell
+    :param FC_crossing_1: the second crossing of each fictitius cell
+    :return: the successor of each state, -1 if the front leaves the fictitius cells or does not enter the next
+             fictitius cell through one of its crossings
+    """
+    # the state 2 * p is left through the crossing 1 and the state 2 * p + 1 through the crossing 0
+    next_position = FC_position[np.column_stack((FC_crossing_1, FC_crossing_0)).ravel()]
+    coming_from = np.repeat(FC_names, 2)
+    valid = next_position >= 0
+    successors = np.full(2 * FC_names.size, -1, dtype=int)
+    successors[valid] = np.where(FC_crossing_0[next_position[valid]] == coming_from[valid],
+                                 2 * next_position[valid],
+                                 np.where(FC_crossing_1[next_position[valid]] == coming_from[valid],
+                                          2 * next_position[valid] + 1, -1))
+    return successors
+
+def get_closed_paths(successors):
+    """
+    Order the fictitius cells along the closed fronts with array operations (pointer jumping), giving the same paths as
+    tracing the fronts cell by cell: a front is traced from the first fictitius cell not explored yet, leaving it
+    through its first crossing, until the first cell is reached again. The fronts are ordered by their first cell.
+
+    :param successors: the successors of the states of the fictitius cells (see get_successors)
+    :return: the list of the positions of the fictitius cells along each of the closed fronts, or None if the
+             successors do not describe closed fronts passing once through each fictitius cell (the fronts have then
+             to be traced cell by cell)
+    """
+    n_states = successors.size
+    if n_states == 0 or np.any(successors < 0) or np.unique(successors).size != n_states:
+        return None
+    n_jumps = int(np.ceil(np.log2(n_states)))
+
+    # the first fictitius cell and the first state of the cycle of states through each state
+    first_cell = np.arange(n_states) // 2
+    first_state = np.arange(n_states)
+    jump = successors
+    for i in range(n_jumps):
+        first_cell = np.minimum(first_cell, first_cell[jump])
+        first_state = np.minimum(first_state, first_state[jump])
+        jump = jump[jump]
+    # the two directions along a front have to pass through the same cells
+    if not np.array_equal(first_cell[0::2], first_cell[1::2]):
+        return None
+
+    # the front is traced from its first cell leaving it through the first crossing (state 2 * p + 1)
+    start = 2 * first_cell + 1
+    on_path = np.where(first_state == first_state[start])[0]
+    if not np.all(np.bincount(on_path // 2, minlength=n_states // 2) == 1):
+        return None
+
+    # the number of states from each state to the last state before the start of the cycle
+    last = successors[on_path] == start[on_path]
+    jump = np.arange(n_states)
+    jump[on_path] = np.where(last, on_path, successors[on_path])
+    to_last = np.zeros(n_states, dtype=int)
+    to_last[on_path] = ~last
+    for i in range(n_jumps):
+        to_last = to_last + to_last[jump]
+        jump = jump[jump]
+
+    order = on_path[np.lexsort((-to_last[on_path], first_cell[on_path]))]
+    path_lengths = np.unique(first_cell[order], return_counts=True)[1]
+    return np.split(order // 2, np.cumsum(path_lengths)[:-1])
+
+def get_fictitius_cells_sign_pattern(fictitius_cells, NeiElements, sgndDist_k):
+    """
+    Encode the signs of the level set at the 4 cells i,c,b,a of each fictitius cell in an integer (a bit is set for
+    each positive value). The crossings of the front with a fictitius cell only depend on these signs.
+
+    :param fictitius_cells: names of the fictitius cells
+    :param NeiElements: see mesh.NeiElements
+    :param sgndDist_k: level set
+    :return: the sign pattern of the fictitius cells
+    """
+    LS = get_LS_on_i_fictitius_cell("icba", fictitius_cells, NeiElements, sgndDist_k)
+    return np.dot((LS > 0.).astype(int), np.asarray([1, 2, 4, 8], dtype=int))
+
+def get_previous_traced_paths(previous_fronts_dictionary, mesh):
+    """
+    Return the closed paths of fictitius cells traced at the previous front reconstruction, together with the sign
+    patterns and the crossings of the fictitius cells, if they can be used to trace the fronts again on the same mesh.
+
+    :param previous_fronts_dictionary: the fronts_dictionary returned by the previous front reconstruction
+    :param mesh: obj
+    :return: the dictionary of the traced paths or None
+    """
+    if previous_fronts_dictionary is None or previous_fronts_dictionary.get('traced_paths') is None:
+        return None
+    traced_paths = previous_fronts_dictionary['traced_paths']
+    if traced_paths['mesh_size'] != (mesh.nx, mesh.ny):
+        return None
+    return traced_paths
+
+def get_front_crossings_from_previous(traced_paths, FC_names, FC_types, FC_sign_pattern, mesh, sgndDist_k):
+    """
+    Find the crossings of the front with the fictitius cells (see get_front_crossings). The crossings of the fictitius
+    cells of the previous front reconstruction whose signs of the level set did not change are taken from there, they
+    are computed only for the other cells.
+
+    :param traced_paths: the paths traced at the previous front reconstruction (see get_previous_traced_paths) or None
+    :param FC_names: names of the fictitius cells
+    :param FC_types: the types of the fictitius cells
+    :param FC_sign_pattern: the sign patterns of the fictitius cells (see get_fictitius_cells_sign_pattern)
+    :param mesh: obj
+    :param sgndDist_k: level set
+    :return: two arrays with the names of the first and second neighbouring fictitius cells and an array telling if
+             the signs of the level set of the fictitius cells did not change
+    """
+    FC_unchanged = np.zeros(FC_names.size, dtype=bool)
+    if traced_paths is not None:
+        previous_position = np.full(mesh.NumberOfElts, -1, dtype=int)
+        previous_position[traced_paths['FC_names']] = np.arange(traced_paths['FC_names'].size)
+        previous_position = previous_position[FC_names]
+        FC_unchanged[previous_position >= 0] = \
+            traced_paths['FC_sign_pattern'][previous_position[previous_position >= 0]] == FC_sign_pattern[previous_position >= 0]
+
+    FC_crossing_0 = np.zeros(FC_names.size, dtype=int)
+    FC_crossing_1 = np.zeros(FC_names.size, dtype=int)
+    if np.any(FC_unchanged):
+        FC_crossing_0[FC_unchanged] = traced_paths['FC_crossing_0'][previous_position[FC_unchanged]]
+        FC_crossing_1[FC_unchanged] = traced_paths['FC_crossing_1'][previous_position[FC_unchanged]]
+    if not np.all(FC_unchanged):
+        FC_crossing_0[~FC_unchanged], FC_crossing_1[~FC_unchanged] = \
+            get_front_crossings(FC_names[~FC_unchanged], FC_types[~FC_unchanged], mesh, sgndDist_k)
+    return FC_crossing_0, FC_crossing_1, FC_unchanged
+
+def retrace_previous_paths(previous_paths, FC_names, FC_position, FC_crossing_0, FC_crossing_1, FC_unchanged):
+    """
+    Update the closed paths of fictitius cells traced at the previous front reconstruction. Along each previous path,
+    the runs of consecutive fictitius cells whose signs of the level set did not change are kept as they are, because
+    their crossings did not change. The front is traced again cell by cell only from the end of each run, across the
+    changed fictitius cells, until the start of a run is reached, and the new segments are spliced with the runs.
+    If the topology of the fronts has changed (a front appears, fronts merge or split, the front leaves the fictitius
+    cells) None is returned and the fronts have to be traced from scratch.
+
+    :param previous_paths: the names of the fictitius cells along each of the closed paths traced previously
+    :param FC_names: names of the fictitius cells
+    :param FC_position: the position of each cell of the mesh in FC_names (-1 if it is not a fictitius cell)
+    :param FC_crossing_0: the first crossing of each fictitius cell
+    :param FC_crossing_1: the second crossing of each fictitius cell
+    :param FC_unchanged: True for the fictitius cells whose signs of the level set did not change
+    :return: the list of the positions of the fictitius cells along each of the closed fronts, in the same order as
+             given by get_closed_paths, or None
+    """
+    unchanged = np.zeros(FC_position.size, dtype=bool)
+    unchanged[FC_names[FC_unchanged]] = True
+
+    # split the previous paths in runs of unchanged cells, the paths without changed cells are kept as they are
+    loops = []
+    runs = []
+    run_entered_from = {}
+    for path in previous_paths:
+        path_unchanged = unchanged[path]
+        if np.all(path_unchanged):
+            loops.append(path)
+            continue
+        # start from a changed cell so that no run goes across the end of the path
+        path = np.roll(path, -np.argmin(path_unchanged))
+        path_unchanged = unchanged[path]
+        starts = np.where(np.logical_and(path_unchanged[1:], ~path_unchanged[:-1]))[0] + 1
+        ends = np.where(np.logical_and(path_unchanged, ~np.roll(path_unchanged, -1)))[0]
+        for start, end in zip(starts, ends):
+            run_entered_from[int(path[start])] = (len(runs), path[start - 1])
+            runs.append((path[start:end + 1], path[(end + 1) % path.size]))
+
+    # trace the front from the end of each run across the changed cells
+    explored = np.zeros(FC_names.size, dtype=bool)
+    next_run = np.full(len(runs), -1, dtype=int)
+    segments = []
+    for run_index, (run, name) in enumerate(runs):
+        segment = []
+        previous_name = run[-1]
+        while not unchanged[name]:
+            position = FC_position[name]
+            if position < 0 or explored[position]:
+                return None
+            explored[position] = True
+            segment.append(name)
+            if FC_crossing_0[position] == previous_name:
+                previous_name, name = name, FC_crossing_1[position]
+            elif FC_crossing_1[position] == previous_name:
+                previous_name, name = name, FC_crossing_0[position]
+            else:
+                return None
+        # the front has to enter the start of a run coming from the same cell as before
+        if int(name) not in run_entered_from or run_entered_from[int(name)][1] != previous_name:
+            return None
+        next_run[run_index] = run_entered_from[int(name)][0]
+        segments.append(segment)
+    if np.unique(next_run).size != len(runs):
+        return None
+
+    # splice the runs and the new segments
+    spliced = np.zeros(len(runs), dtype=bool)
+    for first in range(len(runs)):
+        loop = []
+        run_index = first
+        while not spliced[run_index]:
+            spliced[run_index] = True
+            loop += [runs[run_index][0], np.asarray(segments[run_index], dtype=int)]
+            run_index = next_run[run_index]
+        if len(loop) > 0:
+            loops.append(np.concatenate(loop))
+    # all the fictitius cells have to be along the fronts
+    if sum(loop.size for loop in loops) != FC_names.size:
+        return None
+
+    # start each front from its first cell leaving it through the first crossing (see get_closed_paths)
+    closed_paths = []
+    for loop in loops:
+        path = FC_position[loop]
+        path = np.roll(path, -np.argmin(path))
+        if FC_names[path[1]] != FC_crossing_0[path[0]]:
+            path = np.roll(path[::-1], 1)
+        closed_paths.append(path)
+    closed_paths.sort(key=lambda path: path[0])
+    return closed_paths
+
 from itertools import chain
 def itertools_chain_from_iterable(lsts):
     log = logging.getLogger('PyFrac.continuous_front_reconstruction')
@@ -2048,55 +2420,46 @@ def append_to_typelists(cell_index,cell_type,type1,type2,type3,type4):
         type4.append(cell_index)
     return type1,type2,type3,type4
 
+def copute_area_of_triangles(x0, y0, x1, y1, x2, y2):
+    """use the Shoelace formula to compute, all at once, the areas of a set of triangles (see copute_area_of_a_polygon)
+
+    :param x0, y0: arrays with the coordinates of the first vertex of each triangle
+    :param x1, y1: arrays with the coordinates of the second vertex of each triangle
+    :param x2, y2: arrays with the coordinates of the third vertex of each triangle
+    :return: array with the area of each triangle
+    """
+    return np.abs(x0 * y1 + x1 * y2 + x2 * y0 - (x1 * y0 + x2 * y1) - x0 * y2) / 2.
+
 def is_inside_the_triangle(p_center, p_zero_vertex, p1, p2, mac_precision, area_of_a_cell):
     #
     # This function answer to the question:
     # is the point inside a triangle?
-    # (given the coordinates)
-    T1x = np.asarray([p_center.x,p1.x,p2.x])
-    T1y = np.asarray([p_center.y,p1.y,p2.y])
-    T2x = np.asarray([p_center.x,p1.x,p_zero_vertex.x])
-    T2y = np.asarray([p_center.y,p1.y,p_zero_vertex.y])
-    T3x = np.asarray([p_center.x,p2.x,p_zero_vertex.x])
-    T3y = np.asarray([p_center.y,p2.y,p_zero_vertex.y])
-    Tx = np.asarray([p1.x,p2.x,p_zero_vertex.x])
-    Ty = np.asarray([p1.y,p2.y,p_zero_vertex.y])
-    if    (copute_area_of_a_polygon(T1x, T1y)
-        + copute_area_of_a_polygon(T2x, T2y)
-        + copute_area_of_a_polygon(T3x, T3y)
-        - copute_area_of_a_polygon(Tx, Ty) )/area_of_a_cell < mac_precision:
-        return True
-    else:
-        return False
+    # (given the coordinates, the coordinates of the points can be arrays to answer for many triangles at once)
+    return (copute_area_of_triangles(p_center.x, p_center.y, p1.x, p1.y, p2.x, p2.y)
+        + copute_area_of_triangles(p_center.x, p_center.y, p1.x, p1.y, p_zero_vertex.x, p_zero_vertex.y)
+        + copute_area_of_triangles(p_center.x, p_center.y, p2.x, p2.y, p_zero_vertex.x, p_zero_vertex.y)
+        - copute_area_of_triangles(p1.x, p1.y, p2.x, p2.y, p_zero_vertex.x, p_zero_vertex.y))/area_of_a_cell < mac_precision
 
 def recompute_LS_at_tip_cells(sgndDist_k, p_zero_vertex, p_center, p1, p2, mac_precision,area_of_a_cell,zero_level_set_value):
+    # the names and the coordinates of the points are arrays: one entry per tip cell
     # find the distance from the cell center to the front
-    p1x=p1.x
-    p1y=p1.y
-    p2x=p2.x
-    p2y=p2.y
-    p0x=p_center.x
-    p0y=p_center.y
-    distance_center_to_front = pointtolinedistance(p0x, p1x, p2x, p0y, p1y, p2y)
-
-    # we do not allow to have LS == 0
-    if distance_center_to_front == 0 :
-        distance_center_to_front = -zero_level_set_value
-    else :
-        """
-        Now we want to understand if the sign of the LS at the cell center is positive or negative.
-        This question is equivalent of asking if the center of the cell is inside or outside of the fracture.
-        Again, the latter question is equivalent of asking if the center of the cell belongs to the triangle 
-        that is made by considering the zero vertex and the two points of intersection of the front with the cell. 
-        If it is true, then the cell center is inside the fracture, otherwise it is outside
-        """
-        if is_inside_the_triangle(p_center, p_zero_vertex, p1, p2, mac_precision, area_of_a_cell):
-            sgndDist_k[p_center.name] = - distance_center_to_front
-        else:
-            sgndDist_k[p_center.name] = + distance_center_to_front
+    distance_center_to_front = pointtolinedistance(p_center.x, p1.x, p2.x, p_center.y, p1.y, p2.y)
+
+    # we do not allow to have LS == 0: the level set is kept where the center is on the front
+    on_the_front = distance_center_to_front == 0
+    """
+    Now we want to understand if the sign of the LS at the cell center is positive or negative.
+    This question is equivalent of asking if the center of the cell is inside or outside of the fracture.
+    Again, the latter question is equivalent of asking if the center of the cell belongs to the triangle 
+    that is made by considering the zero vertex and the two points of intersection of the front with the cell. 
+    If it is true, then the cell center is inside the fracture, otherwise it is outside
+    """
+    inside = is_inside_the_triangle(p_center, p_zero_vertex, p1, p2, mac_precision, area_of_a_cell)
+    sgndDist_k[p_center.name[~on_the_front]] = np.where(inside, -distance_center_to_front,
+                                                        distance_center_to_front)[~on_the_front]
     return sgndDist_k
 
-def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, mesh,recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge, lstTmStp_EltCrack0 = None, oldfront=None):
+def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, mesh,recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge, lstTmStp_EltCrack0 = None, oldfront=None, previous_fronts_dictionary=None):
 
         """
         description of the function.
@@ -2106,6 +2469,9 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
             anularegion:name of the cells where we expect to be the front
             Ribbon:     name of the ribbon elements
             mesh:       obj
+            previous_fronts_dictionary: the fronts_dictionary returned by the previous reconstruction (e.g. at the previous
+                        iteration on the front position). The fronts traced then are traced again only across the
+                        fictitius cells where the signs of the level set changed (see retrace_previous_paths).
 
         Returns:
             tipcells (integers):         -- descriptions.
@@ -2191,9 +2557,34 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
         list_of_Cells_type_4_list = []
         Args = [mesh,dict_Ribbon,sgndDist_k]
 
-
+        # the fictitius cells are traced in the order of dict_FC_names, the ones still to be explored are flagged
+        FC_names = np.asarray(list(dict_FC_names.values()), dtype=int)
+        FC_types = np.asarray([i_1_2_3_4_FC_type[name] for name in dict_FC_names.keys()], dtype=int)
+        FC_to_explore = np.ones(FC_names.size, dtype=bool)
+        FC_position = np.full(mesh.NumberOfElts, -1, dtype=int)
+        FC_position[FC_names] = np.arange(FC_names.size)
+        # the two neighbouring fictitius cells where the front enters and exits each fictitius cell. They are computed
+        # again only at the cells where the signs of the level set changed since the previous reconstruction
+        FC_sign_pattern = get_fictitius_cells_sign_pattern(FC_names, mesh.NeiElements, sgndDist_k)
+        previous_traced_paths = get_previous_traced_paths(previous_fronts_dictionary, mesh)
+        FC_crossing_0, FC_crossing_1, FC_unchanged = get_front_crossings_from_previous(previous_traced_paths, FC_names, FC_types, FC_sign_pattern, mesh, sgndDist_k)
+
+        fractures_rejected = False
+        closed_paths = None
         # I require more than 3 cells to define a single fracture
         if NofCells_to_explore > 3 :
+            # the fictitius cells are ordered along the closed fronts at once. The fronts traced at the previous
+            # reconstruction are traced again only across the changed cells if their topology did not change. The fronts
+            # are traced cell by cell if there are cells of type 2 or if the fronts leave the fictitius cells
+            if not np.any(FC_types == 2):
+                if previous_traced_paths is not None:
+                    closed_paths = retrace_previous_paths(previous_traced_paths['paths'], FC_names, FC_position, FC_crossing_0, FC_crossing_1, FC_unchanged)
+                    if closed_paths is not None:
+                        log.debug('Tracing again the fronts across ' + str(np.sum(~FC_unchanged)) + ' changed fictitius cells out of ' + str(FC_names.size))
+                if closed_paths is None:
+                    closed_paths = get_closed_paths(get_successors(FC_names, FC_position, FC_crossing_0, FC_crossing_1))
+            path_index = 0
+
             # do until you have explored all the cells
             while NofCells_explored < NofCells_to_explore:
                 Fracturelist = []
@@ -2202,46 +2593,75 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
                 Cells_type_3_list = []
                 Cells_type_4_list = []
 
-                first_cell_name = dict_FC_names[next(iter(dict_FC_names))]
-                Fracturelist.append(first_cell_name)
-                [Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list] = append_to_typelists(len(Fracturelist)-1, i_1_2_3_4_FC_type[str(first_cell_name)], Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list)
-                del dict_FC_names[next(iter(dict_FC_names))]
-                NofCells_explored += 1
-
-                # todo: in case of cells of type 2 this have to be reviewed: do not delete cell of type 2
-                next_cell_name = get_next_cell_name_from_first(first_cell_name,i_1_2_3_4_FC_type[str(first_cell_name)],mesh,sgndDist_k)
-
-                while next_cell_name != first_cell_name :
-
+                if closed_paths is not None:
+                    path = closed_paths[path_index]
+                    path_index += 1
+                    Fracturelist = FC_names[path].tolist()
+                    [Cells_type_1_list,
+                     Cells_type_2_list,
+                     Cells_type_3_list,
+                     Cells_type_4_list] = [np.where(FC_types[path] == cell_type)[0].tolist() for cell_type in [1, 2, 3, 4]]
+                    NofCells_explored += path.size
+                else:
+                    first_position = np.where(FC_to_explore)[0][0]
+                    first_cell_name = FC_names[first_position]
+                    Fracturelist.append(first_cell_name)
+                    [Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list] = append_to_typelists(len(Fracturelist)-1, FC_types[first_position], Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list)
+                    FC_to_explore[first_position] = False
                     NofCells_explored += 1
-                    Fracturelist.append(next_cell_name) #now is the last cell in the list but also the current cell
-
-                    # we need this check because it happens that some cells of type i are not in the fictitious cells
-                    # in that case compute the type on the fly 3536
-                    LSet_temp = get_LS_on_i_fictitius_cell('iabc', next_cell_name, mesh.NeiElements, sgndDist_k)[0]
-
-                    if str(next_cell_name) not in i_1_2_3_4_FC_type.keys():
-                        if np.any(LSet_temp > 10. ** 40):
-                            intwithFrontlist = np.intersect1d(np.unique(np.ndarray.flatten(get_fictitius_cell_all_names(Fracturelist, mesh.NeiElements))), np.asarray(mesh.Frontlist))
-                            if intwithFrontlist.size >0:
-                                log.info('The new front reaches the boundary. Remeshing')
-                                correct_size_of_pstv_region = [False, True, False]
-                                # Returning the intersection between the fictitius cells and the frontlist as tip in order to decide the direction of remeshing
-                                # (in case of anisotropic remeshing)
-                                return intwithFrontlist, None, None, None, None, None, None, None, correct_size_of_pstv_region, None, None, None, None
-                            else:
-                                log.debug('I am increasing the thickness of the band (tip i cell not found in the anularegion)')
-                                correct_size_of_pstv_region = [False, False, False]
-                                return None, None, None, None, None, None, None, None, correct_size_of_pstv_region, sgndDist_k, None, None, None
-                        cell_type = get_fictitius_cell_type(LSet_temp)
-                    else:
-                        cell_type = i_1_2_3_4_FC_type[str(next_cell_name)]
 
-                    [Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list] = append_to_typelists(len(Fracturelist) - 1, cell_type, Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list)
-                    if str(next_cell_name) in dict_FC_names.keys() and cell_type != 2 :
-                        del dict_FC_names[str(next_cell_name)]
-                    previous_cell_name = Fracturelist[-2] #second last cell in the list and the one where we are coming
-                    next_cell_name = get_next_cell_name(next_cell_name,previous_cell_name,cell_type,Args)
+                    # todo: in case of cells of type 2 this have to be reviewed: do not delete cell of type 2
+                    if FC_types[first_position] == 2:
+                        next_cell_name = get_next_cell_name_from_first(first_cell_name, 2, mesh, sgndDist_k)
+                    else:
+                        next_cell_name = FC_crossing_0[first_position]
+
+                    while next_cell_name != first_cell_name :
+
+                        NofCells_explored += 1
+                        Fracturelist.append(next_cell_name) #now is the last cell in the list but also the current cell
+                        previous_cell_name = Fracturelist[-2] #second last cell in the list and the one where we are coming
+
+                        # we need this check because it happens that some cells of type i are not in the fictitious cells
+                        # in that case compute the type on the fly 3536
+                        position = FC_position[next_cell_name]
+                        if position < 0:
+                            LSet_temp = get_LS_on_i_fictitius_cell('iabc', next_cell_name, mesh.NeiElements, sgndDist_k)[0]
+                            if np.any(LSet_temp > 10. ** 40):
+                                intwithFrontlist = np.intersect1d(np.unique(np.ndarray.flatten(get_fictitius_cell_all_names(Fracturelist, mesh.NeiElements))), np.asarray(mesh.Frontlist))
+                                if intwithFrontlist.size >0:
+                                    log.info('The new front reaches the boundary. Remeshing')
+                                    correct_size_of_pstv_region = [False, True, False]
+                                    # Returning the intersection between the fictitius cells and the frontlist as tip in order to decide the direction of remeshing
+                                    # (in case of anisotropic remeshing)
+                                    return intwithFrontlist, None, None, None, None, None, None, None, correct_size_of_pstv_region, None, None, None, None
+                                else:
+                                    log.debug('I am increasing the thickness of the band (tip i cell not found in the anularegion)')
+                                    correct_size_of_pstv_region = [False, False, False]
+                                    return None, None, None, None, None, None, None, None, correct_size_of_pstv_region, sgndDist_k, None, None, None
+                            cell_type = get_fictitius_cell_type(LSet_temp)
+                            if cell_type != 2:
+                                crossings = get_front_crossings(np.asarray([next_cell_name]), np.asarray([cell_type]), mesh, sgndDist_k)
+                                crossings = (crossings[0][0], crossings[1][0])
+                        else:
+                            cell_type = FC_types[position]
+                            crossings = (FC_crossing_0[position], FC_crossing_1[position])
+                            if cell_type != 2:
+                                FC_to_explore[position] = False
+
+                        [Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list] = append_to_typelists(len(Fracturelist) - 1, cell_type, Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list)
+
+                        # move to the crossing that is not the one where we are coming from
+                        if cell_type == 2:
+                            next_cell_name = get_next_cell_name(next_cell_name,previous_cell_name,cell_type,Args)
+                        elif previous_cell_name == crossings[0]:
+                            next_cell_name = crossings[1]
+                        elif previous_cell_name == crossings[1]:
+                            next_cell_name = crossings[0]
+                        else:
+                            next_cell_name = None
+                        if next_cell_name is None:
+                            raise SystemExit('FRONT RECONSTRUCTION ERROR: the previous fictitious cell is not neighbour of the current fictitious cell')
 
                 # now we check if the fracture is good or not
                 if len(Fracturelist) > 3:
@@ -2260,6 +2680,7 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
                         return intwithFrontlist, None, None, None, None, None, None, None, correct_size_of_pstv_region, None, None, None, None
                     else :
                         log.debug('<< I REJECT A POSSIBLE FRCTURE FRONT BECAUSE IS TOO SMALL >>')
+                        fractures_rejected = True
                         log.debug('set the LS of the positive cells to be -machine precision')
                         all_cells_of_all_FC_of_this_small_fracture = np.unique(
                             np.ndarray.flatten(get_fictitius_cell_all_names(np.asarray(Fracturelist), mesh.NeiElements)))
@@ -2271,8 +2692,19 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
         else :
             raise SystemExit('FRONT RECONSTRUCTION ERROR: not enough cells to define evene one fracture front!')
 
-        del dict_FC_names, next_cell_name, previous_cell_name, Args, Fracturelist, Cells_type_1_list, Cells_type_2_list, Cells_type_3_list, Cells_type_4_list
-        del NofCells_explored, NofCells_to_explore, first_cell_name, dict_Ribbon,  i_1_2_3_4_FC_type
+        # store the traced fronts to be traced again by the next reconstruction. This is not done if some fractures
+        # have been rejected (the level set has been changed) or if the fronts have been traced cell by cell
+        traced_paths = None
+        if not fractures_rejected and closed_paths is not None:
+            traced_paths = {'mesh_size': (mesh.nx, mesh.ny),
+                            'FC_names': FC_names,
+                            'FC_sign_pattern': FC_sign_pattern,
+                            'FC_crossing_0': FC_crossing_0,
+                            'FC_crossing_1': FC_crossing_1,
+                            'paths': [FC_names[path] for path in closed_paths]}
+
+        del dict_FC_names, Args, NofCells_explored, NofCells_to_explore, dict_Ribbon,  i_1_2_3_4_FC_type
+        del FC_names, FC_types, FC_to_explore, FC_position, FC_crossing_0, FC_crossing_1, FC_sign_pattern, FC_unchanged
 
         # plot found sets of ribbon cells
         # fig1 = plot_cells(anularegion, mesh, sgndDist_k, Ribbon, list_of_Fracturelists[0])
@@ -2385,7 +2817,7 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
         list_of_vertexID = []
 
         # prepare the fronts_dictionary that contains the info about the different fronts
-        fronts_dictionary = {'number_of_fronts': len(list_of_Fracturelists)}
+        fronts_dictionary = {'number_of_fronts': len(list_of_Fracturelists), 'traced_paths': traced_paths}
 
         """
         We need to compute first all the closed contours because is of fundamental importance the notion of
@@ -2744,127 +3176,13 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
 
 
                 """
-                Make a 2D table where to store info for each node found at the front. 
-                The 1st column contains the TIPcell's name common with the 
-                previous node in the list of nodes at the front while the second column the cell's name common with the next node.
-                The nodes that have to be deleted will have same value in both columns
+                Find for each node found at the front the TIPcell's name common with the previous node in the list of
+                nodes at the front. The segment of the front between the two nodes lies in this cell.
                 """
-                nodeVScommonelementtable=np.zeros([len(xintersection), 3],dtype=int)
-                for nodeindex in range(0,len(xintersection)):
-                    # commonbackward contains the unique values in cellOfNodei that are in cellOfNodeim1.
-                    # element -1 of a list is the last element
-                    commonbackward = findcommon(nodeindex, (nodeindex - 1), typeindex, mesh.Connectivityedgeselem, mesh.Connectivitynodeselem, edgeORvertexID)
-                    # commonforward contains the unique values in cellOfNodei that are in cellOfNodeip1.
-                    # when nodeindex == len(xintersection)-1 then (nodeindex + 1)%len(xintersection)==0
-                    commonforward = findcommon(nodeindex, (nodeindex + 1)%len(xintersection), typeindex, mesh.Connectivityedgeselem, mesh.Connectivitynodeselem, edgeORvertexID)
-                    column=0
-                    nodeVScommonelementtable, exitstatus=filltable(nodeVScommonelementtable,nodeindex,commonbackward,sgndDist_k,column)
-                    if not exitstatus:
-                        raise SystemExit('FRONT RECONSTRUCTION ERROR: two consecutive nodes does not belongs to a common cell')
-                    column=1
-                    nodeVScommonelementtable, exitstatus=filltable(nodeVScommonelementtable,nodeindex,commonforward,sgndDist_k,column)
-                    if not exitstatus:
-                        raise SystemExit('FRONT RECONSTRUCTION ERROR: two consecutive nodes does not belongs to a common cell')
-
-                listofTIPcells = []
-                # remove the nodes in the cells with more than 2 nodes and keep the first and the last node
-                # counter = 0
-                # n=len(xintersection)
-                # jump = False
-                for nodeindex in range(0, len(xintersection)):
-                    # if nodeVScommonelementtable[nodeindex][1] == nodeVScommonelementtable[nodeindex][0]:
-                    #     # plot before removing
-                    #     # A = np.full(mesh.NumberOfElts, np.nan)
-                    #     # A[anularegion] = sgndDist_k[anularegion]
-                    #     # from visualization import plot_fracture_variable_as_image
-                    #     # figure = plot_fracture_variable_as_image(A, mesh)
-                    #     # ax = figure.get_axes()[0]
-                    #     # xtempppp = xintersection
-                    #     # ytempppp = yintersection
-                    #     # xtempppp.append(xtempppp[0]) # close the front
-                    #     # ytempppp.append(ytempppp[0]) # close the front
-                    #     # plt.plot(xtempppp, ytempppp, '-o')
-                    #     # plt.plot( xintersection[nodeindex-counter - 1:nodeindex-counter + 1], yintersection[nodeindex-counter - 1:nodeindex-counter + 1], '-r')
-                    #     # plt.plot(xblack, yblack, '.',color='black')
-                    #     # plt.plot(mesh.CenterCoor[Ribbon,0], mesh.CenterCoor[Ribbon,1], '.',color='g')
-                    #     # plt.plot(mesh.CenterCoor[listofTIPcells, 0] + mesh.hx / 10, mesh.CenterCoor[listofTIPcells, 1] + mesh.hy / 10, '.', color='blue')
-                    #
-                    #     del xintersection[nodeindex-counter]
-                    #     del yintersection[nodeindex-counter]
-                    #     del typeindex[nodeindex-counter]
-                    #     del edgeORvertexID[nodeindex-counter]
-                    #
-                    #     nodeVScommonelementtable[nodeindex][2]=1 # to remember that the node has been deleted
-                    #
-                    #     #plot after removing
-                    #     # A = np.full(mesh.NumberOfElts, np.nan)
-                    #     # A[anularegion] = sgndDist_k[anularegion]
-                    #     # from visualization import plot_fracture_variable_as_image
-                    #     # figure = plot_fracture_variable_as_image(A, mesh)
-                    #     # ax = figure.get_axes()[0]
-                    #     # xtempppp = xintersection
-                    #     # ytempppp = yintersection
-                    #     # xtempppp.append(xtempppp[0])  # close the front
-                    #     # ytempppp.append(ytempppp[0])  # close the front
-                    #     # plt.plot(xtempppp, ytempppp, '-o')
-                    #     # plt.plot(xintersection[nodeindex-counter - 1:nodeindex-counter + 1], yintersection[nodeindex-counter - 1:nodeindex-counter + 1], '-r')
-                    #     # plt.plot(xblack, yblack, '.', color='black')
-                    #     # plt.plot(mesh.CenterCoor[Ribbon, 0], mesh.CenterCoor[Ribbon, 1], '.', color='g')
-                    #     # plt.plot(mesh.CenterCoor[listofTIPcells, 0] + mesh.hx / 10,
-                    #     #          mesh.CenterCoor[listofTIPcells, 1] + mesh.hy / 10, '.', color='blue')
-                    #     counter = counter + 1
-                    # elif nodeVScommonelementtable[nodeindex][0] == nodeVScommonelementtable[(nodeindex+1)%n][1]:
-                    #     # plot before removing
-                    #     # A = np.full(mesh.NumberOfElts, np.nan)
-                    #     # A[anularegion] = sgndDist_k[anularegion]
-                    #     # from visualization import plot_fracture_variable_as_image
-                    #     # figure = plot_fracture_variable_as_image(A, mesh)
-                    #     # ax = figure.get_axes()[0]
-                    #     # xtempppp = xintersection
-                    #     # ytempppp = yintersection
-                    #     # xtempppp.append(xtempppp[0]) # close the front
-                    #     # ytempppp.append(ytempppp[0]) # close the front
-                    #     # plt.plot(xtempppp, ytempppp, '-o')
-                    #     # plt.plot( xintersection[nodeindex-counter - 1:nodeindex-counter + 1], yintersection[nodeindex-counter - 1:nodeindex-counter + 1], '-r')
-                    #     # plt.plot(xblack, yblack, '.',color='black')
-                    #     # plt.plot(mesh.CenterCoor[Ribbon,0], mesh.CenterCoor[Ribbon,1], '.',color='g')
-                    #     # plt.plot(mesh.CenterCoor[listofTIPcells, 0] + mesh.hx / 10, mesh.CenterCoor[listofTIPcells, 1] + mesh.hy / 10, '.', color='blue')
-                    #     del xintersection[nodeindex-counter]
-                    #     del yintersection[nodeindex-counter]
-                    #     del typeindex[nodeindex-counter]
-                    #     del edgeORvertexID[nodeindex-counter]
-                    #     nodeVScommonelementtable[nodeindex][2]=1 # to remember that the node has been deleted
-                    #     counter = counter + 1
-                    #     del xintersection[(nodeindex-counter+1)%len(xintersection)]
-                    #     del yintersection[(nodeindex-counter+1)%len(xintersection)]
-                    #     del typeindex[(nodeindex-counter+1)%len(xintersection)]
-                    #     del edgeORvertexID[(nodeindex-counter+1)%len(xintersection)]
-                    #     nodeVScommonelementtable[(nodeindex+1)%n][2]=1 # to remember that the node has been deleted
-                    #     counter = counter + 1
-                    #     jump = True
-                    #     # plot after removing
-                    #     # A = np.full(mesh.NumberOfElts, np.nan)
-                    #     # A[anularegion] = sgndDist_k[anularegion]
-                    #     # from visualization import plot_fracture_variable_as_image
-                    #     # figure = plot_fracture_variable_as_image(A, mesh)
-                    #     # ax = figure.get_axes()[0]
-                    #     # xtempppp = xintersection
-                    #     # ytempppp = yintersection
-                    #     # xtempppp.append(xtempppp[0])  # close the front
-                    #     # ytempppp.append(ytempppp[0])  # close the front
-                    #     # plt.plot(xtempppp, ytempppp, '-o')
-                    #     # plt.plot(xintersection[nodeindex-counter - 1:nodeindex-counter + 1], yintersection[nodeindex-counter - 1:nodeindex-counter + 1], '-r')
-                    #     # plt.plot(xblack, yblack, '.', color='black')
-                    #     # plt.plot(mesh.CenterCoor[Ribbon, 0], mesh.CenterCoor[Ribbon, 1], '.', color='g')
-                    #     # plt.plot(mesh.CenterCoor[listofTIPcells, 0] + mesh.hx / 10,
-                    #     #          mesh.CenterCoor[listofTIPcells, 1] + mesh.hy / 10, '.', color='blue')
-                    # else:
-                    #     if jump:
-                    #         jump = False
-                    #     else:
-                    #         listofTIPcells.append(nodeVScommonelementtable[nodeindex][0])
-                    listofTIPcells.append(nodeVScommonelementtable[nodeindex][0])
-                # del n, jump, nodeindex, counter
+                common_cells, exitstatus = find_common_tip_cells(typeindex, edgeORvertexID, mesh, sgndDist_k)
+                if not exitstatus:
+                    raise SystemExit('FRONT RECONSTRUCTION ERROR: two consecutive nodes does not belongs to a common cell')
+                listofTIPcells = common_cells.tolist()
 
                 # after removing the points on the same edge, update the global list
                 list_of_xintersections_for_all_closed_paths[j] = xintersection
@@ -2894,97 +3212,86 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
                      Define the correct node from where compute the distance to the front
                      that node has the largest distance from the front and is inside the fracture but belongs to the tip cell  
                 """
-                vertexpositionwithinthecell=[0 for i in range(len(listofTIPcells))]
-                vertexID = [0 for i in range(len(listofTIPcells))] #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                distances = [0 for i in range(len(listofTIPcells))]
-                angles = [0 for i in range(len(listofTIPcells))]
-                xintersectionsfromzerovertex = []  #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                yintersectionsfromzerovertex = []  #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-
-                # loop over the all segments at the fracture front
-                # the number of segments is equal to the number of tipcells because the front is closed
-                for nodeindex in range(0, len(xintersection)):
-                    nodeindexp1 = (nodeindex + 1)%len(xintersection) # take the near vertex to define an edge
-                    localvertexID = []
-                    localdistances = []
-                    localvertexpositionwithinthecell = []
-                    i=listofTIPcells[nodeindexp1]
-                    # check the vertexes if they are inside or outside of the fracture
-                    answer_on_vertexes = ISinsideFracture(i, mesh, sgndDist_k)
-                    for jj in range(0,4):
-                        if answer_on_vertexes[jj]: # if the vertex is inside the fracture
-                            p0name = mesh.Connectivity[i][jj]
-                            p0x = mesh.VertexCoor[p0name][0]
-                            p0y = mesh.VertexCoor[p0name][1]
-                            localvertexID.append(p0name)
-                            localvertexpositionwithinthecell.append(jj)
-                            p1x = xintersection[nodeindex]
-                            p1y = yintersection[nodeindex]
-                            p2x = xintersection[nodeindexp1]
-                            p2y = yintersection[nodeindexp1]
-                            localdistances.append(pointtolinedistance(p0x, p1x, p2x, p0y, p1y, p2y)) #compute the distance from the vertex to the front
-
-                    # take the largest distance from the front
-                    if len(localdistances)!=0:
-                        index = np.argmax(np.asarray(localdistances)) # compute the index of the point with the maximun distance to the front
-                        if index.size>1: # if you have two nodes that have the same distance to the front and are inside thake the first
-                            index = index[0]
-
-                        # take:
-                        #       - name of the vertex
-                        #       - local position within the cell
-                        #       - distance to the front
-                        vertexID[nodeindexp1]=localvertexID[index] #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                        vertexpositionwithinthecell[nodeindexp1]=localvertexpositionwithinthecell[index]
-                        distances[nodeindexp1]=localdistances[index]
-
-                        # compute the angle
-                        x = mesh.VertexCoor[localvertexID[index]][0] # x coordinate of the zero vertex
-                        y = mesh.VertexCoor[localvertexID[index]][1] # y coordinate of the zero vertex
-                        [angle, xint, yint] = findangle(xintersection[nodeindex], yintersection[nodeindex], xintersection[nodeindexp1], yintersection[nodeindexp1], x, y,mac_precision)
-                        angles[nodeindexp1] = angle
-                        #[angle, xint, yint] = findangle(xintersection[nodeindex], yintersection[nodeindex],
-                        #                                xintersection[nodeindexp1], yintersection[nodeindexp1], mesh.CenterCoor[i,0], mesh.CenterCoor[i,1])  #<--------- IT CAN BE REMOVED, IT IS ONLY FOR ONE POSSIBLE LOCAL DEBUGGING
-                        if recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge:
-                            p_zero_vertex = Point(0, x, y)
-                            p_center = Point(i, mesh.CenterCoor[i,0], mesh.CenterCoor[i,1])
-                            p1 = Point(2, xintersection[nodeindex], yintersection[nodeindex])
-                            p2 = Point(3, xintersection[nodeindexp1], yintersection[nodeindexp1])
-                            sgndDist_k_new = recompute_LS_at_tip_cells(sgndDist_k_new, p_zero_vertex, p_center,p1,p2, mac_precision,area_of_a_cell,zero_level_set_value)
-                        xintersectionsfromzerovertex.append(xint) #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                        yintersectionsfromzerovertex.append(yint) #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                    else:
-                        if typeindex[nodeindex] == 1 and typeindex[nodeindexp1] == 1:
-                            edges_node1 = mesh.Connectivitynodesedges[edgeORvertexID[nodeindex]]
-                            edges_node2 = mesh.Connectivitynodesedges[edgeORvertexID[nodeindexp1]]
-                            commonedge = np.intersect1d(edges_node1, edges_node2)
-                            if commonedge.size > 0 :
-                                #            0
-                                #            |
-                                #         1__o__3    o is the node and the order in  connNodesEdges is [vertical_top, horizotal_left, vertical_bottom, horizotal_right]
-                                #            |
-                                #            2
-                                # the points are on the same edge an the front it is exactly there
-                                position_in_connectivity = np.where(mesh.Connectivitynodesedges[edgeORvertexID[nodeindex]] == commonedge)[0][0]
-                                if  position_in_connectivity in [1,3]:
-                                    angles[nodeindexp1] = np.pi/2.
-                                else:
-                                    angles[nodeindexp1] = 0.
-                                vertexID[nodeindexp1] = edgeORvertexID[nodeindexp1]
-                                vertexpositionwithinthecell[nodeindexp1] = np.where(mesh.Connectivity[i]==edgeORvertexID[nodeindexp1])[0][0]
-                                distances[nodeindexp1] = 0.
-                                x = mesh.VertexCoor[edgeORvertexID[nodeindexp1]][0]  # x coordinate of the zero vertex
-                                y = mesh.VertexCoor[edgeORvertexID[nodeindexp1]][1]  # y coordinate of the zero vertex
-                                xint = x
-                                yint = y
-                                xintersectionsfromzerovertex.append(xint)  # <--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
-                                yintersectionsfromzerovertex.append(yint)  # <--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
+                # the segments at the fracture front, the number of segments is equal to the number of tipcells because
+                # the front is closed. The segment ending at the node nodeindex lies in the tip cell listofTIPcells[nodeindex]
+                tipcells = common_cells
+                p2x = np.asarray(xintersection, dtype=float)
+                p2y = np.asarray(yintersection, dtype=float)
+                p1x = np.roll(p2x, 1)
+                p1y = np.roll(p2y, 1)
+
+                # check the vertexes if they are inside or outside of the fracture
+                answer_on_vertexes = get_LS_on_vertexes(tipcells, mesh, sgndDist_k)[0] < 0
+                has_vertexes_inside = np.any(answer_on_vertexes, axis=1)
+                if np.any(np.logical_and(has_vertexes_inside, np.logical_and(p1x == p2x, p1y == p2y))):
+                    raise SystemExit('FRONT RECONSTRUCTION ERROR: line definded by two coincident points')
+
+                # compute the distance from the vertexes to the front (see pointtolinedistance)
+                p0x = mesh.VertexCoor[mesh.Connectivity[tipcells], 0]
+                p0y = mesh.VertexCoor[mesh.Connectivity[tipcells], 1]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    localdistances = np.abs((p2y - p1y)[:, np.newaxis] * p0x - (p2x - p1x)[:, np.newaxis] * p0y
+                                            + (p2x * p1y)[:, np.newaxis] - (p2y * p1x)[:, np.newaxis]) \
+                                     / np.sqrt(np.power(-p1x + p2x, 2) + np.power(-p1y + p2y, 2))[:, np.newaxis]
+
+                # take the largest distance from the front among the vertexes inside the fracture (the first if equal)
+                vertexpositionwithinthecell = np.argmax(np.where(answer_on_vertexes, localdistances, -np.inf), axis=1)
+                rows = np.arange(tipcells.size)
+                vertexID = mesh.Connectivity[tipcells, vertexpositionwithinthecell] #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
+                distances = np.where(has_vertexes_inside, localdistances[rows, vertexpositionwithinthecell], 0.)
+                vertexpositionwithinthecell[~has_vertexes_inside] = 0
+                vertexID[~has_vertexes_inside] = 0
+
+                # compute the angle (see findangle)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    angles = np.where(p2y != p1y, np.arctan(np.abs(p2x - p1x) / np.abs(p2y - p1y)), np.pi / 2)
+                angles[~has_vertexes_inside] = 0.
+
+                # the intersection of the front with its perpendicular from the zero vertex <--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    t = ((mesh.VertexCoor[vertexID, 0] - p1x) * (p2x - p1x) + (mesh.VertexCoor[vertexID, 1] - p1y) * (p2y - p1y)) \
+                        / ((p2x - p1x) ** 2 + (p2y - p1y) ** 2)
+                xintersectionsfromzerovertex = (p1x + t * (p2x - p1x))[has_vertexes_inside].tolist()
+                yintersectionsfromzerovertex = (p1y + t * (p2y - p1y))[has_vertexes_inside].tolist()
 
-                        else:
-                            raise SystemExit(
-                                'FRONT RECONSTRUCTION ERROR: there are no nodes in the given tip cell that are inside the fracture')
+                if recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge:
+                    # all the tip cells with a zero vertex at once
+                    nodes = np.where(has_vertexes_inside)[0]
+                    p_zero_vertex = Point(0, mesh.VertexCoor[vertexID[nodes], 0], mesh.VertexCoor[vertexID[nodes], 1])
+                    p_center = Point(tipcells[nodes], mesh.CenterCoor[tipcells[nodes], 0], mesh.CenterCoor[tipcells[nodes], 1])
+                    p1 = Point(2, p1x[nodes], p1y[nodes])
+                    p2 = Point(3, p2x[nodes], p2y[nodes])
+                    sgndDist_k_new = recompute_LS_at_tip_cells(sgndDist_k_new, p_zero_vertex, p_center, p1, p2, mac_precision, area_of_a_cell, zero_level_set_value)
+
+                # the segments where none of the vertexes of the tip cell is inside the fracture
+                for nodeindexp1 in np.where(~has_vertexes_inside)[0]:
+                    nodeindex = nodeindexp1 - 1
+                    i = tipcells[nodeindexp1]
+                    if typeindex[nodeindex] == 1 and typeindex[nodeindexp1] == 1:
+                        edges_node1 = mesh.Connectivitynodesedges[edgeORvertexID[nodeindex]]
+                        edges_node2 = mesh.Connectivitynodesedges[edgeORvertexID[nodeindexp1]]
+                        commonedge = np.intersect1d(edges_node1, edges_node2)
+                        if commonedge.size > 0 :
+                            #            0
+                            #            |
+                            #         1__o__3    o is the node and the order in  connNodesEdges is [vertical_top, horizotal_left, vertical_bottom, horizotal_right]
+                            #            |
+                            #            2
+                            # the points are on the same edge an the front it is exactly there
+                            position_in_connectivity = np.where(mesh.Connectivitynodesedges[edgeORvertexID[nodeindex]] == commonedge)[0][0]
+                            if  position_in_connectivity in [1,3]:
+                                angles[nodeindexp1] = np.pi/2.
+                            else:
+                                angles[nodeindexp1] = 0.
+                            vertexID[nodeindexp1] = edgeORvertexID[nodeindexp1]
+                            vertexpositionwithinthecell[nodeindexp1] = np.where(mesh.Connectivity[i]==edgeORvertexID[nodeindexp1])[0][0]
+                            distances[nodeindexp1] = 0.
+                            xintersectionsfromzerovertex.append(mesh.VertexCoor[edgeORvertexID[nodeindexp1]][0])  # <--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
+                            yintersectionsfromzerovertex.append(mesh.VertexCoor[edgeORvertexID[nodeindexp1]][1])  # <--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
+                    else:
+                        raise SystemExit(
+                            'FRONT RECONSTRUCTION ERROR: there are no nodes in the given tip cell that are inside the fracture')
 
-                if recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge: del p_zero_vertex, p_center, p1, p2
                 listofTIPcellsONLY=np.asarray(listofTIPcells,dtype=int) # It contains only the tip cells, not the one fully traversed
                 vertexpositionwithinthecellTIPcellsONLY = np.asarray(vertexpositionwithinthecell,dtype=int)
                 # distancesTIPcellsONLY=np.copy(distances) #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
@@ -3034,13 +3341,13 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
 
                 global_list_of_TIPcells.extend(listofTIPcells)
                 global_list_of_TIPcellsONLY.extend(listofTIPcellsONLY.tolist()) #np
-                global_list_of_distances.extend(distances)
-                global_list_of_angles.extend(angles)
-                global_list_of_vertexpositionwithinthecell.extend(vertexpositionwithinthecell)
+                global_list_of_distances.extend(distances.tolist())
+                global_list_of_angles.extend(angles.tolist())
+                global_list_of_vertexpositionwithinthecell.extend(vertexpositionwithinthecell.tolist())
                 global_list_of_vertexpositionwithinthecellTIPcellsONLY.extend(vertexpositionwithinthecellTIPcellsONLY.tolist()) #np
                 list_of_xintersectionsfromzerovertex.append(xintersectionsfromzerovertex)
                 list_of_yintersectionsfromzerovertex.append(yintersectionsfromzerovertex)
-                list_of_vertexID.append(vertexID)
+                list_of_vertexID.append(vertexID.tolist())
                 fronts_dictionary['TIPcellsONLY_'+str(j)]=listofTIPcellsONLY
                 fronts_dictionary['TIPcellsANDfullytrav_' + str(j)] = listofTIPcells #HERE THE LIST OF TIP CELLS DOES NOT CONTAIN ALL THE FULLY TRAVERSED CELLS
                 fronts_dictionary['xint_' + str(j)] = xintersection
@@ -3115,72 +3422,40 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
                     # 5th arg: name of the cells where to compute the LS => we expect positive LS values here!
                     # 6th arg: name of the cells where to compute the LS => we expect negative LS values here!
 
-                fullyfractured_angle = []
-                fullyfractured_distance = []
-                fullyfractured_vertexID = []
-                fullyfractured_vertexpositionwithinthecell = []
-                # loop over the fullyfractured cells
-                for fullyfracturedcell in range(0, len(fullyfractured)):
-                    i = fullyfractured[fullyfracturedcell]
-                    """
-                    you are in cell i
-                    take the level set at the center of the neighbors cells 
-                      _   _   _   _   _   _
-                    | _ | _ | _ | _ | _ | _ |
-                    | _ | _ | _ | _ | _ | _ |
-                    | _ | e | a | f | _ | _ |
-                    | _ | _ 3 _ 2 _ | _ | _ |              
-                    | _ | d | i | b | _ | _ |
-                    | _ | _ 0 _ 1 _ | _ | _ |
-                    | _ | h | c | g | _ | _ |
-                    | _ | _ | _ | _ | _ | _ |
-    
-                                            0     1      2      3
-                    NeiElements[i]->[left, right, bottom, up]
-                    """
-
-                    a = mesh.NeiElements[i, top_elem]
-                    b = mesh.NeiElements[i, right_elem]
-                    c = mesh.NeiElements[i, bottom_elem]
-                    d = mesh.NeiElements[i, left_elem]
-                    e = mesh.NeiElements[d, top_elem]
-                    f = mesh.NeiElements[b, top_elem]
-                    g = mesh.NeiElements[b, bottom_elem]
-                    h = mesh.NeiElements[d, bottom_elem]
-
-                    hcid = sgndDist_k[[h, c, i, d]]
-                    cgbi = sgndDist_k[[c, g, b, i]]
-                    ibfa = sgndDist_k[[i, b, f, a]]
-                    diae = sgndDist_k[[d, i, a, e]]
-                    LS = [hcid, cgbi, ibfa, diae]
-                    hcid_mean = np.mean(np.asarray(sgndDist_k[[h, c, i, d]]))
-                    cgbi_mean = np.mean(np.asarray(sgndDist_k[[c, g, b, i]]))
-                    ibfa_mean = np.mean(np.asarray(sgndDist_k[[i, b, f, a]]))
-                    diae_mean = np.mean(np.asarray(sgndDist_k[[d, i, a, e]]))
-                    LS_means = [hcid_mean, cgbi_mean, ibfa_mean, diae_mean]
-                    localvertexpositionwithinthecell = np.argmin(np.asarray(LS_means))
-                    fullyfractured_vertexpositionwithinthecell.append(localvertexpositionwithinthecell)
-                    fullyfractured_distance.append(np.abs(LS_means[localvertexpositionwithinthecell]))
-                    fullyfractured_vertexID.append(mesh.Connectivity[i, localvertexpositionwithinthecell])
-                    chosenLS = LS[localvertexpositionwithinthecell]
-                    # compute the angle
-                    dLSdy = 0.5 * mesh.hy * (chosenLS[3] + chosenLS[2] - chosenLS[1] - chosenLS[0])
-                    dLSdx = 0.5 * mesh.hx * (chosenLS[2] + chosenLS[1] - chosenLS[3] - chosenLS[0])
-                    if dLSdy == 0. and dLSdx != 0.:
-                        fullyfractured_angle.append(0.)
-                    elif dLSdy != 0. and dLSdx == 0:
-                        fullyfractured_angle.append(np.pi)
-                    elif dLSdy != 0. and dLSdx != 0:
-                        fullyfractured_angle.append(np.arctan(np.abs(dLSdy) / np.abs(dLSdx)))
-                    else:
-                        raise SystemExit('FRONT RECONSTRUCTION ERROR: minimum of the function has been found, not expected')
+                """
+                for each fullyfractured cell i take the level set at the center of the neighbors cells 
+                  _   _   _   _   _   _
+                | _ | _ | _ | _ | _ | _ |
+                | _ | _ | _ | _ | _ | _ |
+                | _ | e | a | f | _ | _ |
+                | _ | _ 3 _ 2 _ | _ | _ |              
+                | _ | d | i | b | _ | _ |
+                | _ | _ 0 _ 1 _ | _ | _ |
+                | _ | h | c | g | _ | _ |
+                | _ | _ | _ | _ | _ | _ |
+                """
+                LS_means, LS = get_LS_on_vertexes(fullyfractured, mesh, sgndDist_k)
+                fullyfractured_vertexpositionwithinthecell = np.argmin(LS_means, axis=1)
+                rows = np.arange(fullyfractured.size)
+                fullyfractured_distance = np.abs(LS_means[rows, fullyfractured_vertexpositionwithinthecell])
+                fullyfractured_vertexID = mesh.Connectivity[fullyfractured, fullyfractured_vertexpositionwithinthecell]
+                chosenLS = LS[rows, fullyfractured_vertexpositionwithinthecell]
+                # compute the angle
+                dLSdy = 0.5 * mesh.hy * (chosenLS[:, 3] + chosenLS[:, 2] - chosenLS[:, 1] - chosenLS[:, 0])
+                dLSdx = 0.5 * mesh.hx * (chosenLS[:, 2] + chosenLS[:, 1] - chosenLS[:, 3] - chosenLS[:, 0])
+                if np.any(np.logical_and(dLSdy == 0., dLSdx == 0.)):
+                    raise SystemExit('FRONT RECONSTRUCTION ERROR: minimum of the function has been found, not expected')
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    fullyfractured_angle = np.select([dLSdy == 0., dLSdx == 0.],
+                                                     [0., np.pi],
+                                                     np.arctan(np.abs(dLSdy) / np.abs(dLSdx)))
 
                 # finally append these informations to what computed before
 
                 global_list_of_TIPcells.extend(np.ndarray.tolist(fullyfractured))
-                global_list_of_distances.extend(fullyfractured_distance)
-                global_list_of_angles.extend(fullyfractured_angle)
-                global_list_of_vertexpositionwithinthecell.extend(fullyfractured_vertexpositionwithinthecell)
+                global_list_of_distances.extend(fullyfractured_distance.tolist())
+                global_list_of_angles.extend(fullyfractured_angle.tolist())
+                global_list_of_vertexpositionwithinthecell.extend(fullyfractured_vertexpositionwithinthecell.tolist())
 
                 #vertexID = vertexID + fullyfractured_vertexID #<--------- IT CAN BE REMOVED, IT IS ONLY FOR LOCAL DEBUGGING
 
@@ -3190,8 +3465,7 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
             #todo: the updating of the cell status seems to be duplicated in the UpdateListsFromContinuousFrontRec(..)
             CellStatusNew = np.zeros(mesh.NumberOfElts, int)
             CellStatusNew[eltsChannel] = 1
-            for list in global_list_of_TIPcells:
-                CellStatusNew[list] = 2
+            CellStatusNew[np.asarray(global_list_of_TIPcells, dtype=int)] = 2
             CellStatusNew[Ribbon] = 3
 
             # In principle the following check should be activated only if the front is
@@ -3236,7 +3510,9 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
                                                                                                       eltsChannel,
                                                                                                       mesh,
                                                                                                       recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge,
-                                                                                                      lstTmStp_EltCrack0=lstTmStp_EltCrack0)
+                                                                                                      lstTmStp_EltCrack0=lstTmStp_EltCrack0,
+                                                                                                      previous_fronts_dictionary=fronts_dictionary if fronts_dictionary['traced_paths'] is not None
+                                                                                                      else previous_fronts_dictionary)
         else:
             #find the number of fronts
             number_of_fronts = len(list_of_xintersections_for_all_closed_paths)
@@ -3280,18 +3556,21 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
 
             # construct the informations about the cracks
             if fronts_dictionary['number_of_fronts'] == 2:
+                # the fully traversed cells and the cells inside the fracture are tested against both fronts at once
+                fullyfractured = np.asarray(fullyfractured, dtype=int)
+                indx = np.where(sgndDist_k<=0)
+                tested = np.concatenate((fullyfractured, indx[0]))
+                inside_fronts = points_inside_fronts(mesh.CenterCoor[tested, 0], mesh.CenterCoor[tested, 1],
+                                                     [np.column_stack((fronts_dictionary['xint_0'], fronts_dictionary['yint_0'])),
+                                                      np.column_stack((fronts_dictionary['xint_1'], fronts_dictionary['yint_1']))])
                 if len(fullyfractured)>0: #divide the fully traversed cells from left to right
-                    isfullyfractured0 =   ray_tracing_numpy(mesh.CenterCoor[fullyfractured, 0][np.newaxis],
-                                                            mesh.CenterCoor[fullyfractured, 1][np.newaxis],
-                                                            np.column_stack((fronts_dictionary['xint_0'], fronts_dictionary['yint_0'])))
+                    isfullyfractured0 = inside_fronts[:fullyfractured.size, 0]
                     fullyfractured0 = fullyfractured[np.nonzero(isfullyfractured0)]
                     fullyfractured1 = np.setdiff1d(fullyfractured,fullyfractured0)
                     fronts_dictionary['TIPcellsANDfullytrav_0'].extend(fullyfractured0)
                     fronts_dictionary['TIPcellsANDfullytrav_1'].extend(fullyfractured1)
 
-                indx = np.where(sgndDist_k<=0)
-                crack_cells=ray_tracing_numpy(mesh.CenterCoor[indx,0],
-                                              mesh.CenterCoor[indx,1], np.column_stack((fronts_dictionary['xint_0'],fronts_dictionary['yint_0'])))
+                crack_cells = inside_fronts[fullyfractured.size:, 0]
                 #####PLOT TO CHECK THE RESULT
                 # plot_ray_tracing_numpy_results(mesh,
                 #                                mesh.CenterCoor[indx[0],0],
@@ -3302,8 +3581,7 @@ def reconstruct_front_continuous(sgndDist_k, anularegion, Ribbon, eltsChannel, m
 
                 fronts_dictionary['crackcells_0']=np.unique(np.concatenate((indx[0][np.where(crack_cells==1)[0]],fronts_dictionary['TIPcellsONLY_0'])))
 
-                crack_cells=ray_tracing_numpy(mesh.CenterCoor[indx,0],
-                                              mesh.CenterCoor[indx,1], np.column_stack((fronts_dictionary['xint_1'],fronts_dictionary['yint_1'])))
+                crack_cells = inside_fronts[fullyfractured.size:, 1]
                 #####PLOT TO CHECK THE RESULT
                 # plot_ray_tracing_numpy_results(mesh,
                 #                                mesh.CenterCoor[indx[0],0],
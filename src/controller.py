@@ -15,6 +15,7 @@ import numpy as np
 import time
 from time import gmtime, strftime
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 
 # local imports
 from properties import LabelProperties, IterationProperties, PlotProperties
@@ -22,6 +23,9 @@ from properties import instrument_start, instrument_close
 from elasticity import load_isotropic_elasticity_matrix, load_TI_elasticity_matrix, mapping_old_indexes
 from elasticity import load_isotropic_elasticity_matrix_toepliz
 from mesh import CartesianMesh
+from output_writer import FractureWriter
+from fracture_store import FractureStore
+from postprocess_fracture import select_fractures
 from time_step_solution import attempt_time_step
 from visualization import plot_footprint_analytical, plot_analytical_solution,\
                           plot_injection_source, get_elements
@@ -67,6 +71,11 @@ class Controller:
         self.stagnant_TS = None     # time step if the front is stagnant. It is increased exponentialy to avoid uneccessary small steps.
         self.perfData = []
         self.lastSavedFile = 0
+        self.fileWriter = None      # the writer saving the fractures to disk in the background during the run.
+        self.fractureStore = None   # the store in which the fractures are saved and indexed.
+        self.resumed = False        # True if the controller is resumed from a checkpoint (see resume).
+        self.branchedFrom = None    # the folder of the simulation from which this one is branched and the number of
+                                        # its saved fractures preceding the branch (see branch).
         self.lastSavedTime = np.NINF
         self.lastPlotTime = np.NINF
         self.TmStpCount = 0
@@ -156,11 +165,11 @@ class Controller:
 
         # setting up tip asymptote
         if self.fluid_prop.rheology in ["Herschel-Bulkley", "HBF"]:
-            if self.sim_prop.get_tipAsymptote() not in ["HBF", "HBF_aprox", "HBF_num_quad"]:
+            if self.sim_prop.get_tipAsymptote() not in ["HBF", "HBF_aprox", "HBF_num_quad", "HBF_tab_quad"]:
                 warnings.warn("Fluid rhelogy and tip asymptote does not match. Setting tip asymptote to \'HBF\'")
                 self.sim_prop.set_tipAsymptote('HBF')
         if self.fluid_prop.rheology in ["power-law", "PLF"]:
-            if self.sim_prop.get_tipAsymptote() not in ["PLF", "PLF_aprox", "PLF_num_quad", "PLF_M"]:
+            if self.sim_prop.get_tipAsymptote() not in ["PLF", "PLF_aprox", "PLF_num_quad", "PLF_tab_quad", "PLF_M"]:
                 warnings.warn("Fluid rhelogy and tip asymptote does not match. Setting tip asymptote to \'PLF\'")
                 self.sim_prop.set_tipAsymptote('PLF')
         if self.fluid_prop.rheology == 'Newtonian':
@@ -176,6 +185,43 @@ class Controller:
         the documentation of the :py:class:`properties.SimulationProperties` class to get details of the parameters
         controlling the simulation run.
         """
+
+        if self.sim_prop.saveToDisk:
+            os.makedirs(self.sim_prop.get_outputFolder(), exist_ok=True)
+            self.fractureStore = FractureStore(self.sim_prop.get_outputFolder(),
+                                               save_format=self.sim_prop.saveFormat,
+                                               downcast=self.sim_prop.saveFloat32)
+            if self.branchedFrom is not None and self.fractureStore.parent is None:
+                # the history of the parent simulation is referenced instead of being copied
+                self.fractureStore.add_parent(*self.branchedFrom)
+            if self.resumed:
+                # the fractures saved after the checkpoint are saved again
+                self.fractureStore.truncate(self.lastSavedFile)
+
+        self.fileWriter = FractureWriter(self.sim_prop.saveQueueSize, store=self.fractureStore)
+        completed = False
+        try:
+            status = self.__run()
+            completed = True
+            return status
+        finally:
+            # the fractures waiting to be saved are written also if the simulation fails
+            try:
+                self.fileWriter.close()
+            except Exception:
+                if completed:
+                    raise
+                # the failure of the simulation is raised instead of the failure of the writer
+                logging.getLogger('PyFrac.controller.run').exception("Saving the fractures failed after the "
+                                                                     "failure of the simulation!")
+            finally:
+                self.fileWriter = None
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+    def __run(self):
+        """ The time stepping loop of the simulation (see run)."""
+
         log = logging.getLogger('PyFrac.controller.run')
         log_only_to_logfile = logging.getLogger('PyFrac_LF.controller.run')
 
@@ -189,7 +235,7 @@ class Controller:
             with open(self.sim_prop.get_outputFolder() + "properties", 'wb') as output:
                 dill.dump(prop, output, -1)
 
-        if self.sim_prop.plotFigure or self.sim_prop.saveToDisk:
+        if (self.sim_prop.plotFigure or self.sim_prop.saveToDisk) and not self.resumed:
             # save or plot fracture
             self.output(self.fracture)
             self.lastSavedTime = self.fracture.time
@@ -197,9 +243,11 @@ class Controller:
         if self.sim_prop.log2file:
             self.sim_prop.set_logging_to_file(self.logAddress)
 
-        # deactivate the block_toepliz_compression functions
+        # deactivate the block_toepliz_compression functions (already done if resumed from a checkpoint)
         # DO THIS CHECK BEFORE COMPUTING C!
-        if self.C is not None: # in the case C is provided
+        if self.resumed and self.C is not None:
+            pass
+        elif self.C is not None: # in the case C is provided
             self.sim_prop.useBlockToeplizCompression = False
         elif self.solid_prop.TI_elasticity: # in case of TI_elasticity
             self.sim_prop.useBlockToeplizCompression = False
@@ -273,10 +321,11 @@ class Controller:
                 # output
                 if self.sim_prop.plotFigure or self.sim_prop.saveToDisk:
                     if Fr_n_pls1.time > self.lastSavedTime:
-                        self.output(Fr_n_pls1)
+                        self.output(Fr_n_pls1, tmStp_perf)
 
-                # add the advanced fracture to the last five fractures list
-                self.fracture = copy.deepcopy(Fr_n_pls1)
+                # add the advanced fracture to the last five fractures list. The advanced fracture is a new object
+                # (the time step is attempted on a copy), so only the one kept in the list is copied.
+                self.fracture = Fr_n_pls1
                 self.fr_queue[self.successfulTimeSteps % 5] = copy.deepcopy(Fr_n_pls1)
 
                 if self.fracture.time > self.lastSuccessfulTS:
@@ -540,6 +589,7 @@ class Controller:
                 if self.TmStpReductions == self.sim_prop.maxReattemptsFracAdvMore2Cells:
                     log.warning("We can not reduce the time step more than that")
                     if self.sim_prop.collectPerfData:
+                        self.fileWriter.flush()
                         if self.sim_prop.saveToDisk:
                             file_address = self.sim_prop.get_outputFolder() + "perf_data.dat"
                         else:
@@ -568,6 +618,7 @@ class Controller:
                 if self.fr_queue[self.successfulTimeSteps % 5] is None or \
                    self.chkPntReattmpts == 4:
                     if self.sim_prop.collectPerfData:
+                        self.fileWriter.flush()
                         if self.sim_prop.saveToDisk:
                             file_address = self.sim_prop.get_outputFolder() + "perf_data.dat"
                         else:
@@ -598,6 +649,9 @@ class Controller:
 
             self.TmStpCount += 1
 
+            if self.sim_prop.checkpointTSJump is not None and self.TmStpCount % self.sim_prop.checkpointTSJump == 0:
+                self.save_checkpoint()
+
         print("\n")
         log.info("Final time = " + repr(self.fracture.time))
         log.info("-----Simulation finished------")
@@ -609,6 +663,7 @@ class Controller:
         plt.close('all')
 
         if self.sim_prop.collectPerfData:
+            self.fileWriter.flush()
             file_address = self.sim_prop.get_outputFolder() + "perf_data.dat"
             os.makedirs(os.path.dirname(file_address), exist_ok=True)
             with open(file_address, 'wb') as output:
@@ -616,6 +671,220 @@ class Controller:
         return True
 
 
+#-----------------------------------------------------------------------------------------------------------------------
+
+    def save_checkpoint(self):
+        """
+        This function saves the state of the controller in the output folder (in the file named checkpoint), so that
+        the simulation can be resumed from it (see resume). The fractures waiting to be saved are written first. The
+        elasticity matrix is saved in a separate file, once after each remeshing, and is referenced in the checkpoint.
+        The performance data, growing with the number of time steps, is written in the perf_data.dat file instead of
+        the checkpoint. The queue of the fractures from the last five time steps is kept in the checkpoint, as the
+        simulation goes back to them if a time step fails after resuming.
+        """
+        log = logging.getLogger('PyFrac.controller.save_checkpoint')
+
+        if self.fileWriter is not None:
+            self.fileWriter.flush()
+
+        folder = self.logAddress
+        os.makedirs(folder, exist_ok=True)
+
+        state = dict(self.__dict__)
+        for key in ['fileWriter', 'fractureStore', 'Figures', 'perfData']:
+            state[key] = None
+
+        if self.sim_prop.collectPerfData:
+            with open(folder + 'perf_data.dat.tmp', 'wb') as output:
+                dill.dump(self.perfData, output, -1)
+            os.replace(folder + 'perf_data.dat.tmp', folder + 'perf_data.dat')
+
+        state['C_file'] = None
+        if isinstance(self.C, np.ndarray):
+            # the elasticity matrix only changes with remeshing
+            C_file = 'elasticity_matrix_' + repr(self.remeshings) + '.npy'
+            if not os.path.isfile(folder + C_file):
+                with open(folder + C_file + '.tmp', 'wb') as output:
+                    np.save(output, self.C)
+                os.replace(folder + C_file + '.tmp', folder + C_file)
+            state['C'] = None
+            state['C_file'] = C_file
+
+        with open(folder + 'checkpoint.tmp', 'wb') as output:
+            dill.dump(state, output, -1)
+        os.replace(folder + 'checkpoint.tmp', folder + 'checkpoint')
+
+        # the elasticity matrices before the last remeshing are not referenced anymore
+        for i in range(self.remeshings):
+            if os.path.isfile(folder + 'elasticity_matrix_' + repr(i) + '.npy'):
+                os.remove(folder + 'elasticity_matrix_' + repr(i) + '.npy')
+
+        log.debug("Checkpoint saved at " + repr(self.fracture.time))
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def resume(cls, path, share_elasticity=False):
+        """
+        This function loads a controller from a checkpoint saved during a simulation (see save_checkpoint). The
+        simulation continues from the checkpoint, exactly as it would have without interruption, when the run
+        function of the returned controller is called. The fractures saved after the checkpoint are saved again.
+
+        Arguments:
+            path (string):              -- the checkpoint file, or the output folder of the simulation containing it.
+            share_elasticity (bool):    -- if True, the elasticity matrix is memory mapped from its file (copy on
+                                           write), so that the processes resumed from the same checkpoint share it.
+
+        Returns:
+            Controller:         -- the controller with the state at the checkpoint.
+        """
+        log = logging.getLogger('PyFrac.controller.resume')
+
+        if os.path.isdir(path):
+            path = os.path.join(path, 'checkpoint')
+        with open(path, 'rb') as inp:
+            state = dill.load(inp)
+
+        C_file = state.pop('C_file')
+        if C_file is not None:
+            state['C'] = np.load(os.path.join(os.path.dirname(path), C_file),
+                                 mmap_mode='c' if share_elasticity else None)
+
+        controller = cls.__new__(cls)
+        controller.__dict__.update(state)
+        controller.Figures = [None for i in range(len(controller.sim_prop.plotVar))]
+
+        # the performance data is continued from the one written with the checkpoint
+        controller.perfData = []
+        if controller.sim_prop.collectPerfData:
+            perf_file = os.path.join(os.path.dirname(path), 'perf_data.dat')
+            if os.path.isfile(perf_file):
+                with open(perf_file, 'rb') as inp:
+                    controller.perfData = dill.load(inp)
+            else:
+                log.warning("The performance data of the simulation before the checkpoint is not found!")
+        controller.resumed = True
+
+        # the simulation is continued in the folder of the checkpoint (it might have been moved)
+        folder = os.path.dirname(os.path.abspath(path))
+        if controller.sim_prop.saveToDisk and \
+                os.path.abspath(controller.sim_prop.get_outputFolder()) != folder:
+            if os.path.basename(folder) == controller.sim_prop.get_simulation_name():
+                controller.sim_prop.set_outputFolder(os.path.dirname(folder))
+                controller.logAddress = copy.copy(controller.sim_prop.get_outputFolder())
+            else:
+                log.warning("The checkpoint is not in the folder of the simulation. The simulation is continued in "
+                            + controller.sim_prop.get_outputFolder())
+        log.info("Resuming the simulation at " + repr(controller.fracture.time))
+
+        return controller
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+    @classmethod
+    def branch(cls, path, time=None, name=None, output_folder=None, Solid_prop=None, Fluid_prop=None,
+               Injection_prop=None, Sim_prop=None, share_elasticity=False):
+        """
+        This function returns a controller starting a new simulation (a branch) from the state of a saved simulation,
+        with some of its properties modified. The branch is saved in its own folder, which references the fractures
+        of the parent simulation preceding the branch instead of copying them, so that they are loaded along with the
+        fractures of the branch (see :py:class:`fracture_store.FractureStore`).
+
+        If the time is not given, the branch starts from the checkpoint of the parent (see save_checkpoint) and, if
+        no property is modified, continues exactly as the parent. Otherwise, the branch starts from the fracture saved
+        at the closest time after the given time, without the state of the time stepping of the parent. The given
+        properties replace the properties of the parent. The properties depending on the mesh should be given on the
+        mesh of the fracture from which the branch starts (that can be loaded with e.g. load_fractures).
+
+        Arguments:
+            path (string):                          -- the output folder of the parent simulation.
+            time (float):                           -- the time of the saved fracture from which the branch starts.
+                                                       If not given, the branch starts from the checkpoint.
+            name (string):                          -- the name of the branch simulation. If not given, the name of
+                                                       the given simulation properties is used.
+            output_folder (string):                 -- the folder in which the branch is saved. By default, the folder
+                                                       containing the parent simulation.
+            Solid_prop (MaterialProperties):        -- the material properties of the branch.
+            Fluid_prop (FluidProperties):           -- the fluid properties of the branch.
+            Injection_prop (InjectionProperties):   -- the injection properties of the branch.
+            Sim_prop (SimulationProperties):        -- the simulation properties of the branch.
+            share_elasticity (bool):                -- if True, the elasticity matrix saved with the checkpoint is
+                                                       shared by the processes branched from it (see resume).
+
+        Returns:
+            Controller:                             -- the controller of the branch.
+        """
+        log = logging.getLogger('PyFrac.controller.branch')
+
+        parent_folder = os.path.abspath(path)
+        if time is None:
+            parent = cls.resume(parent_folder, share_elasticity=share_elasticity)
+            Fr = parent.fracture
+            properties = (parent.solid_prop, parent.fluid_prop, parent.injection_prop, parent.sim_prop)
+            parent_steps = parent.lastSavedFile
+            C = parent.C
+        else:
+            if FractureStore.exists(parent_folder):
+                store = FractureStore(parent_folder, persistent=False)
+            else:
+                store = FractureStore.index_pickled_fractures(parent_folder, os.path.basename(parent_folder))
+            selected = select_fractures(store.get_times(), time_srs=np.array([time]))
+            if len(selected) == 0:
+                raise ValueError("No fracture is saved after the given time!")
+            parent_steps = selected[0]
+            Fr = store.load(parent_steps)
+            with open(os.path.join(parent_folder, 'properties'), 'rb') as inp:
+                properties = dill.load(inp)
+            C = None
+
+        Solid_prop, Fluid_prop, Injection_prop, Sim_prop = [given if given is not None else default
+                                                            for given, default in zip((Solid_prop, Fluid_prop,
+                                                                                       Injection_prop, Sim_prop),
+                                                                                      properties)]
+        if Solid_prop.Kprime.size != Fr.mesh.NumberOfElts or np.max(Injection_prop.sourceElem) >= Fr.mesh.NumberOfElts:
+            raise ValueError("The properties of the branch are not given on the mesh of the fracture from which it "
+                             "starts!")
+
+        if name is not None:
+            Sim_prop.set_simulation_name(name)
+        if output_folder is None:
+            output_folder = os.path.dirname(parent_folder)
+        Sim_prop.set_outputFolder(output_folder)
+        if os.path.abspath(Sim_prop.get_outputFolder()) == parent_folder:
+            raise ValueError("The branch should be saved in another folder than the parent simulation!")
+
+        if C is not None:
+            if np.array_equal(Solid_prop.Eprime, properties[0].Eprime) and \
+                    Solid_prop.TI_elasticity == properties[0].TI_elasticity and \
+                    Sim_prop.symmetric == properties[3].symmetric:
+                # the type of the elasticity matrix is given by the parent
+                Sim_prop.useBlockToeplizCompression = properties[3].useBlockToeplizCompression
+            else:
+                # the elasticity matrix of the parent is not valid for the branch and is computed again
+                C = None
+
+        controller = cls(Fr, Solid_prop, Fluid_prop, Injection_prop, Sim_prop, Load_prop=None, C=C)
+        controller.branchedFrom = (parent_folder, parent_steps)
+
+        if time is None:
+            # the state of the time stepping is continued from the checkpoint
+            carried = ['fr_queue', 'stepsFromChckPnt', 'stagnant_TS', 'lastSavedFile', 'lastSavedTime',
+                       'lastPlotTime', 'TmStpCount', 'chkPntReattmpts', 'TmStpReductions', 'delta_w', 'lstTmStp',
+                       'PstvInjJmp', 'fullyClosed', 'lastSuccessfulTS', 'maxTmStp', 'remeshings',
+                       'successfulTimeSteps', 'failedTimeSteps', 'load_prop']
+            if Sim_prop is properties[3]:
+                carried += ['tmStpPrefactor_copy', 'solveDetlaP_cp', 'frontAdvancing']
+            for key in carried:
+                setattr(controller, key, getattr(parent, key))
+            controller.resumed = True
+        else:
+            # the fracture from which the branch starts is saved again as the first fracture of the branch
+            controller.lastSavedFile = parent_steps
+
+        log.info("Branching the simulation at " + repr(Fr.time))
+
+        return controller
+
 #-----------------------------------------------------------------------------------------------------------------------
 
     def advance_time_step(self, Frac, C, timeStep, perfNode=None):
@@ -680,7 +949,7 @@ class Controller:
 
 #-----------------------------------------------------------------------------------------------------------------------
 
-    def output(self, Fr_advanced):
+    def output(self, Fr_advanced, perfNode=None):
         """
         This function plot the fracture footprint and/or save file to disk according to the parameters set in the
         simulation properties. See documentation of SimulationProperties class to get the details of parameters which
@@ -688,6 +957,8 @@ class Controller:
 
         Arguments:
             Fr_advanced (Fracture object):       -- fracture after time step is advanced.
+            perfNode (IterationProperties):      -- the time step performance node to which the data on saving the
+                                                    fracture is added.
 
         """
         log = logging.getLogger('Pyfrac.output')
@@ -718,13 +989,24 @@ class Controller:
 
             if save_TP_exceeded or in_req_TSrs or save_TS_exceeded:
 
-                # save fracture to disk
+                # save fracture to disk (in the background during the run)
                 log.info("Saving solution at " + repr(Fr_advanced.time) + "...")
-                Fr_advanced.SaveFracture(self.sim_prop.get_outputFolder() +
-                                         self.sim_prop.get_simulation_name() +
-                                         '_file_' + repr(self.lastSavedFile))
+                filename = self.sim_prop.get_outputFolder() + self.sim_prop.get_simulation_name() + '_file_' + \
+                           repr(self.lastSavedFile)
+                if self.fileWriter is None:
+                    if self.fractureStore is None:
+                        Fr_advanced.SaveFracture(filename)
+                    else:
+                        self.fractureStore.save(Fr_advanced, filename)
+                    log.info("Done! ")
+                else:
+                    perfNode_save = instrument_start('save to disk', perfNode)
+                    self.fileWriter.save(Fr_advanced, filename, perfNode_save)
+                    if perfNode_save is not None:
+                        perfNode_save.time = Fr_advanced.time
+                        perfNode_save.NumbOfElts = len(Fr_advanced.EltCrack)
+                        perfNode.saveToDisk_data.append(perfNode_save)
                 self.lastSavedFile += 1
-                log.info("Done! ")
 
                 self.lastSavedTime = Fr_advanced.time
 
@@ -1120,4 +1402,49 @@ class Controller:
                 ) / ((a + x) * (b - y)) + np.sqrt(np.square(a - x) + np.square(b + y)) / ((a - x) * (b + y)) + np.sqrt(
                     np.square(a + x) + np.square(b + y)) / ((a + x) * (b + y)))
 
-            self.C[np.ix_(new_indexes, add_el)] = np.transpose(self.C[np.ix_(add_el, new_indexes)])
\ No newline at end of file
+            self.C[np.ix_(new_indexes, add_el)] = np.transpose(self.C[np.ix_(add_el, new_indexes)])
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def run_branch(path, branch):
+    """
+    This function runs a branch of the given simulation (see Controller.branch).
+
+    Arguments:
+        path (string):      -- the output folder of the parent simulation.
+        branch (bytes):     -- the keyword arguments of Controller.branch giving the branch, pickled with dill (to
+                               be passed to the worker processes along with the properties it contains).
+
+    Returns:
+        string:             -- the output folder of the branch.
+    """
+
+    controller = Controller.branch(path, **dill.loads(branch))
+    controller.run()
+
+    return controller.sim_prop.get_outputFolder()
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def run_branches(path, branches, n_workers=1):
+    """
+    This function runs several branches of the given simulation (see Controller.branch), optionally in parallel
+    processes. The branches started from the checkpoint of the simulation share its elasticity matrix.
+
+    Arguments:
+        path (string):      -- the output folder of the parent simulation.
+        branches (list):    -- the branches to be run, each given as a dictionary with the keyword arguments of
+                               Controller.branch (e.g. the name and the modified properties of the branch).
+        n_workers (int):    -- the number of processes in which the branches are run.
+
+    Returns:
+        list:               -- the output folders of the branches.
+    """
+
+    branches = [dill.dumps(dict({'share_elasticity': True}, **branch)) for branch in branches]
+    if n_workers <= 1 or len(branches) <= 1:
+        return [run_branch(path, branch) for branch in branches]
+
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(branches))) as executor:
+        return list(executor.map(run_branch, [path] * len(branches), branches))
@@ -17,6 +17,8 @@ toleranceVStagnant = 1e-6               # tolerance on the velocity to decide if
 max_front_itrs = 25                     # maximum iterations for the fracture front.
 max_solver_itrs = 140                   # maximum iterations for the elastohydrodynamic solver.
 max_proj_Itrs = 10                      # maximum projection iterations.
+proj_Anderson_depth = 3                 # previous projection iterations used in the Anderson acceleration (0 for plain relaxation).
+proj_relaxation = 0.7                   # relaxation factor of the projection iterations.
 
 # time and time stepping
 tmStp_prefactor = 0.8                   # time step prefactor(pf) to determine the time step(dt = pf*min(dx, dy)/max(v).
@@ -49,6 +51,10 @@ output_folder = None                    # the address to save the output data.
 save_to_disk = True                     # if True, fracture will be saved after the given time period.
 save_time_period = None                 # the time period after which the output is saved to disk.
 save_TS_jump = 1                        # the number of time steps after which the output is saved to disk.
+save_format = 'pickle'                  # the format of the saved fractures ('pickle' for a file per fracture, 'columnar' for a compact store).
+save_float32 = False                    # if True, the fields are saved in single precision (only with the 'columnar' format).
+save_queue_size = 4                     # the number of fractures that can wait to be saved in the background (0 to save synchronously).
+checkpoint_TS_jump = None               # the number of time steps after which the state of the simulation is saved to resume it (None for no checkpoints).
 save_chi = False                        # Question if we save the tip asymptotics leak-off parameter (Tip leak-off parameter)
 save_regime = True                      # if True, the the regime of the ribbon cells will also be saved.
 save_ReyNumb = False                    # if True, the Reynold's number at each edge will be saved.
@@ -78,6 +84,8 @@ solve_sparse = None                     # if True, the fluid conductivity matrix
 
 # miscellaneous
 tip_asymptote = 'U1'                    # the tip_asymptote to be used (see class documentation for details).
+tabulated_tip_inversion = False         # if True, the tip asymptote ('U', 'U1', 'MK', 'MDR' or 'M_MDR') is inverted with precomputed tables.
+tip_tables_folder = None                # the folder in which the tip asymptote tables are cached (None to build them in each run).
 gravity = False                         # if True, the effect of gravity will be taken into account.
 TI_Kernel_exec_path = '../TI_Kernel/build' # the folder containing the executable to calculate TI elasticity matrix.
 
@@ -92,6 +100,7 @@ proj_method = 'LS_continousfront'       # set the method to evaluate projection
 explicit_projection = False             # if True, direction from last time step will be used to evaluate TI parameters.
 front_advancing = 'predictor-corrector' # possible options include 'implicit', 'explicit' and 'predictor-corrector'.
 param_from_tip = False                  # set the space dependant tip parameters to be taken from ribbon cell.
+level_set_band_width = None             # width (in cells) of the band around the front in which the level set is evaluated (None for whole domain).
 limit_Adancement_To_2_cells = False     # limit the timestep in such a way that the front will advance less than 2 cells in a row
 max_reattemps_FracAdvMore2Cells = 50    # number of time reduction that are made if the fracture is advancing more than two cells (e.g. because of an heterogeneity)
 
@@ -9,6 +9,7 @@ All rights reserved. See the LICENSE.TXT file for more details.
 
 import numpy as np
 import logging
+import hashlib
 import json
 import subprocess
 import pickle
@@ -339,6 +340,38 @@ def load_elasticity_matrix(Mesh, EPrime):
 
 # -----------------------------------------------------------------------------------------------------------------------
 
+def load_cached_elasticity_matrix(Mesh, Ep, folder):
+    """
+    The function loads the elasticity matrix of the given mesh and plain strain modulus from the given cache folder.
+    If it is not found, the matrix is computed and saved in the folder, in a file named after the mesh and the
+    modulus. The matrix is memory mapped (copy on write), so that the processes using the same matrix share it.
+
+    Arguments:
+        Mesh (CartesianMesh):           -- a mesh object describing the domain.
+        Ep (float):                     -- plain strain modulus.
+        folder (string):                -- the folder in which the elasticity matrices are cached.
+
+    Returns:
+         C (ndarray):                   -- the elasticity matrix.
+    """
+    log = logging.getLogger('PyFrac.load_cached_elasticity_matrix')
+
+    key = repr((Mesh.nx, Mesh.ny, [float(limit) for limit in np.ravel(Mesh.domainLimits)], float(Ep)))
+    file_address = os.path.join(folder, 'elasticity_matrix_' + hashlib.sha1(key.encode()).hexdigest()[:16] + '.npy')
+
+    if not os.path.isfile(file_address):
+        log.info('Making the elasticity matrix to be cached...')
+        C = load_isotropic_elasticity_matrix(Mesh, Ep)
+        os.makedirs(folder, exist_ok=True)
+        # the matrix is written to a temporary file first, as it can be read by other processes
+        with open(file_address + '.' + repr(os.getpid()) + '.tmp', 'wb') as output:
+            np.save(output, C)
+        os.replace(file_address + '.' + repr(os.getpid()) + '.tmp', file_address)
+
+    return np.load(file_address, mmap_mode='c')
+
+# -----------------------------------------------------------------------------------------------------------------------
+
 def mapping_old_indexes(new_mesh, mesh, direction = None):
     """
     Function to get the mapping of the indexes
@@ -13,6 +13,7 @@ import matplotlib.path as mpath
 import matplotlib.patches as mpatches
 import mpl_toolkits.mplot3d.art3d as art3d
 import matplotlib.pyplot as plt
+import copy
 import dill
 import numpy as np
 import math
@@ -460,6 +461,37 @@ class Fracture:
                                         plot_cell_center=plot_cell_center,
                                         orientation=orientation)
 
+# ------------------------------------------------------------------------------------------------------------------
+
+    def __deepcopy__(self, memo):
+        """
+        The deep copy of the fracture, taken to keep the state of the last time steps and before each iteration on the
+        front position. The mesh is never modified during the simulation (a new mesh is created when re-meshing), so it
+        is shared with the copy instead of being duplicated. All the other attributes are copied.
+        """
+
+        memo[id(self.mesh)] = self.mesh
+        Fr_copy = self.__class__.__new__(self.__class__)
+        memo[id(self)] = Fr_copy
+        Fr_copy.__dict__.update(copy.deepcopy(self.__dict__, memo))
+
+        return Fr_copy
+
+# ------------------------------------------------------------------------------------------------------------------
+
+    def __getstate__(self):
+        """
+        The state of the fracture to be pickled. The paths traced at the last front reconstruction, kept in the fronts
+        dictionary to be reused at the next reconstruction (see
+        :py:func:`continuous_front_reconstruction.retrace_previous_paths`), are not saved.
+        """
+
+        state = self.__dict__.copy()
+        if isinstance(state.get('fronts_dictionary'), dict) and 'traced_paths' in state['fronts_dictionary']:
+            state['fronts_dictionary'] = dict(state['fronts_dictionary'], traced_paths=None)
+
+        return state
+
 # ------------------------------------------------------------------------------------------------------------------
 
     def SaveFracture(self, filename):
@@ -587,7 +619,8 @@ class Fracture:
         if self.sgndDist_last is None:
             self.sgndDist_last = self.sgndDist
 
-        # interpolate the level set by first advancing and then interpolating
+        # interpolate the level set by first advancing and then interpolating. The level set is re-initialized in the
+        # whole channel (no narrow band), as it may have been evaluated only around the front during propagation
         SolveFMM(self.sgndDist,
                  self.EltRibbon,
                  self.EltChannel,
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+# imports
+import hashlib
+import io
+import json
+import logging
+import os
+import uuid
+import dill
+import numpy as np
+
+
+class FractureStore:
+    """
+    This class keeps the fractures saved during a simulation along with an index of them, from which the fractures can
+    be selected and loaded without reading the other ones. The index is kept in a json lines file in the simulation
+    folder, with the name, the file, the time, the mesh id and the size in bytes of each of the saved fractures. The
+    meshes are saved once in separate files. The fractures are either pickled with dill, each to its own file, or saved
+    in a compact columnar form in numpy .npz files. In the latter, the arrays evaluated on the whole mesh are only saved
+    on the crack cells, if they have the same value in all the other cells, and can optionally be downcast to single
+    precision.
+
+    Arguments:
+        folder (string):        -- the folder of the simulation.
+        save_format (string):   -- the format in which the fractures are saved ('pickle' or 'columnar').
+        downcast (bool):        -- if True, the double precision arrays evaluated on the whole mesh (e.g. the width,
+                                   the pressure and the level set) are saved in single precision. Only used with the
+                                   'columnar' format.
+        persistent (bool):      -- if False, the index and the meshes are not written to disk and are only kept in
+                                   memory (e.g. to index the fractures in a read-only folder).
+
+    Attributes:
+        folder (string):        -- the folder of the simulation.
+        saveFormat (string):    -- the format in which the fractures are saved.
+        downcast (bool):        -- if True, the double precision arrays evaluated on the mesh are saved in single
+                                   precision.
+        persistent (bool):      -- if True, the index and the meshes are written to disk.
+        steps (list):           -- the index entries of the saved fractures (dictionaries with the name, the file,
+                                   the time, the mesh id and the size in bytes of each saved fracture).
+        meshFiles (dict):       -- the files in which the meshes are saved, with the mesh ids as keys.
+        meshes (dict):          -- the meshes saved or loaded, with the mesh ids as keys.
+        parent (dict):          -- the index entry referencing the simulation from which the simulation is branched
+                                   (with the folder of the parent relative to the folder of the store and the number
+                                   of its fractures preceding the branch), or None.
+    """
+
+    indexFile = 'fracture_store.jsonl'
+
+    def __init__(self, folder, save_format='columnar', downcast=False, persistent=True):
+
+        if save_format not in ['pickle', 'columnar']:
+            raise ValueError("The format to save the fractures is not recognised!")
+
+        if folder[-1] != '/':
+            folder = folder + '/'
+        self.folder = folder
+        self.saveFormat = save_format
+        self.downcast = downcast
+        self.persistent = persistent
+        self.steps = []
+        self.meshFiles = {}
+        self.meshes = {}
+        self.parent = None
+
+        if os.path.isfile(folder + self.indexFile):
+            with open(folder + self.indexFile, 'r') as index:
+                for line in index:
+                    entry = json.loads(line)
+                    if 'parent' in entry:
+                        self.read_parent(entry)
+                    elif 'mesh_file' in entry:
+                        self.meshFiles[entry['mesh']] = entry['mesh_file']
+                    else:
+                        self.steps.append(entry)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def exists(folder):
+        """ This function returns True if the fractures in the given simulation folder are indexed."""
+
+        return os.path.isfile(os.path.join(folder, FractureStore.indexFile))
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    @staticmethod
+    def index_pickled_fractures(folder, sim_name):
+        """
+        This function indexes the fractures pickled in the given simulation folder without an index (e.g. saved with an
+        earlier version). Each of the fractures is loaded once to get its time and mesh. The index is written in the
+        folder if it is writable, so that the fractures are not loaded again the next time.
+
+        Arguments:
+            folder (string):        -- the folder of the simulation.
+            sim_name (string):      -- the name of the simulation (with the time stamp).
+
+        Returns:
+            FractureStore:          -- the store with the pickled fractures indexed.
+        """
+        from utility import ReadFracture
+        log = logging.getLogger('PyFrac.FractureStore.index_pickled_fractures')
+
+        store = FractureStore(folder, save_format='pickle', persistent=os.access(folder, os.W_OK))
+        log.info('Indexing the saved fractures...')
+        fileNo = 0
+        while os.path.isfile(store.folder + sim_name + '_file_' + repr(fileNo)):
+            name = sim_name + '_file_' + repr(fileNo)
+            store.add_to_index(ReadFracture(store.folder + name), name, name)
+            fileNo += 1
+
+        return store
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def save(self, fracture, filename):
+        """
+        This function saves the given fracture in the store. The name of the given file (without the folder) is used
+        as the name of the fracture in the store.
+
+        Arguments:
+            fracture (Fracture):    -- the fracture to be saved.
+            filename (string):      -- the file name under which the fracture is saved.
+        """
+
+        name = os.path.basename(filename)
+        if self.saveFormat == 'columnar':
+            file = name + '.npz'
+            arrays = encode_fracture(fracture, self.downcast)
+            with open(self.folder + file, 'wb') as output:
+                np.savez(output, **arrays)
+        else:
+            file = name
+            fracture.SaveFracture(self.folder + file)
+
+        # the fracture is added to the index only after it is completely written
+        self.add_to_index(fracture, name, file)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def add_to_index(self, fracture, name, file):
+        """ This function adds the given fracture, saved in the given file, to the index."""
+
+        entry = {'name': name,
+                 'file': file,
+                 'time': float(fracture.time),
+                 'mesh': self.get_mesh_id(fracture.mesh),
+                 'size': os.path.getsize(self.folder + file),
+                 'id': uuid.uuid4().hex[:16]}
+        self.append_to_index(entry)
+        self.steps.append(entry)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def get_mesh_id(self, mesh):
+        """ This function returns the id of the given mesh in the store. The mesh is saved if it is not found."""
+
+        for mesh_id, stored_mesh in self.meshes.items():
+            if stored_mesh is mesh:
+                return mesh_id
+
+        # meshes are identical if they have the same limits and number of cells
+        mesh_ids = set(self.meshFiles) | set(self.meshes)
+        for mesh_id in mesh_ids:
+            stored_mesh = self.get_mesh(mesh_id)
+            if stored_mesh.nx == mesh.nx and stored_mesh.ny == mesh.ny and \
+                    np.array_equal(stored_mesh.domainLimits, mesh.domainLimits) and \
+                    hasattr(stored_mesh, 'symmetricElts') == hasattr(mesh, 'symmetricElts'):
+                self.meshes[mesh_id] = mesh
+                return mesh_id
+
+        mesh_id = len(mesh_ids)
+        if self.persistent:
+            mesh_file = 'mesh_' + repr(mesh_id)
+            with open(self.folder + mesh_file, 'wb') as output:
+                dill.dump(mesh, output, -1)
+            self.append_to_index({'mesh': mesh_id, 'mesh_file': mesh_file})
+            self.meshFiles[mesh_id] = mesh_file
+        self.meshes[mesh_id] = mesh
+
+        return mesh_id
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def get_mesh(self, mesh_id):
+        """ This function returns the mesh with the given id. Each of the meshes is loaded only once."""
+
+        if mesh_id not in self.meshes:
+            with open(self.folder + self.meshFiles[mesh_id], 'rb') as inp:
+                self.meshes[mesh_id] = dill.load(inp)
+
+        return self.meshes[mesh_id]
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def append_to_index(self, entry):
+
+        if self.persistent:
+            with open(self.folder + self.indexFile, 'a') as index:
+                index.write(json.dumps(entry) + '\n')
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def add_parent(self, folder, n_steps):
+        """
+        This function references the fractures saved in the given folder, up to the given number of fractures, as the
+        first fractures of the store (e.g. the history of the simulation from which a simulation is branched). The
+        fractures of the parent are not copied; they are loaded from the folder of the parent.
+
+        Arguments:
+            folder (string):        -- the folder of the parent simulation. Its fractures should be indexed.
+            n_steps (int):          -- the number of fractures of the parent to be referenced.
+        """
+
+        if len(self.steps) > 0 or self.parent is not None:
+            raise ValueError("The parent should be added to an empty store!")
+        if not FractureStore.exists(folder):
+            raise ValueError("The fractures of the parent simulation are not indexed!")
+
+        entry = {'parent': os.path.relpath(folder, self.folder), 'steps': n_steps}
+        self.read_parent(entry)
+        self.append_to_index(entry)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def read_parent(self, entry):
+        """ This function adds the fractures and the meshes of the parent referenced by the given index entry."""
+
+        parent_folder = os.path.normpath(os.path.join(self.folder, entry['parent']))
+        parent = FractureStore(parent_folder, persistent=False)
+        if len(parent.steps) < entry['steps']:
+            raise ValueError("The parent simulation has less fractures than referenced!")
+
+        # the files of the parent are given relative to the folder of the store
+        for mesh_id, mesh_file in parent.meshFiles.items():
+            self.meshFiles[mesh_id] = os.path.relpath(parent.folder + mesh_file, self.folder)
+        for step in parent.steps[:entry['steps']]:
+            step = dict(step)
+            step['file'] = os.path.relpath(parent.folder + step['file'], self.folder)
+            self.steps.append(step)
+        self.parent = entry
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def truncate(self, n_steps):
+        """
+        This function removes the fractures after the given number of fractures from the index (e.g. the fractures
+        saved after the checkpoint from which a simulation is resumed). Their files are overwritten when the
+        fractures are saved again.
+        """
+
+        if len(self.steps) <= n_steps:
+            return
+
+        self.steps = self.steps[:n_steps]
+        if self.persistent:
+            n_parent = 0
+            with open(self.folder + self.indexFile + '.tmp', 'w') as index:
+                if self.parent is not None:
+                    n_parent = self.parent['steps'] = min(self.parent['steps'], n_steps)
+                    index.write(json.dumps(self.parent) + '\n')
+                for mesh_id, mesh_file in self.meshFiles.items():
+                    # the meshes of the parent are in the folder of the parent
+                    if os.path.dirname(mesh_file) == '':
+                        index.write(json.dumps({'mesh': mesh_id, 'mesh_file': mesh_file}) + '\n')
+                for entry in self.steps[n_parent:]:
+                    index.write(json.dumps(entry) + '\n')
+            os.replace(self.folder + self.indexFile + '.tmp', self.folder + self.indexFile)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def get_signature(self):
+        """
+        This function returns a signature of the saved fractures, changing if any of them is saved again (e.g. after
+        a resumed simulation or a new simulation in the same folder) or if the fractures referenced from a parent
+        change. It is used to check if data extracted from the fractures is up to date.
+        """
+
+        signature = hashlib.sha1()
+        for entry in self.steps:
+            signature.update(json.dumps(entry, sort_keys=True).encode())
+            if os.path.isfile(self.folder + entry['file']):
+                signature.update(repr(os.stat(self.folder + entry['file']).st_mtime_ns).encode())
+
+        return signature.hexdigest()
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def get_times(self):
+        """ This function returns the times of the saved fractures."""
+
+        return np.asarray([entry['time'] for entry in self.steps], dtype=np.float64)
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def load(self, step):
+        """
+        This function loads a saved fracture.
+
+        Arguments:
+            step (int):             -- the position of the fracture in the index (the number of the saved file).
+
+        Returns:
+            Fracture:               -- the loaded fracture, sharing the mesh with the other fractures loaded from
+                                       the store.
+        """
+
+        entry = self.steps[step]
+        if entry['file'].endswith('.npz'):
+            with np.load(self.folder + entry['file'], allow_pickle=False) as arrays:
+                return decode_fracture(arrays, self.get_mesh(entry['mesh']))
+
+        with open(self.folder + entry['file'], 'rb') as inp:
+            Fr = dill.load(inp)
+        Fr.mesh = self.get_mesh(entry['mesh'])
+
+        return Fr
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def encode_fracture(fracture, downcast=False):
+    """
+    This function converts a fracture to a dictionary of arrays to be saved in a .npz file. The arrays of the fracture
+    are packed in a single byte array (reading many small arrays from a .npz file is slow). The arrays evaluated on the
+    whole mesh are saved only on the crack cells if they have the same value in all of the other cells. The attributes
+    that are not arrays are pickled with dill into a byte array.
+
+    Arguments:
+        fracture (Fracture):        -- the fracture to be converted.
+        downcast (bool):            -- if True, the double precision arrays evaluated on the mesh are converted to
+                                       single precision.
+
+    Returns:
+        arrays (dict):              -- the arrays to be saved.
+    """
+
+    n_elts = fracture.mesh.NumberOfElts
+    outside_crack = np.ones((n_elts,), dtype=bool)
+    outside_crack[fracture.EltCrack] = False
+
+    data = []
+    offset = 0
+    attributes = {}
+    meta = {}
+    for key, value in fracture.__getstate__().items():
+        if key == 'mesh':
+            continue
+        if not isinstance(value, np.ndarray) or value.dtype.hasobject or value.dtype.names is not None:
+            attributes[key] = value
+            continue
+        info = {'dtype': value.dtype.str, 'shape': value.shape}
+
+        # the axis along the mesh for the arrays evaluated on the whole mesh
+        axis = [i for i in range(value.ndim) if value.shape[i] == n_elts]
+        if key != 'EltCrack' and len(axis) > 0:
+            axis = axis[0]
+            if downcast and value.dtype == np.float64:
+                value = value.astype(np.float32)
+
+            outside = np.compress(outside_crack, value, axis=axis).ravel()
+            if outside.size > 0 and (np.all(outside == outside[0]) or (np.isnan(outside).all() if
+                                                                        value.dtype.kind == 'f' else False)):
+                value = np.take(value, fracture.EltCrack, axis=axis)
+                info['axis'] = axis
+                info['fill'] = outside[0].item()
+
+        value = np.ascontiguousarray(value)
+        info['stored'] = [value.dtype.str, value.shape, offset]
+        data.append(value.tobytes())
+        offset += value.nbytes
+        meta[key] = info
+
+    buffer = io.BytesIO()
+    dill.dump(attributes, buffer, -1)
+
+    return {'data': np.frombuffer(b''.join(data), dtype=np.uint8),
+            'meta': np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            'attributes': np.frombuffer(buffer.getvalue(), dtype=np.uint8)}
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def decode_fracture(arrays, mesh):
+    """
+    This function reconstructs a fracture from the arrays saved with encode_fracture.
+
+    Arguments:
+        arrays (dict):              -- the saved arrays.
+        mesh (CartesianMesh):       -- the mesh of the fracture.
+
+    Returns:
+        Fracture:                   -- the reconstructed fracture.
+    """
+    from fracture import Fracture
+
+    meta = json.loads(arrays['meta'].tobytes().decode())
+    data = arrays['data']
+    Fr = Fracture.__new__(Fracture)
+    Fr.__dict__.update(dill.loads(arrays['attributes'].tobytes()))
+    Fr.mesh = mesh
+
+    # the crack cells are needed to expand the arrays saved only on the crack cells
+    for key, info in sorted(meta.items(), key=lambda item: 'fill' in item[1]):
+        dtype, shape, offset = info['stored']
+        stored = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+        if 'fill' in info:
+            value = np.full(info['shape'], info['fill'], dtype=info['dtype'])
+            index = [slice(None)] * len(shape)
+            index[info['axis']] = Fr.EltCrack
+            value[tuple(index)] = stored
+        else:
+            value = stored.astype(info['dtype'])
+        setattr(Fr, key, value)
+
+    return Fr
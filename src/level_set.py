@@ -10,11 +10,10 @@ All rights reserved. See the LICENSE.TXT file for more details.
 # local imports
 import numpy as np
 import logging
-import warnings
-from scipy.optimize import fsolve
+import heapq
 
 
-def SolveFMM(levelSet, EltRibbon, EltChannel, mesh, farAwayPstv, farAwayNgtv):
+def SolveFMM(levelSet, EltRibbon, EltChannel, mesh, farAwayPstv, farAwayNgtv, band_width=None):
     """
     solve Eikonal equation to get level set.
 
@@ -27,142 +26,51 @@ def SolveFMM(levelSet, EltRibbon, EltChannel, mesh, farAwayPstv, farAwayNgtv):
                                                is to be evaluated
         farAwayPstv (ndarray-float):        -- the cells outwards from ribbon cells for which the distance from front
                                                is to be evaluated
+        band_width (float):                 -- if given, the level set is evaluated only in a narrow band of the given
+                                               width (in number of cells) on both sides of the front. The cells beyond
+                                               the band are marked as far outside (1e50) or far inside (-1e50). If None,
+                                               the level set is evaluated in all of the given cells (full
+                                               reinitialization, e.g. required for re-meshing).
 
     Returns:
         Note:
             Does not return anything. The levelSet is updated in place.
     """
-    log = logging.getLogger('PyFrac.SolveFMM')
-    # todo: This method is inefficient. It can be implemented with heap for better efficiency
+    farAwayPstv = np.asarray(farAwayPstv, dtype=int)
+    farAwayNgtv = np.asarray(farAwayNgtv, dtype=int)
 
     # for Elements radialy outward from ribbon cells
-    Alive = EltRibbon.tolist()
-    NarrowBand = EltRibbon.tolist()
-    FarAway = np.setdiff1d(farAwayPstv, NarrowBand).tolist()
-
-    Alive_status = np.full((mesh.NumberOfElts, ), False, dtype=bool)
-    NarrowBand_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
-    FarAway_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
-    Alive_status[Alive] = True
-    NarrowBand_status[NarrowBand] = True
-    FarAway_status[FarAway] = True
-
-    # the maximum distance any point can have from another in the current mesh. This distance is used to detect the
-    # cells that are not yet traversed, i.e. having infinity distance
-
-    beta = mesh.hx / mesh.hy
-    while len(NarrowBand) > 0:
-        Smallest = NarrowBand[levelSet[NarrowBand].argmin()]
-        neighbors = mesh.NeiElements[Smallest]
-
-        for neighbor in neighbors:
-            if not Alive_status[neighbor]:
-                if FarAway_status[neighbor]:
-                    NarrowBand.append(neighbor)
-                    NarrowBand_status[neighbor] = True
-                    FarAway.remove(neighbor)
-                    FarAway_status[neighbor] = False
-
-                NeigxMin = min(levelSet[mesh.NeiElements[neighbor, 0]], levelSet[mesh.NeiElements[neighbor, 1]])
-                NeigyMin = min(levelSet[mesh.NeiElements[neighbor, 2]], levelSet[mesh.NeiElements[neighbor, 3]])
-                if NeigxMin >= 1e50 and NeigyMin >= 1e50 :
-                    log.warning("You are trying to compute the level set in a cell where all the neighbours have infinite distance to the front")
-                    # A possible fix of this situation could be leave apart the cell and come back later
-                    # remember that as soon as one neighbour has non infinite level set we can solve the LS via fast macing method
-                delT = NeigyMin - NeigxMin
-
-                theta_sq = mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * delT ** 2
-                if theta_sq > 0:
-                    levelSet[neighbor] = (NeigxMin + beta ** 2 * NeigyMin + theta_sq**0.5) / (1 + beta ** 2)
-                else:  # the distance is to be taken from the horizontal or vertical neighbouring cell as it is the only
-                       # distance available
-                    levelSet[neighbor] = min(NeigyMin + mesh.hy, NeigxMin + mesh.hx)
-
-        Alive.append(Smallest)
-        Alive_status[Smallest] = True
-        NarrowBand.remove(Smallest)
-        NarrowBand_status[Smallest] = False
-
-    # todo !!! hack - find out why this is required
-    if (levelSet[farAwayPstv] >= 1e50).any():
-        unevaluated = np.where(levelSet[farAwayPstv] >= 1e50)[0]
-
-        for i in range(len(unevaluated)):
-            neighbors = mesh.NeiElements[farAwayPstv[unevaluated[i]]]
-            Eikargs = (levelSet[neighbors[0]], levelSet[neighbors[1]], levelSet[neighbors[2]],
-                       levelSet[neighbors[3]], 1, mesh.hx, mesh.hy)  # arguments for the Eikonal equation function
-            guess = np.max(levelSet[neighbors])  # initial starting guess for the numerical solver
-            levelSet[farAwayPstv[unevaluated[i]]] = fsolve(Eikonal_Res, guess, args=Eikargs)  # numerical solver
+    beyond_band = fast_march(levelSet, EltRibbon, farAwayPstv, mesh, band_width=band_width)
 
+    # the cells that could not be reached by marching (e.g. enclosed by cells not to be evaluated)
+    unevaluated = farAwayPstv[np.logical_and(levelSet[farAwayPstv] >= 1e50,
+                                             np.logical_not(np.in1d(farAwayPstv, beyond_band)))]
+    if len(unevaluated) > 0:
+        sweep_Eikonal(levelSet, unevaluated, mesh)
 
     # for elements radialy inward from ribbon cells. The sign of the level set values(tip asymptote) in the ribbon cells
     # is inverted to run the fast marching algorithm. The sign is finally inverted back to assign the value in the level
     # set to be returned.
+    beyond_band = np.asarray([], dtype=int)
     if len(farAwayNgtv) > 0:
         RibbonInwardElts = np.setdiff1d(EltChannel, EltRibbon)
         positive_levelSet = 1e50 * np.ones((mesh.NumberOfElts,), np.float64)
         positive_levelSet[EltRibbon] = -levelSet[EltRibbon]
-        Alive = EltRibbon.tolist()
-        NarrowBand = EltRibbon.tolist()
-        FarAway = np.setdiff1d(farAwayNgtv, NarrowBand).tolist()
-
-        Alive_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
-        NarrowBand_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
-        FarAway_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
-        Alive_status[Alive] = True
-        NarrowBand_status[NarrowBand] = True
-        FarAway_status[FarAway] = True
-
-        while len(NarrowBand) > 0:
-
-            Smallest = NarrowBand[positive_levelSet[NarrowBand].argmin()]
-            neighbors = mesh.NeiElements[Smallest]
-
-            for neighbor in neighbors:
-                if not Alive_status[neighbor]:
-                    if FarAway_status[neighbor]:
-                        NarrowBand.append(neighbor)
-                        NarrowBand_status[neighbor] = True
-                        FarAway.remove(neighbor)
-                        FarAway_status[neighbor] = False
-
-                    NeigxMin = min(positive_levelSet[mesh.NeiElements[neighbor, 0]],
-                                   positive_levelSet[mesh.NeiElements[neighbor, 1]])
-                    NeigyMin = min(positive_levelSet[mesh.NeiElements[neighbor, 2]],
-                                   positive_levelSet[mesh.NeiElements[neighbor, 3]])
-                    if NeigxMin >= 1e50 and NeigyMin >= 1e50:
-                        log.warning(
-                            "You are trying to compute the level set in a cell where all the neighbours have infinite distance to the front")
-                        # A possible fix of this situation could be leave apart the cell and come back later
-                        # remember that as soon as one neighbour has non infinite level set we can solve the LS via fast macing method
-                    beta = mesh.hx / mesh.hy
-                    delT = NeigyMin - NeigxMin
-                    theta_sq = mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * delT ** 2
-                    if theta_sq > 0:
-                        positive_levelSet[neighbor] = (NeigxMin + beta ** 2 * NeigyMin + theta_sq**0.5) / (
-                                                                                                1 + beta ** 2)
-                    else:   # the distance is to be taken from the horizontal or vertical neighbouring cell as it is the
-                            # only distance available
-                        positive_levelSet[neighbor] = min(NeigyMin + mesh.hy, NeigxMin + mesh.hx)
-
-            Alive.append(Smallest)
-            Alive_status[Smallest] = True
-            NarrowBand.remove(Smallest)
-            NarrowBand_status[Smallest] = False
+        beyond_band = fast_march(positive_levelSet, EltRibbon, farAwayNgtv, mesh, band_width=band_width)
 
         # assigning adjusted value to the level set to be returned
         levelSet[RibbonInwardElts] = -positive_levelSet[RibbonInwardElts]
 
-    # todo !!! hack - find out why this is required
-    if (abs(levelSet[farAwayNgtv]) >= 1e50).any():
-        unevaluated = np.where(abs(levelSet[farAwayNgtv]) >= 1e50)[0]
+    # the cells that could not be reached by marching inwards. The distance is evaluated with the sign inverted as for
+    # the fast marching, taking only the cells inside the fracture into account.
+    unevaluated = farAwayNgtv[np.logical_and(abs(levelSet[farAwayNgtv]) >= 1e50,
+                                             np.logical_not(np.in1d(farAwayNgtv, beyond_band)))]
+    if len(unevaluated) > 0:
+        positive_levelSet = np.where(levelSet <= 0, -levelSet, 1e50)
+        positive_levelSet[unevaluated] = 1e50
+        evaluated = sweep_Eikonal(positive_levelSet, unevaluated, mesh)
+        levelSet[evaluated] = -positive_levelSet[evaluated]
 
-        for i in range(len(unevaluated)):
-            neighbors = mesh.NeiElements[farAwayNgtv[unevaluated[i]]]
-            Eikargs = (levelSet[neighbors[0]], levelSet[neighbors[1]], levelSet[neighbors[2]],
-                       levelSet[neighbors[3]], 1, mesh.hx, mesh.hy)  # arguments for the eikonal equation function
-            guess = np.max(levelSet[neighbors])  # initial starting guess for the numerical solver
-            levelSet[farAwayNgtv[unevaluated[i]]] = fsolve(Eikonal_Res, guess, args=Eikargs)  # numerical solver
 # from visualization import plot_fracture_variable_as_image
 # import matplotlib.pyplot as plt
 # fig = plt.figure()
@@ -181,6 +89,124 @@ def SolveFMM(levelSet, EltRibbon, EltChannel, mesh, farAwayPstv, farAwayNgtv):
 # y_center = mesh.CenterCoor[Alive, 1]
 # for i, txt in enumerate(Alive):
 #     ax.annotate(txt, (x_center[i], y_center[i]))
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+
+def clip_to_band(levelSet, mesh, band_width):
+    """
+    Clip the level set of the cells left beyond the narrow band (having the far away distance of 1e50) to the width of
+    the band, keeping their sign. The distance of these cells from the front is at least the band width, so that the
+    clipped values still compare correctly with the ones evaluated in the band.
+
+    Arguments:
+        levelSet (ndarray-float):           -- level set evaluated with the narrow band.
+        mesh (CartesianMesh object):        -- mesh object
+        band_width (float):                 -- the width (in number of cells) of the band. Nothing is done if None.
+
+    Returns:
+        - levelSet (ndarray-float):         -- the level set with the values beyond the band clipped.
+    """
+    if band_width is None:
+        return levelSet
+
+    max_dist = band_width * max(mesh.hx, mesh.hy)
+    return np.clip(levelSet, -max_dist, max_dist)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+
+def fast_march(levelSet, EltAlive, farAway, mesh, band_width=None):
+    """
+    March the level set outwards from the given alive cells with the fast marching method. The narrow band is kept in
+    a binary heap with lazy deletion, i.e. a cell is pushed again every time its distance is updated and the outdated
+    entries are discarded when they are popped. The entries are ordered by the distance and then by the order in which
+    the cells have entered the narrow band, giving the same sequence of evaluation as a linear search for the minimum.
+
+    Arguments:
+        levelSet (ndarray-float):           -- level set to be evaluated and updated.
+        EltAlive (ndarray-int):             -- cells with given distance from the front. These cells also make up
+                                               the initial narrow band.
+        farAway (ndarray-int):              -- the cells for which the distance from front is to be evaluated.
+        mesh (CartesianMesh object):        -- mesh object
+        band_width (float):                 -- if given, the marching is stopped once the distance from the front
+                                               exceeds the given number of cells. The cells left beyond the band are
+                                               assigned the (1e50) far away distance.
+
+    Returns:
+        - beyond_band (ndarray-int):        -- the cells whose distance is not evaluated because they are beyond the \
+                                               band. The levelSet is updated in place.
+    """
+    log = logging.getLogger('PyFrac.SolveFMM')
+
+    EltAlive = np.asarray(EltAlive, dtype=int)
+    Alive_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
+    FarAway_status = np.full((mesh.NumberOfElts,), False, dtype=bool)
+    # number of times a cell is present in the narrow band (the given alive cells can be repeated)
+    NarrowBand_count = np.zeros((mesh.NumberOfElts,), dtype=int)
+    # the order in which the cells have entered the narrow band, used to break ties between equal distances
+    NarrowBand_order = np.zeros((mesh.NumberOfElts,), dtype=int)
+    Alive_status[EltAlive] = True
+    FarAway_status[np.setdiff1d(farAway, EltAlive).astype(int)] = True
+    np.add.at(NarrowBand_count, EltAlive, 1)
+
+    NarrowBand = [(levelSet[elt], order, elt) for order, elt in enumerate(EltAlive.tolist())]
+    heapq.heapify(NarrowBand)
+    entered = len(NarrowBand)
+
+    if band_width is None:
+        max_dist = np.inf
+    else:
+        max_dist = band_width * max(mesh.hx, mesh.hy)
+
+    NeiElements = mesh.NeiElements
+    beta = mesh.hx / mesh.hy
+    while len(NarrowBand) > 0:
+        dist, order, Smallest = heapq.heappop(NarrowBand)
+        # discard the entries of the cells already taken out of the narrow band or having an outdated distance
+        if NarrowBand_count[Smallest] == 0 or dist != levelSet[Smallest]:
+            continue
+
+        if dist > max_dist:
+            # all of the cells still to be marched are beyond the band
+            beyond_band = np.where(np.logical_or(FarAway_status, NarrowBand_count > 0))[0]
+            beyond_band = beyond_band[np.logical_not(Alive_status[beyond_band])]
+            levelSet[beyond_band] = 1e50
+            return beyond_band
+
+        for neighbor in NeiElements[Smallest]:
+            if not Alive_status[neighbor]:
+                if FarAway_status[neighbor]:
+                    FarAway_status[neighbor] = False
+                    NarrowBand_count[neighbor] = 1
+                    NarrowBand_order[neighbor] = entered
+                    entered += 1
+
+                NeigxMin = min(levelSet[NeiElements[neighbor, 0]], levelSet[NeiElements[neighbor, 1]])
+                NeigyMin = min(levelSet[NeiElements[neighbor, 2]], levelSet[NeiElements[neighbor, 3]])
+                if NeigxMin >= 1e50 and NeigyMin >= 1e50:
+                    log.warning("You are trying to compute the level set in a cell where all the neighbours have "
+                                "infinite distance to the front")
+                    # A possible fix of this situation could be leave apart the cell and come back later
+                    # remember that as soon as one neighbour has non infinite level set we can solve the LS via fast
+                    # marching method
+                delT = NeigyMin - NeigxMin
+
+                theta_sq = mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * delT ** 2
+                if theta_sq > 0:
+                    levelSet[neighbor] = (NeigxMin + beta ** 2 * NeigyMin + theta_sq ** 0.5) / (1 + beta ** 2)
+                else:  # the distance is to be taken from the horizontal or vertical neighbouring cell as it is the only
+                       # distance available
+                    levelSet[neighbor] = min(NeigyMin + mesh.hy, NeigxMin + mesh.hx)
+
+                if NarrowBand_count[neighbor] > 0:
+                    heapq.heappush(NarrowBand, (levelSet[neighbor], NarrowBand_order[neighbor], neighbor))
+
+        Alive_status[Smallest] = True
+        NarrowBand_count[Smallest] -= 1
+
+    return np.asarray([], dtype=int)
+
 #-----------------------------------------------------------------------------------------------------------------------
 
 
@@ -198,72 +224,62 @@ def reconstruct_front(dist, bandElts, EltChannel, mesh):
 
     # Elements that are not in channel
     EltRest = np.setdiff1d(bandElts, EltChannel)
-    ElmntTip = np.asarray([], int)
-    l = np.asarray([])
-    alpha = np.asarray([])
-
-    for i in range(0, len(EltRest)):
-        neighbors = mesh.NeiElements[EltRest[i]]
-
-        minx = min(dist[neighbors[0]], dist[neighbors[1]])
-        miny = min(dist[neighbors[2]], dist[neighbors[3]])
-        # distance of the vertex (zero vertex, i.e. rotated distance) of the current cell from the front
-        Pdis = -(minx + miny) / 2
-
-        # if the vertex distance is positive, meaning the fracture has passed the vertex
-        if Pdis >= 0:
-            ElmntTip = np.append(ElmntTip, EltRest[i])
-            l = np.append(l, Pdis)
-
-            # calculate angle imposed by the perpendicular on front (see Peirce & Detournay 2008)
-            delDist = miny - minx
-            beta = mesh.hx / mesh.hy
-            theta = (mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * delDist ** 2) ** 0.5
-            # angle calculate with inverse of cosine trigonometric function
-            a1 = np.arccos((theta + beta ** 2 * delDist) / (mesh.hx * (1 + beta ** 2)))
-            # angle calculate with inverse of sine trigonometric function
-            sinalpha = beta * (theta - delDist) / (mesh.hx * (1 + beta ** 2))
-            a2 = np.arcsin(sinalpha)
-
-            # !!!Hack. this check of zero or 90 degree angle works better
-            warnings.filterwarnings("ignore")
-            if abs(1 - dist[neighbors[0]] / dist[neighbors[1]]) < 1e-5:
-                a2 = np.pi / 2
-            elif abs(1 - dist[neighbors[2]] / dist[neighbors[3]]) < 1e-5:
-                a2 = 0.
-
-            #todo hack!!!
-            # checks to remove numerical noise in angle calculation
-            if a2 >= 0 and a2 <= np.pi / 2:
-                alpha = np.append(alpha, a2)
-            elif a1 >= 0 and a1 <= np.pi / 2:
-                alpha = np.append(alpha, a1)
-            elif a2 < 0 and a2 > -1e-6:
-                alpha = np.append(alpha, 0)
-            elif a2 > np.pi / 2 and a2 < np.pi / 2 + 1e-6:
-                alpha = np.append(alpha, np.pi / 2)
-            elif a1 < 0 and a1 > -1e-6:
-                alpha = np.append(alpha, 0)
-            elif a1 > np.pi / 2 and a1 < np.pi / 2 + 1e-6:
-                alpha = np.append(alpha, np.pi / 2)
-            else:
-                if abs(1 - dist[neighbors[0]] / dist[neighbors[1]]) < 0.1:
-                    alpha = np.append(alpha, np.pi / 2)
-                elif abs(1 - dist[neighbors[2]] / dist[neighbors[3]]) < 0.1:
-                    alpha = np.append(alpha, 0)
-                else:
-                    alpha = np.append(alpha, np.nan)
-
+    neighbors = mesh.NeiElements[EltRest]
+    dist_nei = dist[neighbors]
+
+    minx = np.where(dist_nei[:, 1] < dist_nei[:, 0], dist_nei[:, 1], dist_nei[:, 0])
+    miny = np.where(dist_nei[:, 3] < dist_nei[:, 2], dist_nei[:, 3], dist_nei[:, 2])
+    # distance of the vertex (zero vertex, i.e. rotated distance) of the cells from the front
+    Pdis = -(minx + miny) / 2
+
+    # the cells whose vertex distance is positive, meaning the fracture has passed the vertex
+    passed = Pdis >= 0
+    ElmntTip = EltRest[passed]
+    l = Pdis[passed]
+    dist_nei = dist_nei[passed]
+
+    # calculate angle imposed by the perpendicular on front (see Peirce & Detournay 2008)
+    delDist = miny[passed] - minx[passed]
+    beta = mesh.hx / mesh.hy
+    with np.errstate(divide='ignore', invalid='ignore'):
+        theta = np.power(mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * np.power(delDist, 2), 0.5)
+        # angle calculate with inverse of cosine trigonometric function
+        a1 = np.arccos((theta + beta ** 2 * delDist) / (mesh.hx * (1 + beta ** 2)))
+        # angle calculate with inverse of sine trigonometric function
+        sinalpha = beta * (theta - delDist) / (mesh.hx * (1 + beta ** 2))
+        a2 = np.arcsin(sinalpha)
+
+        # !!!Hack. this check of zero or 90 degree angle works better
+        ratio_x = abs(1 - dist_nei[:, 0] / dist_nei[:, 1])
+        ratio_y = abs(1 - dist_nei[:, 2] / dist_nei[:, 3])
+    a2 = np.where(ratio_x < 1e-5, np.pi / 2, np.where(ratio_y < 1e-5, 0., a2))
+
+    #todo hack!!!
+    # checks to remove numerical noise in angle calculation
+    alpha = np.select([np.logical_and(a2 >= 0, a2 <= np.pi / 2),
+                       np.logical_and(a1 >= 0, a1 <= np.pi / 2),
+                       np.logical_and(a2 < 0, a2 > -1e-6),
+                       np.logical_and(a2 > np.pi / 2, a2 < np.pi / 2 + 1e-6),
+                       np.logical_and(a1 < 0, a1 > -1e-6),
+                       np.logical_and(a1 > np.pi / 2, a1 < np.pi / 2 + 1e-6),
+                       ratio_x < 0.1,
+                       ratio_y < 0.1],
+                      [a2, a1, 0., np.pi / 2, 0., np.pi / 2, np.pi / 2, 0.],
+                      default=np.nan)
+
+    # the angle of the cells for which it could not be evaluated is taken as the mean of the angle of the neighbouring
+    # tip cells (summed in the ascending order of the neighbours, i.e. bottom, left, right and top)
     nan = np.where(np.isnan(alpha))[0]
     if len(nan) > 0:
         alpha_mesh = np.full((mesh.NumberOfElts,), np.nan)
         alpha_mesh[ElmntTip] = alpha
-        for i in range(len(nan)):
-            neighbors = mesh.NeiElements[ElmntTip[nan[i]]]
-            neig_in_tip = np.intersect1d(ElmntTip, neighbors)
-            alpha_neig = alpha_mesh[neig_in_tip]
-            alpha_neig = np.delete(alpha_neig, np.where(np.isnan(alpha_neig))[0])
-            alpha[nan[i]] = np.mean(alpha_neig)
+        alpha_neig = alpha_mesh[mesh.NeiElements[ElmntTip[nan]][:, [2, 0, 1, 3]]]
+        valid = np.logical_not(np.isnan(alpha_neig))
+        sum_neig = np.zeros((len(nan),), dtype=np.float64)
+        for i in range(4):
+            sum_neig = sum_neig + np.where(valid[:, i], alpha_neig[:, i], 0.)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha[nan] = sum_neig / np.sum(valid, axis=1)
 
     CellStatusNew = np.zeros(mesh.NumberOfElts, int)
     CellStatusNew[EltChannel] = 1
@@ -288,70 +304,54 @@ def reconstruct_front_LS_gradient(dist, EltBand, EltChannel, mesh):
 
     # Elements that are not in channel
     EltRest = np.setdiff1d(EltBand, EltChannel)
-    ElmntTip = np.asarray([], int)
-    l = np.asarray([])
-    alpha = np.asarray([])
-
-    for i in range(0, len(EltRest)):
-        neighbors = mesh.NeiElements[EltRest[i]]
-
-        minx = min(dist[neighbors[0]], dist[neighbors[1]])
-        miny = min(dist[neighbors[2]], dist[neighbors[3]])
-        # distance of the vertex (zero vertex, i.e. rotated distance) of the current cell from the front
-        Pdis = -(minx + miny) / 2
-
-        # if the vertex distance is positive, meaning the fracture has passed the vertex
-        if Pdis >= 0:
-            ElmntTip = np.append(ElmntTip, EltRest[i])
-            l = np.append(l, Pdis)
-
-            # neighbors
-            #     6     3    7
-            #     0    elt   1
-            #     4    2     5
-            neighbors_tip = np.zeros(8, dtype=int)
-            neighbors_tip[:4] = mesh.NeiElements[EltRest[i]]
-            neighbors_tip[4] = mesh.NeiElements[neighbors_tip[2]][0]
-            neighbors_tip[5] = mesh.NeiElements[neighbors_tip[2]][1]
-            neighbors_tip[6] = mesh.NeiElements[neighbors_tip[3]][0]
-            neighbors_tip[7] = mesh.NeiElements[neighbors_tip[3]][1]
-
-            # zero Vertex
-            #     3         2
-            #     0         1
-            if dist[neighbors_tip[0]] <= dist[neighbors_tip[1]] and dist[neighbors_tip[2]] <= dist[
-                neighbors_tip[3]]:
-                # if zero vertex is 0:
-                gradx = -((dist[neighbors_tip[0]] + dist[neighbors_tip[4]]) / 2 - (
-                    dist[EltRest[i]] + dist[neighbors_tip[2]]) / 2) / mesh.hx
-                grady = ((dist[neighbors_tip[0]] + dist[EltRest[i]]) / 2 - (
-                    dist[neighbors_tip[4]] + dist[neighbors_tip[2]]) / 2) / mesh.hy
-
-            elif dist[neighbors_tip[0]] > dist[neighbors_tip[1]] and dist[neighbors_tip[2]] <= dist[
-                    neighbors_tip[3]]:
-                # if zero vertex is 1:
-                gradx = ((dist[neighbors_tip[1]] + dist[neighbors_tip[5]]) / 2 - (
-                    dist[EltRest[i]] + dist[neighbors_tip[2]]) / 2) / mesh.hx
-                grady = ((dist[neighbors_tip[1]] + dist[EltRest[i]]) / 2 - (
-                    dist[neighbors_tip[5]] + dist[neighbors_tip[2]]) / 2) / mesh.hy
-
-            elif dist[neighbors_tip[0]] > dist[neighbors_tip[1]] and dist[neighbors_tip[2]] > dist[
-                    neighbors_tip[3]]:
-                # if zero vertex is 2:
-                gradx = ((dist[neighbors_tip[1]] + dist[neighbors_tip[7]]) / 2 - (
-                    dist[EltRest[i]] + dist[neighbors_tip[3]]) / 2) / mesh.hx
-                grady = -((dist[neighbors_tip[1]] + dist[EltRest[i]]) / 2 - (
-                    dist[neighbors_tip[3]] + dist[neighbors_tip[7]]) / 2) / mesh.hy
-
-            elif dist[neighbors_tip[0]] <= dist[neighbors_tip[1]] and dist[neighbors_tip[2]] > dist[
-                    neighbors_tip[3]]:
-                # if zero vertex is 3:
-                gradx = -((dist[neighbors_tip[6]] + dist[neighbors_tip[0]]) / 2 - (
-                    dist[EltRest[i]] + dist[neighbors_tip[3]]) / 2) / mesh.hx
-                grady = ((dist[neighbors_tip[0]] + dist[EltRest[i]]) / 2 - (
-                    dist[neighbors_tip[6]] + dist[neighbors_tip[3]]) / 2) / mesh.hy
-
-            alpha = np.append(alpha, np.abs(np.arcsin(grady / (gradx ** 2 + grady ** 2) ** 0.5)))
+    neighbors = mesh.NeiElements[EltRest]
+
+    minx = np.where(dist[neighbors[:, 1]] < dist[neighbors[:, 0]], dist[neighbors[:, 1]], dist[neighbors[:, 0]])
+    miny = np.where(dist[neighbors[:, 3]] < dist[neighbors[:, 2]], dist[neighbors[:, 3]], dist[neighbors[:, 2]])
+    # distance of the vertex (zero vertex, i.e. rotated distance) of the cells from the front
+    Pdis = -(minx + miny) / 2
+
+    # the cells whose vertex distance is positive, meaning the fracture has passed the vertex
+    passed = Pdis >= 0
+    ElmntTip = EltRest[passed]
+    l = Pdis[passed]
+
+    # neighbors
+    #     6     3    7
+    #     0    elt   1
+    #     4    2     5
+    neighbors_tip = np.zeros((len(ElmntTip), 8), dtype=int)
+    neighbors_tip[:, :4] = neighbors[passed]
+    neighbors_tip[:, 4] = mesh.NeiElements[neighbors_tip[:, 2], 0]
+    neighbors_tip[:, 5] = mesh.NeiElements[neighbors_tip[:, 2], 1]
+    neighbors_tip[:, 6] = mesh.NeiElements[neighbors_tip[:, 3], 0]
+    neighbors_tip[:, 7] = mesh.NeiElements[neighbors_tip[:, 3], 1]
+    d = dist[neighbors_tip]
+    d_elt = dist[ElmntTip]
+
+    # zero Vertex
+    #     3         2
+    #     0         1
+    zero_vertex = [np.logical_and(d[:, 0] <= d[:, 1], d[:, 2] <= d[:, 3]),
+                   np.logical_and(d[:, 0] > d[:, 1], d[:, 2] <= d[:, 3]),
+                   np.logical_and(d[:, 0] > d[:, 1], d[:, 2] > d[:, 3]),
+                   np.logical_and(d[:, 0] <= d[:, 1], d[:, 2] > d[:, 3])]
+
+    gradx = np.select(zero_vertex,
+                      [-((d[:, 0] + d[:, 4]) / 2 - (d_elt + d[:, 2]) / 2) / mesh.hx,
+                       ((d[:, 1] + d[:, 5]) / 2 - (d_elt + d[:, 2]) / 2) / mesh.hx,
+                       ((d[:, 1] + d[:, 7]) / 2 - (d_elt + d[:, 3]) / 2) / mesh.hx,
+                       -((d[:, 6] + d[:, 0]) / 2 - (d_elt + d[:, 3]) / 2) / mesh.hx],
+                      default=np.nan)
+    grady = np.select(zero_vertex,
+                      [((d[:, 0] + d_elt) / 2 - (d[:, 4] + d[:, 2]) / 2) / mesh.hy,
+                       ((d[:, 1] + d_elt) / 2 - (d[:, 5] + d[:, 2]) / 2) / mesh.hy,
+                       -((d[:, 1] + d_elt) / 2 - (d[:, 3] + d[:, 7]) / 2) / mesh.hy,
+                       ((d[:, 0] + d_elt) / 2 - (d[:, 6] + d[:, 3]) / 2) / mesh.hy],
+                      default=np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        alpha = np.abs(np.arcsin(grady / np.power(np.power(gradx, 2) + np.power(grady, 2), 0.5)))
 
     CellStatusNew = np.zeros(mesh.NumberOfElts, int)
     CellStatusNew[EltChannel] = 1
@@ -392,54 +392,35 @@ def UpdateLists(EltsChannel, EltsTipNew, FillFrac, levelSet, mesh):
     # Tip elements flag to avoid search on each iteration
     inTip = np.zeros((mesh.NumberOfElts,), bool)
     inTip[eltsTip] = True
-    i = 0
-
-    #todo: the while below is probably inserting a bug - found it with poor resolution and volume control
-    while i < len(eltsTip):  # to remove a special case encountered in sharp edges and rectangular cells
-        neighbors = mesh.NeiElements[eltsTip[i]]
-        if inTip[neighbors[0]] and inTip[neighbors[3]] and inTip[neighbors[3] - 1]:
-            conjoined = np.asarray([neighbors[0], neighbors[3], neighbors[3] - 1, eltsTip[i]])
-            mindist = np.argmin(mesh.distCenter[conjoined])
-            inTip[conjoined[mindist]] = False
-            eltsTip = np.delete(eltsTip, np.where(eltsTip == conjoined[mindist]))
-            i -= 1
-        i += 1
+
+    # to remove a special case encountered in sharp edges and rectangular cells, i.e. a block of four conjoined tip
+    # cells. The cell of the block closest to the center is removed. As removing a cell can break the blocks found
+    # later, the blocks are treated in the order of the tip cells.
+    #todo: this is probably inserting a bug - found it with poor resolution and volume control
+    neighbors = mesh.NeiElements[eltsTip]
+    conjoined = np.column_stack((neighbors[:, 0], neighbors[:, 3], neighbors[:, 3] - 1, eltsTip))
+    candidates = np.where(np.all(inTip[conjoined], axis=1))[0]
+    for i in candidates:
+        if np.all(inTip[conjoined[i]]):
+            inTip[conjoined[i, np.argmin(mesh.distCenter[conjoined[i]])]] = False
+    eltsTip = eltsTip[inTip[eltsTip]]
 
     # new channel elements
     newEltChannel = np.setdiff1d(EltsTipNew, eltsTip)
 
     eltsChannel = np.append(EltsChannel, newEltChannel)
     eltsCrack = np.append(eltsChannel, eltsTip)
-    eltsRibbon = np.array([], int)
-    zeroVrtx = np.zeros((len(eltsTip),), int)  # Vertex from where the perpendicular is drawn
-
-    # All the inner cells neighboring tip cells are added to ribbon cells
-    for i in range(0, len(eltsTip)):
-        neighbors = mesh.NeiElements[eltsTip[i]]
-
-        if levelSet[neighbors[0]] <= levelSet[neighbors[1]]:
-            eltsRibbon = np.append(eltsRibbon, neighbors[0])
-            drctx = -1
-        else:
-            eltsRibbon = np.append(eltsRibbon, neighbors[1])
-            drctx = 1
-
-        if levelSet[neighbors[2]] <= levelSet[neighbors[3]]:
-            eltsRibbon = np.append(eltsRibbon, neighbors[2])
-            drcty = -1
-        else:
-            eltsRibbon = np.append(eltsRibbon, neighbors[3])
-            drcty = 1
-
-        # Assigning zero vertex according to the direction of propagation
-        if drctx < 0 and drcty < 0:
-            zeroVrtx[i] = 0
-        elif drctx > 0 and drcty < 0:
-            zeroVrtx[i] = 1
-        elif drctx < 0 and drcty > 0:
-            zeroVrtx[i] = 3
-        elif drctx > 0 and drcty > 0:
-            zeroVrtx[i] = 2
+
+    # All the inner cells neighboring tip cells are added to ribbon cells. The inner neighbour in the x and y direction
+    # gives the direction of propagation.
+    neighbors = mesh.NeiElements[eltsTip]
+    drctx_ngtv = levelSet[neighbors[:, 0]] <= levelSet[neighbors[:, 1]]
+    drcty_ngtv = levelSet[neighbors[:, 2]] <= levelSet[neighbors[:, 3]]
+    eltsRibbon = np.concatenate((np.where(drctx_ngtv, neighbors[:, 0], neighbors[:, 1]),
+                                 np.where(drcty_ngtv, neighbors[:, 2], neighbors[:, 3])))
+
+    # Assigning zero vertex (from where the perpendicular is drawn) according to the direction of propagation
+    zeroVrtx = np.where(drctx_ngtv, np.where(drcty_ngtv, 0, 3), np.where(drcty_ngtv, 1, 2)).astype(int)
 
     eltsRibbon = np.setdiff1d(eltsRibbon, eltsTip)
     if np.any(levelSet[eltsRibbon]>0):
@@ -459,13 +440,75 @@ def UpdateLists(EltsChannel, EltsTipNew, FillFrac, levelSet, mesh):
 
     # -----------------------------------------------------------------------------------------------------------------------
 
-def Eikonal_Res(Tij, *args):
-    """quadratic Eikonal equation residual to be used by numerical root finder"""
+def Eikonal_update(levelSet, cells, mesh):
+    """
+    Closed form solution of the upwind discretization of the Eikonal equation for the given cells, evaluated with the
+    current level set of their neighbours. It is the same update as used by the fast marching method, i.e. the
+    two-neighbour quadratic solution if it exists, and the distance from the horizontal or vertical neighbour otherwise.
+    The cells with (1e50) far away distance are not taken into account.
+
+    Arguments:
+        levelSet (ndarray-float):           -- the level set.
+        cells (ndarray-int):                -- the cells for which the update is to be evaluated.
+        mesh (CartesianMesh object):        -- mesh object
+
+    Returns:
+        - dist (ndarray-float):             -- the updated distance of the given cells.
+    """
+    neighbors = mesh.NeiElements[cells]
+    NeigxMin = np.minimum(levelSet[neighbors[:, 0]], levelSet[neighbors[:, 1]])
+    NeigyMin = np.minimum(levelSet[neighbors[:, 2]], levelSet[neighbors[:, 3]])
+
+    beta = mesh.hx / mesh.hy
+    theta_sq = mesh.hx ** 2 * (1 + beta ** 2) - beta ** 2 * (NeigyMin - NeigxMin) ** 2
+    two_neighbours = theta_sq > 0
 
-    (Tleft, Tright, Tbottom, Ttop, Fij, dx, dy) = args
-    return np.nanmax([(Tij - Tleft) / dx, 0]) ** 2 + np.nanmin([(Tright - Tij) / dx, 0]) ** 2 + np.nanmax(
-        [(Tij - Tbottom) / dy, 0]) ** 2 + \
-           np.nanmin([(Ttop - Tij) / dy, 0]) ** 2 - Fij ** 2
+    dist = np.minimum(NeigyMin + mesh.hy, NeigxMin + mesh.hx)
+    dist[two_neighbours] = (NeigxMin[two_neighbours] + beta ** 2 * NeigyMin[two_neighbours] +
+                            theta_sq[two_neighbours] ** 0.5) / (1 + beta ** 2)
 
+    return dist
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+def sweep_Eikonal(levelSet, cells, mesh, max_sweeps=100):
+    """
+    Evaluate the distance of the given cells that are left unevaluated (with 1e50 distance) by the fast marching method.
+    The cells are evaluated layer by layer with the closed form update (see Eikonal_update), starting from the cells
+    having evaluated neighbours. The distances are then relaxed with Jacobi sweeps until they do not decrease anymore.
+    The given cells which are not connected to any evaluated cell are left with the (1e50) far away distance.
+
+    Arguments:
+        levelSet (ndarray-float):           -- level set to be evaluated and updated. The distances are to be positive.
+        cells (ndarray-int):                -- the unevaluated cells.
+        mesh (CartesianMesh object):        -- mesh object
+        max_sweeps (int):                   -- the maximum number of relaxation sweeps.
+
+    Returns:
+        - evaluated (ndarray-int):          -- the cells that have been evaluated. The levelSet is updated in place.
+    """
+    log = logging.getLogger('PyFrac.sweep_Eikonal')
+
+    pending = np.unique(cells)
+    evaluated = np.asarray([], dtype=int)
+    while len(pending) > 0:
+        dist = Eikonal_update(levelSet, pending, mesh)
+        reached = dist < 1e50
+        if not reached.any():
+            log.warning("The level set cannot be evaluated in " + repr(len(pending)) + " cells as they are not "
+                        "connected to the front!")
+            break
+        levelSet[pending[reached]] = dist[reached]
+        evaluated = np.append(evaluated, pending[reached])
+        pending = pending[np.logical_not(reached)]
+
+    for i in range(max_sweeps):
+        dist = np.minimum(Eikonal_update(levelSet, evaluated, mesh), levelSet[evaluated])
+        if np.array_equal(dist, levelSet[evaluated]):
+            break
+        levelSet[evaluated] = dist
+
+    return evaluated
 
 # -----------------------------------------------------------------------------------------------------------------------
\ No newline at end of file
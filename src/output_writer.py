@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+# imports
+import copy
+import logging
+import queue
+import threading
+import time
+
+
+class FractureWriter:
+    """
+    This class saves the fractures to disk in a background thread, so that the time stepping can continue while the
+    fractures are serialized and written. The fractures to be saved are copied (the mesh is shared, see
+    :py:meth:`fracture.Fracture.__deepcopy__`) and put in a bounded queue. If the queue is full, saving waits for the
+    writer to catch up. A failure of the writer is raised at the next call to save, flush or close.
+
+    Arguments:
+        queue_size (int):       -- the maximum number of fractures waiting to be written. If zero, the fractures are
+                                   written synchronously.
+        store (FractureStore):  -- the store in which the fractures are saved. If None, each of the fractures is
+                                   pickled to its own file.
+
+    Attributes:
+        queueSize (int):        -- the maximum number of fractures waiting to be written.
+        store (FractureStore):  -- the store in which the fractures are saved.
+        writeQueue (Queue):     -- the queue of the fractures waiting to be written, along with the file names and the
+                                   performance nodes.
+        thread (Thread):        -- the writer thread. It is started with the first fracture to be saved.
+        error (Exception):      -- the exception raised by the writer, if any.
+    """
+
+    def __init__(self, queue_size=4, store=None):
+
+        self.queueSize = queue_size
+        self.store = store
+        self.writeQueue = queue.Queue(maxsize=max(queue_size, 1))
+        self.thread = None
+        self.error = None
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def save(self, fracture, filename, perfNode=None):
+        """
+        This function queues the given fracture to be written to the given file.
+
+        Arguments:
+            fracture (Fracture):            -- the fracture to be saved.
+            filename (string):              -- the file to which the fracture is written.
+            perfNode (IterationProperties): -- the 'save to disk' performance node to be populated with the time
+                                               spent by the solver to queue the fracture and the time at which it was
+                                               written.
+        """
+        self.check_error()
+
+        if self.queueSize == 0:
+            self.write(fracture, filename, perfNode)
+            if perfNode is not None:
+                perfNode.blockingTime = perfNode.CpuTime_end - perfNode.CpuTime_start
+            self.check_error()
+            return
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='PyFrac fracture writer', daemon=True)
+            self.thread.start()
+
+        # waits if the queue is full
+        self.writeQueue.put((copy.deepcopy(fracture), filename, perfNode))
+        if perfNode is not None:
+            perfNode.blockingTime = time.time() - perfNode.CpuTime_start
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def run(self):
+        """ The loop of the writer thread. It writes the queued fractures until None is found in the queue."""
+
+        while True:
+            item = self.writeQueue.get()
+            try:
+                if item is None:
+                    return
+                self.write(*item)
+            finally:
+                self.writeQueue.task_done()
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def write(self, fracture, filename, perfNode=None):
+        """ This function writes the given fracture to disk and populates the performance node."""
+
+        log = logging.getLogger('PyFrac.FractureWriter.write')
+        status = True
+        fail_cause = None
+        try:
+            if self.store is None:
+                fracture.SaveFracture(filename)
+            else:
+                self.store.save(fracture, filename)
+            log.debug("Saved solution at " + repr(fracture.time))
+        except Exception as error:
+            log.error("Saving solution at " + repr(fracture.time) + " failed!")
+            self.error = error
+            status = False
+            fail_cause = repr(error)
+
+        if perfNode is not None:
+            perfNode.CpuTime_end = time.time()
+            perfNode.status = status
+            perfNode.failure_cause = fail_cause
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def flush(self):
+        """ This function waits until all of the queued fractures are written."""
+
+        if self.thread is not None:
+            self.writeQueue.join()
+        self.check_error()
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def close(self):
+        """ This function writes all of the queued fractures and stops the writer thread."""
+
+        if self.thread is not None:
+            self.writeQueue.put(None)
+            self.thread.join()
+            self.thread = None
+        self.check_error()
+
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def check_error(self):
+        """ This function raises the exception raised by the writer, if any."""
+
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
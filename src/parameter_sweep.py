@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+# imports
+import csv
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import dill
+
+# local imports
+from controller import Controller
+from elasticity import load_cached_elasticity_matrix
+
+
+summary_columns = ['run', 'status', 'final_time', 'time_steps', 'failed_time_steps', 'remeshings', 'wall_time',
+                   'output_folder', 'error']
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def parameter_grid(**values):
+    """
+    This function returns the combinations of the given values of the parameters, to be used as the runs of a sweep
+    (see run_sweep).
+
+    Example:
+        parameter_grid(toughness=[1e6, 2e6], leak_off=[0., 1e-6]) gives the four combinations of the toughness and
+        the leak-off coefficient.
+
+    Returns:
+        list:           -- the combinations of the parameters, each given as a dictionary.
+    """
+
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*[values[name] for name in names])]
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def estimate_run_memory(Fracture, Sim_prop):
+    """
+    This function gives a rough estimate of the memory used by a simulation, dominated by the elasticity matrix and
+    the copies of its blocks made when solving the elasto-hydrodynamic system.
+
+    Arguments:
+        Fracture (Fracture):                -- the fracture to be propagated.
+        Sim_prop (SimulationProperties):    -- the simulation properties.
+
+    Returns:
+        int:                                -- the estimated memory in bytes.
+    """
+
+    n_elts = Fracture.mesh.NumberOfElts
+    if Sim_prop.useBlockToeplizCompression:
+        matrix_size = 8 * n_elts
+    else:
+        matrix_size = 8 * n_elts ** 2
+
+    # the interpreter with the loaded modules
+    base_size = 300 * 2 ** 20
+
+    return base_size + 3 * matrix_size
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_available_memory():
+    """ This function returns the memory available for new processes in bytes, or None if it is not known."""
+
+    try:
+        with open('/proc/meminfo', 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_simulation_inputs(run, build):
+    """
+    This function returns the fracture and the properties of the given run of a sweep, either given directly or built
+    from the parameters of the run with the given function.
+    """
+
+    if build is not None:
+        run = build(**run)
+    if len(run) == 5:
+        run = tuple(run) + (None,)
+
+    return run
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def can_share_elasticity(Solid_prop, Sim_prop):
+    """ This function returns True if the dense isotropic elasticity matrix is used in the simulation."""
+
+    return not (Solid_prop.TI_elasticity or Sim_prop.symmetric or Sim_prop.useBlockToeplizCompression)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def close_log_files(handlers):
+    """
+    This function closes the log files opened for a run (see SimulationProperties.set_logging_to_file), i.e. the
+    handlers of the PyFrac loggers other than the given ones (the handlers before the run).
+    """
+
+    for logger in [logging.getLogger('PyFrac'), logging.getLogger('PyFrac_LF')]:
+        for handler in list(logger.handlers):
+            if handler not in handlers:
+                logger.removeHandler(handler)
+                handler.close()
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def run_simulation(name, run, build, output_folder, elasticity_cache):
+    """
+    This function runs one of the simulations of a sweep (see run_sweep). The simulation is saved and logged in its
+    own folder. A failure of the simulation is recorded in the returned summary instead of being raised.
+
+    Arguments:
+        name (string):              -- the name of the run.
+        run (bytes):                -- the run, pickled with dill (see run_sweep).
+        build (bytes):              -- the function building the simulation from the parameters of the run, pickled
+                                       with dill, or None.
+        output_folder (string):     -- the folder in which the folders of the runs are created.
+        elasticity_cache (string):  -- the folder in which the elasticity matrices are cached, or None.
+
+    Returns:
+        dict:                       -- the summary of the run.
+    """
+    log = logging.getLogger('PyFrac.parameter_sweep.run_simulation')
+
+    summary = {'run': name, 'status': 'failed'}
+    handlers = logging.getLogger('PyFrac').handlers + logging.getLogger('PyFrac_LF').handlers
+    start = time.time()
+    try:
+        if build is not None:
+            build = dill.loads(build)
+        Fr, Solid_prop, Fluid_prop, Injection_prop, Sim_prop, Load_prop = get_simulation_inputs(dill.loads(run), build)
+
+        Sim_prop.set_simulation_name(name)
+        Sim_prop.set_outputFolder(output_folder)
+        Sim_prop.plotFigure = False
+        Sim_prop.log2file = True
+        summary['output_folder'] = Sim_prop.get_outputFolder()
+
+        C = None
+        if elasticity_cache is not None and can_share_elasticity(Solid_prop, Sim_prop):
+            C = load_cached_elasticity_matrix(Fr.mesh, Solid_prop.Eprime, elasticity_cache)
+
+        controller = Controller(Fr, Solid_prop, Fluid_prop, Injection_prop, Sim_prop, Load_prop=Load_prop, C=C)
+        controller.run()
+
+        summary['status'] = 'completed'
+        summary['final_time'] = controller.fracture.time
+        summary['time_steps'] = controller.successfulTimeSteps
+        summary['failed_time_steps'] = controller.failedTimeSteps
+        summary['remeshings'] = controller.remeshings
+    except (Exception, SystemExit) as error:
+        # the failed time steps raise SystemExit
+        log.exception("The run " + name + " failed!")
+        summary['error'] = type(error).__name__ + ': ' + str(error)
+    finally:
+        close_log_files(handlers)
+        summary['wall_time'] = time.time() - start
+
+    return summary
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def run_sweep(runs, output_folder, build=None, n_workers=None, memory_per_run=None, share_elasticity=True,
+              summary_file='sweep_summary.csv'):
+    """
+    This function runs a sweep of simulations (e.g. over a grid of parameters, see parameter_grid) in parallel
+    processes. Each of the simulations is saved and logged in its own folder, named after the run, in the given
+    output folder. The failure of a simulation does not stop the sweep. If a process is killed (e.g. when it runs out
+    of memory), the runs in progress are attempted again with half of the processes, and eventually each in its own
+    process; only a run killed in its own process is given up. A summary table of the runs, with their parameters,
+    status and timings, is written in the output folder, with each of the runs appended as soon as it is finished.
+
+    The number of parallel processes is limited by the available memory, with the memory used by each run estimated
+    from the first run (see estimate_run_memory) if it is not given. The elasticity matrices are cached in the output
+    folder and shared by the processes of the runs with the same mesh and plain strain modulus.
+
+    Arguments:
+        runs (list):                -- the runs of the sweep. If the function building the simulations is given,
+                                       each run is a dictionary with the keyword arguments of the function. Otherwise,
+                                       each run is a tuple with the fracture and the material, fluid, injection,
+                                       simulation (and optionally loading) properties of the simulation.
+        output_folder (string):     -- the folder in which the simulations are saved.
+        build (function):           -- the function returning the tuple of the fracture and the properties of a
+                                       simulation from the parameters of the run.
+        n_workers (int):            -- the maximum number of processes. By default, the number of processors.
+        memory_per_run (int):       -- the memory used by each of the runs in bytes.
+        share_elasticity (bool):    -- if True, the elasticity matrices are cached and shared between the runs.
+        summary_file (string):      -- the name of the file in which the summary table is written.
+
+    Returns:
+        list:                       -- the summaries of the runs (dictionaries with the columns of the table).
+    """
+    log = logging.getLogger('PyFrac.parameter_sweep.run_sweep')
+
+    if len(runs) == 0:
+        return []
+    os.makedirs(output_folder, exist_ok=True)
+
+    names = ['run_' + repr(i) for i in range(len(runs))]
+    pickled_runs = [dill.dumps(run) for run in runs]
+    pickled_build = dill.dumps(build) if build is not None else None
+    elasticity_cache = os.path.join(output_folder, 'elasticity_cache') if share_elasticity else None
+
+    # the first run is used to estimate the memory and to cache its elasticity matrix before the processes start
+    try:
+        Fr, Solid_prop, _, _, Sim_prop, _ = get_simulation_inputs(dill.loads(pickled_runs[0]), build)
+        if memory_per_run is None:
+            memory_per_run = estimate_run_memory(Fr, Sim_prop)
+        if elasticity_cache is not None and can_share_elasticity(Solid_prop, Sim_prop):
+            load_cached_elasticity_matrix(Fr.mesh, Solid_prop.Eprime, elasticity_cache)
+    except Exception:
+        # the failure is recorded when the run is attempted
+        log.warning("The first run could not be built to estimate its memory!")
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    available_memory = get_available_memory()
+    if available_memory is not None and memory_per_run is not None:
+        n_workers = min(n_workers, max(1, int(available_memory // memory_per_run)))
+    n_workers = min(n_workers, len(runs))
+    log.info("Running " + repr(len(runs)) + " simulations in " + repr(n_workers) + " processes...")
+
+    # the summary of each run is appended to the table as soon as it is final
+    summary_address = os.path.join(output_folder, summary_file)
+    columns = get_summary_columns(runs)
+    write_summary([], [], summary_address, columns)
+
+    summaries = [None] * len(runs)
+    pending = list(range(len(runs)))
+    while len(pending) > 0:
+        if n_workers == 1:
+            # each run is attempted in its own process, so that a killed process only concerns its run
+            for i in pending:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    future = executor.submit(run_simulation, names[i], pickled_runs[i], pickled_build, output_folder,
+                                             elasticity_cache)
+                    try:
+                        summaries[i] = future.result()
+                    except BrokenProcessPool as error:
+                        summaries[i] = {'run': names[i], 'status': 'killed', 'error': str(error)}
+                append_to_summary(summaries[i], runs[i], summary_address, columns)
+            pending = []
+        else:
+            killed = []
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                futures = {executor.submit(run_simulation, names[i], pickled_runs[i], pickled_build, output_folder,
+                                           elasticity_cache): i for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        summaries[i] = future.result()
+                        append_to_summary(summaries[i], runs[i], summary_address, columns)
+                    except BrokenProcessPool:
+                        # the run that killed the process is not known; all the runs in progress are attempted again
+                        killed.append(i)
+            if len(killed) > 0:
+                n_workers = max(1, n_workers // 2)
+                log.warning("A process was killed. The " + repr(len(killed)) + " runs in progress are attempted "
+                            "again in " + repr(n_workers) + " processes.")
+            pending = sorted(killed)
+
+    # the table is written again in the order of the runs
+    write_summary(summaries, runs, summary_address, columns)
+    log.info(repr(sum(summary['status'] == 'completed' for summary in summaries)) + " of " + repr(len(runs))
+             + " simulations completed.")
+
+    return summaries
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_summary_columns(runs):
+    """ This function returns the columns of the summary table of the given runs, with their parameters."""
+
+    parameters = []
+    for run in runs:
+        if isinstance(run, dict):
+            parameters += [name for name in run if name not in parameters and name not in summary_columns]
+
+    return summary_columns[:2] + parameters + summary_columns[2:]
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_summary_row(summary, run):
+    """ This function returns the row of the summary table of the given run."""
+
+    row = dict(summary)
+    if isinstance(run, dict):
+        row.update({name: value for name, value in run.items() if name not in summary_columns})
+
+    return row
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def write_summary(summaries, runs, file_address, columns):
+    """
+    This function writes the summaries of the runs of a sweep in a csv table, with the parameters of the runs given
+    as dictionaries in separate columns. The table is written to a temporary file first, so that the previous table
+    is kept if writing is interrupted.
+    """
+
+    with open(file_address + '.tmp', 'w', newline='') as output:
+        writer = csv.DictWriter(output, fieldnames=columns, restval='', extrasaction='ignore')
+        writer.writeheader()
+        for summary, run in zip(summaries, runs):
+            writer.writerow(get_summary_row(summary, run))
+    os.replace(file_address + '.tmp', file_address)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def append_to_summary(summary, run, file_address, columns):
+    """ This function appends the summary of a finished run to the csv table of the sweep."""
+
+    with open(file_address, 'a', newline='') as output:
+        csv.DictWriter(output, fieldnames=columns, restval='', extrasaction='ignore').writerow(
+            get_summary_row(summary, run))
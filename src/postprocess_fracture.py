@@ -10,14 +10,17 @@ All rights reserved. See the LICENSE.TXT file for more details.
 # local
 import logging
 import numpy as np
-from scipy.interpolate import griddata
+from scipy.spatial import Delaunay
 import dill
 import os
 import re
 import sys
 import json
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-from utility import ReadFracture
+from fracture_store import FractureStore
 from HF_reference_solutions import HF_analytical_sol, get_fracture_dimensions_analytical
 from labels import *
 # import FractureInitialization
@@ -31,10 +34,11 @@ else:
 #-----------------------------------------------------------------------------------------------------------------------
 
 
-def load_fractures(address=None, sim_name='simulation', time_period=0.0, time_srs=None, step_size=1):
+def load_fractures(address=None, sim_name='simulation', time_period=0.0, time_srs=None, step_size=1, n_workers=1):
     """
     This function returns a list of the fractures. If address and simulation name are not provided, results from the
-    default address and having the default name will be loaded.
+    default address and having the default name will be loaded. The fractures to be returned are selected from the
+    index of the saved fractures (see :py:class:`fracture_store.FractureStore`) and only these are loaded.
 
     Args:
         address (string):               -- the folder address containing the saved files. If it is not provided,
@@ -47,6 +51,8 @@ def load_fractures(address=None, sim_name='simulation', time_period=0.0, time_sr
                                            will be loaded.
         step_size (int):                -- the number of time steps to skip before loading the next fracture. If not
                                            provided, all of the fractures will be loaded.
+        n_workers (int):                -- the number of processes loading the fractures. The fractures are sent to
+                                           this process without the mesh, which is loaded once and shared.
 
     Returns:
         fracture_list(list):            -- a list of fractures.
@@ -55,17 +61,317 @@ def load_fractures(address=None, sim_name='simulation', time_period=0.0, time_sr
     log = logging.getLogger('PyFrac.load_fractures')
     log.info('Returning fractures...')
 
+    store, properties = load_fracture_index(address, sim_name)
+
+    time_srs = get_time_series(time_srs)
+    if time_srs is not None and len(time_srs) == 0:
+        return []
+
+    steps = select_fractures(store.get_times(), time_period, time_srs, step_size)
+    if n_workers > 1:
+        fracture_list = apply_to_saved_fractures(detach_mesh, store, steps, n_workers)
+        for Fr, step in zip(fracture_list, steps):
+            Fr.mesh = store.get_mesh(store.steps[step]['mesh'])
+    else:
+        fracture_list = []
+        for step in steps:
+            log.info('Returning fracture at ' + repr(store.steps[step]['time']) + ' s')
+            fracture_list.append(store.load(step))
+
+    if len(fracture_list) == 0:
+        raise ValueError("Fracture list is empty")
+
+    return fracture_list, properties
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def iterate_fractures(address=None, sim_name='simulation', time_period=0.0, time_srs=None, step_size=1):
+    """
+    This function is a generator variant of :py:func:`load_fractures`. The selected fractures are loaded one at a time
+    when they are requested, so that only the fractures kept by the caller stay in memory. The meshes are shared
+    between the loaded fractures.
+
+    Args:
+        address (string):               -- the folder address containing the saved files. If it is not provided,
+                                           simulation from the default folder (_simulation_data_PyFrac) will be loaded.
+        sim_name (string):              -- the simulation name from which the fractures are to be loaded.
+        time_period (float):            -- time period between two successive fractures to be loaded. if not provided,
+                                           all fractures will be loaded.
+        time_srs (ndarray):             -- if provided, the fracture stored at the closest time after the given times
+                                           will be loaded.
+        step_size (int):                -- the number of time steps to skip before loading the next fracture.
+
+    Yields:
+        Fracture:                       -- the selected fractures, in the order of time.
+
+    """
+    log = logging.getLogger('PyFrac.iterate_fractures')
+
+    store = load_fracture_index(address, sim_name)[0]
+    for step in select_fractures(store.get_times(), time_period, get_time_series(time_srs), step_size):
+        log.debug('Returning fracture at ' + repr(store.steps[step]['time']) + ' s')
+        yield store.load(step)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def map_fractures(func, address=None, sim_name='simulation', time_period=0.0, time_srs=None, step_size=1, n_workers=1):
+    """
+    This function applies the given function to each of the selected saved fractures. With more than one worker, the
+    fractures are loaded and the function is applied in a pool of processes, and only the results are returned to
+    this process. The given function should then be picklable (e.g. a function defined at the top level of a module or
+    a functools.partial of it).
+
+    Args:
+        func (callable):                -- the function to be applied, taking a fracture as argument.
+        address (string):               -- the folder address containing the saved files. If it is not provided,
+                                           simulation from the default folder (_simulation_data_PyFrac) will be loaded.
+        sim_name (string):              -- the simulation name from which the fractures are to be loaded.
+        time_period (float):            -- time period between two successive fractures to be loaded. if not provided,
+                                           all fractures will be loaded.
+        time_srs (ndarray):             -- if provided, the fracture stored at the closest time after the given times
+                                           will be loaded.
+        step_size (int):                -- the number of time steps to skip before loading the next fracture.
+        n_workers (int):                -- the number of processes in which the fractures are loaded.
+
+    Returns:
+        results (list):                 -- the values returned by the function for each of the selected fractures, in
+                                           the order of time.
+
+    """
+
+    store = load_fracture_index(address, sim_name)[0]
+    steps = select_fractures(store.get_times(), time_period, get_time_series(time_srs), step_size)
+
+    return apply_to_saved_fractures(func, store, steps, n_workers)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_saved_fracture_variable(variable, address=None, sim_name='simulation', time_period=0.0, time_srs=None,
+                                step_size=1, edge=4, return_time=False, n_workers=1):
+    """
+    This function returns the required variable from the selected saved fractures (see :py:func:`load_fractures`),
+    without keeping the fractures in memory. With more than one worker, the variable is extracted in a pool of
+    processes and only the variable is sent to this process.
+
+    Args:
+        variable (string):              -- the variable to be extracted. See :py:data:`labels.supported_variables` of
+                                           the :py:mod:`labels` module for a list of supported variables.
+        address (string):               -- the folder address containing the saved files.
+        sim_name (string):              -- the simulation name from which the fractures are to be loaded.
+        time_period (float):            -- time period between two successive fractures to be loaded.
+        time_srs (ndarray):             -- if provided, the fracture stored at the closest time after the given times
+                                           will be loaded.
+        step_size (int):                -- the number of time steps to skip before loading the next fracture.
+        edge (int):                     -- the edge of the cell for the variables evaluated on the cell edges (see
+                                           :py:func:`get_fracture_variable`).
+        return_time (bool):             -- if True, the times at which the fractures are stored will also be returned.
+        n_workers (int):                -- the number of processes in which the fractures are loaded.
+
+    Returns:
+        - variable_list (list)          -- a list containing the extracted variable from each of the fracture.
+        - time_srs (list)               -- a list of times at which the fractures are stored.
+
+    """
+
+    results = map_fractures(partial(get_variable_and_time, variable=variable, edge=edge), address, sim_name,
+                            time_period, time_srs, step_size, n_workers)
+    variable_list = [result[0] for result in results]
+
+    if return_time:
+        return variable_list, [result[1] for result in results]
+    else:
+        return variable_list
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_fracture_variable_array(variable, address=None, sim_name='simulation', time_period=0.0, time_srs=None,
+                                step_size=1, edge=4, n_workers=1, use_cache=True):
+    """
+    This function returns a variable evaluated on the cells of the mesh (e.g. the width or the pressure) for the
+    selected saved fractures as a single array, with the time along the first axis and the cells along the second. The
+    variable for all of the saved fractures is cached in a numpy file in the simulation folder, and is memory mapped in
+    the subsequent calls instead of loading the fractures again. The cache is rebuilt if the saved fractures have
+    changed since it was written (see :py:meth:`fracture_store.FractureStore.get_signature`). If the mesh changes during the simulation (e.g. with remeshing), the rows of the smaller
+    meshes are padded with nan and the mesh of each row is given by the returned mesh ids (see
+    :py:meth:`fracture_store.FractureStore.get_mesh`).
+
+    Args:
+        variable (string):              -- the variable to be extracted. It should be evaluated on the cells of the
+                                           mesh. See :py:data:`labels.supported_variables` of the :py:mod:`labels`
+                                           module for a list of supported variables.
+        address (string):               -- the folder address containing the saved files.
+        sim_name (string):              -- the simulation name from which the fractures are to be loaded.
+        time_period (float):            -- time period between two successive fractures to be loaded.
+        time_srs (ndarray):             -- if provided, the fracture stored at the closest time after the given times
+                                           will be loaded.
+        step_size (int):                -- the number of time steps to skip before loading the next fracture.
+        edge (int):                     -- the edge of the cell for the variables evaluated on the cell edges (see
+                                           :py:func:`get_fracture_variable`).
+        n_workers (int):                -- the number of processes in which the fractures are loaded to build the
+                                           cache.
+        use_cache (bool):               -- if False, the cache is neither read nor written.
+
+    Returns:
+        - values (ndarray)              -- the variable with the shape (number of times, number of cells). If all of
+                                           the saved fractures are selected, the cache is returned as a read-only
+                                           memory map.
+        - time_srs (ndarray)            -- the times of the selected fractures.
+        - mesh_ids (ndarray)            -- the ids of the meshes of the selected fractures in the store.
+
+    """
+    log = logging.getLogger('PyFrac.get_fracture_variable_array')
+
+    store = load_fracture_index(address, sim_name)[0]
+    n_steps = len(store.steps)
+    cache_file = store.folder + 'variable_cache_' + variable.replace(' ', '_') + '_' + repr(edge) + '.npy'
+    # the signature of the fractures from which the cache is extracted is kept in a separate file
+    signature_file = cache_file[:-4] + '.signature'
+    signature = store.get_signature()
+
+    values = None
+    if use_cache and os.path.isfile(cache_file) and os.path.isfile(signature_file):
+        with open(signature_file, 'r') as inp:
+            if inp.read() == signature:
+                values = np.load(cache_file, mmap_mode='r')
+            else:
+                log.info('The cache of ' + variable + ' is out of date.')
+
+    if values is None:
+        log.info('Extracting ' + variable + ' from the saved fractures...')
+        n_cells = max(store.get_mesh(mesh_id).NumberOfElts for mesh_id in set(step['mesh'] for step in store.steps))
+        if use_cache and os.access(store.folder, os.W_OK):
+            # the cache is written to a temporary file and moved once complete
+            values = np.lib.format.open_memmap(cache_file + '.tmp', mode='w+', dtype=np.float64,
+                                               shape=(n_steps, n_cells))
+        else:
+            values = np.empty((n_steps, n_cells), dtype=np.float64)
+
+        get_variable = partial(get_cell_variable, variable=variable, edge=edge)
+        chunk = max(64, 16 * n_workers)
+        try:
+            for start in range(0, n_steps, chunk):
+                rows = apply_to_saved_fractures(get_variable, store, list(range(start, min(start + chunk, n_steps))),
+                                                n_workers)
+                for i, row in enumerate(rows):
+                    values[start + i, :len(row)] = row
+                    values[start + i, len(row):] = np.nan
+        except Exception:
+            if isinstance(values, np.memmap):
+                del values
+                os.remove(cache_file + '.tmp')
+            raise
+
+        if isinstance(values, np.memmap):
+            values.flush()
+            del values
+            os.replace(cache_file + '.tmp', cache_file)
+            with open(signature_file, 'w') as output:
+                output.write(signature)
+            values = np.load(cache_file, mmap_mode='r')
+
+    times = store.get_times()
+    mesh_ids = np.asarray([step['mesh'] for step in store.steps], dtype=int)
+
+    steps = select_fractures(times, time_period, get_time_series(time_srs), step_size)
+    if len(steps) == n_steps:
+        return values, times, mesh_ids
+    else:
+        return values[steps], times[steps], mesh_ids[steps]
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_cell_variable(fracture, variable, edge=4):
+    """ This function returns the required variable evaluated on the cells of the mesh of the given fracture."""
+
+    value = get_fracture_variable([fracture], variable, edge=edge)[0]
+    if np.shape(value) != (fracture.mesh.NumberOfElts,):
+        raise ValueError('The variable ' + variable + ' is not evaluated on the cells of the mesh.')
+
+    return value
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_variable_and_time(fracture, variable, edge=4):
+    """ This function returns the required variable from the given fracture, along with the time of the fracture."""
+
+    return get_fracture_variable([fracture], variable, edge=edge)[0], fracture.time
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def detach_mesh(fracture):
+    """ This function removes the mesh from the given fracture, so that it is not sent back from the workers."""
+
+    fracture.mesh = None
+    return fracture
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+# the store opened in each of the worker processes
+worker_store = None
+
+def set_worker_store(store):
+    """ This function sets the store of the saved fractures in a worker process."""
+
+    global worker_store
+    worker_store = store
+
+
+def apply_to_worker_fracture(func, step):
+    """ This function applies the given function to a saved fracture in a worker process."""
+
+    return func(worker_store.load(step))
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def apply_to_saved_fractures(func, store, steps, n_workers=1):
+    """
+    This function applies the given function to the given saved fractures.
+
+    Args:
+        func (callable):                -- the function to be applied, taking a fracture as argument.
+        store (FractureStore):          -- the store with the saved fractures.
+        steps (list):                   -- the positions of the fractures in the index of the store.
+        n_workers (int):                -- the number of processes in which the fractures are loaded.
+
+    Returns:
+        results (list):                 -- the values returned by the function, in the order of the given steps.
+
+    """
+
+    if n_workers <= 1 or len(steps) <= 1:
+        return [func(store.load(step)) for step in steps]
+
+    # the store (with the index and the meshes) is sent once to each of the workers
+    chunk_size = max(1, len(steps) // (4 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=set_worker_store, initargs=(store,)) as executor:
+        return list(executor.map(partial(apply_to_worker_fracture, func), steps, chunksize=chunk_size))
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def load_fracture_index(address=None, sim_name='simulation'):
+    """
+    This function returns the index of the fractures saved in a simulation, along with the properties of the
+    simulation. If the fractures were saved without an index, they are indexed (see
+    :py:meth:`fracture_store.FractureStore.index_pickled_fractures`).
+
+    Args:
+        address (string):               -- the folder address containing the saved files. If it is not provided,
+                                           simulation from the default folder (_simulation_data_PyFrac) will be loaded.
+        sim_name (string):              -- the simulation name. If the time stamp is not included, the latest
+                                           simulation with the given name is loaded.
+
+    Returns:
+        - store (FractureStore)         -- the store with the saved fractures.
+        - properties (tuple)            -- the properties of the simulation.
+
+    """
+
     if address is None:
         address = '.' + slash + '_simulation_data_PyFrac'
 
     if address[-1] != slash:
         address = address + slash
 
-    if isinstance(time_srs, float) or isinstance(time_srs, int):
-        time_srs = np.array([time_srs])
-    elif isinstance(time_srs, list):
-        time_srs = np.array(time_srs)
-
     if re.match('\d+-\d+-\d+__\d+_\d+_\d+', sim_name[-20:]):
         sim_full_name = sim_name
     else:
@@ -87,51 +393,74 @@ def load_fractures(address=None, sim_name='simulation', time_period=0.0, time_sr
     except FileNotFoundError:
         raise SystemExit('Data not found. The address might be incorrect')
 
+    if FractureStore.exists(sim_full_path):
+        store = FractureStore(sim_full_path)
+    else:
+        store = FractureStore.index_pickled_fractures(sim_full_path, sim_full_name)
+
+    return store, properties
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_time_series(time_srs):
+    """ This function converts the given time or times to an array."""
+
+    if isinstance(time_srs, float) or isinstance(time_srs, int):
+        time_srs = np.array([time_srs])
+    elif isinstance(time_srs, list):
+        time_srs = np.array(time_srs)
+
+    return time_srs
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def select_fractures(times, time_period=0.0, time_srs=None, step_size=1):
+    """
+    This function selects the saved fractures to be loaded from their times.
+
+    Args:
+        times (ndarray):                -- the times of the saved fractures.
+        time_period (float):            -- time period between two successive selected fractures.
+        time_srs (ndarray):             -- if provided, the fracture saved at the closest time after each of the given
+                                           times is selected.
+        step_size (int):                -- the number of saved fractures to skip before selecting the next fracture.
+
+    Returns:
+        selected (list):                -- the positions of the selected fractures in the given times.
+
+    """
+
     fileNo = 0
     next_t = 0.0
     t_srs_indx = 0
-    fracture_list = []
+    selected = []
 
     t_srs_given = isinstance(time_srs, np.ndarray) #time series is given
     if t_srs_given:
         if len(time_srs) == 0:
-            return fracture_list
+            return selected
         next_t = time_srs[t_srs_indx]
 
-    # time at wich the first fracture file was modified
-    while fileNo < 5000:
-
-        # trying to load next file. exit loop if not found
-        try:
-            ff = ReadFracture(sim_full_path + slash + sim_full_name + '_file_' + repr(fileNo))
-        except FileNotFoundError:
-            break
-
-        fileNo += step_size
-
-        if 1. - next_t / ff.time >= -1e-8:
-            # if the current fracture time has advanced the output time period
-            log.info('Returning fracture at ' + repr(ff.time) + ' s')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while fileNo < len(times):
+            ff_time = times[fileNo]
 
-            fracture_list.append(ff)
+            if 1. - next_t / ff_time >= -1e-8:
+                # if the current fracture time has advanced the output time period
+                selected.append(fileNo)
 
-            if t_srs_given:
-                if t_srs_indx < len(time_srs) - 1:
-                    t_srs_indx += 1
-                    next_t = time_srs[t_srs_indx]
-                if ff.time > max(time_srs):
-                    break
-            else:
-                next_t = ff.time + time_period
-
-    if fileNo >= 5000:
-        raise SystemExit('too many files.')
+                if t_srs_given:
+                    if t_srs_indx < len(time_srs) - 1:
+                        t_srs_indx += 1
+                        next_t = time_srs[t_srs_indx]
+                    if ff_time > max(time_srs):
+                        break
+                else:
+                    next_t = ff_time + time_period
 
-    if len(fracture_list) == 0:
-        raise ValueError("Fracture list is empty")
-
-    return fracture_list, properties
+            fileNo += step_size
 
+    return selected
 
 #-----------------------------------------------------------------------------------------------------------------------
 
@@ -436,11 +765,7 @@ def get_fracture_variable_at_point(fracture_list, variable, point, edge=4, retur
     else:
         for i in range(len(fracture_list)):
             if variable in bidimensional_variables:
-                value_point = griddata(fracture_list[i].mesh.CenterCoor,
-                                       var_values[i],
-                                       point,
-                                       method='linear',
-                                       fill_value=np.nan)
+                value_point = interpolate_on_mesh(fracture_list[i].mesh, var_values[i], point)
                 if np.isnan(value_point):
                     log.warning('Point outside fracture.')
 
@@ -454,6 +779,71 @@ def get_fracture_variable_at_point(fracture_list, variable, point, edge=4, retur
 
 #-----------------------------------------------------------------------------------------------------------------------
 
+# the triangulations of the meshes and the interpolation stencils of the query points, kept as long as the meshes
+interpolation_cache = weakref.WeakKeyDictionary()
+
+def get_interpolation_stencil(mesh, points):
+    """
+    This function returns the stencil to linearly interpolate the values on the cell centers of the given mesh at the
+    given points. The interpolation is the same as with scipy.interpolate.griddata (linear interpolation on the
+    Delaunay triangulation of the cell centers), but the triangulation of the mesh and the stencil of the points are
+    evaluated once and cached, so that the values of many fractures on the same mesh are interpolated with a gather.
+
+    Args:
+        mesh (CartesianMesh):       -- the mesh on the cell centers of which the values are given.
+        points (ndarray):           -- the points at which the values are interpolated ([x, y] or an array of them).
+
+    Returns:
+        - indices (ndarray)         -- the cells of the triangles containing the points, with the shape (points, 3).
+        - weights (ndarray)         -- the barycentric weights of the cells. They are nan for the points outside the
+                                       triangulation.
+
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape((-1, 2))
+    if mesh not in interpolation_cache:
+        interpolation_cache[mesh] = {'triangulation': Delaunay(mesh.CenterCoor), 'stencils': {}}
+    cache = interpolation_cache[mesh]
+
+    key = points.tobytes()
+    if key not in cache['stencils']:
+        triangulation = cache['triangulation']
+        simplex = triangulation.find_simplex(points)
+        transform = triangulation.transform[simplex]
+        barycentric = np.einsum('ijk,ik->ij', transform[:, :2], points - transform[:, 2])
+        weights = np.hstack((barycentric, 1 - np.sum(barycentric, axis=1, keepdims=True)))
+        weights[simplex < 0] = np.nan
+
+        # the stencils of only a few sets of points are kept for each mesh
+        if len(cache['stencils']) >= 32:
+            cache['stencils'].clear()
+        cache['stencils'][key] = (triangulation.simplices[simplex], weights)
+
+    return cache['stencils'][key]
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def interpolate_on_mesh(mesh, values, points):
+    """
+    This function linearly interpolates the values on the cell centers of the given mesh at the given points (see
+    :py:func:`get_interpolation_stencil`).
+
+    Args:
+        mesh (CartesianMesh):       -- the mesh on the cell centers of which the values are given.
+        values (ndarray):           -- the values on the cell centers.
+        points (ndarray):           -- the points at which the values are interpolated ([x, y] or an array of them).
+
+    Returns:
+        ndarray:                    -- the interpolated values, nan for the points outside the mesh.
+
+    """
+
+    indices, weights = get_interpolation_stencil(mesh, points)
+
+    return np.sum(np.asarray(values)[indices] * weights, axis=1)
+
+#-----------------------------------------------------------------------------------------------------------------------
+
 def get_fracture_variable_slice_interpolated(var_value, mesh, point1=None, point2=None):
     """
     This function returns the given fracture variable on a given slice of the domain. Two points are to be given that
@@ -521,11 +911,7 @@ def get_fracture_variable_slice_interpolated(var_value, mesh, point1=None, point
     sampling_points = np.hstack((np.linspace(point1[0], point2[0], 105).reshape((105, 1)),
                                  np.linspace(point1[1], point2[1], 105).reshape((105, 1))))
 
-    value_samp_points = griddata(mesh.CenterCoor,
-                                 var_value,
-                                 sampling_points,
-                                 method='linear',
-                                 fill_value=np.nan)
+    value_samp_points = interpolate_on_mesh(mesh, var_value, sampling_points)
 
     sampling_line_lft = ((sampling_points[:52, 0] - sampling_points[52, 0]) ** 2 +
                          (sampling_points[:52, 1] - sampling_points[52, 1]) ** 2) ** 0.5
@@ -891,11 +1277,7 @@ def write_fracture_variable_csv_file(file_name, fracture_list, variable, point=N
         return_list = var_values
     else:
         for i in range(len(fracture_list)):
-            value_point = griddata(fracture_list[i].mesh.CenterCoor,
-                                   var_values[i],
-                                   point,
-                                   method='linear',
-                                   fill_value=np.nan)
+            value_point = interpolate_on_mesh(fracture_list[i].mesh, var_values[i], point)
             if np.isnan(value_point):
                 log.warning('Point outside fracture.')
             return_list.append(value_point[0])
@@ -99,6 +99,9 @@ def get_performance_variable(perf_data, iteration, variable):
     for i_node, node in enumerate(perf_data):
         if iteration == 'time step':
             append_variable(node, variable)
+        elif iteration == 'save to disk':
+            for i_save, save_node in enumerate(node.saveToDisk_data):
+                append_variable(save_node, variable)
         else:
             for i_TS_attempt, TS_attempt in enumerate(node.attempts_data):
                 if iteration == 'time step attempt':
@@ -135,7 +138,7 @@ def get_performance_variable(perf_data, iteration, variable):
                                     append_variable(tipInv_itr, variable)
                                 else:
                                     for i_brentq_itr, brentq_itr in enumerate(tipInv_itr.brentMethod_data):
-                                        if iteration == 'Brent method':
+                                        if iteration == brentq_itr.itrType:
                                             append_variable(brentq_itr, variable)
 
                             for i_tipWidth_itr, tipWidth_itr in enumerate(extFP_inj.tipWidth_data):
@@ -143,7 +146,7 @@ def get_performance_variable(perf_data, iteration, variable):
                                     append_variable(tipWidth_itr, variable)
                                 else:
                                     for i_brentq_itr, brentq_itr in enumerate(tipWidth_itr.brentMethod_data):
-                                        if iteration == 'Brent method':
+                                        if iteration == brentq_itr.itrType:
                                             append_variable(brentq_itr, variable)
 
                             for i_nonLinSolve, nonLinSolve_itr in enumerate(extFP_inj.nonLinSolve_data):
@@ -182,12 +185,16 @@ def plot_performance(address, variable, sim_name='simulation', fig=None, plot_pr
             ===============================     ================================================
             'time step attempts'                the number of attempts taken for the time step
             'fracture front iterations'         fracture front iterations (including the fixed front iteration)
-            'tip inversion iterations'          the iterations taken by the brentq method to converge while inverting \
-                                                the tip asymptote
+            'tip inversion iterations'          the iterations taken by the root finding method to converge while \
+                                                inverting the tip asymptote (summed over the ribbon cells)
+            'projection iterations'             the iterations on the projection of the ribbon cells on the front in \
+                                                each front iteration (anisotropic toughness or TI elasticity)
             'width constraint iterations'       the iterations taken to converge on closed cells
             'Picard iterations'                 the number of times the linear system is solved
             'CPU time: time steps'              the CPU time taken by each of the time steps
             'CPU time: time step attempts'      the CPU time taken by each of the time step attempt
+            'CPU time: saving to disk'          the time for which the time stepping is held to save the fracture
+            'save to disk latency'              the time from the request to save the fracture to its writing on disk
             ===============================     ================================================
          sim_name(string):              -- the name of the simulation.
          fig (Figure):                  -- a figure to superimpose on
@@ -203,7 +210,12 @@ def plot_performance(address, variable, sim_name='simulation', fig=None, plot_pr
     elif variable in ['fracture front iterations']:
         var_list, time_list, N_list = get_performance_variable(perf_data, 'time step attempt', 'iterations')
     elif variable in ['tip inversion iterations']:
-        var_list, time_list, N_list = get_performance_variable(perf_data, 'Brent method', 'iterations')
+        var_list, time_list, N_list = get_performance_variable(perf_data, 'Chandrupatla method', 'iterations')
+        if len(var_list) == 0:
+            # the root finding was done with the Brent method in the earlier versions
+            var_list, time_list, N_list = get_performance_variable(perf_data, 'Brent method', 'iterations')
+    elif variable in ['projection iterations']:
+        var_list, time_list, N_list = get_performance_variable(perf_data, 'extended front', 'projectionItrs')
     elif variable in ['width constraint iterations']:
         var_list, time_list, N_list = get_performance_variable(perf_data, 'nonlinear system solve', 'iterations')
     elif variable in ['Picard iterations']:
@@ -220,6 +232,13 @@ def plot_performance(address, variable, sim_name='simulation', fig=None, plot_pr
         del time_list, N_list
         t_end_list, time_list, N_list = get_performance_variable(perf_data, 'time step attempt', 'CpuTime_end')
         var_list = [i - j for i, j in zip(t_end_list, t_start_list)]
+    elif variable in ['CPU time: saving to disk']:
+        var_list, time_list, N_list = get_performance_variable(perf_data, 'save to disk', 'blockingTime')
+    elif variable in ['save to disk latency']:
+        t_start_list, time_list, N_list = get_performance_variable(perf_data, 'save to disk', 'CpuTime_start')
+        del time_list, N_list
+        t_end_list, time_list, N_list = get_performance_variable(perf_data, 'save to disk', 'CpuTime_end')
+        var_list = [i - j for i, j in zip(t_end_list, t_start_list)]
     else:
         raise ValueError("Cannot recognize the required variable.")
 
@@ -312,6 +331,7 @@ def print_performance_data(address, sim_name=None):
             for i_extFP_inj, extFP_inj in enumerate(TS_attempt.extendedFront_data):
                 f.write("\t--->extended footprint injection" + '\n')
                 f.write("\t\tCPU time taken: " + repr(extFP_inj.CpuTime_end - extFP_inj.CpuTime_start) + " seconds" + '\n')
+                f.write("\t\tnumber of projection iterations = " + repr(getattr(extFP_inj, 'projectionItrs', None)) + '\n')
 
                 for i_tipInv_itr, tipInv_itr in enumerate(extFP_inj.tipInv_data):
                     f.write("\t\t--->tip inversion" + '\n')
@@ -319,8 +339,10 @@ def print_performance_data(address, sim_name=None):
                     f.write("\t\t\tnumber of root findings = " + repr(tipInv_itr.iterations) + '\n')
 
                     for i_brentq_itr, brentq_itr in enumerate(tipInv_itr.brentMethod_data):
-                        f.write("\t\t\t--->root finding through brentq method: " + repr(i_brentq_itr + 1) + '\n')
+                        f.write("\t\t\t--->root finding through " + brentq_itr.itrType + ": " + repr(i_brentq_itr + 1) + '\n')
                         f.write("\t\t\t\tCPU time taken: " + repr(brentq_itr.CpuTime_end - brentq_itr.CpuTime_start) + " seconds" + '\n')
+                        if brentq_itr.itrType == 'Chandrupatla method':
+                            f.write("\t\t\t\tnumber of roots = " + repr(brentq_itr.NumbOfElts) + '\n')
                         f.write("\t\t\t\tnumber of iterations = " + repr(brentq_itr.iterations) + '\n')
 
                 for i_tipWidth_itr, tipWidth_itr in enumerate(extFP_inj.tipWidth_data):
@@ -48,6 +48,10 @@ class MaterialProperties:
         free_surf_depth (float):        -- the depth of the fracture from the free surface.
         TI_plane_angle (float):         -- the angle of the plane of the fracture with respect to the free surface.
         minimum_width (float):          -- minimum width corresponding to the asperity of the material.
+        vectorized_funcs (bool):        -- if True, the functions giving the toughness, the confining stress and the
+                                           leak off coefficient are taken to accept arrays of coordinates (or of angles
+                                           in the case of anisotropic toughness) and are evaluated at once for all of
+                                           the points, instead of being called separately for each of them.
 
 
     Attributes:
@@ -75,13 +79,14 @@ class MaterialProperties:
         ClFunc (function):          -- the function giving the in Carter's leak off coefficient on the domain. It should
                                         takes two arguments (x, y) to give the coefficient on these coordinates. It is
                                         also used to get the leak off coefficient if the domain is re-meshed.
+        vectorizedFuncs (bool):     -- if True, the functions above are evaluated at once on arrays of coordinates.
 
     """
 
     def __init__(self, Mesh, Eprime, toughness=0., Carters_coef=0., confining_stress=0., grain_size=0., K1c_func=None,
                  anisotropic_K1c=False, confining_stress_func = None, Carters_coef_func = None, TI_elasticity=False,
                  Cij = None, free_surf=False, free_surf_depth=1.e300, TI_plane_angle=0., minimum_width=1e-6,
-                 pore_pressure=-1.e100):
+                 pore_pressure=-1.e100, vectorized_funcs=False):
         """
         The constructor function
         """
@@ -165,6 +170,7 @@ class MaterialProperties:
         self.K1cFunc = K1c_func
         self.SigmaOFunc = confining_stress_func
         self.ClFunc = Carters_coef_func
+        self.vectorizedFuncs = vectorized_funcs
 
         # overriding with the values evaluated by the given functions
         if (K1c_func is not None) or (confining_stress_func is not None) or (Carters_coef_func is not None):
@@ -187,34 +193,52 @@ class MaterialProperties:
         """
 
         if self.K1cFunc is not None and not self.anisotropic_K1c:
-            self.K1c = np.empty((mesh.NumberOfElts,), dtype=np.float64)
-            for i in range(mesh.NumberOfElts):
-                self.K1c[i] = self.K1cFunc(mesh.CenterCoor[i, 0], mesh.CenterCoor[i, 1])
+            self.K1c = self.evaluate_on_points(self.K1cFunc, mesh.CenterCoor[:, 0], mesh.CenterCoor[:, 1])
             self.Kprime = self.K1c * ((32 / math.pi) ** 0.5)
         elif self.K1cFunc is not None and self.anisotropic_K1c:
-            self.K1c = np.empty((mesh.NumberOfElts,), dtype=np.float64)
-            for i in range(mesh.NumberOfElts):
-                self.K1c[i] = self.K1cFunc(np.pi/2)
+            self.K1c = np.full((mesh.NumberOfElts,), self.K1cFunc(np.pi/2), dtype=np.float64)
             self.Kprime = self.K1c * ((32 / math.pi) ** 0.5)
         else:
             self.Kprime = np.full((mesh.NumberOfElts,), self.Kprime[0])
 
         if self.SigmaOFunc is not None:
-            self.SigmaO = np.empty((mesh.NumberOfElts,), dtype=np.float64)
-            for i in range(mesh.NumberOfElts):
-                self.SigmaO[i] = self.SigmaOFunc(mesh.CenterCoor[i, 0], mesh.CenterCoor[i, 1])
+            self.SigmaO = self.evaluate_on_points(self.SigmaOFunc, mesh.CenterCoor[:, 0], mesh.CenterCoor[:, 1])
         else:
             self.SigmaO = np.full((mesh.NumberOfElts,), self.SigmaO[0])
 
         if self.ClFunc is not None:
-            self.Cl = np.empty((mesh.NumberOfElts,), dtype=np.float64)
-            self.Cprime = np.empty((mesh.NumberOfElts,), dtype=np.float64)
-            for i in range(mesh.NumberOfElts):
-                self.Cl[i] = self.ClFunc(mesh.CenterCoor[i, 0], mesh.CenterCoor[i, 1])
+            self.Cl = self.evaluate_on_points(self.ClFunc, mesh.CenterCoor[:, 0], mesh.CenterCoor[:, 1])
             self.Cprime = 2 * self.Cl
         else:
             self.Cprime = np.full((mesh.NumberOfElts,), self.Cprime[0])
 
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def evaluate_on_points(self, func, *coordinates):
+        """
+        This function evaluates one of the functions given in the MaterialProperties object (e.g. the toughness) on the
+        given points. The function is called once with the arrays of the coordinates if it is declared to be
+        vectorized (see vectorized_funcs), and separately for each of the points otherwise.
+
+        Arguments:
+            func (function):            -- the function to be evaluated.
+            coordinates (ndarray):      -- the coordinates (x and y, or the angle in the case of anisotropic
+                                           toughness) of the points.
+
+        Returns:
+            values (ndarray):           -- the values of the function on the given points.
+        """
+
+        n_points = len(coordinates[0])
+        if self.vectorizedFuncs:
+            return np.asarray(func(*coordinates), dtype=np.float64) * np.ones((n_points,))
+
+        values = np.empty((n_points,), dtype=np.float64)
+        for i in range(n_points):
+            values[i] = func(*(coordinate[i] for coordinate in coordinates))
+
+        return values
+
 #-----------------------------------------------------------------------------------------------------------------------
 
 
@@ -604,6 +628,12 @@ class SimulationProperties:
         maxSolverItrs (int):         -- maximum iterations for the EHL iterative solver (Picard-Newton hybrid) in this
                                         case.
         maxProjItrs (int):           -- maximum iterations for the loop to find projection on the front from ribbon.
+        projAndersonDepth (int):     -- the number of previous iterations combined in the Anderson acceleration of the
+                                        loop to find projection on the front from ribbon. The history is discarded
+                                        if the residual of the loop does not decrease. If 0, the loop is a relaxed
+                                        fixed point iteration.
+        projRelaxation (float):      -- the relaxation factor of the loop to find projection on the front from
+                                        ribbon, giving the weight of the new projection in the next iterate.
         tmStpPrefactor (float):      -- factor for time-step adaptivity.
         maxTimeSteps (integer):      -- maximum number of time steps.
         finalTime (float):           -- time where the simulation ends.
@@ -644,6 +674,21 @@ class SimulationProperties:
         saveTimePeriod (float):      -- the time period after which the results are saved to disk during simulation.
         saveTSJump (int):            -- the number of time steps after which the results are saved to disk, e.g. a value
                                         of 4 will result in plotting every four time steps.
+        saveFormat (string):         -- the format in which the fractures are saved to disk. Possible options are:
+
+                                            - 'pickle' (each fracture is pickled with dill to its own file).
+                                            - 'columnar' (the fractures are saved in a FractureStore (see \
+                                              :py:class:`fracture_store.FractureStore`), with the mesh saved once and \
+                                              the fields saved only on the crack cells).
+        saveFloat32 (bool):          -- if True, the fields evaluated on the mesh are saved in single precision. Only
+                                        used with the 'columnar' format.
+        saveQueueSize (int):         -- the number of fractures that can wait to be written to disk. The fractures are
+                                        written in a background thread while the simulation advances. If the queue is
+                                        full, the simulation waits for the writer. If 0, the fractures are written
+                                        before the simulation advances.
+        checkpointTSJump (int):      -- the number of time steps after which the state of the controller is saved in
+                                        the output folder, so that the simulation can be resumed from it (see
+                                        :py:meth:`controller.Controller.resume`). If None, no checkpoint is saved.
         elastohydrSolver (string):   -- the type of solver to solve the elasto-hydrodynamic system. At the moment, two
                                         main solvers can be specified.
 
@@ -688,6 +733,12 @@ class SimulationProperties:
                                         coefficients will be taken from the tip by projections instead of taking them
                                         from the ribbon cell center. The numerical scheme as a result will become
                                         unstable due to the complexities in finding the projection
+        levelSetBandWidth (float):   -- the width (in number of cells) of the narrow band on both sides of the front
+                                        in which the level set is evaluated with the fast marching method on each
+                                        front iteration. The cells beyond the band are marked as far inside or far
+                                        outside while the front is evaluated and are stored on the fracture with the
+                                        distance clipped to the band width. If None, the level set is evaluated in the whole domain. The band
+                                        should be wide enough to contain the front advancement in a time step.
         saveReynNumb (boolean):      -- if True, the Reynold's number at each edge of the cells inside the fracture
                                         will be saved.
         saveFluidFlux (boolean):     -- if True, the fluid flux at each edge of the cells inside the fracture
@@ -698,6 +749,15 @@ class SimulationProperties:
                                         be saved.
         TI_KernelExecPath (string):  -- the folder containing the executable to calculate transverse isotropic
                                        kernel or kernel with free surface.
+        tabulatedTipInversion (bool):-- if True, the tip asymptote is inverted with tables of the dimensionless
+                                        distance from the front, precomputed at the start of the run and polished with
+                                        the Newton method. The cells outside of the range of the tables are inverted
+                                        with the root finder. Only the 'U', 'U1', 'MK', 'MDR' and 'M_MDR' tip
+                                        asymptotes are tabulated. With the 'U' and 'U1' asymptotes, the width giving
+                                        the tip volume is also evaluated from tables.
+        tipTablesFolder (string):    -- the folder in which the tables of the tip asymptotes (and of the tip volume
+                                        with the 'HBF_tab_quad' and 'PLF_tab_quad' asymptotes) are cached on disk, to be
+                                        loaded in the next runs. If None, the tables are built in each run.
         explicitProjection (bool):   -- if True, direction from last time step will be used to evaluate TI parameters.
         symmetric (bool):            -- if True, the four quadrant of the domain will be considered symmetric and only
                                         one will be solved for. The rest will be replaced by its reflection along the x
@@ -771,6 +831,8 @@ class SimulationProperties:
         self.maxFrontItrs = simul_param.max_front_itrs
         self.maxSolverItrs = simul_param.max_solver_itrs
         self.maxProjItrs = simul_param.max_proj_Itrs
+        self.projAndersonDepth = simul_param.proj_Anderson_depth
+        self.projRelaxation = simul_param.proj_relaxation
 
         # time and time stepping
         self.maxTimeSteps = simul_param.maximum_steps
@@ -803,6 +865,10 @@ class SimulationProperties:
         self.plotVar = simul_param.plot_var
         self.saveTSJump = simul_param.save_TS_jump
         self.saveTimePeriod = simul_param.save_time_period
+        self.saveFormat = simul_param.save_format
+        self.saveFloat32 = simul_param.save_float32
+        self.saveQueueSize = simul_param.save_queue_size
+        self.checkpointTSJump = simul_param.checkpoint_TS_jump
         self.plotATsolTimeSeries = simul_param.plot_at_sol_time_series
 
         # solver type
@@ -823,6 +889,8 @@ class SimulationProperties:
         self.verbositylevel = simul_param.verbosity_level
         self.log2file = simul_param.log_to_file
         self.set_tipAsymptote(simul_param.tip_asymptote)
+        self.tabulatedTipInversion = simul_param.tabulated_tip_inversion
+        self.tipTablesFolder = simul_param.tip_tables_folder
         self.saveRegime = simul_param.save_regime
         self.enableRemeshing = simul_param.enable_remeshing
         self.remeshFactor = simul_param.remesh_factor
@@ -838,6 +906,7 @@ class SimulationProperties:
         self.frontAdvancing = simul_param.front_advancing
         self.collectPerfData = simul_param.collect_perf_data
         self.paramFromTip = simul_param.param_from_tip
+        self.levelSetBandWidth = simul_param.level_set_band_width
         if simul_param.param_from_tip:
             raise ValueError("Parameters from tip not yet supported!")
         self.saveReynNumb = simul_param.save_ReyNumb
@@ -979,10 +1048,14 @@ class SimulationProperties:
                                             - PLF_num_quad (power law fluid, see Dontsov and \
                                                   Kresse 2017; the tip volume is evaluated with numerical quadrature of the\ 
                                                   approximate function, which makes it very slow)
+                                            - HBF_tab_quad and PLF_tab_quad (as HBF_num_quad and PLF_num_quad, \
+                                                  with the integrals of the width interpolated from tables built \
+                                                  once for the flow index of the fluid)
                                             = PLF_M (power law fluid in viscosity storage regime; see Desroche et al.)
         """
         tipAssymptOptions = ["K", "M", "Mt", "U", "U1", "MK", "MDR", "M_MDR", "HBF", "HBF_aprox", 
-                             "HBF_num_quad", "PLF", "PLF_aprox", "PLF_num_quad", "PLF_M"]
+                             "HBF_num_quad", "HBF_tab_quad", "PLF", "PLF_aprox", "PLF_num_quad", "PLF_tab_quad",
+                             "PLF_M"]
         if tip_asymptote in tipAssymptOptions:  # check if tip asymptote matches any option
             self.__tipAsymptote = tip_asymptote
         else: # error
@@ -1168,6 +1241,8 @@ class IterationProperties:
                                     - 'width constraint iteration'
                                     - 'linear system solve'
                                     - 'Brent method'
+                                    - 'Chandrupatla method'
+                                    - 'save to disk'
     """
 
     def __init__(self, itr_type="not initialized"):
@@ -1184,12 +1259,14 @@ class IterationProperties:
         # sub-iterations data
         if itr_type == 'time step':
             self.attempts_data = []
+            self.saveToDisk_data = []
         elif itr_type == 'time step attempt':
             self.sameFront_data = []
             self.extendedFront_data = []
         elif itr_type == 'same front':
             self.nonLinSolve_data = []
         elif itr_type == 'extended front':
+            self.projectionItrs = 0
             self.tipInv_data = []
             self.tipWidth_data = []
             self.nonLinSolve_data = []
@@ -1206,6 +1283,11 @@ class IterationProperties:
             pass
         elif itr_type == 'Brent method':
             pass
+        elif itr_type == 'Chandrupatla method':
+            pass
+        elif itr_type == 'save to disk':
+            # the time taken by the solver to queue the fracture. The fracture is written at CpuTime_end.
+            self.blockingTime = None
         else:
             raise ValueError("The given iteration type is not supported!")
 
@@ -10,11 +10,12 @@ All rights reserved. See the LICENSE.TXT file for more details.
 
 # local imports
 import logging
-from volume_integral import leak_off_stagnant_tip, find_corresponding_ribbon_cell
+from volume_integral import leak_off_stagnant_tip, leak_off_channel, arrival_time_new_channel, \
+    find_corresponding_ribbon_cell
 from symmetry import get_symetric_elements, self_influence
 from tip_inversion import TipAsymInversion, StressIntensityFactor
 from elastohydrodynamic_solver import *
-from level_set import SolveFMM, reconstruct_front, reconstruct_front_LS_gradient, UpdateLists
+from level_set import SolveFMM, clip_to_band, reconstruct_front, reconstruct_front_LS_gradient, UpdateLists
 from continuous_front_reconstruction import reconstruct_front_continuous, UpdateListsFromContinuousFrontRec, you_advance_more_than_2_cells
 from properties import IterationProperties, instrument_start, instrument_close
 from anisotropy import *
@@ -153,6 +154,16 @@ def attempt_time_step(Frac, C, mat_properties, fluid_properties, sim_properties,
 
     previous_norm = 100 # initially set with a big value
 
+    # the leak-off from the channel cells is the same in all of the iterations on the front position
+    LkOff_channel = None
+    if np.sum(mat_properties.Cprime[Frac.EltChannel]) > 0:
+        LkOff_channel = leak_off_channel(Frac.EltChannel,
+                                         Frac.Tarrival,
+                                         Frac.time,
+                                         mat_properties.Cprime,
+                                         timeStep,
+                                         Frac.mesh)
+
     # Fracture front loop to find the correct front location
     while norm > sim_properties.tolFractFront:
         k = k + 1
@@ -170,7 +181,9 @@ def attempt_time_step(Frac, C, mat_properties, fluid_properties, sim_properties,
                                                           mat_properties,
                                                           fluid_properties,
                                                           sim_properties,
-                                                          perfNode_extFront)
+                                                          perfNode_extFront,
+                                                          Fr_k.fronts_dictionary,
+                                                          LkOff_channel=LkOff_channel)
 
         if exitstatus == 1:
             # norm is evaluated by dividing the difference in the area of the tip cells between two successive
@@ -241,7 +254,7 @@ def injection_same_footprint(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
     """
     log = logging.getLogger('PyFrac.injection_same_footprint')
     LkOff = np.zeros((Fr_lstTmStp.mesh.NumberOfElts,), dtype=np.float64)
-    if sum(mat_properties.Cprime[Fr_lstTmStp.EltCrack]) > 0.:
+    if np.sum(mat_properties.Cprime[Fr_lstTmStp.EltCrack]) > 0.:
         # the tip cells are assumed to be stagnant in same footprint evaluation
         LkOff[Fr_lstTmStp.EltTip] = leak_off_stagnant_tip(Fr_lstTmStp.EltTip,
                                                           Fr_lstTmStp.l,
@@ -253,11 +266,12 @@ def injection_same_footprint(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                                                           Fr_lstTmStp.mesh)
 
         # Calculate leak-off term for the channel cell
-        t_lst_min_t0 = Fr_lstTmStp.time - Fr_lstTmStp.Tarrival[Fr_lstTmStp.EltChannel]
-        t_lst_min_t0[t_lst_min_t0 < 0.] = 0.
-        t_min_t0 = t_lst_min_t0 + timeStep
-        LkOff[Fr_lstTmStp.EltChannel] = 2 * mat_properties.Cprime[Fr_lstTmStp.EltChannel] * (t_min_t0 ** 0.5 -
-                                                                                             t_lst_min_t0 ** 0.5) * Fr_lstTmStp.mesh.EltArea
+        LkOff[Fr_lstTmStp.EltChannel] = leak_off_channel(Fr_lstTmStp.EltChannel,
+                                                         Fr_lstTmStp.Tarrival,
+                                                         Fr_lstTmStp.time,
+                                                         mat_properties.Cprime,
+                                                         timeStep,
+                                                         Fr_lstTmStp.mesh)
 
     LkOff[Fr_lstTmStp.pFluid <= mat_properties.porePressure] = 0.
 
@@ -395,8 +409,76 @@ def injection_same_footprint(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
 # -----------------------------------------------------------------------------------------------------------------------
 
 
+def anderson_acceleration(x_hist, g_hist, relaxation):
+    """
+    This function gives the next iterate of the fixed point iteration x = g(x) with the Anderson acceleration (see
+    Walker and Ni, SIAM J. Numer. Anal. 2011). The relaxed iterate is corrected with the combination of the
+    differences of the last iterates minimizing the linearized residual in the least squares sense. With a single
+    iterate in the history, it reduces to the relaxed fixed point iteration.
+
+    Arguments:
+        x_hist (list):          -- the last iterates (the latest at the end).
+        g_hist (list):          -- the function g evaluated at the iterates given in x_hist.
+        relaxation (float):     -- the relaxation factor of the fixed point iteration.
+
+    Returns:
+        x_next (ndarray):       -- the next iterate.
+    """
+
+    x_next = (1 - relaxation) * x_hist[-1] + relaxation * g_hist[-1]
+
+    if len(x_hist) > 1:
+        res = np.asarray(g_hist) - np.asarray(x_hist)
+        dRes = np.diff(res, axis=0).T
+        dx = np.diff(np.asarray(x_hist), axis=0).T
+        gamma = np.linalg.lstsq(dRes, res[-1], rcond=None)[0]
+        x_next -= np.dot(dx + relaxation * dRes, gamma)
+
+    return x_next
+
+# -----------------------------------------------------------------------------------------------------------------------
+
+
+def update_projection_angles(alpha_k, projection_k, alpha_hist, projection_hist, sim_properties):
+    """
+    This function gives the next iterate of the loop finding the angles of the projections of the ribbon cells on the
+    front. The relaxed fixed point iteration is accelerated with the Anderson acceleration over the last iterates (see
+    anderson_acceleration). The history is discarded if the residual of the loop does not decrease and the angles are
+    clipped to [0, pi/2].
+
+    Arguments:
+        alpha_k (ndarray):                      -- the angles at the current iteration.
+        projection_k (ndarray):                 -- the angles of the projections on the front evaluated with the
+                                                   current angles.
+        alpha_hist (list):                      -- the angles at the previous iterations.
+        projection_hist (list):                 -- the angles of the projections at the previous iterations.
+        sim_properties (SimulationProperties):  -- the simulation parameters, giving the relaxation factor and the
+                                                   depth of the acceleration.
+
+    Returns:
+        - alpha_next (ndarray):                 -- the angles for the next iteration.
+        - alpha_hist (list):                    -- the history of the angles, including the current iteration.
+        - projection_hist (list):               -- the history of the angles of the projections.
+    """
+
+    # safeguard: the history is discarded if the residual of the fixed point iteration does not decrease
+    if len(alpha_hist) > 0 and np.linalg.norm(projection_k - alpha_k) >= np.linalg.norm(projection_hist[-1] -
+                                                                                         alpha_hist[-1]):
+        alpha_hist = []
+        projection_hist = []
+    alpha_hist = (alpha_hist + [alpha_k])[-sim_properties.projAndersonDepth - 1:]
+    projection_hist = (projection_hist + [projection_k])[-sim_properties.projAndersonDepth - 1:]
+
+    alpha_next = np.clip(anderson_acceleration(alpha_hist, projection_hist, sim_properties.projRelaxation),
+                         0., np.pi / 2)
+
+    return alpha_next, alpha_hist, projection_hist
+
+# -----------------------------------------------------------------------------------------------------------------------
+
+
 def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_properties, fluid_properties,
-                                 sim_properties, perfNode=None):
+                                 sim_properties, perfNode=None, fronts_dictionary_k=None, LkOff_channel=None):
     """
     This function takes the fracture width from the last iteration of the fracture front loop, calculates the level set
     (fracture front position) by inverting the tip asymptote and then solves the ElastoHydrodynamic equations to obtain
@@ -412,6 +494,11 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
         fluid_properties (FluidProperties ):    -- fluid properties.
         sim_properties (SimulationProperties):  -- simulation parameters.
         perfNode (IterationProperties):         -- the IterationProperties object passed to be populated with data.
+        fronts_dictionary_k (dict):             -- the fronts dictionary from the previous iteration on the front
+                                                   position. The fronts traced in it are reused by the continuous
+                                                   front reconstruction if they did not change.
+        LkOff_channel (ndarray):                -- the leak-off from the channel cells of the last time step over the
+                                                   time step. It is evaluated here if not given.
 
     Returns:
         - exitstatus (int)  possible values are
@@ -458,11 +545,22 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                                                    Fr_lstTmStp.mesh,
                                                    sgndDist_k)
                 alpha_ribbon_km1 = np.zeros(Fr_lstTmStp.EltRibbon.size, )
+                alpha_hist = []
+                projection_hist = []
             else:
-                alpha_ribbon_k = 0.3 * alpha_ribbon_k + 0.7 * projection_method(Fr_lstTmStp.EltRibbon,
-                                                                                Fr_lstTmStp.EltChannel,
-                                                                                Fr_lstTmStp.mesh,
-                                                                                sgndDist_k)
+                projection_k = projection_method(Fr_lstTmStp.EltRibbon,
+                                                 Fr_lstTmStp.EltChannel,
+                                                 Fr_lstTmStp.mesh,
+                                                 sgndDist_k)
+                if np.isnan(projection_k).any():
+                    exitstatus = 11
+                    return exitstatus, None
+
+                alpha_ribbon_k, alpha_hist, projection_hist = update_projection_angles(alpha_ribbon_k,
+                                                                                       projection_k,
+                                                                                       alpha_hist,
+                                                                                       projection_hist,
+                                                                                       sim_properties)
             if np.isnan(alpha_ribbon_k).any():
                 exitstatus = 11
                 return exitstatus, None
@@ -544,7 +642,8 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                  Fr_lstTmStp.EltChannel,
                  Fr_lstTmStp.mesh,
                  front_region[pstv_region],
-                 front_region[ngtv_region])
+                 front_region[ngtv_region],
+                 band_width=sim_properties.levelSetBandWidth)
 
         # do it only once if not anisotropic
         if not (sim_properties.paramFromTip or mat_properties.anisotropic_K1c
@@ -561,6 +660,9 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
         log.debug("iterating on projection... norm " + repr(norm))
         itr += 1
 
+    if perfNode is not None:
+        perfNode.projectionItrs = min(itr + 1, sim_properties.maxProjItrs)
+
     # if itr == sim_properties.maxProjItrs:
     #     exitstatus = 10
     #     return exitstatus, None
@@ -596,7 +698,8 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                                                                           Fr_lstTmStp.EltChannel,
                                                                           Fr_lstTmStp.mesh,
                                                                           recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge,
-                                                                          lstTmStp_EltCrack0=Fr_lstTmStp.fronts_dictionary['crackcells_0'], oldfront=Fr_lstTmStp.Ffront)
+                                                                          lstTmStp_EltCrack0=Fr_lstTmStp.fronts_dictionary['crackcells_0'], oldfront=Fr_lstTmStp.Ffront,
+                                                                          previous_fronts_dictionary=fronts_dictionary_k)
             if correct_size_of_pstv_region[2]:
                 exitstatus = 7 # You are here because the level set has negative values until the end of the mesh
                                 # or because a fictitius cell has intersected the mesh.frontlist
@@ -630,7 +733,8 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                          Fr_lstTmStp.EltCrack,
                          Fr_lstTmStp.mesh,
                          front_region[pstv_region],
-                         front_region[ngtv_region])
+                         front_region[ngtv_region],
+                         band_width=sim_properties.levelSetBandWidth)
         sgndDist_k = sgndDist_k_temp
 
         del correct_size_of_pstv_region
@@ -802,7 +906,9 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                                   stagnant=stagnant,
                                   KIPrime=KIPrime,
                                   Eprime=Eprime_tip,
-                                  Cprime=Cprime_tip) / Fr_lstTmStp.mesh.EltArea
+                                  Cprime=Cprime_tip,
+                                  tabulated=sim_properties.tabulatedTipInversion,
+                                  tables_folder=sim_properties.tipTablesFolder) / Fr_lstTmStp.mesh.EltArea
     else:
         # Calculate average width in the tip cells by integrating tip asymptote
         wTip = Integral_over_cell(EltsTipNew,
@@ -817,7 +923,9 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                                   Kprime=Kprime_tip,
                                   Eprime=Eprime_tip,
                                   Cprime=Cprime_tip,
-                                  stagnant=stagnant) / Fr_lstTmStp.mesh.EltArea
+                                  stagnant=stagnant,
+                                  tabulated=sim_properties.tabulatedTipInversion,
+                                  tables_folder=sim_properties.tipTablesFolder) / Fr_lstTmStp.mesh.EltArea
 
     # check if the tip volume has gone into negative
     smallNgtvWTip = np.where(np.logical_and(wTip < 0, wTip > -1e-4 * np.mean(wTip)))
@@ -834,7 +942,7 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
         # todo close tip width instrumentation
 
     LkOff = np.zeros((len(CellStatus),), dtype=np.float64)
-    if sum(mat_properties.Cprime[EltsTipNew]) > 0:
+    if np.sum(mat_properties.Cprime[EltsTipNew]) > 0:
         # Calculate leak-off term for the tip cell
         LkOff[EltsTipNew] = 2 * mat_properties.Cprime[EltsTipNew] * Integral_over_cell(EltsTipNew,
                                                                                        alpha_k,
@@ -849,13 +957,16 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
                                                                                        Fr_lstTmStp.TarrvlZrVrtx[
                                                                                            EltsTipNew])
 
-    if sum(mat_properties.Cprime[Fr_lstTmStp.EltChannel]) > 0:
-        # todo: no need to evaluate on each iteration. Need to decide. Evaluating here for now for better readability
-        t_lst_min_t0 = Fr_lstTmStp.time - Fr_lstTmStp.Tarrival[Fr_lstTmStp.EltChannel]
-        t_lst_min_t0[t_lst_min_t0 < 0.] = 0.
-        t_min_t0 = t_lst_min_t0 + timeStep
-        LkOff[Fr_lstTmStp.EltChannel] = 2 * mat_properties.Cprime[Fr_lstTmStp.EltChannel] * (
-                t_min_t0 ** 0.5 - t_lst_min_t0 ** 0.5) * Fr_lstTmStp.mesh.EltArea
+    if np.sum(mat_properties.Cprime[Fr_lstTmStp.EltChannel]) > 0:
+        # the leak-off from the channel cells does not change over the iterations on the front position
+        if LkOff_channel is None:
+            LkOff_channel = leak_off_channel(Fr_lstTmStp.EltChannel,
+                                             Fr_lstTmStp.Tarrival,
+                                             Fr_lstTmStp.time,
+                                             mat_properties.Cprime,
+                                             timeStep,
+                                             Fr_lstTmStp.mesh)
+        LkOff[Fr_lstTmStp.EltChannel] = LkOff_channel
         if stagnant.any():
             LkOff[EltsTipNew[stagnant]] = leak_off_stagnant_tip(EltsTipNew[stagnant],
                                                                 l_k[stagnant],
@@ -909,18 +1020,15 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
     if data[0] != None:
         fluidVel = data[0][0]
     # setting arrival time for fully traversed tip elements (new channel elements)
-    Tarrival_k = np.copy(Fr_lstTmStp.Tarrival)
-    max_Tarrival = np.nanmax(Tarrival_k)
-    nc = np.setdiff1d(EltChannel_k, Fr_lstTmStp.EltChannel)
-    new_channel = np.array([], dtype=int)
-    for i in nc:
-        new_channel = np.append(new_channel, np.where(EltsTipNew == i)[0])
-    t_enter = Fr_lstTmStp.time + timeStep - l_k[new_channel] / Vel_k[new_channel]
-    max_l = Fr_lstTmStp.mesh.hx * np.cos(alpha_k[new_channel]) + Fr_lstTmStp.mesh.hy * np.sin(alpha_k[new_channel])
-    t_leave = Fr_lstTmStp.time + timeStep - (l_k[new_channel] - max_l) / Vel_k[new_channel]
-    Tarrival_k[EltsTipNew[new_channel]] = (t_enter + t_leave) / 2
-    to_correct = np.where(Tarrival_k[EltsTipNew[new_channel]] < max_Tarrival)[0]
-    Tarrival_k[EltsTipNew[new_channel[to_correct]]] = max_Tarrival
+    # the tip cells that have become channel cells
+    new_channel = np.where(np.isin(EltsTipNew, EltChannel_k) & ~np.isin(EltsTipNew, Fr_lstTmStp.EltChannel))[0]
+    Tarrival_new_channel = arrival_time_new_channel(Fr_lstTmStp.Tarrival,
+                                                    Fr_lstTmStp.EltCrack,
+                                                    Fr_lstTmStp.time + timeStep,
+                                                    l_k[new_channel],
+                                                    alpha_k[new_channel],
+                                                    Vel_k[new_channel],
+                                                    Fr_lstTmStp.mesh)
 
     # the fracture to be returned for k plus 1 iteration
     Fr_kplus1 = copy.deepcopy(Fr_lstTmStp)
@@ -935,7 +1043,9 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
     Fr_kplus1.EltCrack = EltCrack_k
     Fr_kplus1.EltRibbon = EltRibbon_k
     Fr_kplus1.ZeroVertex = zrVertx_k
-    Fr_kplus1.sgndDist = sgndDist_k
+    # the far away distance is kept only while evaluating the front; the cells beyond the band are stored with the
+    # distance clipped to the band width
+    Fr_kplus1.sgndDist = clip_to_band(sgndDist_k, Fr_kplus1.mesh, sim_properties.levelSetBandWidth)
     Fr_kplus1.fully_traversed = fully_traversed_k
     Fr_kplus1.alpha = alpha_k[partlyFilledTip]
     Fr_kplus1.l = l_k[partlyFilledTip]
@@ -960,7 +1070,8 @@ def injection_extended_footprint(w_k, Fr_lstTmStp, C, timeStep, Qin, mat_propert
             append_to_json_file(myJsonName, Fr_kplus1.time, 'append2keyAND2list', key='coalescence_time')
 
     Fr_kplus1.FractureVolume = np.sum(Fr_kplus1.w) * Fr_kplus1.mesh.EltArea
-    Fr_kplus1.Tarrival = Tarrival_k
+    # only the arrival time of the new channel cells is updated in the copy of the last fracture
+    Fr_kplus1.Tarrival[EltsTipNew[new_channel]] = Tarrival_new_channel
     new_tip = np.where(np.isnan(Fr_kplus1.TarrvlZrVrtx[Fr_kplus1.EltTip]))[0]
     Fr_kplus1.TarrvlZrVrtx[Fr_kplus1.EltTip[new_tip]] = Fr_kplus1.time - Fr_kplus1.l[new_tip] / Fr_kplus1.v[new_tip]
     Fr_kplus1.wHist = np.maximum(Fr_kplus1.w, Fr_lstTmStp.wHist)
@@ -1660,7 +1771,8 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
              Fr_lstTmStp.EltCrack,
              Fr_lstTmStp.mesh,
              front_region[pstv_region],
-             front_region[ngtv_region])
+             front_region[ngtv_region],
+             band_width=sim_properties.levelSetBandWidth)
 
     # gets the new tip elements, along with the length and angle of the perpendiculars drawn on front (also containing
     # the elements which are fully filled after the front is moved outward)
@@ -1694,7 +1806,8 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                                                                           Fr_lstTmStp.EltChannel,
                                                                           Fr_lstTmStp.mesh,
                                                                           recomp_LS_4fullyTravCellsAfterCoalescence_OR_RemovingPtsOnCommonEdge,
-                                                                          lstTmStp_EltCrack0=Fr_lstTmStp.fronts_dictionary['crackcells_0'], oldfront=Fr_lstTmStp.Ffront)
+                                                                          lstTmStp_EltCrack0=Fr_lstTmStp.fronts_dictionary['crackcells_0'], oldfront=Fr_lstTmStp.Ffront,
+                                                                          previous_fronts_dictionary=Fr_lstTmStp.fronts_dictionary)
             if correct_size_of_pstv_region[2]:
                 exitstatus = 7 # You are here because the level set has negative values until the end of the mesh
                                 # or because a fictitius cell has intersected the mesh.frontlist
@@ -1736,7 +1849,8 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                          Fr_lstTmStp.EltCrack,
                          Fr_lstTmStp.mesh,
                          front_region[pstv_region],
-                         front_region[ngtv_region])
+                         front_region[ngtv_region],
+                         band_width=sim_properties.levelSetBandWidth)
 
         sgndDist_k = sgndDist_k_temp
         del correct_size_of_pstv_region
@@ -1899,7 +2013,9 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                                   stagnant=stagnant,
                                   KIPrime=KIPrime,
                                   Eprime=Eprime_tip,
-                                  Cprime=Cprime_tip) / Fr_lstTmStp.mesh.EltArea
+                                  Cprime=Cprime_tip,
+                                  tabulated=sim_properties.tabulatedTipInversion,
+                                  tables_folder=sim_properties.tipTablesFolder) / Fr_lstTmStp.mesh.EltArea
     else:
         # Calculate average width in the tip cells by integrating tip asymptote
         wTip = Integral_over_cell(EltsTipNew,
@@ -1914,7 +2030,9 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                                   Kprime=Kprime_tip,
                                   Eprime=Eprime_tip,
                                   Cprime=Cprime_tip,
-                                  stagnant=stagnant) / Fr_lstTmStp.mesh.EltArea
+                                  stagnant=stagnant,
+                                  tabulated=sim_properties.tabulatedTipInversion,
+                                  tables_folder=sim_properties.tipTablesFolder) / Fr_lstTmStp.mesh.EltArea
 
     # check if the tip volume has gone into negative
     smallNgtvWTip = np.where(np.logical_and(wTip < 0, wTip > -1e-4 * np.mean(wTip)))
@@ -1930,7 +2048,7 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
         # todo close tip width instrumentation
 
     LkOff = np.zeros((len(CellStatus),), dtype=np.float64)
-    if sum(mat_properties.Cprime[EltsTipNew]) > 0:
+    if np.sum(mat_properties.Cprime[EltsTipNew]) > 0:
         # Calculate leak-off term for the tip cell
         LkOff[EltsTipNew] = 2 * mat_properties.Cprime[EltsTipNew] * Integral_over_cell(EltsTipNew,
                                                                                        alpha_k,
@@ -1948,11 +2066,13 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
             exitstatus = 13
             return exitstatus, None
 
-    if sum(mat_properties.Cprime[Fr_lstTmStp.EltChannel]) > 0:
-        t_since_arrival = Fr_lstTmStp.time - Fr_lstTmStp.Tarrival[Fr_lstTmStp.EltChannel]
-        t_since_arrival[t_since_arrival < 0.] = 0.
-        LkOff[Fr_lstTmStp.EltChannel] = 2 * mat_properties.Cprime[Fr_lstTmStp.EltChannel] * ((t_since_arrival
-                                                                                              + timeStep) ** 0.5 - t_since_arrival ** 0.5) * Fr_lstTmStp.mesh.EltArea
+    if np.sum(mat_properties.Cprime[Fr_lstTmStp.EltChannel]) > 0:
+        LkOff[Fr_lstTmStp.EltChannel] = leak_off_channel(Fr_lstTmStp.EltChannel,
+                                                         Fr_lstTmStp.Tarrival,
+                                                         Fr_lstTmStp.time,
+                                                         mat_properties.Cprime,
+                                                         timeStep,
+                                                         Fr_lstTmStp.mesh)
         if np.isnan(LkOff[Fr_lstTmStp.EltChannel]).any():
             exitstatus = 13
             return exitstatus, None
@@ -2006,20 +2126,17 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
     if data[0] != None: #todo: Check why we need this if condition in the case of volume control
         fluidVel = data[0][0]
     # setting arrival time for fully traversed tip elements (new channel elements)
-    Tarrival_k = np.copy(Fr_lstTmStp.Tarrival)
-    max_Tarrival = np.nanmax(Tarrival_k)
-    nc = np.setdiff1d(EltChannel_k, Fr_lstTmStp.EltChannel)
-    new_channel = np.array([], dtype=int)
-    for i in nc:
-        new_channel = np.append(new_channel, np.where(EltsTipNew == i)[0])
+    # the tip cells that have become channel cells
+    new_channel = np.where(np.isin(EltsTipNew, EltChannel_k) & ~np.isin(EltsTipNew, Fr_lstTmStp.EltChannel))[0]
     if np.any(Vel_k[new_channel]==0):
         log.debug("why we have zeros?")
-    t_enter = Fr_lstTmStp.time + timeStep - l_k[new_channel] / Vel_k[new_channel]
-    max_l = Fr_lstTmStp.mesh.hx * np.cos(alpha_k[new_channel]) + Fr_lstTmStp.mesh.hy * np.sin(alpha_k[new_channel])
-    t_leave = Fr_lstTmStp.time + timeStep - (l_k[new_channel] - max_l) / Vel_k[new_channel]
-    Tarrival_k[EltsTipNew[new_channel]] = (t_enter + t_leave) / 2
-    to_correct = np.where(Tarrival_k[EltsTipNew[new_channel]] < max_Tarrival)[0]
-    Tarrival_k[EltsTipNew[new_channel[to_correct]]] = max_Tarrival
+    Tarrival_new_channel = arrival_time_new_channel(Fr_lstTmStp.Tarrival,
+                                                    Fr_lstTmStp.EltCrack,
+                                                    Fr_lstTmStp.time + timeStep,
+                                                    l_k[new_channel],
+                                                    alpha_k[new_channel],
+                                                    Vel_k[new_channel],
+                                                    Fr_lstTmStp.mesh)
 
     # the fracture to be returned for k plus 1 iteration
     Fr_kplus1 = copy.deepcopy(Fr_lstTmStp)
@@ -2055,7 +2172,8 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
             append_to_json_file(myJsonName, Fr_kplus1.EltTip.size, 'append2keyAND2list', key='elements_in_tip')
             append_to_json_file(myJsonName, Fr_kplus1.time, 'append2keyAND2list', key='coalescence_time')
     Fr_kplus1.FractureVolume = np.sum(Fr_kplus1.w) * Fr_kplus1.mesh.EltArea
-    Fr_kplus1.Tarrival = Tarrival_k
+    # only the arrival time of the new channel cells is updated in the copy of the last fracture
+    Fr_kplus1.Tarrival[EltsTipNew[new_channel]] = Tarrival_new_channel
     Fr_kplus1.wHist = np.maximum(Fr_kplus1.w, Fr_lstTmStp.wHist)
     if data[0] != None: #todo: Check why we need  this if condition in the case of volume control
         Fr_kplus1.effVisc = data[0][1]
@@ -2084,11 +2202,22 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                                                    Fr_lstTmStp.mesh,
                                                    sgndDist_k)
                 alpha_ribbon_km1 = np.zeros(Fr_lstTmStp.EltRibbon.size, )
+                alpha_hist = []
+                projection_hist = []
             else:
-                alpha_ribbon_k = 0.3 * alpha_ribbon_k + 0.7 * projection_method(Fr_lstTmStp.EltRibbon,
-                                                                                Fr_lstTmStp.EltChannel,
-                                                                                Fr_lstTmStp.mesh,
-                                                                                sgndDist_k)
+                projection_k = projection_method(Fr_lstTmStp.EltRibbon,
+                                                 Fr_lstTmStp.EltChannel,
+                                                 Fr_lstTmStp.mesh,
+                                                 sgndDist_k)
+                if np.isnan(projection_k).any():
+                    exitstatus = 11
+                    return exitstatus, None
+
+                alpha_ribbon_k, alpha_hist, projection_hist = update_projection_angles(alpha_ribbon_k,
+                                                                                       projection_k,
+                                                                                       alpha_hist,
+                                                                                       projection_hist,
+                                                                                       sim_properties)
             if np.isnan(alpha_ribbon_k).any():
                 exitstatus = 11
                 return exitstatus, None
@@ -2172,7 +2301,8 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
                  Fr_lstTmStp.EltChannel,
                  Fr_lstTmStp.mesh,
                  front_region[pstv_region],
-                 front_region[ngtv_region])
+                 front_region[ngtv_region],
+                 band_width=sim_properties.levelSetBandWidth)
 
         # do it only once if not anisotropic
         if not (sim_properties.paramFromTip or mat_properties.anisotropic_K1c
@@ -2188,13 +2318,18 @@ def time_step_explicit_front(Fr_lstTmStp, C, timeStep, Qin, mat_properties, flui
         log.debug("iterating on projection... norm = " + repr(norm))
         itr += 1
 
+    if perfNode is not None:
+        perfNode.projectionItrs = min(itr + 1, sim_properties.maxProjItrs)
+
     # todo Hack!!! keep going if projection does not converge
     # if itr == sim_properties.maxProjItrs:
     #     exitstatus = 10
     #     return exitstatus, None
 
     Fr_kplus1.v = -(sgndDist_k[Fr_kplus1.EltTip] - Fr_lstTmStp.sgndDist[Fr_kplus1.EltTip]) / timeStep
-    Fr_kplus1.sgndDist = sgndDist_k
+    # the far away distance is kept only while evaluating the front; the cells beyond the band are stored with the
+    # distance clipped to the band width
+    Fr_kplus1.sgndDist = clip_to_band(sgndDist_k, Fr_kplus1.mesh, sim_properties.levelSetBandWidth)
     Fr_kplus1.sgndDist_last = Fr_lstTmStp.sgndDist
     Fr_kplus1.timeStep_last = timeStep
     new_tip = np.where(np.isnan(Fr_kplus1.TarrvlZrVrtx[Fr_kplus1.EltTip]))[0]
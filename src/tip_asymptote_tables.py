@@ -0,0 +1,797 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of PyFrac.
+
+Copyright (c) ECOLE POLYTECHNIQUE FEDERALE DE LAUSANNE, Switzerland, Geo-Energy Laboratory, 2016-2020.
+All rights reserved. See the LICENSE.TXT file for more details.
+"""
+
+# imports
+import os
+import logging
+import itertools
+import numpy as np
+from types import SimpleNamespace
+from scipy.interpolate import RegularGridInterpolator
+
+from tip_inversion import Chandrupatla, get_args_subset, TipAsym_MDR_Res, TipAsym_M_MDR_Res
+from volume_integral import TipAsym_res_Herschel_Bulkley_w, FindBracket_w_arrays
+
+
+# the tables built in the current run, indexed with the name of the residual function (or the flow index for the volume
+# tables) and the flags of the table
+tables_in_memory = {}
+
+
+class TipInversionTable:
+    """
+    Tabulated inversion of the viscosity-toughness-leak off tip asymptotes (e.g. the zeroth and first order universal
+    asymptotes). Given the width w in the ribbon cell and the distance d0 of the front from the ribbon cell at the last
+    time step, the asymptotes with the velocity V = (d - d0) / dt give the distance d as a function of three
+    dimensionless groups only. Scaling the distance with the distance given by the toughness asymptote
+    dk = (Eprime * w / Kprime) ** 2, these are:
+
+        - A = muPrime * dk ** 3 / (dt * Eprime * w ** 3)  (viscosity)
+        - B = 2 * Cprime * dt ** 0.5 / w                  (leak off)
+        - delta_0 = d0 / dk                                (front position at the last time step)
+
+    The logarithm of the dimensionless advancement (d - d0) / (dk - d0), lying in (0, 1), is tabulated once on a grid of
+    these groups (piecewise linear in log(A), log(B) and delta_0). At run time the table evaluation gives an initial guess which is
+    polished with a few Newton iterations on the residual function to get the same accuracy as the root finder.
+
+    Arguments:
+        ResFunc (function):     -- the residual function of the tip asymptote (see tip_inversion module).
+        leak_off (bool):        -- if False, the table is built without leak off (B = 0).
+        folder (string):        -- the folder in which the table is cached on disk. If None, the table is kept only
+                                   in memory.
+
+    Attributes:
+        ResFunc (function):     -- the residual function of the tip asymptote.
+        leakOff (bool):         -- if the leak off is taken into account.
+        axes (tuple):           -- the grid of the dimensionless groups (log10(A), log10(B), delta_0) the table is
+                                   built on (log10(B) is not given without leak off).
+        values (ndarray):       -- the tabulated logarithm (base 10) of the dimensionless advancement. It is nan where
+                                   the cell is stagnant.
+    """
+
+    log10A_range = (-9., 12.)
+    log10B_range = (-4., 4.)
+    delta0_max = 0.995
+    log_step = 0.25
+    n_delta0 = 40
+
+    def __init__(self, ResFunc, leak_off=True, folder=None):
+        log = logging.getLogger('PyFrac.TipInversionTable')
+        self.ResFunc = ResFunc
+        self.leakOff = leak_off
+        self.axes = self.get_axes()
+
+        file_name = None
+        if folder is not None:
+            file_name = os.path.join(folder, 'tip_inversion_table_' + ResFunc.__name__ +
+                                     ('_leakOff' if leak_off else '') + '.npz')
+
+        self.values = None
+        if file_name is not None and os.path.isfile(file_name):
+            cached = np.load(file_name)
+            if 'values' in cached.files and len(cached.files) == len(self.axes) + 1 and \
+                    all(np.array_equal(cached['axis_' + repr(i)], axis) for i, axis in enumerate(self.axes)):
+                self.values = cached['values']
+                log.debug('Tip table loaded from ' + file_name)
+
+        if self.values is None:
+            log.debug('Building the tip table for ' + ResFunc.__name__ + '...')
+            self.values = self.build_table()
+            if file_name is not None:
+                if not os.path.isdir(folder):
+                    os.makedirs(folder)
+                np.savez(file_name,
+                         values=self.values,
+                         **{'axis_' + repr(i): axis for i, axis in enumerate(self.axes)})
+
+        self.interpolator = RegularGridInterpolator(self.axes, self.values)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def get_axes(self):
+        """
+        The grid of the dimensionless groups the table is built on.
+        """
+
+        log10A = np.arange(self.log10A_range[0], self.log10A_range[1] + self.log_step / 2, self.log_step)
+        delta0 = np.linspace(0., self.delta0_max, self.n_delta0)
+        if self.leakOff:
+            log10B = np.arange(self.log10B_range[0], self.log10B_range[1] + self.log_step / 2, self.log_step)
+            return log10A, log10B, delta0
+        else:
+            return log10A, delta0
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def build_table(self):
+        """
+        Solve the tip asymptote on the grid of the dimensionless groups. The asymptote is evaluated with unit width,
+        toughness and plain strain modulus (giving dk = 1) and viscosity, the viscosity and leak off groups being given
+        by the time step and the leak off coefficient.
+        """
+
+        grid = np.meshgrid(*self.axes, indexing='ij')
+        A = 10. ** grid[0].ravel()
+        delta0 = grid[-1].ravel()
+        dt = 1. / A
+        if self.leakOff:
+            Cprime = 10. ** grid[1].ravel() / (2 * dt ** 0.5)
+        else:
+            Cprime = np.zeros((A.size,))
+
+        n = A.size
+        args = (np.ones((n,)), np.ones((n,)), np.ones((n,)), SimpleNamespace(muPrime=1.), Cprime, delta0, dt)
+        # the residual vanishes at delta0 as the velocity is zero. The left end of the bracket is moved as in the root
+        # finder, the cells in which the root can not be bracketed being taken as stagnant (nan in the table).
+        a = np.maximum(delta0 * (1 + 5e3 * np.finfo(float).eps), 1e-12)
+        b = np.ones((n,))
+        roots = Chandrupatla(self.ResFunc, a, b, args)[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log10((roots - delta0) / (1 - delta0)).reshape(grid[0].shape)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def invert(self, args, maxiter=6, xtol=2e-12, rtol=4 * np.finfo(float).eps):
+        """
+        Invert the tip asymptote for the given cells from the table, polishing the result with the Newton method.
+
+        Arguments:
+            args (tuple):               -- the arguments of the residual function, i.e. (w, Kprime, Eprime, fluidProp,
+                                           Cprime, d0, dt) with the arrays given for each of the cells.
+            maxiter (int):              -- the maximum number of Newton iterations.
+            xtol (float):               -- the absolute tolerance on the distance (as for the root finder).
+            rtol (float):               -- the relative tolerance on the distance (as for the root finder).
+
+        Returns:
+            - dist (ndarray)            -- the distance from the front. It is nan for the cells not inverted.
+            - inverted (ndarray)        -- boolean array which is False for the cells outside of the range of the \\
+                                           table or for which the Newton iterations have not converged.
+            - iterations (ndarray)      -- the Newton iterations taken for each of the cells.
+        """
+
+        (w, Kprime, Eprime, fluidProp, Cprime, d0, dt) = args
+        n = len(w)
+        dist = np.full((n,), np.nan)
+        iterations = np.zeros((n,), dtype=int)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dk = (Eprime * w / Kprime) ** 2
+            log10A = np.log10(fluidProp.muPrime * dk ** 3 / (dt * Eprime * w ** 3))
+            delta0 = d0 / dk
+            points = [log10A]
+            if self.leakOff:
+                # the table is evaluated at the lower bound of the leak off group if it is smaller (small effect of
+                # leak off), the Newton iterations taking care of the difference.
+                points.append(np.maximum(np.log10(2 * Cprime * dt ** 0.5 / w), self.axes[1][0]))
+            points.append(np.minimum(delta0, self.axes[-1][-1]))
+
+        in_range = np.logical_and(delta0 >= 0, delta0 < 1)
+        for i in range(len(points) - 1):
+            in_range = np.logical_and(in_range, np.logical_and(points[i] >= self.axes[i][0],
+                                                               points[i] <= self.axes[i][-1]))
+        active = np.where(in_range)[0]
+        if active.size == 0:
+            return dist, in_range, iterations
+
+        advancement = 10 ** self.interpolator(np.column_stack([p[active] for p in points]))
+        x = dk[active] * (delta0[active] + advancement * (1 - delta0[active]))
+
+        # the distance is searched in between the distance at the last time step and the toughness distance
+        converged, iterations[active] = self.polish(x, get_args_subset(args, active), d0[active], dk[active], maxiter,
+                                                    xtol, rtol)
+
+        inverted = np.full((n,), False)
+        inverted[active[converged]] = True
+        dist[active[converged]] = x[converged]
+
+        return dist, inverted, iterations
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def polish(self, x, args, lower, upper, maxiter, xtol, rtol):
+        """
+        Polish the values evaluated from the table (the distances or the widths) with the Newton method (the
+        derivative of the residual is evaluated with finite difference). The values are updated in place.
+
+        Arguments:
+            x (ndarray):                -- the values evaluated from the table.
+            args (tuple):               -- the arguments of the residual function for the given values.
+            lower (ndarray):            -- the lower bound of the values (excluded).
+            upper (ndarray):            -- the upper bound of the values.
+            maxiter (int):              -- the maximum number of Newton iterations.
+            xtol (float):               -- the absolute tolerance.
+            rtol (float):               -- the relative tolerance.
+
+        Returns:
+            - converged (ndarray)       -- boolean array which is False for the values for which the iterations \
+                                           have not converged in the bounds.
+            - iterations (ndarray)      -- the Newton iterations taken for each of the values.
+        """
+
+        converged = np.full((len(x),), False)
+        iterations = np.zeros((len(x),), dtype=int)
+        to_polish = np.arange(len(x))
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            for i in range(maxiter):
+                args_polish = get_args_subset(args, to_polish)
+                iterations[to_polish] += 1
+                res = self.ResFunc(x[to_polish], *args_polish)
+                h = 1e-7 * x[to_polish]
+                dres = (self.ResFunc(x[to_polish] + h, *args_polish) - res) / h
+                step = res / dres
+                x[to_polish] -= step
+
+                valid = np.logical_and(np.isfinite(x[to_polish]), np.logical_and(x[to_polish] > lower[to_polish],
+                                                                                  x[to_polish] <= upper[to_polish]))
+                converged[to_polish] = np.logical_and(valid, abs(step) < xtol + rtol * abs(x[to_polish]))
+                to_polish = to_polish[np.logical_and(valid, ~converged[to_polish])]
+                if to_polish.size == 0:
+                    break
+
+        return converged, iterations
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+class MDRInversionTable(TipInversionTable):
+    """
+    Tabulated inversion of the maximum drag reduction tip asymptotes ('MDR' and 'M_MDR'), which do not depend on the
+    toughness and are given without leak off. Scaling the distance with the distance d0 of the front from the ribbon
+    cell at the last time step, i.e. with y = d / d0 and the velocity V = d0 * (y - 1) / dt, the asymptotes are given
+    by (with the density rho of the residual functions):
+
+        - MDR:      y ** 0.740741 * (y - 1) ** 0.481481 = G, with
+                    G = w * Eprime ** 0.37037 * dt ** 0.481481 / (1.89812 * (muPrime ** 0.7 * rho ** 0.3) ** 0.37037
+                    * d0 ** 1.222222)
+        - M_MDR:    (y ** 2 * (y - 1)) ** (1 / 3) * (1 + H * y ** 0.2 * (y - 1) ** 0.4) ** 0.37037 = G, with
+                    G = w / (3.14735 * d0 * (muPrime / (Eprime * dt)) ** (1 / 3)) and
+                    H = 0.255286 * d0 ** 0.6 * rho ** 0.3 / (dt ** 0.4 * Eprime ** 0.1 * muPrime ** 0.2)
+
+    The logarithm of the dimensionless advancement y - 1 is tabulated on a grid of log(G) (and log(H)) and polished
+    with the Newton method as for the TipInversionTable.
+
+    Arguments:
+        ResFunc (function):     -- the residual function of the tip asymptote (TipAsym_MDR_Res or TipAsym_M_MDR_Res).
+        folder (string):        -- the folder in which the table is cached on disk. If None, the table is kept only
+                                   in memory.
+
+    Attributes:
+        ResFunc (function):     -- the residual function of the tip asymptote.
+        axes (tuple):           -- the grid of the dimensionless groups (log10(H), log10(G)) the table is built on
+                                   (log10(H) is not given for the 'MDR' asymptote).
+        values (ndarray):       -- the tabulated logarithm (base 10) of the dimensionless advancement.
+    """
+
+    # the density taken in the residual functions
+    density = 1000.
+    # the advancement is tabulated down to about 1e-9 (of the order of the tolerance of the root finder)
+    log10G_range = {'TipAsym_MDR_Res': (-4., 8.), 'TipAsym_M_MDR_Res': (-2.5, 8.)}
+    log10H_range = (-6., 6.)
+    log_step = 0.25
+
+    def __init__(self, ResFunc, folder=None):
+        super().__init__(ResFunc, leak_off=False, folder=folder)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def get_axes(self):
+        """
+        The grid of the dimensionless groups the table is built on.
+        """
+
+        log10G_range = self.log10G_range[self.ResFunc.__name__]
+        log10G = np.arange(log10G_range[0], log10G_range[1] + self.log_step / 2, self.log_step)
+        if self.ResFunc is TipAsym_M_MDR_Res:
+            log10H = np.arange(self.log10H_range[0], self.log10H_range[1] + self.log_step / 2, self.log_step)
+            return log10H, log10G
+        else:
+            return (log10G,)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def get_groups(self, w, Eprime, muPrime, d0, dt):
+        """
+        Evaluate the dimensionless groups (log10(H), log10(G)) of the asymptote.
+        """
+
+        if self.ResFunc is TipAsym_M_MDR_Res:
+            log10G = np.log10(w / (3.14735 * d0 * (muPrime / (Eprime * dt)) ** (1 / 3)))
+            log10H = np.log10(0.255286 * d0 ** 0.6 * self.density ** 0.3 / (dt ** 0.4 * Eprime ** 0.1
+                                                                               * muPrime ** 0.2))
+            return [log10H, log10G]
+        else:
+            log10G = np.log10(w * Eprime ** 0.37037 * dt ** 0.481481 / (1.89812 * (muPrime ** 0.7 *
+                                                    self.density ** 0.3) ** 0.37037 * d0 ** (0.740741 + 0.481481)))
+            return [log10G]
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def build_table(self):
+        """
+        Solve the tip asymptote on the grid of the dimensionless groups. The asymptote is evaluated with unit distance
+        at the last time step, plain strain modulus and viscosity, the groups being given by the width and the time
+        step.
+        """
+
+        grid = np.meshgrid(*self.axes, indexing='ij')
+        n = grid[0].size
+        G = 10. ** grid[-1].ravel()
+        ones = np.ones((n,))
+        if self.ResFunc is TipAsym_M_MDR_Res:
+            dt = (0.255286 * self.density ** 0.3 / 10. ** grid[0].ravel()) ** 2.5
+            w = G * 3.14735 * dt ** (-1 / 3)
+            # the second factor of the asymptote is larger than one
+            upper = np.minimum(G, G ** 3)
+        else:
+            dt = ones
+            w = G * 1.89812 * self.density ** (0.3 * 0.37037)
+            upper = np.minimum(G ** (1 / 0.481481), G ** (1 / (0.740741 + 0.481481)))
+
+        args = (w, ones, ones, SimpleNamespace(muPrime=1.), np.zeros((n,)), ones, dt)
+        roots = Chandrupatla(self.ResFunc, ones * (1 + 5e3 * np.finfo(float).eps), 1 + 2 * upper, args)[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log10(roots - 1).reshape(grid[0].shape)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def invert(self, args, maxiter=6, xtol=2e-12, rtol=4 * np.finfo(float).eps):
+        """
+        Invert the tip asymptote for the given cells from the table, polishing the result with the Newton method.
+
+        Arguments:
+            args (tuple):               -- the arguments of the residual function, i.e. (w, Kprime, Eprime, fluidProp,
+                                           Cprime, d0, dt) with the arrays given for each of the cells.
+            maxiter (int):              -- the maximum number of Newton iterations.
+            xtol (float):               -- the absolute tolerance on the distance (as for the root finder).
+            rtol (float):               -- the relative tolerance on the distance (as for the root finder).
+
+        Returns:
+            - dist (ndarray)            -- the distance from the front. It is nan for the cells not inverted.
+            - inverted (ndarray)        -- boolean array which is False for the cells outside of the range of the \
+                                           table or for which the Newton iterations have not converged.
+            - iterations (ndarray)      -- the Newton iterations taken for each of the cells.
+        """
+
+        (w, Kprime, Eprime, fluidProp, Cprime, d0, dt) = args
+        n = len(w)
+        dist = np.full((n,), np.nan)
+        iterations = np.zeros((n,), dtype=int)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            points = self.get_groups(w, Eprime, fluidProp.muPrime, d0, dt)
+
+        in_range = d0 > 0
+        for i in range(len(points)):
+            in_range = np.logical_and(in_range, np.logical_and(points[i] >= self.axes[i][0],
+                                                               points[i] <= self.axes[i][-1]))
+        active = np.where(in_range)[0]
+        if active.size == 0:
+            return dist, in_range, iterations
+
+        x = d0[active] * (1 + 10 ** self.interpolator(np.column_stack([p[active] for p in points])))
+
+        # the distance is not bounded from above
+        converged, iterations[active] = self.polish(x, get_args_subset(args, active), d0[active],
+                                                    np.full((active.size,), np.inf), maxiter, xtol, rtol)
+
+        inverted = np.full((n,), False)
+        inverted[active[converged]] = True
+        dist[active[converged]] = x[converged]
+
+        return dist, inverted, iterations
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+class TipWidthTable(TipInversionTable):
+    """
+    Tabulated width of the universal tip asymptote (zeroth or first order, see Donstov and Pierce 2017) at the given
+    distance from the front, used to evaluate the tip volume. Scaling the width with the width given by the toughness
+    asymptote wk = Kprime * dist ** 0.5 / Eprime, the dimensionless width omega = w / wk is given by the residual
+    function of the width as a function of two dimensionless groups only:
+
+        - chi = muPrime * Vel * Eprime ** 2 * dist ** 0.5 / Kprime ** 3    (viscosity)
+        - lambda = 2 * Cbar * Eprime / (Vel ** 0.5 * Kprime)              (leak off)
+
+    The logarithm of the excess width omega - 1 (the width being larger than the toughness width) is tabulated on a
+    grid of log(chi) and log(lambda) and polished with the Newton method as for the TipInversionTable.
+
+    Arguments:
+        ResFunc (function):     -- the residual function of the width (TipAsym_UniversalW_zero_Res or
+                                   TipAsym_UniversalW_delt_Res, see volume_integral module).
+        leak_off (bool):        -- if False, the table is built without leak off (lambda = 0).
+        folder (string):        -- the folder in which the table is cached on disk. If None, the table is kept only
+                                   in memory.
+
+    Attributes:
+        ResFunc (function):     -- the residual function of the width.
+        leakOff (bool):         -- if the leak off is taken into account.
+        axes (tuple):           -- the grid of the dimensionless groups (log10(chi), log10(lambda)) the table is built
+                                   on (log10(lambda) is not given without leak off).
+        values (ndarray):       -- the tabulated logarithm (base 10) of the excess width omega - 1.
+    """
+
+    log10chi_range = (-8., 12.)
+    log10lambda_range = (-4., 6.)
+    log_step = 0.25
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def get_axes(self):
+        """
+        The grid of the dimensionless groups the table is built on.
+        """
+
+        log10chi = np.arange(self.log10chi_range[0], self.log10chi_range[1] + self.log_step / 2, self.log_step)
+        if self.leakOff:
+            log10lambda = np.arange(self.log10lambda_range[0], self.log10lambda_range[1] + self.log_step / 2,
+                                    self.log_step)
+            return log10chi, log10lambda
+        else:
+            return (log10chi,)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def build_table(self):
+        """
+        Solve the tip asymptote on the grid of the dimensionless groups. The asymptote is evaluated with unit distance,
+        toughness, plain strain modulus and viscosity (giving wk = 1), the groups being given by the velocity and the
+        leak off coefficient.
+        """
+
+        grid = np.meshgrid(*self.axes, indexing='ij')
+        Vel = 10. ** grid[0].ravel()
+        n = Vel.size
+        if self.leakOff:
+            Cbar = 10. ** grid[1].ravel() * Vel ** 0.5 / 2
+        else:
+            Cbar = np.zeros((n,))
+
+        ones = np.ones((n,))
+        args = (ones, ones, ones, 1., Cbar, Vel)
+        a, b = FindBracket_w_arrays(*args, self.ResFunc)
+        roots = Chandrupatla(self.ResFunc, a, b, args)[0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log10(roots - 1).reshape(grid[0].shape)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def invert(self, args, maxiter=6, xtol=2e-12, rtol=4 * np.finfo(float).eps):
+        """
+        Evaluate the width of the tip asymptote for the given distances from the table, polishing the result with the
+        Newton method.
+
+        Arguments:
+            args (tuple):               -- the arguments of the residual function, i.e. (dist, Kprime, Eprime,
+                                           muPrime, Cbar, Vel) with the arrays given for each of the distances.
+            maxiter (int):              -- the maximum number of Newton iterations.
+            xtol (float):               -- the absolute tolerance on the width (as for the root finder).
+            rtol (float):               -- the relative tolerance on the width (as for the root finder).
+
+        Returns:
+            - w (ndarray)               -- the width at the given distances. It is nan for the widths not evaluated.
+            - inverted (ndarray)        -- boolean array which is False for the distances outside of the range of \
+                                           the table or for which the Newton iterations have not converged.
+            - iterations (ndarray)      -- the Newton iterations taken for each of the distances.
+        """
+
+        (dist, Kprime, Eprime, muPrime, Cbar, Vel) = args
+        n = len(dist)
+        w = np.full((n,), np.nan)
+        iterations = np.zeros((n,), dtype=int)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            wk = Kprime * dist ** 0.5 / Eprime
+            log10chi = np.log10(muPrime * Vel * Eprime ** 2 * dist ** 0.5 / Kprime ** 3)
+            points = [log10chi]
+            in_range = np.logical_and(log10chi >= self.axes[0][0], log10chi <= self.axes[0][-1])
+            if self.leakOff:
+                # the table is evaluated at the lower bound of the leak off group if it is smaller (small effect of
+                # leak off), the Newton iterations taking care of the difference.
+                log10lambda = np.log10(2 * Cbar * Eprime / (Vel ** 0.5 * Kprime))
+                points.append(np.maximum(log10lambda, self.axes[1][0]))
+                in_range = np.logical_and(in_range, log10lambda <= self.axes[1][-1])
+
+        active = np.where(in_range)[0]
+        if active.size == 0:
+            return w, in_range, iterations
+
+        x = wk[active] * (1 + 10 ** self.interpolator(np.column_stack([p[active] for p in points])))
+
+        # the width is not bounded from above
+        converged, iterations[active] = self.polish(x, get_args_subset(args, active), np.zeros((active.size,)),
+                                                    np.full((active.size,), np.inf), maxiter, xtol, rtol)
+
+        inverted = np.full((n,), False)
+        inverted[active[converged]] = True
+        w[active[converged]] = x[converged]
+
+        return w, inverted, iterations
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_tip_inversion_table(ResFunc, leak_off=True, folder=None):
+    """
+    Get the tip inversion table for the given residual function. The table is built once in a run (or loaded from the
+    given folder, if it has been saved there before) and kept in memory.
+    """
+
+    key = (ResFunc.__name__, leak_off)
+    if key not in tables_in_memory:
+        if ResFunc in [TipAsym_MDR_Res, TipAsym_M_MDR_Res]:
+            tables_in_memory[key] = MDRInversionTable(ResFunc, folder=folder)
+        else:
+            tables_in_memory[key] = TipInversionTable(ResFunc, leak_off=leak_off, folder=folder)
+
+    return tables_in_memory[key]
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_tip_width_table(ResFunc, leak_off=True, folder=None):
+    """
+    Get the tip width table for the given residual function of the width. The table is built once in a run (or loaded
+    from the given folder, if it has been saved there before) and kept in memory.
+    """
+
+    key = (ResFunc.__name__, leak_off)
+    if key not in tables_in_memory:
+        tables_in_memory[key] = TipWidthTable(ResFunc, leak_off=leak_off, folder=folder)
+
+    return tables_in_memory[key]
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+class TipVolumeTable:
+    """
+    Tabulated volume integrals of the Herschel-Bulkley (or power law) fluid tip asymptote (see Bessmertnykh and Dontsov,
+    2019). Scaling the distance s from the front with the length scale ell of the asymptote, the width is given by
+    w = Kprime * s ** 0.5 / Eprime * wt(xi), with xi = (s / ell) ** 0.5. The dimensionless width wt depends, apart from
+    the flow index n, only on the leak off group X = 2 * Cprime * Eprime / (V ** 0.5 * Kprime) and the yield stress group
+    T0t = 2 * T0 * Eprime * ell / Kprime ** 2. The moments of the width giving the tip volume are then
+
+        - M0 = integral of w over (0, d)     = 2 * Kprime * ell ** 1.5 / Eprime * J0(xi_d)
+        - M1 = integral of w * s over (0, d) = 2 * Kprime * ell ** 2.5 / Eprime * J1(xi_d)
+
+    with J0 and J1 the integrals of xi ** 2 * wt and xi ** 4 * wt over (0, xi_d). These are evaluated once for the
+    given flow index on a grid of log(xi), log(X) and log(T0t) with Gauss-Legendre quadrature in between the nodes
+    of the grid, and interpolated with piecewise cubic polynomials. The consistency index and the yield stress enter
+    only through the scaling, so the table can be reused for any of these.
+
+    Arguments:
+        n (float):              -- the flow index of the fluid.
+        yield_stress (bool):    -- if False, the table is built without yield stress (power law fluid, T0t = 0).
+        leak_off (bool):        -- if False, the table is built without leak off (X = 0).
+        folder (string):        -- the folder in which the table is cached on disk. If None, the table is kept only
+                                   in memory.
+
+    Attributes:
+        n (float):              -- the flow index of the fluid.
+        yieldStress (bool):     -- if the yield stress is taken into account.
+        leakOff (bool):         -- if the leak off is taken into account.
+        axes (tuple):           -- the grid of log10(xi), log10(X) and log10(T0t) the table is built on (the last two
+                                   are not given without leak off or yield stress respectively).
+        integrals (ndarray):    -- the tabulated logarithm (base 10) of J0 and J1 (first index).
+    """
+
+    log10xi_range = (-6., 4.)
+    log10X_range = (-4., 3.)
+    log10T0t_range = (-12., 3.)
+    log10xi_step = 0.1
+    log_step = 0.25
+    n_gauss = 3
+
+    def __init__(self, n, yield_stress=True, leak_off=True, folder=None):
+        log = logging.getLogger('PyFrac.TipVolumeTable')
+        self.n = n
+        self.yieldStress = yield_stress
+        self.leakOff = leak_off
+
+        axes = [np.arange(self.log10xi_range[0], self.log10xi_range[1] + self.log10xi_step / 2, self.log10xi_step)]
+        if leak_off:
+            axes.append(np.arange(self.log10X_range[0], self.log10X_range[1] + self.log_step / 2, self.log_step))
+        if yield_stress:
+            axes.append(np.arange(self.log10T0t_range[0], self.log10T0t_range[1] + self.log_step / 2, self.log_step))
+        self.axes = tuple(axes)
+
+        file_name = None
+        if folder is not None:
+            file_name = os.path.join(folder, 'tip_volume_table_n' + repr(float(n)) + ('_yield' if yield_stress else '')
+                                     + ('_leakOff' if leak_off else '') + '.npz')
+
+        self.integrals = None
+        if file_name is not None and os.path.isfile(file_name):
+            cached = np.load(file_name)
+            if len(cached.files) == len(self.axes) + 1 and all(np.array_equal(cached['axis_' + repr(i)], axis)
+                                                                for i, axis in enumerate(self.axes)):
+                self.integrals = cached['integrals']
+                log.debug('Tip volume table loaded from ' + file_name)
+
+        if self.integrals is None:
+            log.debug('Building the tip volume table for n = ' + repr(n) + '...')
+            self.integrals = self.build_table()
+            if file_name is not None:
+                if not os.path.isdir(folder):
+                    os.makedirs(folder)
+                np.savez(file_name,
+                         integrals=self.integrals,
+                         **{'axis_' + repr(i): axis for i, axis in enumerate(self.axes)})
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def solve_width(self, xi, X, T0t):
+        """
+        Solve the tip asymptote for the dimensionless width at the given points. The asymptote is evaluated with unit
+        toughness, plain strain modulus and velocity, and the consistency index giving Mprime = 1 (giving ell = 1).
+        """
+
+        n = self.n
+        k = n ** n / (2 ** (n + 1) * (2 * n + 1) ** n)
+        ones = np.ones((len(xi),))
+        args = (xi ** 2, ones, ones, 1., X / 2, ones, n, k, T0t / 2, xi ** 2)
+
+        # the width is bounded from below by the width given by the toughness and the yield stress
+        alpha = -0.3107 * n + 1.9924
+        a = xi * (1 + (np.sqrt(4 * np.pi * T0t) * xi) ** alpha) ** (1 / alpha) * (1 + 1e-12)
+        b = 2 * a
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            Res_a = TipAsym_res_Herschel_Bulkley_w(a, *args)
+            Res_b = TipAsym_res_Herschel_Bulkley_w(b, *args)
+            to_bracket = np.where(Res_a * Res_b > 0)[0]
+            while to_bracket.size > 0:
+                a[to_bracket], Res_a[to_bracket] = b[to_bracket], Res_b[to_bracket]
+                b[to_bracket] = 2 * b[to_bracket]
+                Res_b[to_bracket] = TipAsym_res_Herschel_Bulkley_w(b[to_bracket], *get_args_subset(args, to_bracket))
+                to_bracket = to_bracket[Res_a[to_bracket] * Res_b[to_bracket] > 0]
+
+        return Chandrupatla(TipAsym_res_Herschel_Bulkley_w, a, b, args, xtol=0., rtol=1e-13)[0] / xi
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def build_table(self):
+        """
+        Evaluate the integrals J0 and J1 on the grid. Below the first node, the dimensionless width is taken to be
+        constant (the toughness asymptote).
+        """
+
+        u = self.axes[0] * np.log(10)
+        h = u[1] - u[0]
+        points, weights = np.polynomial.legendre.leggauss(self.n_gauss)
+        u_gauss = (u[:-1, np.newaxis] + h * (points + 1) / 2).ravel()
+
+        # the dimensionless width at the gauss points in between the nodes and at the first node
+        grid = np.meshgrid(np.concatenate((u[:1], u_gauss)), *self.axes[1:], indexing='ij')
+        xi = np.exp(grid[0].ravel())
+        X = 10. ** grid[1].ravel() if self.leakOff else np.zeros((xi.size,))
+        T0t = 10. ** grid[-1].ravel() if self.yieldStress else np.zeros((xi.size,))
+        wt = self.solve_width(xi, X, T0t).reshape(grid[0].shape)
+        xi = xi.reshape(grid[0].shape)
+
+        integrals = []
+        for p in [3, 5]:
+            # the integral of xi ** (p - 1) * wt, i.e. xi ** p * wt over log(xi)
+            start = xi[0] ** p / p * wt[0]
+            intervals = (xi[1:] ** p * wt[1:]).reshape((len(u) - 1, self.n_gauss) + wt.shape[1:])
+            intervals = h / 2 * np.tensordot(weights, intervals, axes=([0], [1]))
+            integrals.append(np.log10(np.concatenate((start[np.newaxis],
+                                                      start + np.cumsum(intervals, axis=0)))))
+
+        return np.asarray(integrals)
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def moments(self, dist, Kprime, Eprime, Cbar, Vel, k, T0):
+        """
+        Evaluate the moments of the tip width from the table.
+
+        Arguments:
+            dist (ndarray):             -- the distances from the front up to which the width is integrated.
+            Kprime (ndarray):           -- the toughness for each of the distances.
+            Eprime (ndarray):           -- the plain strain modulus for each of the distances.
+            Cbar (ndarray):             -- the Carter's leak off coefficient multiplied by 2.
+            Vel (ndarray):              -- the velocity of the front.
+            k (float):                  -- the consistency index of the fluid.
+            T0 (float):                 -- the yield stress of the fluid.
+
+        Returns:
+            - M0 (ndarray)              -- the integral of the width. It is nan for the distances outside of the \
+                                           range of the table.
+            - M1 (ndarray)              -- the integral of the width multiplied with the distance from the front.
+        """
+
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            Mprime = 2 ** (n + 1) * (2 * n + 1) ** n / n ** n * k
+            ell = (Kprime ** (n + 2) / Mprime / Vel ** n / Eprime ** (n + 1)) ** (2 / (2 - n))
+            log10xi = np.log10(dist / ell) / 2
+            points = [np.maximum(log10xi, self.axes[0][0])]
+            in_range = np.logical_and(dist > 0, log10xi <= self.axes[0][-1])
+            if self.leakOff:
+                # the table is evaluated at the lower bound of the leak off group if it is smaller
+                log10X = np.log10(2 * Cbar * Eprime / Vel ** 0.5 / Kprime)
+                points.append(np.maximum(log10X, self.axes[1][0]))
+                in_range = np.logical_and(in_range, log10X <= self.axes[1][-1])
+            if self.yieldStress:
+                log10T0t = np.log10(2 * T0 * Eprime * ell / Kprime ** 2)
+                points.append(log10T0t)
+                in_range = np.logical_and(in_range, np.logical_and(log10T0t >= self.axes[-1][0],
+                                                                   log10T0t <= self.axes[-1][-1]))
+
+        M0 = np.full((len(dist),), np.nan)
+        M1 = np.full((len(dist),), np.nan)
+        active = np.where(in_range)[0]
+        if active.size == 0:
+            return M0, M1
+
+        points = np.column_stack([p[active] for p in points])
+        # the width is taken to be constant below the first node (see build_table)
+        xi_ratio = 10. ** (log10xi[active] - points[:, 0])
+        scale = 2 * Kprime[active] / Eprime[active]
+        M0[active] = scale * ell[active] ** 1.5 * 10 ** interpolate_cubic(self.axes, self.integrals[0], points) \
+                     * np.minimum(xi_ratio, 1) ** 3
+        M1[active] = scale * ell[active] ** 2.5 * 10 ** interpolate_cubic(self.axes, self.integrals[1], points) \
+                     * np.minimum(xi_ratio, 1) ** 5
+
+        return M0, M1
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def interpolate_cubic(axes, values, points):
+    """
+    Interpolate the values given on a regular grid with piecewise cubic (Lagrange) polynomials on each of the axes. The
+    points are taken to lie in the range of the grid.
+
+    Arguments:
+        axes (tuple):               -- the uniformly spaced axes of the grid (at least four points on each of them).
+        values (ndarray):           -- the values on the grid.
+        points (ndarray):           -- the points (one on each row) at which the values are to be interpolated.
+
+    Returns:
+        interpolated (ndarray)      -- the interpolated values.
+    """
+
+    indices, weights = [], []
+    for i, axis in enumerate(axes):
+        r = (points[:, i] - axis[0]) / (axis[1] - axis[0])
+        index = np.clip(np.floor(r).astype(int), 1, len(axis) - 3)
+        t = r - index
+        indices.append(index)
+        weights.append([-t * (t - 1) * (t - 2) / 6,
+                        (t + 1) * (t - 1) * (t - 2) / 2,
+                        -(t + 1) * t * (t - 2) / 2,
+                        (t + 1) * t * (t - 1) / 6])
+
+    interpolated = np.zeros((len(points),))
+    for stencil in itertools.product(range(4), repeat=len(axes)):
+        weight = np.ones((len(points),))
+        for i, j in enumerate(stencil):
+            weight = weight * weights[i][j]
+        interpolated += weight * values[tuple(indices[i] + j - 1 for i, j in enumerate(stencil))]
+
+    return interpolated
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def get_tip_volume_table(n, yield_stress=True, leak_off=True, folder=None):
+    """
+    Get the tip volume table for the given flow index. The table is built once in a run (or loaded from the given
+    folder, if it has been saved there before) and kept in memory.
+    """
+
+    key = (float(n), yield_stress, leak_off)
+    if key not in tables_in_memory:
+        tables_in_memory[key] = TipVolumeTable(n, yield_stress=yield_stress, leak_off=leak_off, folder=folder)
+
+    return tables_in_memory[key]
@@ -13,7 +13,7 @@ from properties import instrument_start, instrument_close
 import numpy as np
 from scipy.optimize import brentq
 import warnings
-from scipy.optimize import fsolve
+from scipy.optimize import fsolve, newton
 
 
 beta_m = 2**(1/3) * 3**(5/6)
@@ -24,6 +24,12 @@ Ki_c = 3000
 
 # ----------------------------------------------------------------------------------------------------------------------
 def C1(delta):
+    if np.ndim(delta) > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(np.logical_or(delta >= 1, delta <= 0),
+                            cnst_m,
+                            4 * (1 - 2 * delta) / (delta * (1 - delta)) * np.tan(np.pi * delta))
+
     if (delta >= 1 or delta <= 0):
         return cnst_m
     else:
@@ -31,6 +37,12 @@ def C1(delta):
 
 # ----------------------------------------------------------------------------------------------------------------------
 def C2(delta):
+    if np.ndim(delta) > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(delta == 1/3,
+                            beta_mtld ** 4 / 4,
+                            16 * (1 - 3 * delta) / (3 * delta * (2 - 3 * delta)) * np.tan(3 * np.pi / 2 * delta))
+
     if delta == 1/3:
         return beta_mtld ** 4 / 4
     else:
@@ -38,6 +50,17 @@ def C2(delta):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
+def use_residual_where(condition, res, ResFunc, dist, *args):
+    """
+    Replace the residual with the one given by the ResFunc for the elements where the condition is met. It is used
+    to switch elementwise to the limiting asymptotes (e.g. no leak off) when the residuals are evaluated on arrays.
+    """
+    if np.any(condition):
+        return np.where(condition, ResFunc(dist, *args), res)
+    return res
+
+# ----------------------------------------------------------------------------------------------------------------------
+
 def TipAsym_k_exp(dist, *args):
     """Residual function for the near-field k expansion (Garagash & Detournay, 2011)"""
 
@@ -135,15 +158,19 @@ def TipAsym_MK_zrthOrder_Res(dist, *args):
 
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
 
-    if Kprime == 0:
+    if np.all(Kprime == 0):
         return TipAsym_viscStor_Res(dist, *args)
-    if fluidProp.muPrime == 0:
-        # return toughness dominated asymptote
-        return dist - wEltRibbon ** 2 * (Eprime / Kprime) ** 2
 
-    w_tld = Eprime * wEltRibbon / (Kprime * dist**0.5)
-    V = (dist - DistLstTSEltRibbon) / dt
-    return w_tld - (1 + beta_m**3 * Eprime**2 * V * dist**0.5 * fluidProp.muPrime / Kprime**3)**(1/3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if fluidProp.muPrime == 0:
+            # return toughness dominated asymptote
+            res = dist - wEltRibbon ** 2 * (Eprime / Kprime) ** 2
+        else:
+            w_tld = Eprime * wEltRibbon / (Kprime * dist**0.5)
+            V = (dist - DistLstTSEltRibbon) / dt
+            res = w_tld - (1 + beta_m**3 * Eprime**2 * V * dist**0.5 * fluidProp.muPrime / Kprime**3)**(1/3)
+
+    return use_residual_where(Kprime == 0, res, TipAsym_viscStor_Res, dist, *args)
 
 # -----------------------------------------------------------------------------------------------------------------------
 
@@ -152,19 +179,23 @@ def TipAsym_MK_deltaC_Res(dist, *args):
 
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
 
-    if Kprime == 0:
+    if np.all(Kprime == 0):
         return TipAsym_viscStor_Res(dist, *args)
-    if fluidProp.muPrime == 0:
-        # return toughness dominated asymptote
-        return dist - wEltRibbon ** 2 * (Eprime / Kprime) ** 2
 
-    w_tld = Eprime * wEltRibbon / (Kprime * dist ** 0.5)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if fluidProp.muPrime == 0:
+            # return toughness dominated asymptote
+            res = dist - wEltRibbon ** 2 * (Eprime / Kprime) ** 2
+        else:
+            w_tld = Eprime * wEltRibbon / (Kprime * dist ** 0.5)
 
-    V = (dist - DistLstTSEltRibbon) / dt
-    l_mk = (Kprime ** 3 / (Eprime ** 2 * fluidProp.muPrime * V)) ** 2
-    x_tld = (dist / l_mk) ** (1/2)
-    delta = 1 / 3 * beta_m ** 3 * x_tld / (1 + beta_m ** 3 * x_tld)
-    return w_tld - (1 + 3 * C1(delta) * x_tld) ** (1/3)
+            V = (dist - DistLstTSEltRibbon) / dt
+            l_mk = (Kprime ** 3 / (Eprime ** 2 * fluidProp.muPrime * V)) ** 2
+            x_tld = (dist / l_mk) ** (1/2)
+            delta = 1 / 3 * beta_m ** 3 * x_tld / (1 + beta_m ** 3 * x_tld)
+            res = w_tld - (1 + 3 * C1(delta) * x_tld) ** (1/3)
+
+    return use_residual_where(Kprime == 0, res, TipAsym_viscStor_Res, dist, *args)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -196,6 +227,13 @@ def TipAsym_MTildeK_deltaC_Res(dist, *args):
 # ----------------------------------------------------------------------------------------------------------------------
 
 def f(K, Cb, Con):
+    if np.ndim(K) > 0 or np.ndim(Cb) > 0 or np.ndim(Con) > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.select([K >= 1, Cb > 100, np.logical_and(Cb == 0, K == 0), Cb == 0],
+                             [0., (1 - K ** 4) / (4 * cnst_m * Cb), 1 / (3 * Con), 1 / (3 * Con) * ( 1 - K ** 3)],
+                             1 / (3 * Con) * (1 - K ** 3 - 3 * Cb * (1 - K ** 2) / 2 + 3 * Cb ** 2 * (1 - K)
+                                              - 3 * Cb ** 3 * np.log((Cb + 1) / (Cb + K))))
+
     if K >= 1:
         return 0
     elif Cb > 100:
@@ -215,7 +253,7 @@ def TipAsym_Universal_1stOrder_Res(dist, *args):
 
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
 
-    if Cbar == 0:
+    if np.all(Cbar == 0):
         return TipAsym_MK_deltaC_Res(dist, *args)
 
     Vel = (dist - DistLstTSEltRibbon) / dt
@@ -227,7 +265,7 @@ def TipAsym_Universal_1stOrder_Res(dist, *args):
     delt = cnst_m * (1 + cnst_mc * Ch) * g0
     gdelt = f(Kh, Ch * C2(delt) / C1(delt), C1(delt))
 
-    return sh - gdelt
+    return use_residual_where(Cbar == 0, sh - gdelt, TipAsym_MK_deltaC_Res, dist, *args)
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -236,7 +274,7 @@ def TipAsym_Universal_zrthOrder_Res(dist, *args):
     
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
 
-    if Cbar == 0:
+    if np.all(Cbar == 0):
         return TipAsym_MK_zrthOrder_Res(dist, *args)
 
     Vel = (dist - DistLstTSEltRibbon) / dt
@@ -246,7 +284,7 @@ def TipAsym_Universal_zrthOrder_Res(dist, *args):
     g0 = f(Kh, cnst_mc * Ch, cnst_m)
     sh = fluidProp.muPrime * Vel * dist ** 2 / (Eprime * wEltRibbon ** 3)
 
-    return sh - g0
+    return use_residual_where(Cbar == 0, sh - g0, TipAsym_MK_zrthOrder_Res, dist, *args)
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -256,7 +294,7 @@ def TipAsym_Hershcel_Burkley_Res(dist, *args):
 
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
     
-    if Cbar == 0:
+    if np.all(Cbar == 0):
         return TipAsym_power_law_MK_Res(dist, *args)
     
     Vel = (dist - DistLstTSEltRibbon) / dt
@@ -283,9 +321,11 @@ def TipAsym_Hershcel_Burkley_Res(dist, *args):
           (dmt * Vmt * Bm**((2 + n) / n) * Vmt**((1 + theta) / n) +
            dm * Vm * X / wt * Bmt**(2 * (1 + n) / n) * Vm**((1 + theta) / n))
 
-    return xt**((2 - n) / (1 + theta)) - dt1 * wt**((2 + n) / (1 + theta)) * (dm**(1 + theta) * Bm**(2 + n) +
+    res = xt**((2 - n) / (1 + theta)) - dt1 * wt**((2 + n) / (1 + theta)) * (dm**(1 + theta) * Bm**(2 + n) +
                             dmt**(1 + theta) * Bmt**(2 * (1 + n)) * ((1 + X / wt)**n - 1))**(-1 / (1 + theta))
 
+    return use_residual_where(Cbar == 0, res, TipAsym_power_law_MK_Res, dist, *args)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -294,7 +334,7 @@ def TipAsym_power_law_Res(dist, *args):
 
     (wEltRibbon, Kprime, Eprime, fluidProp, Cbar, DistLstTSEltRibbon, dt) = args
     
-    if Cbar == 0:
+    if np.all(Cbar == 0):
         return TipAsym_power_law_MK_Res(dist, *args)
     
     Vel = (dist - DistLstTSEltRibbon) / dt
@@ -318,9 +358,11 @@ def TipAsym_power_law_Res(dist, *args):
           (dmt * Vmt * Bm**((2 + n) / n) * Vmt**((1 + theta) / n) +
            dm * Vm * X / wt * Bmt**(2 * (1 + n) / n) * Vm**((1 + theta) / n))
 
-    return xt**((2 - n) / (1 + theta)) - dt1 * wt**((2 + n) / (1 + theta)) * (dm**(1 + theta) * Bm**(2 + n) +
+    res = xt**((2 - n) / (1 + theta)) - dt1 * wt**((2 + n) / (1 + theta)) * (dm**(1 + theta) * Bm**(2 + n) +
                             dmt**(1 + theta) * Bmt**(2 * (1 + n)) * ((1 + X / wt)**n - 1))**(-1 / (1 + theta))
 
+    return use_residual_where(Cbar == 0, res, TipAsym_power_law_MK_Res, dist, *args)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -445,43 +487,151 @@ def FindBracket_dist(w, Kprime, Eprime, fluidProp, Cprime, DistLstTS, dt, mesh,
     a = -DistLstTS * (1 + 5e3 * np.finfo(float).eps)
     if fluidProp.rheology == "Newtonian" or sum(Cprime) == 0:
         b = np.full((len(w),), 6 * (mesh.hx**2 + mesh.hy**2)**0.5, dtype=np.float64)
-    elif simProp.get_tipAsymptote() in ["PLF", "PLF_aprox", "PLF_num_quad"]:
+    elif simProp.get_tipAsymptote() in ["PLF", "PLF_aprox", "PLF_num_quad", "PLF_tab_quad"]:
         b = (w * Eprime / Kprime)**2 - np.finfo(float).eps
-    elif simProp.get_tipAsymptote() in ["HBF", "HBF_aprox", "HBF_num_quad"]:
-        b = np.zeros(len(w), dtype=np.float64)
-        for i in range(0, len(w)):
+    elif simProp.get_tipAsymptote() in ["HBF", "HBF_aprox", "HBF_num_quad", "HBF_tab_quad"]:
+        # the roots of the residual are found for all of the cells at once with the secant method
+        TipAsmptargs = (w, Kprime, Eprime, fluidProp, Cprime, -DistLstTS, dt)
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            b, converged = newton(Vm_residual, (w * Eprime / Kprime)**2, args=TipAsmptargs, maxiter=100,
+                                  full_output=True, disp=False)[:2]
+        b = np.asarray(b, dtype=np.float64)
+        # the cells where it has not converged are solved one by one, as before
+        for i in np.where(~np.logical_and(converged, np.isfinite(b)))[0]:
             TipAsmptargs = (w[i], Kprime[i], Eprime[i], fluidProp, Cprime[i], -DistLstTS[i], dt)
-            b[i] = fsolve(Vm_residual, (w[i] * Eprime[i] / Kprime[i])**2, args=TipAsmptargs)
-        
-        
-    for i in range(0, len(w)):
+            b[i] = fsolve(Vm_residual, (w[i] * Eprime[i] / Kprime[i])**2, args=TipAsmptargs)[0]
+
+    TipAsmptargs = (w, Kprime, Eprime, fluidProp, Cprime, -DistLstTS, dt)
+    Res_a = ResFunc(a, *TipAsmptargs)
+    Res_b = ResFunc(b, *TipAsmptargs)
+
+    # the bracket is searched simultaneously for all of the cells where the residual does not change sign. The left end
+    # is moved towards the right end and the right end is moved further if the residual is positive at both ends.
+    mid = np.copy(b)
+    to_bracket = np.where(Res_a * Res_b > 0)[0]
+    cnt = 0
+    while to_bracket.size > 0:
+        cnt += 1
+        mid[to_bracket] = (a[to_bracket] + 2 * mid[to_bracket]) / 3  # weighted
+        Res_a[to_bracket] = ResFunc(mid[to_bracket], *get_args_subset(TipAsmptargs, to_bracket))
+        found = Res_a[to_bracket] * Res_b[to_bracket] < 0
+        a[to_bracket[found]] = mid[to_bracket[found]]
+
+        both_pstv = np.logical_and(~found, np.logical_and(Res_a[to_bracket] > 0.0, Res_b[to_bracket] > 0.0))
+        if np.any(both_pstv):
+            extend = to_bracket[both_pstv]
+            mid_b = b[extend] * 2. ** cnt
+            Res_b[extend] = ResFunc(mid_b, *get_args_subset(TipAsmptargs, extend))
+            found_b = Res_a[extend] * Res_b[extend] < 0
+            a[extend[found_b]] = mid[extend[found_b]]
+            b[extend[found_b]] = mid_b[found_b]
+            found[both_pstv] = found_b
+
+        to_bracket = to_bracket[~found]
+        if cnt >= 100:  # Should assume not propagating. not set to check how frequently it happens.
+            a[to_bracket] = np.nan
+            b[to_bracket] = np.nan
+            break
+        to_bracket = to_bracket[Res_a[to_bracket] * Res_b[to_bracket] > 0]
 
-        TipAsmptargs = (w[i], Kprime[i], Eprime[i], fluidProp, Cprime[i], -DistLstTS[i], dt)
-        Res_a = ResFunc(a[i], *TipAsmptargs)
-        Res_b = ResFunc(b[i], *TipAsmptargs)
+    return a, b
 
-        cnt = 0
-        mid = b[i]
-        while Res_a * Res_b > 0:
-            mid = (a[i] + 2 * mid) / 3  # weighted
-            Res_a = ResFunc(mid, *TipAsmptargs)
-            cnt += 1
-            if Res_a * Res_b < 0:
-                a[i] = mid
-                break
-            elif Res_a > 0.0 and Res_b > 0.0:
-                mid_b = b[i] * 2 ** cnt
-                Res_b = ResFunc(mid_b, *TipAsmptargs)
-                if Res_a * Res_b < 0:
-                    a[i] = mid
-                    b[i] = mid_b
-                    break
-            if cnt >= 100:  # Should assume not propagating. not set to check how frequently it happens.
-                a[i] = np.nan
-                b[i] = np.nan
-                break
 
-    return a, b
+# ----------------------------------------------------------------------------------------------------------------------
+
+def get_args_subset(args, indices):
+    """ Get the arguments of a residual function for the given elements (the arrays in the arguments are given
+    elementwise)."""
+    return tuple(arg[indices] if isinstance(arg, np.ndarray) else arg for arg in args)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+
+def Chandrupatla(ResFunc, a, b, args, xtol=2e-12, rtol=4 * np.finfo(float).eps, maxiter=100):
+    """
+    Find the roots of a residual function that is evaluated elementwise on arrays with the bracketed method of
+    Chandrupatla (1997). As the Brent method, it switches between bisection and inverse quadratic interpolation, but the
+    choice depends only on the values of the function at the last three points and the iterations can be performed
+    simultaneously for all of the elements. The elements are removed from the iteration as they converge.
+
+    Arguments:
+        ResFunc (function):     -- the residual function, called as ResFunc(x, *args).
+        a (ndarray):            -- the left ends of the brackets.
+        b (ndarray):            -- the right ends of the brackets.
+        args (tuple):           -- the arguments of the residual function. The arrays in it are given elementwise.
+        xtol (float):           -- the absolute tolerance on the roots (as for scipy.optimize.brentq).
+        rtol (float):           -- the relative tolerance on the roots (as for scipy.optimize.brentq).
+        maxiter (int):          -- the maximum number of iterations.
+
+    Returns:
+        - roots (ndarray)       -- the roots found. It is nan where the bracket is not valid or if the iterations did \
+                                   not converge.
+        - bracketed (ndarray)   -- boolean array which is False where the residual does not change sign in the bracket.
+        - iterations (ndarray)  -- the number of iterations taken for each of the elements.
+    """
+
+    roots = np.full((len(a),), np.nan, dtype=np.float64)
+    iterations = np.zeros((len(a),), dtype=int)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        f_a = np.asarray(ResFunc(a, *args), dtype=np.float64)
+        f_b = np.asarray(ResFunc(b, *args), dtype=np.float64)
+    # as for the brent method, the residual can not be evaluated at one of the ends of the bracket (e.g. at the limit
+    # of validity of the asymptote). It is taken as infinite there, with the sign opposite to the other end.
+    f_a = np.where(np.logical_and(np.isnan(f_a), np.isfinite(f_b)), -np.sign(f_b) * np.inf, f_a)
+    f_b = np.where(np.logical_and(np.isnan(f_b), np.isfinite(f_a)), -np.sign(f_a) * np.inf, f_b)
+    bracketed = f_a * f_b <= 0
+    roots[f_b == 0] = b[f_b == 0]
+    roots[f_a == 0] = a[f_a == 0]
+
+    active = np.where(np.logical_and(bracketed, f_a * f_b != 0))[0]
+    x1, f1 = a[active], f_a[active]
+    x2, f2 = b[active], f_b[active]
+    x3, f3 = x2, f2
+    t = np.full((len(active),), 0.5)
+
+    for i in range(maxiter):
+        if active.size == 0:
+            break
+        iterations[active] += 1
+        xt = x2 + t * (x1 - x2)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            ft = np.asarray(ResFunc(xt, *get_args_subset(args, active)), dtype=np.float64)
+
+        # keep the root between x1 and x2, x3 being the previous point
+        same_sign = np.sign(ft) == np.sign(f2)
+        x3 = np.where(same_sign, x2, x1)
+        f3 = np.where(same_sign, f2, f1)
+        x1 = np.where(same_sign, x1, x2)
+        f1 = np.where(same_sign, f1, f2)
+        x2, f2 = xt, ft
+
+        closer = abs(f2) < abs(f1)
+        xm = np.where(closer, x2, x1)
+        fm = np.where(closer, f2, f1)
+        tol = (xtol + rtol * abs(xm)) / 2
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            tlim = tol / abs(x1 - x3)
+            converged = np.logical_or(tlim > 0.5, fm == 0)
+            roots[active[converged]] = xm[converged]
+
+            # inverse quadratic interpolation is used if the function is well behaved in between the last three points
+            xi = (x2 - x1) / (x3 - x1)
+            phi = (f2 - f1) / (f3 - f1)
+            iqi = np.logical_and(phi ** 2 < xi, (1 - phi) ** 2 < 1 - xi)
+            t = np.where(iqi,
+                         f2 / (f1 - f2) * f3 / (f1 - f3) + (x3 - x2) / (x1 - x2) * f2 / (f3 - f2) * f1 / (f3 - f1),
+                         0.5)
+        t = np.minimum(np.maximum(t, tlim), 1 - tlim)
+
+        # the elements for which the residual can not be evaluated are dropped (nan is returned)
+        keep = np.logical_and(~converged, np.isfinite(ft))
+        active, t = active[keep], t[keep]
+        x1, x2, x3 = x1[keep], x2[keep], x3[keep]
+        f1, f2, f3 = f1[keep], f2[keep], f3[keep]
+
+    return roots, bracketed, iterations
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -533,9 +683,9 @@ def TipAsymInversion(w, frac, matProp, fluidProp, simParmtrs, dt=None, Kprime_k=
         ResFunc = TipAsym_MDR_Res
     elif simParmtrs.get_tipAsymptote() == 'M_MDR':
         ResFunc = TipAsym_M_MDR_Res
-    elif simParmtrs.get_tipAsymptote() in ["HBF", "HBF_aprox", "HBF_num_quad"]:
+    elif simParmtrs.get_tipAsymptote() in ["HBF", "HBF_aprox", "HBF_num_quad", "HBF_tab_quad"]:
         ResFunc = TipAsym_Hershcel_Burkley_Res
-    elif simParmtrs.get_tipAsymptote() in ["PLF", "PLF_aprox", "PLF_num_quad"]:
+    elif simParmtrs.get_tipAsymptote() in ["PLF", "PLF_aprox", "PLF_num_quad", "PLF_tab_quad"]:
         ResFunc = TipAsym_power_law_Res
     elif simParmtrs.get_tipAsymptote() == 'PLF_M':
         ResFunc = TipAsym_PowerLaw_M_vertex_Res
@@ -547,6 +697,38 @@ def TipAsymInversion(w, frac, matProp, fluidProp, simParmtrs, dt=None, Kprime_k=
                                         Eprime * w[frac.EltRibbon]) > 1)[0]
     moving = np.arange(frac.EltRibbon.shape[0])[~np.in1d(frac.EltRibbon, frac.EltRibbon[stagnant])]
 
+    dist = -frac.sgndDist[frac.EltRibbon]
+    rootFind_itr = instrument_start('Chandrupatla method', perfNode)
+    n_moving = len(moving)
+    iterations_table = 0
+
+    if simParmtrs.tabulatedTipInversion and simParmtrs.get_tipAsymptote() in ['U', 'U1', 'MK', 'MDR', 'M_MDR']:
+        # the tip asymptote is inverted with the precomputed tables. The cells that can not be inverted with the tables
+        # are left to the root finder.
+        from tip_asymptote_tables import get_tip_inversion_table
+
+        TipAsmptargs = (w[frac.EltRibbon[moving]],
+                        Kprime[moving],
+                        Eprime[moving],
+                        fluidProp,
+                        matProp.Cprime[frac.EltRibbon[moving]],
+                        -frac.sgndDist[frac.EltRibbon[moving]],
+                        dt)
+        if simParmtrs.get_tipAsymptote() in ['MK', 'MDR', 'M_MDR']:
+            leak_off = np.full((len(moving),), False)
+        else:
+            leak_off = matProp.Cprime[frac.EltRibbon[moving]] > 0
+
+        inverted = np.full((len(moving),), False)
+        for with_leak_off in [True, False]:
+            cells = np.where(leak_off == with_leak_off)[0]
+            if cells.size > 0:
+                table = get_tip_inversion_table(ResFunc, leak_off=with_leak_off, folder=simParmtrs.tipTablesFolder)
+                dist_table, inverted[cells], iterations = table.invert(get_args_subset(TipAsmptargs, cells))
+                dist[moving[cells[inverted[cells]]]] = dist_table[inverted[cells]]
+                iterations_table += np.sum(iterations)
+        moving = moving[~inverted]
+
     a, b = FindBracket_dist(w[frac.EltRibbon[moving]],
                             Kprime[moving],
                             Eprime[moving],
@@ -565,48 +747,37 @@ def TipAsymInversion(w, frac, matProp, fluidProp, simParmtrs, dt=None, Kprime_k=
         if not stagnant.size == 0:
             stagnant = np.sort(np.unique(np.hstack((stagnant, moving[stagnant_from_bracketing]))))
         else:
-            stagnant = stagnant_from_bracketing
-        moving = np.arange(frac.EltRibbon.shape[0])[~np.in1d(frac.EltRibbon, frac.EltRibbon[stagnant])]
+            stagnant = moving[stagnant_from_bracketing]
+        moving = np.delete(moving, stagnant_from_bracketing)
     ## End of adaption
 
-    dist = -frac.sgndDist[frac.EltRibbon]
-    for i in range(0, len(moving)):
-        TipAsmptargs = (w[frac.EltRibbon[moving[i]]],
-                        Kprime[moving[i]],
-                        Eprime[moving[i]],
-                        fluidProp,
-                        matProp.Cprime[frac.EltRibbon[moving[i]]],
-                        -frac.sgndDist[frac.EltRibbon[moving[i]]],
-                        dt)
-        try:
-            if perfNode is None:
-                dist[moving[i]] = brentq(ResFunc, a[i], b[i], TipAsmptargs)
-            else:
-                brentq_itr = instrument_start('Brent method', perfNode)
-                dist[moving[i]], data = brentq(ResFunc, a[i], b[i], TipAsmptargs, full_output=True)
-                instrument_close(perfNode, brentq_itr, None, None, data.converged, None, None)
-                brentq_itr.iterations = data.iterations
-                perfNode.brentMethod_data.append(brentq_itr)
-        except RuntimeError:
-            dist[moving[i]] = np.nan
-        except ValueError:
-            if simParmtrs.get_tipAsymptote() == 'U1':
-                log.warning("First order did not converged: try with zero order.")
-                try:
-                    if perfNode is None:
-                        dist[moving[i]] = brentq(TipAsym_Universal_zrthOrder_Res, a[i], b[i], TipAsmptargs)
-                    else:
-                        brentq_itr = instrument_start('Brent method', perfNode)
-                        dist[moving[i]], data = brentq(ResFunc, a[i], b[i], TipAsmptargs, full_output=True)
-                        instrument_close(perfNode, brentq_itr, None, None, data.converged, None, None)
-                        brentq_itr.iterations = data.iterations
-                        perfNode.brentMethod_data.append(brentq_itr)
-                except RuntimeError:
-                    dist[moving[i]] = np.nan
-                except ValueError:
-                    dist[moving[i]] = np.nan
-            else:
-                dist[moving[i]] = np.nan
+    TipAsmptargs = (w[frac.EltRibbon[moving]],
+                    Kprime[moving],
+                    Eprime[moving],
+                    fluidProp,
+                    matProp.Cprime[frac.EltRibbon[moving]],
+                    -frac.sgndDist[frac.EltRibbon[moving]],
+                    dt)
+
+    # the roots are found simultaneously for all of the moving cells
+    dist[moving], bracketed, iterations = Chandrupatla(ResFunc, a, b, TipAsmptargs)
+
+    if simParmtrs.get_tipAsymptote() == 'U1' and not np.all(bracketed):
+        log.warning("First order did not converged: try with zero order.")
+        not_bracketed = np.where(~bracketed)[0]
+        dist[moving[not_bracketed]], bracketed_zrthOrder, iterations_zrthOrder = Chandrupatla(
+                                                                    TipAsym_Universal_zrthOrder_Res,
+                                                                    a[not_bracketed],
+                                                                    b[not_bracketed],
+                                                                    get_args_subset(TipAsmptargs, not_bracketed))
+        iterations[not_bracketed] += iterations_zrthOrder
+
+    if perfNode is not None:
+        # the iterations are aggregated over all of the cells
+        instrument_close(perfNode, rootFind_itr, None, n_moving, not np.isnan(dist).any(), None, None)
+        rootFind_itr.iterations = int(np.sum(iterations) + iterations_table)
+        perfNode.brentMethod_data.append(rootFind_itr)
+
     return dist
 
 # -----------------------------------------------------------------------------------------------------------------------
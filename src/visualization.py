@@ -1039,11 +1039,7 @@ def plot_fracture_slice_interpolated(var_value, mesh, point1=None, point2=None,
     sampling_points = np.hstack((np.linspace(point1[0], point2[0], 105).reshape((105, 1)),
                                  np.linspace(point1[1], point2[1], 105).reshape((105, 1))))
 
-    value_samp_points = griddata(mesh.CenterCoor,
-                                    var_value,
-                                    sampling_points,
-                                    method='linear',
-                                    fill_value=np.nan)
+    value_samp_points = interpolate_on_mesh(mesh, var_value, sampling_points)
 
     sampling_line_lft = ((sampling_points[:52, 0] - sampling_points[52, 0]) ** 2 +
                      (sampling_points[:52, 1] - sampling_points[52, 1]) ** 2) ** 0.5
@@ -1653,11 +1649,7 @@ def plot_slice_3D(var_value, mesh, point1=None, point2=None, fig=None, plot_prop
     sampling_points = np.hstack((np.linspace(point1[0], point2[0], 100).reshape((100, 1)),
                                  np.linspace(point1[1], point2[1], 100).reshape((100, 1))))
 
-    value_samp_points = griddata(mesh.CenterCoor,
-                                 var_value,
-                                 sampling_points,
-                                 method='linear',
-                                 fill_value=np.nan)
+    value_samp_points = interpolate_on_mesh(mesh, var_value, sampling_points)
 
     ax.plot(sampling_points[:,0],
             sampling_points[:,1],
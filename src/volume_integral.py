@@ -11,7 +11,7 @@ All rights reserved. See the LICENSE.TXT file for more details.
 import logging
 import numpy as np
 from scipy.optimize import brentq
-from tip_inversion import f, C1, C2
+from tip_inversion import f, C1, C2, Chandrupatla, get_args_subset, use_residual_where
 from scipy.integrate import quad
 
 beta_m = 2**(1/3) * 3**(5/6)
@@ -55,13 +55,17 @@ def TipAsym_UniversalW_zero_Res(w, *args):
     """Function to be minimized to find root for universal Tip assymptote (see Donstov and Pierce 2017)"""
     (dist, Kprime, Eprime, muPrime, Cbar, Vel) = args
 
-    if Cbar == 0:
+    if np.ndim(Cbar) == 0 and Cbar == 0:
         return TipAsym_MK_W_zrthOrder_Res(w, *args)
 
-    Kh = Kprime * dist ** 0.5 / (Eprime * w)
-    Ch = 2 * Cbar * dist ** 0.5 / (Vel ** 0.5 * w)
-    g0 = f(Kh, 0.9911799823 * Ch, 6 * 3 ** 0.5)
-    sh = muPrime * Vel * dist ** 2 / (Eprime * w ** 3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Kh = Kprime * dist ** 0.5 / (Eprime * w)
+        Ch = 2 * Cbar * dist ** 0.5 / (Vel ** 0.5 * w)
+        g0 = f(Kh, 0.9911799823 * Ch, 6 * 3 ** 0.5)
+        sh = muPrime * Vel * dist ** 2 / (Eprime * w ** 3)
+
+    if np.ndim(Cbar) > 0:
+        return use_residual_where(Cbar == 0, sh - g0, TipAsym_MK_W_zrthOrder_Res, w, *args)
 
     return sh - g0
 
@@ -73,19 +77,23 @@ def TipAsym_UniversalW_delt_Res(w, *args):
 
     (dist, Kprime, Eprime, muPrime, Cbar, Vel) = args
 
-    if Cbar == 0:
+    if np.ndim(Cbar) == 0 and Cbar == 0:
         return TipAsym_MK_W_deltaC_Res(w, *args)
 
-    Kh = Kprime * dist ** 0.5 / (Eprime * w)
-    Ch = 2 * Cbar * dist ** 0.5 / (Vel ** 0.5 * w)
-    sh = muPrime * Vel * dist ** 2 / (Eprime * w ** 3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Kh = Kprime * dist ** 0.5 / (Eprime * w)
+        Ch = 2 * Cbar * dist ** 0.5 / (Vel ** 0.5 * w)
+        sh = muPrime * Vel * dist ** 2 / (Eprime * w ** 3)
+
+        g0 = f(Kh, 0.9911799823 * Ch, 10.392304845)
+        delt = 10.392304845 * (1 + 0.9911799823 * Ch) * g0
 
-    g0 = f(Kh, 0.9911799823 * Ch, 10.392304845)
-    delt = 10.392304845 * (1 + 0.9911799823 * Ch) * g0
+        b = C2(delt) / C1(delt)
+        con = C1(delt)
+        gdelt = f(Kh, Ch * b, con)
 
-    b = C2(delt) / C1(delt)
-    con = C1(delt)
-    gdelt = f(Kh, Ch * b, con)
+    if np.ndim(Cbar) > 0:
+        return use_residual_where(Cbar == 0, sh - gdelt, TipAsym_MK_W_deltaC_Res, w, *args)
 
     return sh - gdelt
 
@@ -97,6 +105,15 @@ def TipAsym_MK_W_zrthOrder_Res(w, *args):
 
     (dist, Kprime, Eprime, muPrime, Cbar, Vel) = args
 
+    if np.ndim(Kprime) > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if muPrime == 0:
+                res = dist - w ** 2 * (Eprime / Kprime) ** 2
+            else:
+                w_tld = Eprime * w / (Kprime * dist ** 0.5)
+                res = w_tld - (1 + beta_m ** 3 * Eprime ** 2 * Vel * dist ** 0.5 * muPrime / Kprime ** 3) ** (1 / 3)
+        return use_residual_where(Kprime == 0, res, TipAsym_viscStor_Res, w, *args)
+
     if Kprime == 0:
         return TipAsym_viscStor_Res(w, *args) #todo: make this
     if muPrime == 0:
@@ -114,6 +131,18 @@ def TipAsym_MK_W_deltaC_Res(w, *args):
 
     (dist, Kprime, Eprime, muPrime, Cbar, Vel) = args
 
+    if np.ndim(Kprime) > 0:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if muPrime == 0:
+                res = dist - w ** 2 * (Eprime / Kprime) ** 2
+            else:
+                w_tld = Eprime * w / (Kprime * dist ** 0.5)
+                l_mk = (Kprime ** 3 / (Eprime ** 2 * muPrime * Vel)) ** 2
+                x_tld = (dist / l_mk) ** (1 / 2)
+                delta = 1 / 3 * beta_m ** 3 * x_tld / (1 + beta_m ** 3 * x_tld)
+                res = w_tld - (1 + 3 * C1(delta) * x_tld) ** (1 / 3)
+        return use_residual_where(Kprime == 0, res, TipAsym_viscStor_Res, w, *args)
+
     if Kprime == 0:
         return TipAsym_viscStor_Res(w, *args)
     if muPrime == 0:
@@ -140,11 +169,62 @@ def TipAsym_viscStor_Res(w, *args):
 
 # ----------------------------------------------------------------------------------------------------------------------
 
-def MomentsTipAssympGeneral(dist, Kprime, Eprime, muPrime, Cbar, Vel, stagnant, KIPrime, regime):
-    """Moments of the General tip asymptote to calculate the volume integral (see Donstov and Pierce, 2017)"""
+def MomentsTipAssympGeneral(dist, Kprime, Eprime, muPrime, Cbar, Vel, stagnant, KIPrime, regime, tabulated=False,
+                            tables_folder=None):
+    """Moments of the General tip asymptote to calculate the volume integral (see Donstov and Pierce, 2017). If
+    tabulated, the widths are evaluated from the tables of the width (see tip_asymptote_tables.TipWidthTable) cached in
+    the given folder, the widths out of the range of the tables being found with the root finder."""
     log = logging.getLogger('PyFrac.MomentsTipAssympGeneral')
     TipAsmptargs = (dist, Kprime, Eprime, muPrime, Cbar, Vel)
 
+    if np.ndim(dist) > 0:
+        # the widths are found simultaneously for all of the given distances
+        w = np.zeros((len(dist),), dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            w[stagnant] = KIPrime[stagnant] * dist[stagnant] ** 0.5 / Eprime[stagnant]
+        moving = np.where(np.logical_and(dist != 0, ~stagnant))[0]
+        if regime == 'U':
+            res_func = TipAsym_UniversalW_zero_Res
+        else:
+            res_func = TipAsym_UniversalW_delt_Res
+
+        if tabulated and moving.size > 0:
+            from tip_asymptote_tables import get_tip_width_table
+
+            args_moving = get_args_subset(TipAsmptargs, moving)
+            leak_off = args_moving[4] > 0
+            inverted = np.full((moving.size,), False)
+            for with_leak_off in [True, False]:
+                cells = np.where(leak_off == with_leak_off)[0]
+                if cells.size > 0:
+                    table = get_tip_width_table(res_func, leak_off=with_leak_off, folder=tables_folder)
+                    w_table, inverted[cells] = table.invert(get_args_subset(args_moving, cells))[:2]
+                    w[moving[cells[inverted[cells]]]] = w_table[inverted[cells]]
+            moving = moving[~inverted]
+
+        if moving.size > 0:
+            args_moving = get_args_subset(TipAsmptargs, moving)
+            a, b = FindBracket_w(*args_moving, regime)
+            w[moving] = Chandrupatla(res_func, a, b, args_moving)[0]
+
+            if (w[moving] < -1e-15).any():
+                log.warning('Negative width encountered in volume integral')
+                w[moving] = np.where(w[moving] < -1e-15, abs(w[moving]), w[moving])
+        w[dist == 0] = 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Kh = Kprime * dist ** 0.5 / (Eprime * w)
+            Ch = 2 * Cbar * dist ** 0.5 / (Vel ** 0.5 * w)
+            g0 = f(Kh, 0.9911799823 * Ch, 10.392304845)
+            delt = np.where(np.logical_or(Vel < 1e-6, w == 0), 1 / 6, 10.392304845 * (1 + 0.9911799823 * Ch) * g0)
+
+        M0 = 2 * w * dist / (3 + delt)
+        M1 = 2 * w * dist ** 2 / (5 + delt)
+        failed = np.logical_or(np.isnan(M0), np.isnan(M1))
+        M0[failed], M1[failed] = np.nan, np.nan
+
+        return M0, M1
+
     if dist == 0:
         w = 0
     elif stagnant:
@@ -217,11 +297,37 @@ def TipAsym_res_Herschel_Bulkley_d_given(w, *args):
                     dmt ** (1 + theta) * Bmt ** (2 * (1 + n)) * ((1 + X / wt) ** n - 1)) ** (-1 / (1 + theta))
 
 
+#-----------------------------------------------------------------------------------------------------------------------
+
+def TipAsym_res_Herschel_Bulkley_w(w, *args):
+    """The residual function for Herschel-Bulkley fluid model with the distance given as the last argument, to be used
+    with the root finder on arrays."""
+
+    return TipAsym_res_Herschel_Bulkley_d_given(w, args[:-1], args[-1])
+
+
 #-----------------------------------------------------------------------------------------------------------------------
 
 def MomentsTipAssymp_HBF_approx(s, *HB_args):
     """Approximate moments of the Herschel-Bulkley fluid. Delta is taken to be 1/6."""
 
+    if np.ndim(s) > 0:
+        # the widths are found simultaneously for all of the given distances
+        w = np.full((len(s),), np.nan)
+        a, b = FindBracket_w_HB(None, None, HB_args, s)
+        bracketed = np.where(~np.isnan(a))[0]
+        if bracketed.size > 0:
+            w[bracketed] = Chandrupatla(TipAsym_res_Herschel_Bulkley_w,
+                                        a[bracketed],
+                                        b[bracketed],
+                                        get_args_subset(HB_args + (s,), bracketed))[0]
+        M0 = 2 * w * s / (3 + 1 / 6)
+        M1 = 2 * w * s ** 2 / (5 + 1 / 6)
+        failed = np.logical_or(np.isnan(M0), np.isnan(M1))
+        M0[failed], M1[failed] = np.nan, np.nan
+
+        return M0, M1
+
     HB_args_ext = (HB_args, s)
     a = 1e-8
     b = 1e1
@@ -239,6 +345,38 @@ def MomentsTipAssymp_HBF_approx(s, *HB_args):
     return M0, M1
 
 
+#-----------------------------------------------------------------------------------------------------------------------
+
+def MomentsTipAssymp_HBF_tabulated(s, *HB_args, tables_folder=None):
+    """Moments of the Herschel-Bulkley fluid tip asymptote, interpolated from the tabulated integrals of the width (see
+    tip_asymptote_tables.TipVolumeTable). The tables are cached in the given folder. The moments out of the range of
+    the table are evaluated with numerical quadrature."""
+    from tip_asymptote_tables import get_tip_volume_table
+
+    (l, Kprime, Eprime, muPrime, Cbar, Vel, n, k, T0) = HB_args
+    scalar = np.ndim(s) == 0
+    dist, Kprime, Eprime, Cbar, Vel = (np.atleast_1d(np.asarray(arg, dtype=np.float64)) * np.ones((np.size(s),))
+                                       for arg in (s, Kprime, Eprime, Cbar, Vel))
+
+    M0 = np.full((len(dist),), np.nan)
+    M1 = np.full((len(dist),), np.nan)
+    for leak_off in [False, True]:
+        cells = np.where((Cbar > 0) == leak_off)[0]
+        if cells.size > 0:
+            table = get_tip_volume_table(n, yield_stress=T0 > 0, leak_off=leak_off, folder=tables_folder)
+            M0[cells], M1[cells] = table.moments(*get_args_subset((dist, Kprime, Eprime, Cbar, Vel), cells), k, T0)
+
+    for i in np.where(np.logical_and(np.isnan(M0), dist > 0))[0]:
+        args_HB = (dist[i], Kprime[i], Eprime[i], muPrime, Cbar[i], Vel[i], n, k, T0)
+        M0[i] = quad(width_HBF, 0, dist[i], args_HB)[0]
+        M1[i] = dist[i] * M0[i] - quad(width_dist_product_HBF, 0, dist[i], args_HB)[0]
+    M0[dist <= 0], M1[dist <= 0] = 0., 0.
+
+    if scalar:
+        return M0[0], M1[0]
+    return M0, M1
+
+
 #-----------------------------------------------------------------------------------------------------------------------
 
 def Pdistance(x, y, slope, intercpt):
@@ -249,15 +387,49 @@ def Pdistance(x, y, slope, intercpt):
 
 #-----------------------------------------------------------------------------------------------------------------------
 
-def VolumeTriangle(dist, *param):
+def evaluate_elementwise_cases(func, dist, param, tabulated=False, tables_folder=None):
+    """
+    Evaluate the function giving the volume (VolumeTriangle or Area) on arrays for the cases that are not evaluated
+    at once for all of the distances, i.e. the regimes evaluated with numerical quadrature and the stagnant cells (with
+    the universal asymptote). Returns None if the function is to be evaluated at once.
+    """
+    regime, stagnant = param[0], param[6]
+
+    if len(dist) == 0:
+        return np.zeros((0,), dtype=np.float64)
+
+    if regime in ['HBF_num_quad', 'PLF_num_quad']:
+        return np.asarray([func(dist[i], *get_args_subset(param, i)) for i in range(len(dist))], dtype=np.float64)
+
+    if regime not in ['U', 'U1'] and np.any(stagnant):
+        values = np.empty((len(dist),), dtype=np.float64)
+        values[stagnant] = func(dist[stagnant], 'U1', *get_args_subset(param[1:], stagnant), tabulated=tabulated,
+                                tables_folder=tables_folder)
+        values[~stagnant] = func(dist[~stagnant], *get_args_subset(param, ~stagnant), tabulated=tabulated,
+                                 tables_folder=tables_folder)
+        return values
+
+    return None
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def VolumeTriangle(dist, *param, tabulated=False, tables_folder=None):
     """
     Volume  of the triangle defined by perpendicular distance (dist) and em (em=1/sin(alpha)cos(alpha), where alpha
-    is the angle of the perpendicular). The regime variable identifies the propagation regime.
+    is the angle of the perpendicular). The regime variable identifies the propagation regime. The tables of the
+    tabulated regimes are cached in the given tables folder. If tabulated, the width of the universal asymptote is
+    evaluated from the tables.
     """
 
     regime, fluid_prop, Kprime, Eprime, Cbar, Vel, stagnant, KIPrime, arrival_t, em, t_lstTS, dt = param
 
-    if stagnant:
+    if np.ndim(dist) > 0:
+        values = evaluate_elementwise_cases(VolumeTriangle, dist, param, tabulated=tabulated,
+                                            tables_folder=tables_folder)
+        if values is not None:
+            return values
+    elif stagnant:
         regime = 'U1'
 
     if regime == 'A':
@@ -271,6 +443,13 @@ def VolumeTriangle(dist, *param):
 
     elif regime == 'Lk':
         t = t_lstTS + dt
+        if np.ndim(dist) > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_e = np.where(Vel <= 0, arrival_t, t - dist / Vel)
+                intgrl_0_t = 4 / 15 * em * (t - t_e) ** (5 / 2) * Vel ** 2
+                intgrl_0_tm1 = np.where((t - t_e - dt) < 0, 0., 4 / 15 * em * (t - t_e - dt) ** (5 / 2) * Vel ** 2)
+            return intgrl_0_t - intgrl_0_tm1
+
         if Vel <= 0:
             t_e = arrival_t
         else:
@@ -289,6 +468,16 @@ def VolumeTriangle(dist, *param):
                                     Cbar * fluid_prop.muPrime / Eprime) ** 0.25 * em * Vel ** 0.125 * dist ** (21 / 8)
 
     elif regime == 'U' or regime == 'U1':
+        if np.ndim(dist) > 0:
+            visc = np.logical_and(np.logical_and(Cbar == 0, Kprime == 0), ~stagnant)  # fully viscosity dominated
+            with np.errstate(invalid='ignore'):
+                volume = 0.7081526678 * (Vel * fluid_prop.muPrime / Eprime) ** (1 / 3) * em * dist ** (8 / 3)
+            if not visc.all():
+                (M0, M1) = MomentsTipAssympGeneral(*get_args_subset((dist, Kprime, Eprime, fluid_prop.muPrime, Cbar,
+                                                                     Vel, stagnant, KIPrime, regime), ~visc),
+                                                   tabulated=tabulated, tables_folder=tables_folder)
+                volume[~visc] = em[~visc] * (dist[~visc] * M0 - M1)
+            return volume
         if Cbar == 0 and Kprime == 0 and not stagnant: # if fully viscosity dominated
             return 0.7081526678 * (Vel * fluid_prop.muPrime / Eprime) ** (1 / 3) * em * dist ** (8 / 3)
         (M0, M1) = MomentsTipAssympGeneral(dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, stagnant, KIPrime, regime)
@@ -318,6 +507,11 @@ def VolumeTriangle(dist, *param):
         args_HB = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, fluid_prop.T0)
         return em * quad(width_dist_product_HBF, 0, dist, args_HB)[0]
     
+    elif regime == 'HBF_tab_quad':
+        args_HB = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, fluid_prop.T0)
+        (M0, M1) = MomentsTipAssymp_HBF_tabulated(dist, *args_HB, tables_folder=tables_folder)
+        return em * (dist * M0 - M1)
+
     elif regime in ['PLF', 'PLF_aprox']:
         args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
         (M0, M1) = MomentsTipAssymp_HBF_approx(dist, *args_PLF)
@@ -327,6 +521,11 @@ def VolumeTriangle(dist, *param):
         args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
         return em * quad(width_dist_product_HBF, 0, dist, args_PLF)[0]
 
+    elif regime == 'PLF_tab_quad':
+        args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
+        (M0, M1) = MomentsTipAssymp_HBF_tabulated(dist, *args_PLF, tables_folder=tables_folder)
+        return em * (dist * M0 - M1)
+
     elif regime == 'PLF_M':
         n = fluid_prop.n
         k = fluid_prop.k
@@ -339,13 +538,18 @@ def VolumeTriangle(dist, *param):
 
 #-----------------------------------------------------------------------------------------------------------------------
 
-def Area(dist, *param):
+def Area(dist, *param, tabulated=False, tables_folder=None):
     """Gives Area under the tip depending on the regime identifier ;  
-    used in case of 0 or 90 degree angle; can be used for 1d case"""
+    used in case of 0 or 90 degree angle; can be used for 1d case. The tables of the tabulated regimes are cached in
+    the given tables folder. If tabulated, the width of the universal asymptote is evaluated from the tables."""
 
     regime, fluid_prop, Kprime, Eprime, Cbar, Vel, stagnant, KIPrime, arrival_t, em, t_lstTS, dt = param
 
-    if stagnant:
+    if np.ndim(dist) > 0:
+        values = evaluate_elementwise_cases(Area, dist, param, tabulated=tabulated, tables_folder=tables_folder)
+        if values is not None:
+            return values
+    elif stagnant:
         regime = 'U1'
 
     if regime == 'A':
@@ -359,6 +563,13 @@ def Area(dist, *param):
 
     elif regime == 'Lk':
         t = t_lstTS + dt
+        if np.ndim(dist) > 0:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t_e = np.where(Vel <= 0, arrival_t, t - dist / Vel)
+                intgrl_0_t = 2 / 3 * (t - t_e) ** (3 / 2) * Vel
+                intgrl_0_tm1 = np.where((t - t_e - dt) < 0, 0., 2 / 3 * (t - t_e - dt) ** (3 / 2) * Vel)
+            return intgrl_0_t - intgrl_0_tm1
+
         if Vel <= 0:
             t_e = arrival_t
         else:
@@ -377,6 +588,15 @@ def Area(dist, *param):
         13 / 8)
 
     elif regime == 'U' or regime == 'U1':
+        if np.ndim(dist) > 0:
+            visc = np.logical_and(np.logical_and(Cbar == 0, Kprime == 0), ~stagnant)  # fully viscosity dominated
+            with np.errstate(invalid='ignore'):
+                area = 1.8884071141 * (Vel * fluid_prop.muPrime / Eprime) ** (1 / 3) * dist ** (5 / 3)
+            if not visc.all():
+                area[~visc] = MomentsTipAssympGeneral(*get_args_subset((dist, Kprime, Eprime, fluid_prop.muPrime, Cbar,
+                                                                        Vel, stagnant, KIPrime, regime), ~visc),
+                                                      tabulated=tabulated, tables_folder=tables_folder)[0]
+            return area
         if Cbar == 0 and Kprime == 0 and not stagnant:  # if fully viscosity dominated
             return 1.8884071141 * (Vel * fluid_prop.muPrime / Eprime) ** (1 / 3) * dist ** (5 / 3)
         (M0, M1) = MomentsTipAssympGeneral(dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, stagnant, KIPrime, regime)
@@ -404,6 +624,10 @@ def Area(dist, *param):
         args_HB = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, fluid_prop.T0)
         return quad(width_HBF, 0, dist, args_HB)[0]
     
+    elif regime == 'HBF_tab_quad':
+        args_HB = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, fluid_prop.T0)
+        return MomentsTipAssymp_HBF_tabulated(dist, *args_HB, tables_folder=tables_folder)[0]
+
     elif regime in ['PLF', 'PLF_aprox']:
         args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
         (M0, M1) = MomentsTipAssymp_HBF_approx(dist, *args_PLF)
@@ -412,6 +636,10 @@ def Area(dist, *param):
     elif regime == 'PLF_num_quad':
         args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
         return quad(width_HBF, 0, dist, args_PLF)[0]
+
+    elif regime == 'PLF_tab_quad':
+        args_PLF = (dist, Kprime, Eprime, fluid_prop.muPrime, Cbar, Vel, fluid_prop.n, fluid_prop.k, 0.)
+        return MomentsTipAssymp_HBF_tabulated(dist, *args_PLF, tables_folder=tables_folder)[0]
         
     elif regime == 'PLF_M':
         n = fluid_prop.n
@@ -425,7 +653,8 @@ def Area(dist, *param):
 #-----------------------------------------------------------------------------------------------------------------------
 
 def Integral_over_cell(EltTip, alpha, l, mesh, function, frac=None, mat_prop=None, fluid_prop=None, Vel=None,
-                       Kprime=None, Eprime=None, Cprime=None, stagnant=None, KIPrime=None, dt=None, arrival_t=None, projMethod=None):
+                       Kprime=None, Eprime=None, Cprime=None, stagnant=None, KIPrime=None, dt=None, arrival_t=None,
+                       projMethod=None, tabulated=False, tables_folder=None):
     """
     Calculate integral of the function specified by the argument function over the cell.
 
@@ -459,6 +688,9 @@ def Integral_over_cell(EltTip, alpha, l, mesh, function, frac=None, mat_prop=Non
                                                 - PLF_num_quad (power law fluid, see Dontsov and \
                                                       Kresse 2017; the tip volume is evaluated with numerical quadrature of the\ 
                                                       approximate function, which makes it very slow)
+                                                - HBF_tab_quad and PLF_tab_quad (as HBF_num_quad and \
+                                                      PLF_num_quad, with the integrals of the width interpolated from \
+                                                      tables built once for the flow index of the fluid)
                                                 - PLF_M (power law fluid in viscosity storage regime; see Desroche et al.) 
         frac (Fracture):                -- the fracture object.
         mat_prop (MaterialProperties):  -- the material properties object.
@@ -474,17 +706,22 @@ def Integral_over_cell(EltTip, alpha, l, mesh, function, frac=None, mat_prop=Non
                                            moving.
         dt (float):                     -- the time step, only used to calculate leak off.
         arrival_t (ndarray):            -- the time at which the front passes the given point.
+        projMethod (string):            -- the method used to project the front on the cells.
+        tabulated (bool):               -- if True, the width of the universal asymptote ('U' and 'U1' functions) is
+                                           evaluated from precomputed tables.
+        tables_folder (string):         -- the folder in which the tip volume and width tables are cached (only used
+                                           with the HBF_tab_quad and PLF_tab_quad functions or if tabulated).
 
     Returns:
         integral (ndarray)              -- the integral of the specified function over the given tip cells.
 
     """
     log = logging.getLogger('PyFrac.Integral_over_cell')
-    # Pass None as dummy if parameter is not required
-    dummy = np.full((alpha.size,),None)
+    # Pass nan as dummy if parameter is not required
+    dummy = np.full((alpha.size,), np.nan)
 
     if stagnant is None:
-        stagnant = dummy
+        stagnant = np.full((alpha.size,), False)
     if KIPrime is None:
         KIPrime = dummy
 
@@ -514,74 +751,101 @@ def Integral_over_cell(EltTip, alpha, l, mesh, function, frac=None, mat_prop=Non
     if arrival_t is None:
         arrival_t = dummy
 
+    # packing parameters to pass
+    param_pack = (function, fluid_prop, Kprime, Eprime, Cprime, Vel, np.asarray(stagnant, dtype=bool), KIPrime,
+                  arrival_t, t_lstTS, dt)
+
     integral = np.zeros((len(l),), float)
-    i=0
-    while i < len(l):
-
-        if abs(alpha[i]) >= 1e-8 and abs(alpha[i] - np.pi / 2) >= 1e-8:
-            m = 1 / (np.sin(alpha[i]) * np.cos(alpha[i]))  # the m parameter (see e.g. A. Pierce 2015)
-        else : 
-            m = np.inf
-        # packing parameters to pass
-        param_pack = (function, fluid_prop, Kprime[i], Eprime[i], Cprime[i], Vel[i], stagnant[i], KIPrime[i],
-                      arrival_t[i], m, t_lstTS, dt)
-
-        if abs(alpha[i]) < 1e-8:
-            # the angle inscribed by the perpendicular is zero
-            if l[i] <= mesh.hx:
-                # the front is within the cell.
-                integral[i] = Area(l[i], *param_pack) * mesh.hy
-            else:
-                # the front has surpassed this cell.
-                integral[i] = (Area(l[i], *param_pack) - Area(l[i] - mesh.hx, *param_pack)) * mesh.hy
-
-        elif abs(alpha[i] - np.pi / 2) < 1e-8:
-            # the angle inscribed by the perpendicular is 90 degrees
-            if l[i] <= mesh.hy:
-                # the front is within the cell.
-                integral[i] = Area(l[i], *param_pack) * mesh.hx
-            else:
-                # the front has surpassed this cell.
-                integral[i] = (Area(l[i], *param_pack) - Area(l[i] - mesh.hy, *param_pack)) * mesh.hx
+    to_evaluate = np.arange(len(l))
+    while to_evaluate.size > 0:
+        integral[to_evaluate] = integral_over_tip_cells(alpha[to_evaluate],
+                                                        l[to_evaluate],
+                                                        mesh,
+                                                        get_args_subset(param_pack, to_evaluate),
+                                                        tabulated=tabulated,
+                                                        tables_folder=tables_folder)
+
+        if projMethod == 'LS_continousfront' and function == 'A':
+            to_evaluate = to_evaluate[integral[to_evaluate] / mesh.EltArea > 1. + 1e-4]
+            if to_evaluate.size > 0:
+                log.debug("Recomputing Integral over cell (filling fraction) --> if something else goes wrong the tip "
+                          "volume might be the problem")
+                alpha[to_evaluate] = np.where(abs(alpha[to_evaluate]) < np.pi / 2, 0, np.pi / 2)
         else:
-            yIntrcpt = l[i] / np.cos(np.pi / 2 - alpha[i]) # Y intercept of the front line
-            grad = -1 / np.tan(alpha[i]) # gradient of the front line
+            break
 
-            # integral of the triangle made by the front by intersecting the x and y directional lines of the cell
-            TriVol = VolumeTriangle(l[i], *param_pack)
+    return integral
 
-            # distance of the front from the upper left vertex of the grid cell
-            lUp = Pdistance(0, mesh.hy, grad, yIntrcpt)
 
-            if lUp > 0:  # upper vertex of the triangle is higher than the grid cell height
-                UpTriVol = VolumeTriangle(lUp, *param_pack)
-            else:
-                UpTriVol = 0
-
-            # distance of the front from the lower right vertex of the grid cell
-            lRt = Pdistance(mesh.hx, 0, grad, yIntrcpt)
+#-----------------------------------------------------------------------------------------------------------------------
 
-            if lRt > 0:  # right vertex of the triangle is wider than the grid cell width
-                RtTriVol = VolumeTriangle(lRt, *param_pack)
-            else:
-                RtTriVol = 0
+def integral_over_tip_cells(alpha, l, mesh, param_pack, tabulated=False, tables_folder=None):
+    """
+    Calculate the integral over the given tip cells simultaneously (see Integral_over_cell). The cells are classified
+    by the angle of the perpendicular drawn on the front (zero, 90 degrees or general) and the function is evaluated at
+    once for all of the distances required.
 
-            # distance of the front from the upper right vertex of the grid cell
-            IntrsctTriDist = Pdistance(mesh.hx, mesh.hy, grad, yIntrcpt)
+    Arguments:
+        alpha (ndarray):                -- the angle alpha of the perpendicular drawn on the front from the zero vertex.
+        l (ndarray):                    -- the length of the perpendicular drawn on the front from the zero vertex.
+        mesh (CartesianMesh):           -- the mesh object.
+        param_pack (tuple):             -- the parameters passed to the function (see Area and VolumeTriangle), with
+                                           the m parameter left out.
+        tabulated (bool):               -- if True, the width of the universal asymptote is evaluated from tables.
+        tables_folder (string):         -- the folder in which the tip volume and width tables are cached.
 
-            if IntrsctTriDist > 0:  # front has passed the grid cell
-                IntrsctTri = VolumeTriangle(IntrsctTriDist, *param_pack)
-            else:
-                IntrsctTri = 0
+    Returns:
+        integral (ndarray)              -- the integral of the specified function over the given tip cells.
+    """
 
-            integral[i] = TriVol - UpTriVol - RtTriVol + IntrsctTri
+    integral = np.zeros((len(l),), float)
 
-        if projMethod == 'LS_continousfront' and function == 'A' and integral[i]/ mesh.EltArea > 1.+1e-4:
-            log.debug("Recomputing Integral over cell (filling fraction) --> if something else goes wrong the tip volume might be the problem")
-            if abs(alpha[i]) < np.pi / 2 : alpha[i]=0
-            else : alpha[i] = np.pi / 2
-        else:
-            i = i + 1
+    zero_angle = abs(alpha) < 1e-8
+    right_angle = np.logical_and(~zero_angle, abs(alpha - np.pi / 2) < 1e-8)
+    aligned = np.where(np.logical_or(zero_angle, right_angle))[0]
+    general = np.where(np.logical_and(~zero_angle, ~right_angle))[0]
+
+    # the m parameter (see e.g. A. Pierce 2015)
+    m = np.full((len(l),), np.inf)
+    m[general] = 1 / (np.sin(alpha[general]) * np.cos(alpha[general]))
+    param_pack = param_pack[:9] + (m,) + param_pack[9:]
+
+    # the angle inscribed by the perpendicular is zero or 90 degrees
+    h_across = np.where(zero_angle[aligned], mesh.hx, mesh.hy)
+    h_along = np.where(zero_angle[aligned], mesh.hy, mesh.hx)
+    # the front has surpassed the cell
+    surpassed = np.where(~(l[aligned] <= h_across))[0]
+    areas = Area(np.concatenate((l[aligned], l[aligned[surpassed]] - h_across[surpassed])),
+                 *get_args_subset(param_pack, np.concatenate((aligned, aligned[surpassed]))),
+                 tabulated=tabulated,
+                 tables_folder=tables_folder)
+    integral[aligned] = areas[:len(aligned)] * h_along
+    integral[aligned[surpassed]] = (areas[:len(aligned)][surpassed] - areas[len(aligned):]) * h_along[surpassed]
+
+    # the front makes a triangle by intersecting the x and y directional lines of the cell
+    yIntrcpt = l[general] / np.cos(np.pi / 2 - alpha[general])  # Y intercept of the front line
+    grad = -1 / np.tan(alpha[general])  # gradient of the front line
+
+    # distance of the front from the upper left, lower right and upper right vertices of the grid cell
+    lUp = Pdistance(0, mesh.hy, grad, yIntrcpt)
+    lRt = Pdistance(mesh.hx, 0, grad, yIntrcpt)
+    IntrsctTriDist = Pdistance(mesh.hx, mesh.hy, grad, yIntrcpt)
+
+    # the triangles that are to be subtracted or added back, if the front is beyond the corresponding vertex
+    up, rt, intrsct = np.where(lUp > 0)[0], np.where(lRt > 0)[0], np.where(IntrsctTriDist > 0)[0]
+    volumes = VolumeTriangle(np.concatenate((l[general], lUp[up], lRt[rt], IntrsctTriDist[intrsct])),
+                             *get_args_subset(param_pack, np.concatenate((general, general[up], general[rt],
+                                                                          general[intrsct]))),
+                             tabulated=tabulated,
+                             tables_folder=tables_folder)
+    TriVol, UpTriVol, RtTriVol, IntrsctTri = (np.zeros((len(general),), float) for i in range(4))
+    n_vol = np.cumsum([len(general), len(up), len(rt), len(intrsct)])
+    TriVol[:] = volumes[:n_vol[0]]
+    UpTriVol[up] = volumes[n_vol[0]:n_vol[1]]
+    RtTriVol[rt] = volumes[n_vol[1]:n_vol[2]]
+    IntrsctTri[intrsct] = volumes[n_vol[2]:n_vol[3]]
+
+    integral[general] = TriVol - UpTriVol - RtTriVol + IntrsctTri
 
     return integral
 
@@ -598,6 +862,9 @@ def FindBracket_w(dist, Kprime, Eprime, muPrime, Cprime, Vel, regime):
     else:
         res_func = TipAsym_UniversalW_delt_Res
 
+    if np.ndim(dist) > 0:
+        return FindBracket_w_arrays(dist, Kprime, Eprime, muPrime, Cprime, Vel, res_func)
+
     if dist == 0:
         log.warning("Zero distance!")
 
@@ -642,6 +909,61 @@ def FindBracket_w(dist, Kprime, Eprime, muPrime, Cprime, Vel, regime):
     return a, b
 
 
+#-----------------------------------------------------------------------------------------------------------------------
+
+def FindBracket_w_arrays(dist, Kprime, Eprime, muPrime, Cprime, Vel, res_func):
+    """
+    This function finds the brackets to be used by the Universal tip asymptote root finder simultaneously for all of
+    the given distances (see FindBracket_w).
+    """
+    log = logging.getLogger('PyFrac.FindBracket_w')
+
+    if (dist == 0).any():
+        log.warning("Zero distance!")
+
+    with np.errstate(invalid='ignore'):
+        wk = dist ** 0.5 * Kprime / Eprime
+        wmtld = 4 / (15 ** (1 / 4) * (2 ** 0.5 - 1) ** (1 / 4)) * \
+                            (2 * Cprime * Vel ** (1/2) * muPrime / Eprime) ** (1/4)\
+                            * dist ** (5/8)
+        wm = 2 ** (1 / 3) * 3 ** (5 / 6) * (Vel * muPrime / Eprime) ** (1/3) * dist ** (2/3)
+
+    # the minimum and maximum ignoring nan, as given by np.nanmin and np.nanmax
+    eps = np.finfo(float).eps
+    min_all, max_all = np.fmin(np.fmin(wk, wmtld), wm), np.fmax(np.fmax(wk, wmtld), wm)
+    min_mtld_m, max_mtld_m = np.fmin(wmtld, wm), np.fmax(wmtld, wm)
+    min_k_m, max_k_m = np.fmin(wk, wm), np.fmax(wk, wm)
+    cases = [min_all > eps, min_mtld_m > eps, min_k_m > eps]
+    b = np.select(cases, [0.95 * min_all, 0.95 * min_mtld_m, 0.95 * min_k_m], 0.95 * max_all)
+    a = np.select(cases, [1.05 * max_all, 1.05 * max_mtld_m, 1.05 * max_k_m], 1.05 * max_all)
+
+    TipAsmptargs = (dist, Kprime, Eprime, muPrime, Cprime, Vel)
+
+    cnt = 1
+    Res_a = res_func(a, *TipAsmptargs)
+    Res_b = res_func(b, *TipAsmptargs)
+
+    to_bracket = np.where(np.logical_or(Res_a * Res_b > 0, np.logical_or(np.isnan(Res_a), np.isnan(Res_b))))[0]
+    while to_bracket.size > 0:
+        args_to_bracket = get_args_subset(TipAsmptargs, to_bracket)
+        a[to_bracket] = 2 * a[to_bracket]
+        Res_a[to_bracket] = res_func(a[to_bracket], *args_to_bracket)
+
+        b[to_bracket] = 0.5 * b[to_bracket]
+        Res_b[to_bracket] = res_func(b[to_bracket], *args_to_bracket)
+
+        cnt += 1
+        if cnt >= 20:
+            a[to_bracket] = np.nan
+            b[to_bracket] = np.nan
+            break
+        to_bracket = to_bracket[np.logical_or(Res_a[to_bracket] * Res_b[to_bracket] > 0,
+                                              np.logical_or(np.isnan(Res_a[to_bracket]),
+                                                            np.isnan(Res_b[to_bracket])))]
+
+    return a, b
+
+
 #-----------------------------------------------------------------------------------------------------------------------
 
 def FindBracket_w_HB(a, b, *args):
@@ -659,6 +981,35 @@ def FindBracket_w_HB(a, b, *args):
     alpha = -0.3107 * n + 1.9924
     a = Kprime * np.sqrt(dist) / Eprime * (1 + (np.sqrt(4 * np.pi * T0t) * xt) ** alpha) ** (
         1 / alpha) + 10*np.finfo(float).eps
+
+    if np.ndim(dist) > 0:
+        # the brackets are found simultaneously for all of the given distances
+        b = np.ones((len(dist),), dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            Res_a = TipAsym_res_Herschel_Bulkley_d_given(a, *args)
+            Res_b = TipAsym_res_Herschel_Bulkley_d_given(b, *args)
+            cnt = 1
+            to_bracket = np.where(Res_a * Res_b > 0)[0]
+            while to_bracket.size > 0:
+                b[to_bracket] = 10 ** cnt * b[to_bracket]
+                Res_b[to_bracket] = TipAsym_res_Herschel_Bulkley_w(b[to_bracket],
+                                                                   *get_args_subset(args[0] + (dist,), to_bracket))
+                cnt += 1
+                if cnt >= 12:
+                    log.debug("can't find bracket for " + repr(to_bracket.size) + " cells")
+                    a[to_bracket] = np.nan
+                    b[to_bracket] = np.nan
+                    break
+                to_bracket = to_bracket[Res_a[to_bracket] * Res_b[to_bracket] > 0]
+
+        failed = np.logical_or(np.isnan(Res_a), np.isnan(Res_b))
+        if failed.any():
+            log.debug("res is nan!")
+        a[failed] = np.nan
+        b[failed] = np.nan
+
+        return a, b
+
     b = 1
     cnt = 1
     Res_a = TipAsym_res_Herschel_Bulkley_d_given(a, *args)
@@ -750,3 +1101,69 @@ def leak_off_stagnant_tip(Elts, l, alpha, vrtx_arr_time, current_time, Cprime, t
     LkOff = 2 * Cprime[Elts] * (t_since_arrival ** 0.5 - t_since_arrival_lstTS ** 0.5) * area
 
     return LkOff
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def leak_off_channel(Elts, Tarrival, time_lstTS, Cprime, time_step, mesh):
+    """
+    This function evaluates the Carter leak-off from the given channel cells over the time step, at once for all of
+    the cells. With t_since_arrival_lstTS the time since the arrival of the front at the last time step (zero if the
+    front has arrived after it), the difference of the square roots of the times since arrival is evaluated as
+    time_step / (sqrt(t_since_arrival_lstTS + time_step) + sqrt(t_since_arrival_lstTS)), which does not lose precision
+    when the time step is small compared to the time since arrival.
+
+    Arguments:
+        Elts (ndarray):                 -- the channel cells.
+        Tarrival (ndarray):             -- the arrival time of the front for each of the cell in the mesh.
+        time_lstTS (float):             -- the time at the last time step.
+        Cprime (ndarray):               -- the Carter's leak off coefficient multiplied by 2 for each of the cell in the
+                                           mesh.
+        time_step (float):              -- the time step.
+        mesh (CartesianMesh):           -- the mesh object.
+
+    Returns:
+        LkOff (ndarray)                 -- the volume leaked off from the given cells over the time step.
+    """
+
+    t_since_arrival_lstTS = np.maximum(time_lstTS - Tarrival[Elts], 0.)
+
+    return 2 * Cprime[Elts] * mesh.EltArea * time_step / ((t_since_arrival_lstTS + time_step) ** 0.5
+                                                           + t_since_arrival_lstTS ** 0.5)
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+
+def arrival_time_new_channel(Tarrival, EltCrack_lstTS, time, l, alpha, Vel, mesh):
+    """
+    This function evaluates the arrival time of the front in the tip cells that have become channel cells in the time
+    step, as the average of the times at which the front has entered and left the cells. The arrival times are not
+    allowed to be earlier than the latest arrival time before the time step. The arrival time is set only in the cells
+    of the fracture and the fracture does not recede, so that the latest arrival time is found in the cells of the
+    fracture at the last time step instead of the whole mesh.
+
+    Arguments:
+        Tarrival (ndarray):             -- the arrival time of the front for each of the cell in the mesh at the last
+                                           time step.
+        EltCrack_lstTS (ndarray):       -- the cells of the fracture at the last time step.
+        time (float):                   -- the time at the end of the time step.
+        l (ndarray):                    -- the length of the perpendicular drawn on the front from the zero vertex of
+                                           the new channel cells.
+        alpha (ndarray):                -- the angle of the perpendicular drawn on the front in the new channel cells.
+        Vel (ndarray):                  -- the velocity of the front in the new channel cells.
+        mesh (CartesianMesh):           -- the mesh object.
+
+    Returns:
+        Tarrival_new (ndarray)          -- the arrival time of the front in the new channel cells.
+    """
+
+    t_enter = time - l / Vel
+    max_l = mesh.hx * np.cos(alpha) + mesh.hy * np.sin(alpha)
+    t_leave = time - (l - max_l) / Vel
+    Tarrival_new = (t_enter + t_leave) / 2
+
+    if len(Tarrival_new) > 0:
+        max_Tarrival = np.nanmax(Tarrival[EltCrack_lstTS])
+        Tarrival_new[Tarrival_new < max_Tarrival] = max_Tarrival
+
+    return Tarrival_new